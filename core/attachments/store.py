@@ -0,0 +1,220 @@
+"""
+Almacén de archivos por contenido para ISMAPP.
+
+Cada archivo se guarda una sola vez, con su hash SHA-256 como nombre:
+``objects/ab/cdef0123...``. El hash se calcula mientras el archivo se copia,
+por bloques de ``CHUNK_SIZE``: un escaneo o una planilla de cientos de MB
+nunca se carga completo en memoria, y no hace falta leerlo dos veces.
+
+La copia se escribe primero en ``tmp/`` y se mueve a su lugar con un
+rename atómico, de modo que en ``objects/`` nunca hay archivos a medias
+(aunque el programa se cierre durante la copia). Si el contenido ya
+existía, la copia temporal se descarta: dos adjuntos iguales ocupan el
+espacio de uno.
+
+Los objetos no se modifican nunca; solo se crean y, cuando ningún adjunto
+los usa, se eliminan (ver AttachmentService.collect_garbage).
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+# Bloque de lectura y escritura (bytes)
+CHUNK_SIZE = 1024 * 1024
+
+# Antigüedad (segundos) desde la que una copia temporal se considera abandonada
+STALE_TEMP_AGE = 24 * 3600
+
+
+class ContentStore:
+    """Archivos guardados por su hash SHA-256."""
+
+    def __init__(self, root=os.path.join("data", "attachments")):
+        """
+        Inicializa el almacén (crea los directorios si no existen).
+
+        Args:
+            root (str, optional): Directorio del almacén
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.temp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+    def path_for(self, digest):
+        """
+        Obtiene la ruta de un objeto.
+
+        Args:
+            digest (str): Hash SHA-256 en hexadecimal
+
+        Returns:
+            str: Ruta del archivo
+        """
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def exists(self, digest):
+        """Indica si el almacén tiene un objeto."""
+        return os.path.exists(self.path_for(digest))
+
+    def put_file(self, source_path, progress=None):
+        """
+        Guarda una copia de un archivo.
+
+        Args:
+            source_path (str): Archivo a guardar
+            progress (callable, optional): Función (bytes copiados, total)
+
+        Returns:
+            tuple: (hash, tamaño en bytes, True si el contenido era nuevo)
+        """
+        total = os.path.getsize(source_path)
+        with open(source_path, "rb") as source:
+            return self.put_stream(source, progress, total)
+
+    def put_stream(self, stream, progress=None, total=None):
+        """
+        Guarda el contenido de un archivo abierto, calculando su hash al copiarlo.
+
+        Args:
+            stream: Archivo binario abierto para lectura
+            progress (callable, optional): Función (bytes copiados, total)
+            total (int, optional): Tamaño esperado (solo para informar el avance)
+
+        Returns:
+            tuple: (hash, tamaño en bytes, True si el contenido era nuevo)
+        """
+        sha256 = hashlib.sha256()
+        buffer = bytearray(CHUNK_SIZE)
+        view = memoryview(buffer)
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.temp_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                while True:
+                    count = stream.readinto(buffer)
+                    if not count:
+                        break
+                    chunk = view[:count]
+                    sha256.update(chunk)
+                    target.write(chunk)
+                    size += count
+                    if progress is not None:
+                        progress(size, total)
+                target.flush()
+                os.fsync(target.fileno())
+
+            digest = sha256.hexdigest()
+            created = self._commit(temp_path, digest)
+            return digest, size, created
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def open(self, digest):
+        """
+        Abre un objeto para lectura.
+
+        Args:
+            digest (str): Hash del objeto
+
+        Returns:
+            file: Archivo binario abierto
+
+        Raises:
+            FileNotFoundError: Si el objeto no existe
+        """
+        return open(self.path_for(digest), "rb")
+
+    def copy_to(self, digest, destination_path, progress=None):
+        """
+        Copia un objeto a un archivo, por bloques.
+
+        Args:
+            digest (str): Hash del objeto
+            destination_path (str): Archivo de destino
+            progress (callable, optional): Función (bytes copiados, total)
+        """
+        total = os.path.getsize(self.path_for(digest))
+        copied = 0
+        buffer = bytearray(CHUNK_SIZE)
+        view = memoryview(buffer)
+        with self.open(digest) as source, open(destination_path, "wb") as target:
+            while True:
+                count = source.readinto(buffer)
+                if not count:
+                    break
+                target.write(view[:count])
+                copied += count
+                if progress is not None:
+                    progress(copied, total)
+
+    def verify(self, digest):
+        """
+        Comprueba que el contenido de un objeto coincida con su hash.
+
+        Returns:
+            bool: True si el objeto existe y está íntegro
+        """
+        sha256 = hashlib.sha256()
+        buffer = bytearray(CHUNK_SIZE)
+        view = memoryview(buffer)
+        try:
+            with self.open(digest) as source:
+                while True:
+                    count = source.readinto(buffer)
+                    if not count:
+                        break
+                    sha256.update(view[:count])
+        except FileNotFoundError:
+            return False
+        return sha256.hexdigest() == digest
+
+    def remove(self, digest):
+        """
+        Elimina un objeto (si existe).
+
+        Returns:
+            bool: True si se eliminó
+        """
+        try:
+            os.remove(self.path_for(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clean_temp(self, max_age=STALE_TEMP_AGE):
+        """
+        Elimina copias temporales abandonadas (cierres durante una copia).
+
+        Returns:
+            int: Archivos eliminados
+        """
+        removed = 0
+        limit = time.time() - max_age
+        for name in os.listdir(self.temp_dir):
+            path = os.path.join(self.temp_dir, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass  # otro puesto la está usando o ya la eliminó
+        return removed
+
+    def _commit(self, temp_path, digest):
+        """Mueve la copia temporal a su lugar; False si el contenido ya existía."""
+        final_path = self.path_for(digest)
+        if os.path.exists(final_path):
+            return False
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        try:
+            os.replace(temp_path, final_path)
+        except PermissionError:
+            # En Windows falla si otro puesto lo acaba de crear y lo tiene abierto
+            if os.path.exists(final_path):
+                return False
+            raise
+        return True
@@ -0,0 +1,300 @@
+"""
+Miniaturas de los archivos adjuntos.
+
+Decodificar un escaneo o la primera página de un PDF cada vez que se abre
+la ficha de un cliente es lento, así que cada miniatura se genera una sola
+vez y se guarda como PNG en un caché en disco. La clave es el hash del
+contenido más el tamaño de la miniatura (``<sha256>-<px>``): dos adjuntos
+iguales comparten miniatura y un adjunto nunca cambia de contenido, por lo
+que una miniatura guardada no vence nunca.
+
+El caché tiene un tope en MB y descarta las miniaturas menos usadas (LRU).
+El orden de uso es la fecha de modificación de cada archivo, que se
+actualiza en cada acierto: el caché conserva su orden entre sesiones.
+
+Las imágenes se decodifican con Pillow y los PDF se rasterizan con PyMuPDF,
+ambos opcionales: si no están instalados, el adjunto no tiene miniatura.
+Las imágenes JPEG se decodifican directamente a escala reducida
+(``Image.draft``) y las páginas PDF se rasterizan al tamaño de la
+miniatura, nunca a resolución completa.
+"""
+import importlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from core.attachments.store import STALE_TEMP_AGE
+
+logger = logging.getLogger(__name__)
+
+# Lado mayor de las miniaturas (píxeles)
+THUMBNAIL_SIZE = 96
+
+# Tope del caché en disco
+DEFAULT_CACHE_MB = 64
+
+_IMAGE_TYPES = ("image/jpeg", "image/png", "image/gif", "image/bmp", "image/tiff", "image/webp")
+_PDF_TYPE = "application/pdf"
+
+# Módulos opcionales ya buscados (nombre -> módulo o None)
+_optional_modules = {}
+
+
+def _optional_import(name):
+    """Importa un módulo opcional una sola vez; None si no está instalado."""
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = importlib.import_module(name)
+        except ImportError:
+            _optional_modules[name] = None
+    return _optional_modules[name]
+
+
+def can_preview(mime_type):
+    """
+    Indica si un tipo de archivo puede tener miniatura con los módulos instalados.
+
+    Args:
+        mime_type (str): Tipo de contenido
+
+    Returns:
+        bool: True si se puede generar su miniatura
+    """
+    if mime_type in _IMAGE_TYPES:
+        return _optional_import("PIL.Image") is not None
+    if mime_type == _PDF_TYPE:
+        return _optional_import("fitz") is not None
+    return False
+
+
+def render_thumbnail(path, mime_type, size=THUMBNAIL_SIZE):
+    """
+    Genera la miniatura PNG de un archivo.
+
+    Args:
+        path (str): Archivo de origen
+        mime_type (str): Tipo de contenido
+        size (int, optional): Lado mayor en píxeles
+
+    Returns:
+        bytes: PNG de la miniatura, o None si el tipo no tiene miniatura o el
+            archivo no se pudo decodificar
+    """
+    if not can_preview(mime_type):
+        return None
+    try:
+        if mime_type == _PDF_TYPE:
+            return _render_pdf(path, size)
+        return _render_image(path, size)
+    except Exception as e:
+        # Archivo dañado o con un formato que el decodificador no entiende
+        logger.warning(f"No se pudo generar la miniatura de {path}: {e}")
+        return None
+
+
+def _render_image(path, size):
+    Image = _optional_import("PIL.Image")
+    with Image.open(path) as image:
+        # JPEG: decodificar a 1/2, 1/4 o 1/8 en lugar de a tamaño completo
+        image.draft("RGB", (size, size))
+        image.thumbnail((size, size))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        output = io.BytesIO()
+        image.save(output, "PNG", optimize=True)
+        return output.getvalue()
+
+
+def _render_pdf(path, size):
+    fitz = _optional_import("fitz")
+    with fitz.open(path) as document:
+        if document.page_count == 0:
+            return None
+        page = document.load_page(0)
+        zoom = size / max(page.rect.width, page.rect.height)
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return pixmap.tobytes("png")
+
+
+class ThumbnailCache:
+    """Caché LRU de miniaturas en disco, con tope en MB."""
+
+    def __init__(self, root, max_mb=DEFAULT_CACHE_MB):
+        """
+        Inicializa el caché (crea el directorio si no existe).
+
+        Args:
+            root (str): Directorio del caché
+            max_mb (float, optional): Tamaño máximo en MB
+        """
+        self.root = root
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # clave -> bytes, del menos al más usado
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def key_for(digest, size):
+        """Clave de la miniatura de un contenido a un tamaño."""
+        return f"{digest}-{size}"
+
+    def path_for(self, key):
+        """Ruta del archivo de una miniatura."""
+        return os.path.join(self.root, key + ".png")
+
+    def contains(self, key):
+        """
+        Indica si una miniatura está en el índice (solo memoria, sin acceder al disco).
+
+        Args:
+            key (str): Clave de la miniatura
+
+        Returns:
+            bool: True si está en el caché
+        """
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        """
+        Busca una miniatura y marca su uso en el disco (fuera del hilo de Tk).
+
+        Args:
+            key (str): Clave de la miniatura
+
+        Returns:
+            str: Ruta del PNG, o None si no está en el caché
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Otro puesto la descartó
+            with self._lock:
+                self._forget(key)
+            return None
+        return path
+
+    def put(self, key, data):
+        """
+        Guarda una miniatura y descarta las menos usadas si se supera el tope.
+
+        Args:
+            key (str): Clave de la miniatura
+            data (bytes): PNG de la miniatura
+
+        Returns:
+            str: Ruta del PNG guardado
+        """
+        path = self.path_for(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                target.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(data)
+            self._total += len(data)
+            evicted = self._evict()
+        for old_key in evicted:
+            self._remove_file(old_key)
+        return path
+
+    def discard(self, digest):
+        """
+        Elimina las miniaturas de un contenido (a cualquier tamaño).
+
+        Args:
+            digest (str): Hash del contenido
+        """
+        prefix = digest + "-"
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._forget(key)
+        for key in keys:
+            self._remove_file(key)
+
+    def stats(self):
+        """
+        Obtiene el estado del caché.
+
+        Returns:
+            dict: entries, bytes, max_bytes, hits y misses
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _load_index(self):
+        """Carga las miniaturas guardadas, ordenadas por último uso."""
+        found = []
+        stale = time.time() - STALE_TEMP_AGE
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".part"):
+                # Escritura interrumpida hace rato (una reciente puede ser de
+                # otro puesto que está guardando una miniatura)
+                try:
+                    if entry.stat().st_mtime < stale:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+                continue
+            if not entry.name.endswith(".png"):
+                continue
+            try:
+                info = entry.stat()
+            except FileNotFoundError:
+                continue
+            found.append((info.st_mtime, entry.name[:-4], info.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+        evicted = self._evict()
+        for key in evicted:
+            self._remove_file(key)
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total -= size
+
+    def _evict(self):
+        """Saca del índice las menos usadas hasta quedar bajo el tope (con el lock tomado)."""
+        evicted = []
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            evicted.append(key)
+        return evicted
+
+    def _remove_file(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,297 @@
+"""
+Copias de seguridad en línea de la base de datos de ISMAPP.
+
+Copiar ``ismv3.db`` con ``shutil.copy2`` mientras otros puestos escriben
+puede producir una copia inconsistente (una transacción a medias, o el
+archivo principal sin el WAL). ``online_backup`` usa la API de backup de
+SQLite, que copia páginas de una instantánea consistente.
+
+La copia se hace por tramos de ``pages_per_step`` páginas con una pausa
+entre tramos, para no acaparar el disco ni la red:
+
+- En modo WAL la conexión de origen mantiene una transacción de lectura
+  durante toda la copia. La copia sale de esa instantánea y los demás
+  puestos siguen escribiendo sin esperar (en WAL los lectores no bloquean
+  a los escritores).
+- Con diario de reversión (perfil de carpeta compartida) una lectura
+  abierta sí bloquearía las escrituras, así que entre tramos no se retiene
+  ningún bloqueo. Si otro puesto escribe durante la copia, SQLite la
+  reinicia desde el principio; tras ``max_restarts`` reinicios se termina
+  en un solo paso (bloquea las escrituras solo lo que dura esa copia).
+
+La copia se escribe en un archivo temporal y se renombra al terminar: en
+el directorio de respaldos nunca hay copias a medias. Con ``compress`` se
+guarda comprimida con gzip (por bloques, sin cargarla en memoria).
+
+``RetentionPolicy`` decide qué copias conservar (las últimas N y una por
+día, semana y mes).
+"""
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+# Directorio de respaldos por defecto
+BACKUP_DIR = os.path.join("data", "backups")
+
+# Páginas copiadas por tramo y pausa entre tramos (segundos)
+DEFAULT_PAGES_PER_STEP = 128
+DEFAULT_STEP_PAUSE = 0.02
+
+# Reinicios tolerados antes de terminar la copia en un solo paso
+DEFAULT_MAX_RESTARTS = 3
+
+# Espera ante un bloqueo de escritura de otro puesto (segundos)
+BUSY_TIMEOUT = 5.0
+
+BACKUP_PREFIX = "ismv3_backup_"
+_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+_BACKUP_PATTERN = re.compile(r"^ismv3_backup_(\d{8}_\d{6})(\.db|\.db\.gz|\.json)$")
+
+# Bloque de compresión (bytes)
+_CHUNK_SIZE = 1024 * 1024
+
+
+class _RestartLimit(Exception):
+    """La copia por tramos se reinició demasiadas veces."""
+
+
+def backup_file_name(timestamp, compress=False):
+    """
+    Nombre del archivo de una copia.
+
+    Args:
+        timestamp (datetime): Fecha de la copia
+        compress (bool, optional): Si la copia va comprimida
+
+    Returns:
+        str: Nombre (p. ej. 'ismv3_backup_20240131_235900.db.gz')
+    """
+    return backup_name(timestamp) + (".db.gz" if compress else ".db")
+
+
+def backup_name(timestamp):
+    """Nombre de una copia sin extensión (p. ej. 'ismv3_backup_20240131_235900')."""
+    return f"{BACKUP_PREFIX}{timestamp.strftime(_TIMESTAMP_FORMAT)}"
+
+
+def parse_backup_file(file_name):
+    """
+    Obtiene la fecha de una copia a partir del nombre de su archivo.
+
+    Args:
+        file_name (str): Nombre de la copia (.db, .db.gz o manifiesto .json)
+
+    Returns:
+        datetime: Fecha de la copia, o None si el nombre no es de una copia
+    """
+    match = _BACKUP_PATTERN.match(file_name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), _TIMESTAMP_FORMAT)
+
+
+def list_backups(backup_dir=BACKUP_DIR):
+    """
+    Lista las copias de un directorio (incluidas las de versiones anteriores).
+
+    Args:
+        backup_dir (str, optional): Directorio de respaldos
+
+    Returns:
+        list: Tuplas (fecha, ruta), de la más reciente a la más antigua
+    """
+    backups = []
+    if not os.path.isdir(backup_dir):
+        return backups
+    for name in os.listdir(backup_dir):
+        timestamp = parse_backup_file(name)
+        if timestamp is not None and not name.endswith(".json"):
+            backups.append((timestamp, os.path.join(backup_dir, name)))
+    backups.sort(reverse=True)
+    return backups
+
+
+def online_backup(db_path, destination_path, pages_per_step=DEFAULT_PAGES_PER_STEP,
+                  step_pause=DEFAULT_STEP_PAUSE, compress=False, max_restarts=DEFAULT_MAX_RESTARTS,
+                  verify=True):
+    """
+    Copia una base de datos en uso, sin detener a los demás puestos.
+
+    Args:
+        db_path (str): Base de datos de origen
+        destination_path (str): Archivo de la copia
+        pages_per_step (int, optional): Páginas por tramo
+        step_pause (float, optional): Pausa entre tramos (segundos)
+        compress (bool, optional): Guardar la copia comprimida con gzip
+        max_restarts (int, optional): Reinicios antes de copiar en un solo paso
+        verify (bool, optional): Comprobar la copia con PRAGMA quick_check
+
+    Returns:
+        dict: path, size (bytes guardados), database_size, pages, steps,
+            restarts, snapshot (copia desde una instantánea WAL), single_step,
+            compressed y duration_ms
+
+    Raises:
+        sqlite3.Error: Si la base de datos no se pudo leer o la copia está dañada
+        OSError: Si la copia no se pudo escribir
+    """
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(destination_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    os.close(fd)
+    state = {"steps": 0, "restarts": 0, "remaining": None, "pages": 0}
+
+    def progress(status, remaining, total):
+        state["steps"] += 1
+        state["pages"] = total
+        # Si quedan más páginas que en el tramo anterior, otro puesto escribió
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise _RestartLimit()
+        state["remaining"] = remaining
+        if remaining and step_pause:
+            # Los demás puestos escriben durante la pausa
+            time.sleep(step_pause)
+
+    single_step = False
+    source = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True,
+                             timeout=BUSY_TIMEOUT, isolation_level=None)
+    try:
+        snapshot = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        if snapshot:
+            # La lectura abierta fija la instantánea hasta el final de la copia
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        target = sqlite3.connect(temp_path)
+        try:
+            try:
+                source.backup(target, pages=pages_per_step, progress=progress)
+            except _RestartLimit:
+                single_step = True
+                source.backup(target, pages=-1)
+            if snapshot:
+                source.execute("COMMIT")
+            if verify:
+                result = target.execute("PRAGMA quick_check").fetchone()[0]
+                if result != "ok":
+                    raise sqlite3.DatabaseError(f"La copia no superó la verificación: {result}")
+        finally:
+            target.close()
+        database_size = os.path.getsize(temp_path)
+
+        if compress:
+            compressed_path = temp_path + ".gz"
+            try:
+                with open(temp_path, "rb") as plain, gzip.open(compressed_path, "wb", compresslevel=6) as packed:
+                    shutil.copyfileobj(plain, packed, _CHUNK_SIZE)
+                _fsync(compressed_path)
+                os.replace(compressed_path, destination_path)
+            finally:
+                if os.path.exists(compressed_path):
+                    os.remove(compressed_path)
+        else:
+            _fsync(temp_path)
+            os.replace(temp_path, destination_path)
+    finally:
+        source.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return {
+        "path": destination_path,
+        "size": os.path.getsize(destination_path),
+        "database_size": database_size,
+        "pages": state["pages"],
+        "steps": state["steps"],
+        "restarts": state["restarts"],
+        "snapshot": snapshot,
+        "single_step": single_step,
+        "compressed": compress,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def restore_file(backup_path, destination_path):
+    """
+    Extrae una copia (comprimida o no) a un archivo de base de datos.
+
+    No sobrescribe la base de datos en uso: el destino debe ser un archivo
+    nuevo, que luego se reemplaza con la aplicación cerrada.
+
+    Args:
+        backup_path (str): Archivo de la copia
+        destination_path (str): Archivo de destino
+    """
+    opener = gzip.open if backup_path.endswith(".gz") else open
+    with opener(backup_path, "rb") as source, open(destination_path, "xb") as target:
+        shutil.copyfileobj(source, target, _CHUNK_SIZE)
+
+
+def _fsync(path):
+    with open(path, "rb+") as handle:
+        os.fsync(handle.fileno())
+
+
+class RetentionPolicy:
+    """Reglas para decidir qué copias conservar."""
+
+    def __init__(self, keep_last=5, keep_daily=7, keep_weekly=4, keep_monthly=6):
+        """
+        Inicializa la política.
+
+        Una copia se conserva si cumple cualquiera de las reglas.
+
+        Args:
+            keep_last (int, optional): Copias más recientes que se conservan siempre
+            keep_daily (int, optional): Días con copia (la última de cada día)
+            keep_weekly (int, optional): Semanas con copia (la última de cada semana)
+            keep_monthly (int, optional): Meses con copia (la última de cada mes)
+        """
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+        self.keep_monthly = keep_monthly
+
+    def select_expired(self, backups):
+        """
+        Selecciona las copias que ya no hace falta conservar.
+
+        Args:
+            backups (list): Tuplas (fecha, ruta), de la más reciente a la más antigua
+
+        Returns:
+            list: Rutas de las copias vencidas
+        """
+        keep = set(path for _, path in backups[:self.keep_last])
+        periods = (
+            (self.keep_daily, lambda ts: ts.date()),
+            (self.keep_weekly, lambda ts: tuple(ts.isocalendar())[:2]),
+            (self.keep_monthly, lambda ts: (ts.year, ts.month)),
+        )
+        for count, period_of in periods:
+            seen = set()
+            for timestamp, path in backups:
+                period = period_of(timestamp)
+                if period in seen:
+                    continue
+                if len(seen) >= count:
+                    break
+                seen.add(period)
+                keep.add(path)
+        return [path for _, path in backups if path not in keep]
+
+    def to_dict(self):
+        """Convierte la política a diccionario."""
+        return {
+            "keep_last": self.keep_last,
+            "keep_daily": self.keep_daily,
+            "keep_weekly": self.keep_weekly,
+            "keep_monthly": self.keep_monthly,
+        }
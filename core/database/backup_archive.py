@@ -0,0 +1,488 @@
+"""
+Archivo de respaldos deduplicado por bloques de páginas.
+
+Una copia completa diaria repite casi todo: entre un día y el siguiente
+solo cambian las páginas de las tablas con movimiento (pesajes del día,
+change_log, índices). El archivo parte cada copia en bloques de
+``pages_per_chunk`` páginas y guarda cada bloque distinto una sola vez,
+con su hash SHA-256 como nombre y comprimido con zlib:
+
+    archive/
+        chunks/ab/cdef0123...      bloques (nunca se modifican)
+        snapshots/<nombre>.json    manifiesto de cada copia
+
+SQLite nunca desplaza páginas dentro del archivo, así que los bloques de
+tamaño fijo alineados a páginas se deduplican bien sin recurrir a cortes
+por contenido: una página que no cambió cae siempre en el mismo bloque.
+El espacio ocupado crece con lo que cambia cada día, no con el tamaño de
+la base de datos.
+
+El manifiesto lista los hashes de los bloques en orden y el hash del
+archivo completo. Se escribe al final, cuando todos sus bloques ya están
+en disco: una copia interrumpida deja bloques huérfanos (que elimina
+``collect_garbage``) pero nunca un manifiesto incompleto.
+
+Varios puestos comparten el archivo (está junto a la base de datos en la
+carpeta compartida). ``add_snapshot`` y ``collect_garbage`` se excluyen con
+un archivo de bloqueo (``archive.lock``, creado con O_EXCL): si no, la
+recolección de un puesto podría borrar un bloque que otro acaba de dar por
+existente, y el manifiesto de ese otro puesto quedaría apuntando a un
+bloque que ya no está.
+
+La restauración escribe bloque a bloque (la memoria usada no depende del
+tamaño de la base de datos) y la verificación revisa los bloques en
+paralelo: zlib y hashlib liberan el GIL con bloques de este tamaño.
+"""
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Directorio del archivo por defecto
+ARCHIVE_DIR = os.path.join("data", "backups", "archive")
+
+# Páginas por bloque (16 páginas de 4 KiB = bloques de 64 KiB)
+DEFAULT_PAGES_PER_CHUNK = 16
+
+# Hilos de la verificación por defecto
+DEFAULT_VERIFY_WORKERS = 4
+
+# Antigüedad (segundos) desde la que un bloque temporal se considera abandonado
+STALE_TEMP_AGE = 3600
+
+# Bloqueo entre puestos: espera máxima, renovación y antigüedad desde la que
+# se considera abandonado (el puesto que lo tenía se cerró sin liberarlo)
+LOCK_TIMEOUT = 600
+LOCK_REFRESH = 30
+LOCK_STALE_AGE = 300
+_LOCK_POLL = 0.5
+
+MANIFEST_VERSION = 1
+
+_SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+class ArchiveError(Exception):
+    """El archivo de respaldos está incompleto o dañado."""
+
+
+def read_page_size(db_path):
+    """
+    Lee el tamaño de página de un archivo de base de datos SQLite.
+
+    Args:
+        db_path (str): Archivo de base de datos
+
+    Returns:
+        int: Tamaño de página en bytes
+
+    Raises:
+        ArchiveError: Si el archivo no es una base de datos SQLite
+    """
+    with open(db_path, "rb") as source:
+        header = source.read(18)
+    if len(header) < 18 or not header.startswith(_SQLITE_HEADER):
+        raise ArchiveError(f"{db_path} no es una base de datos SQLite")
+    page_size = int.from_bytes(header[16:18], "big")
+    # El valor 1 representa páginas de 65536 bytes
+    return 65536 if page_size == 1 else page_size
+
+
+class _ArchiveLock:
+    """Archivo de bloqueo compartido entre puestos (creado con O_EXCL)."""
+
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+        self._refreshed = 0.0
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                self._break_if_stale()
+                if time.monotonic() >= deadline:
+                    raise ArchiveError("El archivo de respaldos está en uso por otro puesto")
+                time.sleep(_LOCK_POLL)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(f"{socket.gethostname()} {os.getpid()}\n")
+            self._refreshed = time.monotonic()
+            return self
+
+    def __exit__(self, *exc_info):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def refresh(self):
+        """Renueva el bloqueo (lo llaman las operaciones largas)."""
+        now = time.monotonic()
+        if now - self._refreshed >= LOCK_REFRESH:
+            self._refreshed = now
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+
+    def _break_if_stale(self):
+        try:
+            if time.time() - os.path.getmtime(self.path) > LOCK_STALE_AGE:
+                logger.warning(f"Bloqueo abandonado en {self.path}; se libera")
+                os.remove(self.path)
+        except OSError:
+            pass
+
+
+class BackupArchive:
+    """Copias de la base de datos guardadas por bloques deduplicados."""
+
+    def __init__(self, root=ARCHIVE_DIR, pages_per_chunk=DEFAULT_PAGES_PER_CHUNK):
+        """
+        Inicializa el archivo (crea los directorios si no existen).
+
+        Args:
+            root (str, optional): Directorio del archivo
+            pages_per_chunk (int, optional): Páginas por bloque de las copias nuevas
+        """
+        self.root = root
+        self.pages_per_chunk = pages_per_chunk
+        self.chunks_dir = os.path.join(root, "chunks")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    def chunk_path(self, digest):
+        """Ruta del archivo de un bloque."""
+        return os.path.join(self.chunks_dir, digest[:2], digest[2:])
+
+    def manifest_path(self, name):
+        """Ruta del manifiesto de una copia."""
+        return os.path.join(self.snapshots_dir, name + ".json")
+
+    def lock(self, timeout=LOCK_TIMEOUT):
+        """
+        Bloqueo del archivo entre puestos (administrador de contexto).
+
+        add_snapshot y collect_garbage ya lo toman; no es reentrante.
+
+        Args:
+            timeout (float, optional): Espera máxima (segundos)
+
+        Raises:
+            ArchiveError: Si otro puesto lo retiene más que ``timeout``
+        """
+        return _ArchiveLock(os.path.join(self.root, "archive.lock"), timeout)
+
+    def add_snapshot(self, db_path, name, progress=None):
+        """
+        Agrega una copia al archivo.
+
+        El archivo de origen debe ser una copia consistente que nadie esté
+        modificando (p. ej. la generada por online_backup), no la base de
+        datos en uso.
+
+        Args:
+            db_path (str): Copia de la base de datos
+            name (str): Nombre de la copia (p. ej. 'ismv3_backup_20240131_235900')
+            progress (callable, optional): Función (bytes leídos, total)
+
+        Returns:
+            dict: name, size, chunks, new_chunks, new_bytes (bytes escritos en
+                el archivo) y duration_ms
+
+        Raises:
+            ArchiveError: Si el origen no es una base de datos SQLite, la copia ya
+                existe u otro puesto retiene el archivo demasiado tiempo
+        """
+        with self.lock() as lock:
+            return self._add_snapshot(db_path, name, progress, lock)
+
+    def _add_snapshot(self, db_path, name, progress, lock):
+        started = datetime.now()
+        if os.path.exists(self.manifest_path(name)):
+            raise ArchiveError(f"La copia {name} ya existe en el archivo")
+        page_size = read_page_size(db_path)
+        chunk_size = page_size * self.pages_per_chunk
+        total = os.path.getsize(db_path)
+
+        digests = []
+        new_chunks = 0
+        new_bytes = 0
+        file_hash = hashlib.sha256()
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        read = 0
+        with open(db_path, "rb") as source:
+            while True:
+                count = source.readinto(buffer)
+                if not count:
+                    break
+                chunk = view[:count]
+                file_hash.update(chunk)
+                digest = hashlib.sha256(chunk).hexdigest()
+                digests.append(digest)
+                if not os.path.exists(self.chunk_path(digest)):
+                    new_bytes += self._write_chunk(digest, chunk)
+                    new_chunks += 1
+                read += count
+                lock.refresh()
+                if progress is not None:
+                    progress(read, total)
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "name": name,
+            "created_at": started.isoformat(timespec="seconds"),
+            "size": total,
+            "page_size": page_size,
+            "chunk_size": chunk_size,
+            "sha256": file_hash.hexdigest(),
+            "new_chunks": new_chunks,
+            "new_bytes": new_bytes,
+            "chunks": digests,
+        }
+        self._write_manifest(name, manifest)
+        return {
+            "name": name,
+            "size": total,
+            "chunks": len(digests),
+            "new_chunks": new_chunks,
+            "new_bytes": new_bytes,
+            "duration_ms": round((datetime.now() - started).total_seconds() * 1000, 1),
+        }
+
+    def list_snapshots(self):
+        """
+        Lista los nombres de las copias del archivo.
+
+        Returns:
+            list: Nombres, del más reciente al más antiguo
+        """
+        names = [entry[:-5] for entry in os.listdir(self.snapshots_dir) if entry.endswith(".json")]
+        return sorted(names, reverse=True)
+
+    def load_manifest(self, name):
+        """
+        Lee el manifiesto de una copia.
+
+        Raises:
+            ArchiveError: Si la copia no existe o su manifiesto está dañado
+        """
+        try:
+            with open(self.manifest_path(name), "r", encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except FileNotFoundError:
+            raise ArchiveError(f"La copia {name} no existe en el archivo")
+        except json.JSONDecodeError as e:
+            raise ArchiveError(f"Manifiesto dañado ({name}): {e}")
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ArchiveError(f"Versión de manifiesto no soportada ({name}): {manifest.get('version')}")
+        return manifest
+
+    def restore(self, name, destination_path, progress=None):
+        """
+        Restaura una copia en un archivo nuevo, bloque a bloque.
+
+        No sobrescribe archivos: la base de datos en uso se reemplaza por la
+        restaurada con la aplicación cerrada.
+
+        Args:
+            name (str): Nombre de la copia
+            destination_path (str): Archivo de destino (no debe existir)
+            progress (callable, optional): Función (bytes escritos, total)
+
+        Raises:
+            ArchiveError: Si falta un bloque o el resultado no coincide con la copia
+            FileExistsError: Si el destino ya existe
+        """
+        manifest = self.load_manifest(name)
+        file_hash = hashlib.sha256()
+        written = 0
+        try:
+            with open(destination_path, "xb") as target:
+                for digest in manifest["chunks"]:
+                    chunk = self._read_chunk(digest)
+                    file_hash.update(chunk)
+                    target.write(chunk)
+                    written += len(chunk)
+                    if progress is not None:
+                        progress(written, manifest["size"])
+                target.flush()
+                os.fsync(target.fileno())
+            if written != manifest["size"] or file_hash.hexdigest() != manifest["sha256"]:
+                raise ArchiveError(f"La copia restaurada de {name} no coincide con el original")
+        except BaseException:
+            if os.path.exists(destination_path):
+                os.remove(destination_path)
+            raise
+
+    def verify(self, names=None, workers=DEFAULT_VERIFY_WORKERS):
+        """
+        Comprueba en paralelo que los bloques de las copias estén completos e íntegros.
+
+        Args:
+            names (list, optional): Copias a verificar (por defecto, todas)
+            workers (int, optional): Hilos de verificación
+
+        Returns:
+            dict: snapshots, chunks (bloques distintos revisados), bytes,
+                bad_chunks (hashes faltantes o dañados) y damaged_snapshots
+        """
+        names = self.list_snapshots() if names is None else names
+        manifests = {name: self.load_manifest(name) for name in names}
+        unique = sorted(set(digest for manifest in manifests.values() for digest in manifest["chunks"]))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = list(executor.map(self._check_chunk, unique))
+        bad = set(digest for digest, (ok, _) in zip(unique, results) if not ok)
+
+        return {
+            "snapshots": len(manifests),
+            "chunks": len(unique),
+            "bytes": sum(size for _, size in results),
+            "bad_chunks": sorted(bad),
+            "damaged_snapshots": sorted(
+                name for name, manifest in manifests.items() if bad.intersection(manifest["chunks"])
+            ),
+        }
+
+    def delete_snapshot(self, name):
+        """
+        Elimina el manifiesto de una copia (sus bloques se eliminan con collect_garbage).
+
+        Returns:
+            bool: True si se eliminó
+        """
+        try:
+            os.remove(self.manifest_path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def collect_garbage(self):
+        """
+        Elimina los bloques que ya no usa ninguna copia.
+
+        Toma el bloqueo del archivo: mientras se agrega una copia (en este u
+        otro puesto) sus bloques aún no figuran en ningún manifiesto.
+
+        Returns:
+            tuple: (bloques eliminados, bytes liberados)
+
+        Raises:
+            ArchiveError: Si otro puesto retiene el archivo demasiado tiempo
+        """
+        with self.lock() as lock:
+            return self._collect_garbage(lock)
+
+    def _collect_garbage(self, lock):
+        referenced = set()
+        for name in self.list_snapshots():
+            referenced.update(self.load_manifest(name)["chunks"])
+
+        removed = 0
+        freed = 0
+        stale = time.time() - STALE_TEMP_AGE
+        for prefix in os.listdir(self.chunks_dir):
+            directory = os.path.join(self.chunks_dir, prefix)
+            lock.refresh()
+            for entry in os.scandir(directory):
+                if prefix + entry.name in referenced:
+                    continue
+                try:
+                    info = entry.stat()
+                    # Temporales: solo los de escrituras interrumpidas hace rato
+                    if entry.name.endswith(".part") and info.st_mtime > stale:
+                        continue
+                    size = info.st_size
+                    os.remove(entry.path)
+                    removed += 1
+                    freed += size
+                except OSError:
+                    pass
+        return removed, freed
+
+    def stats(self):
+        """
+        Obtiene el espacio usado por el archivo.
+
+        Returns:
+            dict: snapshots, logical_bytes (suma de los tamaños de las copias),
+                chunks y stored_bytes (bloques guardados, comprimidos)
+        """
+        logical = 0
+        names = self.list_snapshots()
+        for name in names:
+            logical += self.load_manifest(name)["size"]
+        chunks = 0
+        stored = 0
+        for prefix in os.listdir(self.chunks_dir):
+            for entry in os.scandir(os.path.join(self.chunks_dir, prefix)):
+                chunks += 1
+                stored += entry.stat().st_size
+        return {"snapshots": len(names), "logical_bytes": logical, "chunks": chunks, "stored_bytes": stored}
+
+    def _write_chunk(self, digest, chunk):
+        """Guarda un bloque comprimido; devuelve los bytes escritos."""
+        data = zlib.compress(chunk, 6)
+        path = self.chunk_path(digest)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                target.write(data)
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return len(data)
+
+    def _read_chunk(self, digest):
+        """Lee y descomprime un bloque, comprobando su hash."""
+        try:
+            with open(self.chunk_path(digest), "rb") as source:
+                chunk = zlib.decompress(source.read())
+        except FileNotFoundError:
+            raise ArchiveError(f"Falta el bloque {digest}")
+        except zlib.error as e:
+            raise ArchiveError(f"Bloque dañado {digest}: {e}")
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ArchiveError(f"Bloque dañado {digest}")
+        return chunk
+
+    def _check_chunk(self, digest):
+        """Verifica un bloque; devuelve (íntegro, bytes sin comprimir)."""
+        try:
+            chunk = self._read_chunk(digest)
+        except ArchiveError as e:
+            logger.warning(str(e))
+            return False, 0
+        return True, len(chunk)
+
+    def _write_manifest(self, name, manifest):
+        """Escribe el manifiesto de forma atómica (lo último de cada copia)."""
+        fd, temp_path = tempfile.mkstemp(dir=self.snapshots_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as target:
+                json.dump(manifest, target, separators=(",", ":"))
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_path, self.manifest_path(name))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
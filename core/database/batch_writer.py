@@ -0,0 +1,263 @@
+"""
+Escritura por lotes en segundo plano para ISMAPP.
+
+Las lecturas de balanza llegan de a una y a ritmo alto. Confirmar cada una
+por separado cuesta una sincronización del archivo por fila (y, en una
+carpeta compartida, un viaje por la red), y bloquearía a quien la envía.
+``BatchWriter`` encola los elementos y un hilo propio los escribe en lotes:
+espera como máximo ``flush_interval`` segundos desde el primer elemento
+pendiente, o hasta juntar ``batch_size``, y confirma el lote en una sola
+transacción.
+
+Si un lote falla (p. ej. la base de datos sigue bloqueada tras el
+busy_timeout), se reintenta con espera creciente: los elementos no se
+descartan. La excepción es un error de integridad (una clave foránea
+inexistente, por ejemplo): reintentar no lo arregla, así que el lote se
+escribe elemento por elemento y solo se rechazan los que fallan. Solo tras
+el cierre, si un lote sigue fallando, se descarta (se cuenta en
+``dropped``) para que flush() y close() no esperen indefinidamente.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Elementos por transacción y espera máxima antes de confirmar un lote
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.25
+
+# Espera entre reintentos de un lote fallido (segundos, se duplica hasta el máximo)
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 10.0
+
+
+class BatchWriter:
+    """Cola de escritura con un hilo que confirma por lotes."""
+
+    def __init__(self, data_manager, write_batch, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, name="batch-writer", on_written=None,
+                 on_rejected=None):
+        """
+        Inicializa el escritor (el hilo se inicia con el primer elemento).
+
+        Args:
+            data_manager (DataManager): Gestor de datos
+            write_batch (callable): Función (conexión, elementos) que escribe un
+                lote; se llama dentro de una transacción
+            batch_size (int, optional): Máximo de elementos por transacción
+            flush_interval (float, optional): Segundos máximos de espera de un
+                elemento antes de confirmarse
+            name (str, optional): Nombre del hilo (para los registros)
+            on_written (callable, optional): Función elementos -> None, llamada
+                en el hilo del escritor tras confirmar cada lote
+            on_rejected (callable, optional): Función elementos -> None, llamada
+                con los elementos rechazados por un error de integridad (antes
+                que on_written del mismo lote)
+        """
+        self.data_manager = data_manager
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.name = name
+        self.on_written = on_written
+        self.on_rejected = on_rejected
+
+        self._queue = queue.Queue()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self._enqueued = 0
+        self._written = 0
+        self._batches = 0
+        self._failures = 0
+        self._rejected = 0
+        self._dropped = 0
+        self._last_batch_ms = 0.0
+        self._max_batch_ms = 0.0
+
+    def put(self, item):
+        """
+        Encola un elemento para escribirlo en el próximo lote (no bloquea).
+
+        Args:
+            item: Elemento a escribir
+
+        Returns:
+            int: Número de secuencia del elemento (para flush)
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"{self.name} está cerrado")
+            self._enqueued += 1
+            sequence = self._enqueued
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._queue.put(item)
+        return sequence
+
+    def flush(self, timeout=None):
+        """
+        Espera a que se escriba todo lo encolado hasta el momento.
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera
+
+        Returns:
+            bool: True si se escribió todo antes del plazo (False también si se
+                descartó algún lote tras el cierre)
+        """
+        with self._condition:
+            target = self._enqueued
+            dropped = self._dropped
+            done = self._condition.wait_for(lambda: self._written + self._dropped >= target, timeout)
+            return done and self._dropped == dropped
+
+    def close(self, timeout=5.0):
+        """
+        Escribe lo pendiente y detiene el hilo (al cerrar la aplicación).
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera
+
+        Returns:
+            bool: True si no quedaron elementos sin escribir
+        """
+        with self._condition:
+            self._closed = True
+            thread = self._thread
+        if thread is None:
+            return True
+        self._queue.put(None)  # señal de término
+        thread.join(timeout)
+        with self._condition:
+            pending = self._enqueued - self._written
+        if pending:
+            # Incluye los lotes descartados tras el cierre
+            logger.error(f"{self.name}: {pending} elementos sin escribir al cerrar")
+        return pending == 0
+
+    def stats(self):
+        """
+        Obtiene estadísticas del escritor.
+
+        Returns:
+            dict: pending, written, rejected, dropped, batches, failures,
+                last_batch_ms, max_batch_ms (written incluye los rechazados)
+        """
+        with self._condition:
+            return {
+                "pending": self._enqueued - self._written - self._dropped,
+                "written": self._written,
+                "rejected": self._rejected,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "failures": self._failures,
+                "last_batch_ms": self._last_batch_ms,
+                "max_batch_ms": self._max_batch_ms,
+            }
+
+    # ------------------------------------------------------------------
+    # Implementación interna
+    # ------------------------------------------------------------------
+
+    def _collect(self):
+        """Espera el primer elemento y junta el lote; None si hay que terminar."""
+        item = self._queue.get()
+        if item is None:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Confirmar lo juntado y terminar en la siguiente vuelta
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            self._write(batch)
+
+    def _write(self, batch):
+        """Escribe un lote, reintentando hasta lograrlo (o hasta el cierre)."""
+        delay = RETRY_DELAY
+        rejected = []
+        individually = False
+        while True:
+            started = time.perf_counter()
+            try:
+                if individually:
+                    rejected = self._write_individually(batch)
+                else:
+                    with self.data_manager.transaction() as connection:
+                        self.write_batch(connection, batch)
+                break
+            except sqlite3.IntegrityError:
+                individually = True
+                continue
+            except Exception as e:
+                with self._condition:
+                    self._failures += 1
+                    closed = self._closed
+                logger.error(f"{self.name}: error al escribir lote de {len(batch)}: {e}")
+                if closed and delay >= MAX_RETRY_DELAY:
+                    # Descartar el lote y despertar a quien espera en flush()
+                    logger.error(f"{self.name}: lote de {len(batch)} descartado al cerrar")
+                    with self._condition:
+                        self._dropped += len(batch)
+                        self._condition.notify_all()
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        # Los avisos van antes de contar el lote: al volver flush() ya se ejecutaron
+        if rejected and self.on_rejected is not None:
+            try:
+                self.on_rejected(rejected)
+            except Exception as e:
+                logger.error(f"{self.name}: error al informar elementos rechazados: {e}")
+
+        if self.on_written is not None:
+            written = batch
+            if rejected:
+                written = [item for item in batch if not any(item is r for r in rejected)]
+            try:
+                self.on_written(written)
+            except Exception as e:
+                logger.error(f"{self.name}: error tras escribir lote: {e}")
+
+        with self._condition:
+            self._written += len(batch)
+            self._rejected += len(rejected)
+            self._batches += 1
+            self._last_batch_ms = elapsed_ms
+            self._max_batch_ms = max(self._max_batch_ms, elapsed_ms)
+            self._condition.notify_all()
+
+    def _write_individually(self, batch):
+        """Escribe un lote con errores de integridad de a un elemento; devuelve los rechazados."""
+        rejected = []
+        with self.data_manager.transaction() as connection:
+            for item in batch:
+                try:
+                    with self.data_manager.transaction():
+                        self.write_batch(connection, [item])
+                except sqlite3.IntegrityError as e:
+                    logger.error(f"{self.name}: elemento rechazado ({e}): {item!r}")
+                    rejected.append(item)
+        return rejected
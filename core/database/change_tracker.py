@@ -0,0 +1,238 @@
+"""
+Detección de cambios hechos por otros puestos de trabajo en ISMAPP.
+
+Varios equipos comparten el mismo archivo de base de datos. Los triggers de
+la tabla change_log (ver migrations.py) registran cada fila modificada; este
+módulo consulta ``PRAGMA data_version`` en una conexión propia, que solo
+cambia cuando otra conexión confirma una escritura, y únicamente entonces lee
+las entradas nuevas de change_log. Sin cambios, cada sondeo cuesta una sola
+consulta PRAGMA.
+
+Las entradas escritas por este mismo proceso no se notifican: la vista que
+guardó ya se actualizó (ver DataManager.local_change_ranges).
+"""
+import sqlite3
+import time
+
+# Días que se conservan las entradas de change_log
+CHANGE_LOG_RETENTION_DAYS = 7
+
+# Cada cuánto se depuran las entradas vencidas durante el sondeo (segundos)
+CHANGE_LOG_PRUNE_INTERVAL = 3600
+
+# Con más filas cambiadas que esto, recargar la lista completa es más barato
+FULL_RELOAD_THRESHOLD = 200
+
+
+class ChangeTracker:
+    """Sondea la base de datos y notifica las filas cambiadas por tabla."""
+
+    def __init__(self, data_manager):
+        """
+        Inicializa el detector de cambios.
+
+        Args:
+            data_manager (DataManager): Gestor de datos
+        """
+        self.data_manager = data_manager
+        self._connection = None
+        self._data_version = None
+        self._last_id = 0
+        self._last_prune = None
+        self._subscribers = {}  # tabla -> lista de callbacks
+
+    def subscribe(self, table, callback):
+        """
+        Registra una función a llamar cuando cambien filas de una tabla.
+
+        La función recibe un diccionario {row_id: operación ('I', 'U', 'D')},
+        o None si no se pudo determinar qué filas cambiaron y hay que recargar
+        todo.
+
+        Args:
+            table (str): Tabla a observar
+            callback (callable): Función a llamar
+        """
+        self._subscribers.setdefault(table, []).append(callback)
+
+    def unsubscribe(self, table, callback):
+        """
+        Elimina una suscripción.
+
+        Args:
+            table (str): Tabla observada
+            callback (callable): Función registrada
+        """
+        callbacks = self._subscribers.get(table, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def start(self):
+        """
+        Abre la conexión de sondeo y toma el estado actual como punto de partida.
+
+        Returns:
+            bool: True si el registro de cambios está disponible
+        """
+        try:
+            # Conexión propia: data_version no refleja las escrituras de la
+            # misma conexión, así que no puede ser una del pool
+            self._connection = self.data_manager.get_connection()
+            self._prune()
+            self._last_id = self._connection.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM change_log"
+            ).fetchone()[0]
+            self._data_version = self._read_data_version()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error al iniciar la detección de cambios: {e}")
+            self.close()
+            return False
+
+    def poll(self):
+        """
+        Comprueba si hubo cambios y notifica a los suscriptores.
+
+        Returns:
+            dict: Cambios detectados por tabla ({tabla: {row_id: operación}} o
+            {tabla: None} si hay que recargar todo)
+        """
+        if self._connection is None:
+            return {}
+
+        if time.monotonic() - self._last_prune >= CHANGE_LOG_PRUNE_INTERVAL:
+            try:
+                self._prune()
+            except sqlite3.Error as e:
+                # Se reintenta en el próximo sondeo
+                self._connection.rollback()
+                print(f"Error al depurar el registro de cambios: {e}")
+
+        try:
+            version = self._read_data_version()
+            if version == self._data_version:
+                return {}
+            self._data_version = version
+
+            rows = self._connection.execute(
+                "SELECT id, table_name, row_id, operation FROM change_log "
+                "WHERE id > ? ORDER BY id",
+                (self._last_id,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error al consultar cambios: {e}")
+            return {}
+
+        if not rows:
+            return {}
+
+        changes = {}
+        if rows[0][0] != self._last_id + 1:
+            # Entradas depuradas antes de leerlas: no se sabe qué cambió
+            changes = {table: None for table in {row[1] for row in rows} | set(self._subscribers)}
+        else:
+            local = self.data_manager.local_change_ranges(after=self._last_id)
+            for change_id, table, row_id, operation in rows:
+                if local and any(first < change_id <= last for first, last in local):
+                    continue  # escrita por este proceso
+                table_changes = changes.setdefault(table, {})
+                if table_changes is not None:
+                    table_changes[row_id] = operation
+                    if len(table_changes) > FULL_RELOAD_THRESHOLD:
+                        changes[table] = None
+        self._last_id = rows[-1][0]
+
+        for table, table_changes in changes.items():
+            self._invalidate_cache(table, table_changes)
+            for callback in list(self._subscribers.get(table, [])):
+                try:
+                    callback(table_changes)
+                except Exception as e:
+                    print(f"Error al notificar cambios de '{table}': {e}")
+
+        return changes
+
+    def close(self):
+        """Cierra la conexión de sondeo."""
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except sqlite3.Error:
+                pass
+            self._connection = None
+
+    def _prune(self):
+        """Elimina las entradas de change_log más antiguas que la retención."""
+        self._last_prune = time.monotonic()
+        self._connection.execute(
+            "DELETE FROM change_log WHERE changed_at < datetime('now', ?)",
+            (f"-{CHANGE_LOG_RETENTION_DAYS} days",)
+        )
+        self._connection.commit()
+
+    def _read_data_version(self):
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def _invalidate_cache(self, table, changes):
+        """Invalida en el caché de entidades las filas cambiadas por otros puestos."""
+        data_manager = self.data_manager
+        if changes is None:
+            data_manager.invalidate_cache(table)
+            if table == "materials":
+                data_manager.invalidate_cache("client_materials")
+            return
+
+        if table == "client_materials":
+            # row_id es el cliente afectado
+            keys = []
+            for client_id in changes:
+                keys.append(("client_materials", "client", client_id))
+                keys.append(("client_materials", "available", client_id))
+            data_manager.invalidate_cache(table, keys=keys)
+            return
+
+        for row_id in changes:
+            data_manager.invalidate_cache(table, row_id)
+        if table == "materials":
+            data_manager.invalidate_cache("client_materials")
+
+
+def load_changed_rows(changes, load):
+    """
+    Carga las filas cambiadas (pensada para ejecutarse en segundo plano).
+
+    Args:
+        changes (dict): {row_id: operación} recibido del ChangeTracker
+        load (callable): Función id -> entidad, o None si ya no debe mostrarse
+
+    Returns:
+        dict: {row_id: entidad o None}, utilizable con apply_row_changes
+    """
+    return {row_id: load(row_id) for row_id in changes}
+
+
+def apply_row_changes(items, changes, load, sort_key=None):
+    """
+    Actualiza en memoria una lista de entidades con las filas cambiadas.
+
+    Args:
+        items (list): Entidades cargadas actualmente (con atributo id)
+        changes (dict): {row_id: operación} recibido del ChangeTracker
+        load (callable): Función id -> entidad, o None si ya no debe mostrarse
+        sort_key (callable, optional): Clave para reordenar la lista
+
+    Returns:
+        list: Nueva lista de entidades
+    """
+    by_id = {item.id: item for item in items}
+    for row_id in changes:
+        entity = load(row_id)
+        if entity is None:
+            by_id.pop(row_id, None)
+        else:
+            by_id[row_id] = entity
+
+    updated = list(by_id.values())
+    if sort_key is not None:
+        updated.sort(key=sort_key)
+    return updated
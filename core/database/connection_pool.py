@@ -0,0 +1,333 @@
+"""
+Pool de conexiones SQLite reutilizables por hilo para ISMAPP.
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolExhaustedError(sqlite3.OperationalError):
+    """Se lanza cuando no hay conexiones libres dentro del tiempo de espera."""
+
+
+class _PooledConnection:
+    """Conexión administrada por el pool junto con su estado de uso."""
+
+    __slots__ = ("connection", "thread", "created_at", "last_used",
+                 "last_checked", "depth")
+
+    def __init__(self, connection, thread):
+        now = time.monotonic()
+        self.connection = connection
+        self.thread = thread
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+        self.depth = 0  # Usos anidados activos en el hilo dueño
+
+    @property
+    def in_use(self):
+        return self.depth > 0
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite con una conexión persistente por hilo.
+
+    Cada hilo reutiliza siempre la misma conexión mientras siga sana, lo que
+    evita abrir el archivo (y negociar sus bloqueos) en cada consulta cuando la
+    base de datos está en una carpeta compartida de la red local.
+    """
+
+    def __init__(self, db_path, max_connections=8, idle_timeout=300.0,
+                 health_check_interval=30.0, acquire_timeout=10.0,
+                 on_connect=None, on_close=None, cached_statements=128):
+        """
+        Inicializa el pool.
+
+        Args:
+            db_path (str): Ruta al archivo de base de datos
+            max_connections (int): Máximo de conexiones abiertas simultáneamente
+            idle_timeout (float): Segundos sin uso tras los cuales se cierra una conexión
+            health_check_interval (float): Segundos entre verificaciones de salud
+            acquire_timeout (float): Segundos máximos de espera por una conexión libre
+            on_connect (callable, optional): Función aplicada a cada conexión nueva
+            on_close (callable, optional): Función llamada antes de cerrar una conexión
+            cached_statements (int): Sentencias compiladas que conserva cada conexión
+        """
+        self.db_path = db_path
+        self.max_connections = max(1, int(max_connections))
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self.on_connect = on_connect
+        self.on_close = on_close
+        self.cached_statements = cached_statements
+
+        self._connections = {}  # ident del hilo -> _PooledConnection
+        self._condition = threading.Condition(threading.Lock())
+        self._closed = False
+        self._connecting = 0  # Conexiones abriéndose fuera del candado
+
+        # Estadísticas
+        self._created = 0
+        self._reused = 0
+        self._discarded = 0
+
+    def configure(self, max_connections=None, idle_timeout=None,
+                  health_check_interval=None, acquire_timeout=None,
+                  cached_statements=None):
+        """
+        Ajusta los parámetros del pool en caliente.
+
+        Args:
+            max_connections (int, optional): Nuevo máximo de conexiones
+            idle_timeout (float, optional): Nuevo tiempo de inactividad
+            health_check_interval (float, optional): Nuevo intervalo de verificación
+            acquire_timeout (float, optional): Nuevo tiempo de espera
+            cached_statements (int, optional): Tamaño del caché de sentencias
+                de las conexiones que se abran a partir de ahora
+        """
+        with self._condition:
+            if max_connections is not None:
+                self.max_connections = max(1, int(max_connections))
+            if idle_timeout is not None:
+                self.idle_timeout = idle_timeout
+            if health_check_interval is not None:
+                self.health_check_interval = health_check_interval
+            if acquire_timeout is not None:
+                self.acquire_timeout = acquire_timeout
+            if cached_statements is not None:
+                self.cached_statements = cached_statements
+            self._condition.notify_all()
+
+    @contextmanager
+    def connection(self):
+        """
+        Entrega la conexión del hilo actual mientras dure el bloque ``with``.
+
+        Los usos anidados en el mismo hilo comparten la misma conexión.
+
+        Yields:
+            sqlite3.Connection: Conexión lista para usar
+        """
+        pooled = self._acquire()
+        try:
+            yield pooled.connection
+        finally:
+            self._release(pooled)
+
+    def mark_suspect(self):
+        """
+        Fuerza la verificación de salud de la conexión del hilo actual en su
+        próximo uso (p. ej. tras un error de E/S o de bloqueo de archivo).
+        """
+        with self._condition:
+            pooled = self._connections.get(threading.get_ident())
+            if pooled is not None:
+                pooled.last_checked = float("-inf")
+
+    def close_all(self):
+        """Cierra todas las conexiones que no estén en uso."""
+        with self._condition:
+            for pooled in list(self._connections.values()):
+                if not pooled.in_use:
+                    self._close(pooled)
+            self._condition.notify_all()
+
+    def close(self):
+        """Cierra el pool; las conexiones en uso se cierran al liberarse."""
+        with self._condition:
+            self._closed = True
+        self.close_all()
+
+    def reap(self):
+        """
+        Cierra las conexiones inactivas o pertenecientes a hilos terminados.
+
+        Returns:
+            int: Número de conexiones cerradas
+        """
+        with self._condition:
+            closed = self._reap_locked(time.monotonic())
+            if closed:
+                self._condition.notify_all()
+            return closed
+
+    def stats(self):
+        """
+        Obtiene estadísticas de uso del pool.
+
+        Returns:
+            dict: Conexiones abiertas, en uso, creadas, reutilizadas y descartadas
+        """
+        with self._condition:
+            return {
+                "open": len(self._connections),
+                "in_use": sum(1 for p in self._connections.values() if p.in_use),
+                "max_connections": self.max_connections,
+                "created": self._created,
+                "reused": self._reused,
+                "discarded": self._discarded,
+            }
+
+    # ------------------------------------------------------------------
+    # Implementación interna
+    # ------------------------------------------------------------------
+
+    def _acquire(self):
+        """Obtiene (o crea) la conexión del hilo actual."""
+        ident = threading.get_ident()
+        deadline = time.monotonic() + self.acquire_timeout
+
+        # Abrir una conexión (con el perfil de PRAGMA) y verificar su salud
+        # puede esperar segundos en una carpeta de red: se hace fuera del
+        # candado para no detener a los demás hilos
+        with self._condition:
+            if self._closed:
+                raise sqlite3.ProgrammingError("El pool de conexiones está cerrado")
+
+            pooled = self._connections.get(ident)
+            if pooled is not None:
+                # Uso anidado: no se verifica la salud en medio de una operación
+                if pooled.in_use:
+                    pooled.depth += 1
+                    return pooled
+                state = self._health_state(pooled)
+                if state == "expired":
+                    self._close(pooled)
+                    pooled = None
+                else:
+                    # En uso durante la verificación: nadie la cierra mientras tanto
+                    pooled.depth = 1
+
+        if pooled is not None:
+            healthy = state == "ok" or self._check(pooled)
+            with self._condition:
+                if healthy:
+                    self._reused += 1
+                    # El identificador puede haberse heredado de un hilo terminado
+                    pooled.thread = threading.current_thread()
+                    return pooled
+                pooled.depth = 0
+                self._close(pooled)
+                self._condition.notify_all()
+
+        with self._condition:
+            while len(self._connections) + self._connecting >= self.max_connections:
+                now = time.monotonic()
+                if self._reap_locked(now) or self._evict_lru_locked():
+                    continue
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"No hay conexiones libres (máximo {self.max_connections})")
+                self._condition.wait(remaining)
+            # Reserva el lugar mientras se abre la conexión
+            self._connecting += 1
+
+        try:
+            connection = self._connect()
+        except BaseException:
+            with self._condition:
+                self._connecting -= 1
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            self._connecting -= 1
+            if self._closed:
+                self._condition.notify_all()
+                connection.close()
+                raise sqlite3.ProgrammingError("El pool de conexiones está cerrado")
+            pooled = _PooledConnection(connection, threading.current_thread())
+            pooled.depth = 1
+            self._connections[ident] = pooled
+            self._created += 1
+            return pooled
+
+    def _release(self, pooled):
+        """Libera un uso de la conexión."""
+        with self._condition:
+            pooled.depth -= 1
+            pooled.last_used = time.monotonic()
+            if pooled.depth == 0:
+                if self._closed:
+                    self._close(pooled)
+                self._condition.notify_all()
+
+    def _connect(self):
+        """Abre una conexión nueva y aplica la configuración inicial."""
+        # check_same_thread=False permite cerrar conexiones de otros hilos al
+        # recolectarlas; el pool garantiza que cada una la usa un solo hilo.
+        connection = sqlite3.connect(self.db_path, check_same_thread=False,
+                                     cached_statements=self.cached_statements)
+        try:
+            if self.on_connect:
+                self.on_connect(connection)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _health_state(self, pooled):
+        """
+        Estado de una conexión libre según sus tiempos. Requiere el candado.
+
+        Returns:
+            str: 'expired' (inactiva demasiado tiempo), 'check' (toca
+                verificarla) u 'ok'
+        """
+        now = time.monotonic()
+        if self.idle_timeout and now - pooled.last_used > self.idle_timeout:
+            return "expired"
+        if now - pooled.last_checked < self.health_check_interval:
+            return "ok"
+        return "check"
+
+    def _check(self, pooled):
+        """Verifica una conexión reservada por el hilo actual (sin el candado)."""
+        try:
+            pooled.connection.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        pooled.last_checked = time.monotonic()
+        return True
+
+    def _reap_locked(self, now):
+        """Cierra conexiones de hilos muertos o inactivas. Requiere el candado."""
+        closed = 0
+        for pooled in list(self._connections.values()):
+            if pooled.in_use:
+                continue
+            expired = self.idle_timeout and now - pooled.last_used > self.idle_timeout
+            if expired or not pooled.thread.is_alive():
+                self._close(pooled)
+                closed += 1
+        return closed
+
+    def _evict_lru_locked(self):
+        """Cierra la conexión libre usada hace más tiempo. Requiere el candado."""
+        idle = [p for p in self._connections.values() if not p.in_use]
+        if not idle:
+            return False
+        self._close(min(idle, key=lambda p: p.last_used))
+        return True
+
+    def _close(self, pooled):
+        """Cierra una conexión y la elimina del registro. Requiere el candado."""
+        for ident, candidate in list(self._connections.items()):
+            if candidate is pooled:
+                del self._connections[ident]
+                break
+        try:
+            if self.on_close:
+                self.on_close(pooled.connection)
+        except Exception:
+            pass
+        try:
+            pooled.connection.close()
+        except sqlite3.Error:
+            pass
+        self._discarded += 1
@@ -1,9 +1,45 @@
 """
 Gestor de acceso a la base de datos SQLite para ISMAPP.
 """
+import logging
 import os
 import sqlite3
 import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+
+from core.database.connection_pool import ConnectionPool
+from core.database.entity_cache import EntityCache
+from core.database.full_text import create_full_text_index, fts5_available, indexed_tables, missing_indexes
+from core.database.migrations import apply_migrations
+from core.database.pragmas import NETWORK_SHARE_PROFILE, PROFILES, select_profile
+from core.database.query_log import QueryLog
+from core.database.statement_cache import StatementCache
+
+logger = logging.getLogger(__name__)
+
+# Configuración por defecto del pool de conexiones
+POOL_MAX_CONNECTIONS = 8
+POOL_IDLE_TIMEOUT = 300.0  # segundos
+POOL_HEALTH_CHECK_INTERVAL = 30.0  # segundos
+
+# Sentencias compiladas que conserva cada conexión del pool
+STATEMENT_CACHE_SIZE = 128
+
+# Consultas de lectura (entidades y listados) que se guardan en memoria
+ENTITY_CACHE_CAPACITY = 256
+
+# Configuración por defecto del registro de consultas
+QUERY_LOG_CAPACITY = 200
+
+# Tamaño por defecto de los bloques de lectura de iter_query
+ITER_BATCH_SIZE = 500
+
+# Rangos de change_log escritos por este proceso que se recuerdan (ver
+# local_change_ranges); los más antiguos ya fueron leídos por el ChangeTracker
+LOCAL_CHANGES_LIMIT = 1000
 
 class DataManager:
     """Clase para gestionar operaciones de base de datos."""
@@ -28,6 +64,44 @@ class DataManager:
         self.db_path = os.path.join("data", "ismv3.db")
         self._initialized = True
         
+        # Perfil de PRAGMA según la ubicación del archivo (disco local o red)
+        self.pragma_profile = select_profile(self.db_path)
+        logger.info(f"Perfil de base de datos: {self.pragma_profile.name}")
+        
+        # Registro de consultas (inactivo por defecto). El umbral de consultas
+        # lentas puede fijarse en milisegundos con ISMAPP_SLOW_QUERY_MS
+        slow_ms = os.environ.get("ISMAPP_SLOW_QUERY_MS")
+        self.query_log = QueryLog(
+            capacity=QUERY_LOG_CAPACITY,
+            slow_query_threshold=float(slow_ms) if slow_ms else None
+        )
+        
+        # Estado por hilo de las transacciones explícitas (ver transaction())
+        self._local = threading.local()
+        
+        # Entradas de change_log escritas por este proceso: (primera, última]
+        self._local_changes = deque(maxlen=LOCAL_CHANGES_LIMIT)
+        self._local_changes_lock = threading.Lock()
+        
+        # Caché de lectura de entidades, compartido por todas las instancias
+        # de servicios a través del singleton
+        self.entity_cache = EntityCache(ENTITY_CACHE_CAPACITY)
+        
+        # Caché de sentencias preparadas de las conexiones del pool
+        self.statement_cache = StatementCache(STATEMENT_CACHE_SIZE)
+        
+        # Pool de conexiones persistentes (una por hilo), compartido por todos
+        # los servicios a través del singleton
+        self.pool = ConnectionPool(
+            self.db_path,
+            max_connections=POOL_MAX_CONNECTIONS,
+            idle_timeout=POOL_IDLE_TIMEOUT,
+            health_check_interval=POOL_HEALTH_CHECK_INTERVAL,
+            on_connect=self._configure_connection,
+            on_close=self.statement_cache.forget,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        
         # Verificar que existe la base de datos
         if not os.path.exists(self.db_path):
             # Crear directorio de datos si no existe
@@ -45,236 +119,673 @@ class DataManager:
                 self._create_schema()
             except Exception as e:
                 print(f"Error al crear la base de datos: {e}")
+        
+        # Aplicar migraciones pendientes (PRAGMA user_version)
+        self.schema_version = 0
+        try:
+            self.schema_version = apply_migrations(self)
+        except Exception as e:
+            logger.error(f"Error al aplicar migraciones: {e}")
+        
+        # Tablas con índice de texto completo (las demás se buscan con LIKE)
+        self.full_text_tables = set()
+        try:
+            with self.pool.connection() as connection:
+                self.full_text_tables = indexed_tables(connection)
+                pending = missing_indexes(connection) and fts5_available(connection)
+            if pending:
+                self._create_missing_full_text()
+        except sqlite3.Error as e:
+            logger.error(f"Error al detectar índices de texto completo: {e}")
     
+    def _create_missing_full_text(self):
+        """
+        Crea los índices de texto completo que falten (p. ej. si la migración
+        se aplicó con un SQLite sin FTS5).
+        """
+        with self.transaction() as connection:
+            # Se vuelve a comprobar con el bloqueo tomado: otro puesto pudo crearlos
+            tables = missing_indexes(connection)
+            cursor = connection.cursor()
+            for table in tables:
+                create_full_text_index(cursor, table)
+            self.full_text_tables = indexed_tables(connection)
+        if tables:
+            logger.info(f"Índices de texto completo creados: {', '.join(tables)}")
+
     def _create_schema(self):
         """Crea el esquema inicial de la base de datos."""
-        connection = None
         try:
-            connection = sqlite3.connect(self.db_path)
-            cursor = connection.cursor()
-            
-            # Tabla de usuarios (para autenticación)
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL UNIQUE,
-                password TEXT NOT NULL,
-                name TEXT,
-                role TEXT DEFAULT 'user',
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
-            
-            # Crear índices para usuarios
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users (username)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users (role)")
-            
-            # Tabla de clientes
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clients (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                business_name TEXT NOT NULL,
-                rut TEXT NOT NULL,
-                address TEXT,
-                phone TEXT,
-                email TEXT,
-                contact_person TEXT,
-                notes TEXT,
-                is_active INTEGER DEFAULT 1,
-                client_type TEXT DEFAULT 'both',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
-            
-            # Crear índices para clientes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_name ON clients (name)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_rut ON clients (rut)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_type ON clients (client_type)")
-            
-            # Tabla de materiales
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS materials (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                material_type TEXT NOT NULL,
-                is_plastic_subtype INTEGER DEFAULT 0,
-                plastic_subtype TEXT,
-                plastic_state TEXT,
-                custom_subtype TEXT,
-                is_active INTEGER DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
+            # Todo el esquema en una sola transacción (un único commit)
+            with self.transaction() as connection:
+                self._create_schema_tables(connection.cursor())
+            print("Esquema de base de datos creado correctamente!")
+        except Exception as e:
+            print(f"Error al crear el esquema: {e}")
+    
+    def _create_schema_tables(self, cursor):
+        """
+        Crea las tablas e índices del esquema inicial.
+        
+        Args:
+            cursor (sqlite3.Cursor): Cursor dentro de una transacción abierta
+        """
+        # Tabla de usuarios (para autenticación)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            name TEXT,
+            role TEXT DEFAULT 'user',
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
+        # Crear índices para usuarios
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users (username)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users (role)")
+        
+        # Tabla de clientes
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            business_name TEXT NOT NULL,
+            rut TEXT NOT NULL,
+            address TEXT,
+            phone TEXT,
+            email TEXT,
+            contact_person TEXT,
+            notes TEXT,
+            is_active INTEGER DEFAULT 1,
+            client_type TEXT DEFAULT 'both',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
+        # Crear índices para clientes
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_name ON clients (name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_rut ON clients (rut)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_type ON clients (client_type)")
+        
+        # Tabla de materiales
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS materials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            material_type TEXT NOT NULL,
+            is_plastic_subtype INTEGER DEFAULT 0,
+            plastic_subtype TEXT,
+            plastic_state TEXT,
+            custom_subtype TEXT,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
+        # Crear índices para materiales
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_materials_name ON materials (name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_materials_type ON materials (material_type)")
+        
+        # Tabla de relación cliente-material (con precios)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS client_materials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            material_id INTEGER NOT NULL,
+            price REAL DEFAULT 0.0,
+            includes_tax INTEGER DEFAULT 0,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (client_id) REFERENCES clients(id),
+            FOREIGN KEY (material_id) REFERENCES materials(id),
+            UNIQUE(client_id, material_id)
+        )
+        ''')
+        
+        # Crear índices para relación
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_cm_client ON client_materials (client_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_cm_material ON client_materials (material_id)")
+        
+        # Tabla de trabajadores
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS workers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            rut TEXT NOT NULL UNIQUE,
+            phone TEXT,
+            address TEXT,
+            email TEXT,
+            role TEXT,
+            salary REAL DEFAULT 0.0,
+            is_active INTEGER DEFAULT 1,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
+        # Crear índices para trabajadores
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_workers_name ON workers (name)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_workers_rut ON workers (rut)")
+        
+        # Insertar usuario admin por defecto
+        cursor.execute('''
+        INSERT OR IGNORE INTO users (username, password, name, role)
+        VALUES (?, ?, ?, ?)
+        ''', ('admin', 'admin123', 'Administrador', 'admin'))
+    
+    def _configure_connection(self, connection):
+        """
+        Configura una conexión recién abierta por el pool.
+        
+        Args:
+            connection (sqlite3.Connection): Conexión a configurar
+        """
+        # Habilitar claves foráneas
+        connection.execute("PRAGMA foreign_keys = ON")
+        
+        profile = self.pragma_profile
+        try:
+            journal_mode = profile.apply(connection)
+        except sqlite3.OperationalError as e:
+            # Algunas carpetas compartidas fallan al crear el archivo -shm de WAL
+            logger.warning(f"No se pudo aplicar el perfil '{profile.name}': {e}")
+            journal_mode = None
+        
+        if journal_mode != profile.journal_mode and profile is not NETWORK_SHARE_PROFILE:
+            logger.warning(f"Modo de diario '{profile.journal_mode}' no soportado "
+                           f"(obtenido: {journal_mode}); usando perfil '{NETWORK_SHARE_PROFILE.name}'")
+            self.pragma_profile = NETWORK_SHARE_PROFILE
+            NETWORK_SHARE_PROFILE.apply(connection)
+    
+    def configure_pragmas(self, profile):
+        """
+        Cambia el perfil de PRAGMA y renueva las conexiones del pool.
+        
+        Args:
+            profile (str/PragmaProfile): Nombre del perfil o perfil a aplicar
+        """
+        if isinstance(profile, str):
+            profile = PROFILES[profile]
+        self.pragma_profile = profile
+        # Las conexiones libres se reabren con el nuevo perfil en su próximo uso
+        self.pool.close_all()
+    
+    def configure_pool(self, max_connections=None, idle_timeout=None,
+                       health_check_interval=None):
+        """
+        Ajusta la configuración del pool de conexiones.
+        
+        Args:
+            max_connections (int, optional): Máximo de conexiones simultáneas
+            idle_timeout (float, optional): Segundos de inactividad antes de cerrar una conexión
+            health_check_interval (float, optional): Segundos entre verificaciones de salud
+        """
+        self.pool.configure(
+            max_connections=max_connections,
+            idle_timeout=idle_timeout,
+            health_check_interval=health_check_interval
+        )
+    
+    def get_pool_stats(self):
+        """
+        Obtiene estadísticas del pool de conexiones.
+        
+        Returns:
+            dict: Estadísticas de conexiones abiertas, en uso y reutilizadas
+        """
+        return self.pool.stats()
+    
+    def configure_statement_cache(self, capacity):
+        """
+        Cambia el tamaño del caché de sentencias de cada conexión.
+        
+        Args:
+            capacity (int): Sentencias compiladas por conexión (0 lo desactiva)
+        """
+        self.statement_cache.configure(capacity)
+        self.pool.configure(cached_statements=capacity)
+        # Las conexiones libres se reabren con el nuevo tamaño en su próximo uso
+        self.pool.close_all()
+    
+    def get_statement_cache_stats(self):
+        """
+        Obtiene estadísticas del caché de sentencias.
+        
+        Returns:
+            dict: Capacidad, aciertos, fallos, desalojos y tasa de aciertos
+        """
+        return self.statement_cache.stats()
+    
+    def reset_statement_cache_stats(self):
+        """Pone a cero los contadores del caché de sentencias."""
+        self.statement_cache.reset_stats()
+    
+    def has_full_text_index(self, table):
+        """
+        Indica si una tabla tiene índice FTS5 para búsquedas.
+        
+        Args:
+            table (str): Nombre de la tabla
             
-            # Crear índices para materiales
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_materials_name ON materials (name)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_materials_type ON materials (material_type)")
+        Returns:
+            bool: True si se puede buscar con MATCH
+        """
+        return table in self.full_text_tables
+    
+    def configure_entity_cache(self, capacity):
+        """
+        Cambia la capacidad del caché de entidades.
+        
+        Args:
+            capacity (int): Número máximo de consultas en caché (0 lo desactiva)
+        """
+        self.entity_cache.configure(capacity)
+    
+    def get_cache_stats(self):
+        """
+        Obtiene estadísticas del caché de entidades.
+        
+        Returns:
+            dict: Capacidad, tamaño, aciertos, fallos, desalojos e invalidaciones
+        """
+        return self.entity_cache.stats()
+    
+    def invalidate_cache(self, namespace, entity_id=None, keys=None):
+        """
+        Invalida consultas del caché de entidades tras una escritura.
+        
+        Dentro de transaction() la invalidación se repite al terminar el bloque,
+        para descartar lo que otro hilo haya leído antes del commit.
+        
+        Args:
+            namespace (str): Espacio de nombres (tabla) afectado
+            entity_id (int, optional): ID de la entidad modificada; invalida
+                esa entidad y los listados del espacio de nombres
+            keys (list, optional): Claves concretas a invalidar (tiene prioridad)
+        """
+        self._apply_invalidation(namespace, entity_id, keys)
+        if self._in_transaction():
+            self._local.pending_invalidations.append((namespace, entity_id, keys))
+    
+    def _apply_invalidation(self, namespace, entity_id, keys):
+        """Aplica una invalidación al caché de entidades."""
+        if keys:
+            self.entity_cache.invalidate_keys(*keys)
+        elif entity_id is not None:
+            self.entity_cache.invalidate_entity(namespace, entity_id)
+        else:
+            self.entity_cache.invalidate_namespace(namespace)
+    
+    def close(self):
+        """Cierra las conexiones libres del pool (p. ej. al salir de la aplicación)."""
+        self.pool.close_all()
+    
+    def configure_query_log(self, recording=None, capacity=None, slow_query_threshold=False):
+        """
+        Ajusta el registro de consultas.
+        
+        Args:
+            recording (bool, optional): Guardar las consultas en el búfer circular
+            capacity (int, optional): Tamaño del búfer circular
+            slow_query_threshold (float, optional): Umbral de consulta lenta en
+                milisegundos (None lo desactiva)
+        """
+        self.query_log.configure(
+            recording=recording,
+            capacity=capacity,
+            slow_query_threshold=slow_query_threshold
+        )
+    
+    def dump_query_log(self, stream=None):
+        """
+        Vuelca las últimas consultas registradas.
+        
+        Args:
+            stream (file, optional): Destino (por defecto, la salida estándar)
             
-            # Tabla de relación cliente-material (con precios)
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS client_materials (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_id INTEGER NOT NULL,
-                material_id INTEGER NOT NULL,
-                price REAL DEFAULT 0.0,
-                includes_tax INTEGER DEFAULT 0,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (client_id) REFERENCES clients(id),
-                FOREIGN KEY (material_id) REFERENCES materials(id),
-                UNIQUE(client_id, material_id)
-            )
-            ''')
+        Returns:
+            int: Número de consultas volcadas
+        """
+        return self.query_log.dump(stream)
+    
+    def execute_query(self, query, params=()):
+        """
+        Ejecuta una consulta SQL y devuelve los resultados.
+        
+        Args:
+            query (str): Consulta SQL a ejecutar
+            params (tuple, optional): Parámetros para la consulta
             
-            # Crear índices para relación
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_cm_client ON client_materials (client_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_cm_material ON client_materials (material_id)")
+        Returns:
+            list/int/bool: Resultados de la consulta, ID de inserción o indicador de éxito
+        """
+        # Medir solo si algún destino del registro está activo
+        started = time.perf_counter() if self.query_log.is_active() else None
+        try:
+            if self._in_transaction() or query.lstrip()[:6].upper() == "SELECT":
+                with self.pool.connection() as connection:
+                    result = self._run_query(connection, query, params)
+            else:
+                # Una escritura suelta es su propia transacción (así sus
+                # entradas de change_log se registran como propias)
+                with self.transaction() as connection:
+                    result = self._run_query(connection, query, params)
+            if started is not None:
+                self.query_log.record(query, params, time.perf_counter() - started, result)
+            return result
+        except Exception as e:
+            return self._handle_error(query, params, started, e)
+    
+    def fetch_rows(self, query, params=(), cache_key=None):
+        """
+        Ejecuta una consulta SELECT y devuelve las filas como tuplas.
+        
+        Es la variante ligera de execute_query: no construye un diccionario por
+        fila. Se usa junto con RowMapper para crear objetos del modelo.
+        
+        Args:
+            query (str): Consulta SELECT a ejecutar
+            params (tuple, optional): Parámetros para la consulta
+            cache_key (tuple, optional): Clave del caché de entidades; si se
+                indica, el resultado se sirve desde memoria mientras no se invalide
             
-            # Tabla de trabajadores
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS workers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                rut TEXT NOT NULL UNIQUE,
-                phone TEXT,
-                address TEXT,
-                email TEXT,
-                role TEXT,
-                salary REAL DEFAULT 0.0,
-                is_active INTEGER DEFAULT 1,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        Returns:
+            tuple: (nombres de columna, lista de filas), o None si hubo un error
+        """
+        # Dentro de una transacción se leen datos aún no confirmados: sin caché
+        if cache_key is not None and not self._in_transaction():
+            return self.entity_cache.get_or_load(
+                cache_key, lambda: self._fetch_rows(query, params)
             )
-            ''')
+        return self._fetch_rows(query, params)
+    
+    def _fetch_rows(self, query, params):
+        """Ejecuta la consulta de fetch_rows contra la base de datos."""
+        started = time.perf_counter() if self.query_log.is_active() else None
+        try:
+            with self.pool.connection() as connection:
+                self.statement_cache.touch(connection, query)
+                cursor = connection.execute(query, params)
+                rows = cursor.fetchall()
+                columns = tuple(column[0] for column in cursor.description or ())
+            if started is not None:
+                self.query_log.record(query, params, time.perf_counter() - started, rows)
+            return columns, rows
+        except Exception as e:
+            return self._handle_error(query, params, started, e)
+    
+    def fetch_models(self, mapper, query, params=(), cache_key=None):
+        """
+        Ejecuta una consulta SELECT y convierte cada fila en un objeto del modelo.
+        
+        Args:
+            mapper (RowMapper): Mapeador del modelo a construir
+            query (str): Consulta SELECT a ejecutar
+            params (tuple, optional): Parámetros para la consulta
+            cache_key (tuple, optional): Clave del caché de entidades
             
-            # Crear índices para trabajadores
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_workers_name ON workers (name)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_workers_rut ON workers (rut)")
+        Returns:
+            list: Objetos del modelo (siempre instancias nuevas), o None si hubo un error
+        """
+        result = self.fetch_rows(query, params, cache_key)
+        if result is None:
+            return None
+        columns, rows = result
+        return mapper.map_rows(columns, rows)
+    
+    def execute_many(self, query, rows):
+        """
+        Ejecuta una misma sentencia para varias filas en una sola transacción.
+        
+        Args:
+            query (str): Sentencia SQL (INSERT, UPDATE o DELETE)
+            rows (iterable): Secuencia de tuplas de parámetros
             
-            # Insertar usuario admin por defecto
-            cursor.execute('''
-            INSERT OR IGNORE INTO users (username, password, name, role)
-            VALUES (?, ?, ?, ?)
-            ''', ('admin', 'admin123', 'Administrador', 'admin'))
+        Returns:
+            int: Número de filas afectadas, o None si hubo un error
+        """
+        started = time.perf_counter() if self.query_log.is_active() else None
+        try:
+            with self.transaction() as connection:
+                self.statement_cache.touch(connection, query)
+                count = connection.executemany(query, rows).rowcount
+            if started is not None:
+                self.query_log.record(query, "[lote]", time.perf_counter() - started, rows=count)
+            return count
+        except Exception as e:
+            return self._handle_error(query, "[lote]", started, e)
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa varias operaciones del hilo actual en una sola transacción.
+        
+        Las llamadas a execute_query y execute_many dentro del bloque usan la
+        misma conexión y no confirman por separado: se hace un único commit al
+        salir, o un rollback si se produce una excepción. Dentro del bloque los
+        errores de consulta se propagan en lugar de devolver None. Los bloques
+        anidados se implementan con SAVEPOINT.
+        
+        Las entradas de change_log que agrega la transacción se recuerdan como
+        propias (ver local_change_ranges).
+        
+        Yields:
+            sqlite3.Connection: Conexión de la transacción
+        """
+        with self.pool.connection() as connection:
+            depth = getattr(self._local, "transaction_depth", 0)
+            savepoint = f"sp_{depth}"
+            if depth == 0:
+                # IMMEDIATE toma el bloqueo de escritura al inicio y evita
+                # interbloqueos al pasar de lectura a escritura
+                connection.execute("BEGIN IMMEDIATE")
+                self._local.pending_invalidations = []
+                first_change = self._change_log_sequence(connection)
+            else:
+                connection.execute(f"SAVEPOINT {savepoint}")
             
-            connection.commit()
-            print("Esquema de base de datos creado correctamente!")
+            self._local.transaction_depth = depth + 1
+            try:
+                yield connection
+                if depth == 0:
+                    last_change = self._change_log_sequence(connection)
+                    connection.commit()
+                    if last_change > first_change:
+                        with self._local_changes_lock:
+                            self._local_changes.append((first_change, last_change))
+                else:
+                    connection.execute(f"RELEASE {savepoint}")
+            except BaseException:
+                if depth == 0:
+                    connection.rollback()
+                else:
+                    connection.execute(f"ROLLBACK TO {savepoint}")
+                    connection.execute(f"RELEASE {savepoint}")
+                raise
+            finally:
+                self._local.transaction_depth = depth
+                if depth == 0:
+                    for invalidation in self._local.pending_invalidations:
+                        self._apply_invalidation(*invalidation)
+                    self._local.pending_invalidations = []
+    
+    def local_change_ranges(self, after=0):
+        """
+        Obtiene las entradas de change_log escritas por este proceso.
+        
+        Se usa para no notificar a las vistas sus propios cambios. Solo se
+        recuerdan los últimos LOCAL_CHANGES_LIMIT rangos: una escritura propia
+        olvidada se notifica como si fuera de otro puesto.
+        
+        Args:
+            after (int, optional): Omitir los rangos que terminan en este ID o antes
             
-        except Exception as e:
-            print(f"Error al crear el esquema: {e}")
-            if connection:
-                connection.rollback()
-        finally:
-            if connection:
-                connection.close()
+        Returns:
+            list: Rangos (primera, última]: los IDs mayores que primera y
+            menores o iguales que última son propios
+        """
+        with self._local_changes_lock:
+            return [(first, last) for first, last in self._local_changes if last > after]
     
-    def execute_query(self, query, params=()):
+    def _change_log_sequence(self, connection):
+        """Último ID asignado en change_log (con el bloqueo de escritura tomado es exacto)."""
+        try:
+            row = connection.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Base de datos aún sin tablas AUTOINCREMENT (sin sqlite_sequence)
+            return 0
+        return row[0] if row else 0
+    
+    def _in_transaction(self):
+        """Indica si el hilo actual está dentro de transaction()."""
+        return getattr(self._local, "transaction_depth", 0) > 0
+    
+    def _handle_error(self, query, params, started, error):
         """
-        Ejecuta una consulta SQL y devuelve los resultados.
+        Informa de un error de consulta.
+        
+        Returns:
+            None: Indica un problema al llamador (fuera de una transacción)
+        """
+        print(f"Error en la consulta: {error}")
+        if started is not None:
+            self.query_log.record(query, params, time.perf_counter() - started, error=error)
+        if isinstance(error, sqlite3.OperationalError):
+            # Errores de E/S o bloqueo de archivo pueden dejar la conexión inservible
+            self.pool.mark_suspect()
+        if self._in_transaction():
+            # Propagar para que la transacción completa se deshaga
+            raise error
+        # En lugar de propagar el error, devolvemos None para indicar un problema
+        return None
+    
+    def _run_query(self, connection, query, params):
+        """
+        Ejecuta la consulta sobre una conexión del pool.
         
         Args:
+            connection (sqlite3.Connection): Conexión a utilizar
             query (str): Consulta SQL a ejecutar
-            params (tuple, optional): Parámetros para la consulta
+            params (tuple): Parámetros para la consulta
             
         Returns:
             list/int/bool: Resultados de la consulta, ID de inserción o indicador de éxito
         """
-        connection = None
-        try:
-            connection = sqlite3.connect(self.db_path)
-            
-            # Habilitar claves foráneas
-            connection.execute("PRAGMA foreign_keys = ON")
+        self.statement_cache.touch(connection, query)
+        statement = query.strip().upper()
+        
+        # Para las consultas SELECT (incluidas las que tienen JOIN) devolvemos diccionarios
+        if statement.startswith("SELECT"):
+            # La fábrica de filas se fija en el cursor para no alterar la conexión compartida
+            cursor = connection.cursor()
+            cursor.row_factory = sqlite3.Row
             
-            # Debug: mostrar consulta
-            print(f"Ejecutando: {query}")
-            print(f"Parámetros: {params}")
+            # Ejecutar consulta
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
             
-            # Para SELECT que involucre JOINs, utilizamos un enfoque alternativo
-            if query.strip().upper().startswith("SELECT") and " JOIN " in query.upper():
-                # Crear cursor directamente con row_factory
-                connection.row_factory = sqlite3.Row
-                cursor = connection.cursor()
-                
-                # Ejecutar la consulta
-                cursor.execute(query, params)
+            # Convertir objetos Row a diccionarios
+            results = []
+            for row in rows:
+                results.append({key: row[key] for key in row.keys()})
                 
-                # Obtener los resultados
-                rows = cursor.fetchall()
-                
-                # Para JOINs, creamos un diccionario por cada fila que incluye el prefijo de la tabla
-                result = []
-                for row in rows:
-                    row_dict = {}
-                    for key in row.keys():
-                        row_dict[key] = row[key]  # Nombres de columnas estándar
-                        
-                    result.append(row_dict)
-                    
-                connection.close()
-                return result
-                
-            # Para las consultas SELECT normales
-            elif query.strip().upper().startswith("SELECT"):
-                # Configurar para que las respuestas sean diccionarios
-                connection.row_factory = sqlite3.Row
-                cursor = connection.cursor()
-                
-                # Ejecutar consulta
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                
-                # Convertir objetos Row a diccionarios
-                results = []
-                for row in rows:
-                    results.append({key: row[key] for key in row.keys()})
-                    
-                connection.close()
-                return results
+            return results
+        
+        # Para INSERT, UPDATE, DELETE
+        cursor = connection.cursor()
+        cursor.execute(query, params)
+        
+        # Confirmar cambios (dentro de transaction() se confirma al final del bloque)
+        if not self._in_transaction():
+            connection.commit()
+        
+        # Para INSERT, intentar obtener el ID
+        if statement.startswith("INSERT"):
+            # Intentar obtener lastrowid
+            last_id = cursor.lastrowid
             
-            # Para INSERT, UPDATE, DELETE
-            else:
-                cursor = connection.cursor()
-                cursor.execute(query, params)
+            # Si es None o 0, intentar obtenerlo explícitamente
+            if last_id is None or last_id == 0:
+                cursor.execute("SELECT last_insert_rowid()")
+                row = cursor.fetchone()
+                if row and row[0] is not None:
+                    last_id = row[0]
+            
+            return last_id
+        
+        # Para UPDATE y DELETE, devolver True (éxito)
+        return True
+    
+    def iter_query(self, query, params=(), batch_size=ITER_BATCH_SIZE, row_format="dict"):
+        """
+        Recorre el resultado de una consulta SELECT por bloques.
+        
+        A diferencia de execute_query, no carga todas las filas en memoria: lee
+        del cursor con fetchmany y entrega cada bloque a medida que se consume.
+        La conexión del hilo queda ocupada hasta agotar o cerrar el generador.
+        
+        Args:
+            query (str): Consulta SELECT a ejecutar
+            params (tuple, optional): Parámetros para la consulta
+            batch_size (int, optional): Filas por bloque
+            row_format (str, optional): Formato de cada fila: "dict",
+                "tuple" (el más ligero) o "namedtuple"
+            
+        Yields:
+            list: Bloque de hasta batch_size filas en el formato indicado
+            
+        Raises:
+            ValueError: Si row_format no es válido
+            sqlite3.Error: Si la consulta falla (no se devuelve None a mitad
+                de un recorrido para no truncar exportaciones en silencio)
+        """
+        if row_format not in ("dict", "tuple", "namedtuple"):
+            raise ValueError(f"Formato de fila no válido: {row_format}")
+        
+        started = time.perf_counter() if self.query_log.is_active() else None
+        total = 0
+        try:
+            with self.pool.connection() as connection:
+                self.statement_cache.touch(connection, query)
+                cursor = connection.execute(query, params)
+                columns = tuple(column[0] for column in cursor.description or ())
                 
-                # Confirmar cambios
-                connection.commit()
+                if row_format == "namedtuple":
+                    row_class = _row_namedtuple(columns)
                 
-                # Para INSERT, intentar obtener el ID
-                if query.strip().upper().startswith("INSERT"):
-                    # Intentar obtener lastrowid
-                    last_id = cursor.lastrowid
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    total += len(rows)
                     
-                    # Si es None o 0, intentar obtenerlo explícitamente
-                    if last_id is None or last_id == 0:
-                        cursor.execute("SELECT last_insert_rowid()")
-                        row = cursor.fetchone()
-                        if row and row[0] is not None:
-                            last_id = row[0]
-                    
-                    connection.close()
-                    return last_id
-                
-                # Para UPDATE y DELETE, devolver True (éxito)
-                connection.close()
-                return True
-                
-        except Exception as e:
+                    if row_format == "dict":
+                        yield [dict(zip(columns, row)) for row in rows]
+                    elif row_format == "namedtuple":
+                        yield [row_class._make(row) for row in rows]
+                    else:
+                        yield rows
+        except sqlite3.Error as e:
             print(f"Error en la consulta: {e}")
-            if connection:
-                connection.rollback()
-            if connection:
-                connection.close()
-            # En lugar de propagar el error, devolvemos None para indicar un problema
-            return None
+            if started is not None:
+                self.query_log.record(query, params, time.perf_counter() - started, error=e)
+            if isinstance(e, sqlite3.OperationalError):
+                self.pool.mark_suspect()
+            raise
+        
+        if started is not None:
+            self.query_log.record(query, params, time.perf_counter() - started, rows=total)
     
     def get_all(self, table_name, condition=None):
         """
@@ -295,15 +806,31 @@ class DataManager:
     
     def get_connection(self):
         """
-        Obtiene una conexión a la base de datos.
+        Obtiene una conexión independiente a la base de datos.
+        
+        La conexión no pertenece al pool: quien la solicita debe cerrarla.
         
         Returns:
             Connection: Objeto de conexión SQLite
         """
         try:
             connection = sqlite3.connect(self.db_path)
-            connection.execute("PRAGMA foreign_keys = ON")
+            self._configure_connection(connection)
             return connection
         except Exception as e:
             print(f"Error al conectar a la base de datos: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+@lru_cache(maxsize=64)
+def _row_namedtuple(columns):
+    """
+    Obtiene la clase namedtuple para un conjunto de columnas.
+    
+    Args:
+        columns (tuple): Nombres de las columnas del resultado
+        
+    Returns:
+        type: Clase namedtuple (las columnas repetidas o inválidas se renombran)
+    """
+    return namedtuple("Row", columns, rename=True)
@@ -0,0 +1,495 @@
+"""
+Motor de diagnóstico de la base de datos de ISMAPP.
+
+Las comprobaciones son independientes entre sí y solo leen, así que se
+ejecutan en paralelo, cada una en su propia conexión de solo lectura
+(SQLite libera el GIL mientras ejecuta una consulta). Las más pesadas
+(integridad y claves foráneas) se dividen por tabla y las tablas más
+grandes se lanzan primero, para que ninguna quede sola al final.
+
+Modo rápido: en las tablas con más de ``sample_rows`` filas se revisan
+``SAMPLE_WINDOWS`` tramos de rowid elegidos al azar en lugar de la tabla
+completa. Leer un tramo obliga a SQLite a recorrer sus páginas (una
+página dañada produce un error) y las claves foráneas se comprueban solo
+en esas filas. Así una base de datos de varios GB se revisa en segundos;
+el informe marca qué resultados son por muestreo.
+
+Cada resultado indica su estado (ok, warning, error, failed si la propia
+comprobación falló, skipped) y, cuando hay algo que corregir, las
+reparaciones sugeridas (``fixes``), que este módulo nunca aplica.
+
+Con un archivo de estado, cada resultado se guarda al terminar: si el
+diagnóstico se interrumpe, ``resume=True`` retoma solo las comprobaciones
+pendientes, siempre que la base de datos no haya cambiado.
+"""
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+# Hilos por defecto
+DEFAULT_WORKERS = 4
+
+# Modo rápido: filas desde las que una tabla se revisa por muestreo
+DEFAULT_SAMPLE_ROWS = 20000
+
+# Tramos de rowid revisados en cada tabla muestreada
+SAMPLE_WINDOWS = 20
+
+# Hallazgos detallados por comprobación (el total se informa siempre)
+MAX_FINDINGS = 100
+
+# Espera ante un bloqueo de escritura de otro puesto (segundos)
+BUSY_TIMEOUT = 10.0
+
+STATE_VERSION = 1
+
+# Tablas y columnas mínimas que la aplicación necesita
+REQUIRED_COLUMNS = {
+    "users": ("id", "username", "password", "role"),
+    "clients": ("id", "name", "business_name", "rut", "client_type"),
+    "materials": ("id", "name", "material_type"),
+    "client_materials": ("id", "client_id", "material_id", "price"),
+    "workers": ("id", "name", "rut"),
+}
+
+OK = "ok"
+WARNING = "warning"
+ERROR = "error"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+_SEVERITY = {OK: 0, SKIPPED: 0, WARNING: 1, ERROR: 2, FAILED: 3}
+
+
+def connect_read_only(db_path):
+    """
+    Abre una conexión de solo lectura.
+
+    Args:
+        db_path (str): Base de datos
+
+    Returns:
+        sqlite3.Connection: Conexión (no puede modificar la base de datos)
+    """
+    connection = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True,
+                                 timeout=BUSY_TIMEOUT, check_same_thread=False)
+    connection.execute("PRAGMA query_only = 1")
+    return connection
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _result(status=OK, findings=None, fixes=None, details=None, sampled=False):
+    findings = findings or []
+    return {
+        "status": status,
+        "finding_count": len(findings),
+        "findings": findings[:MAX_FINDINGS],
+        "fixes": fixes or [],
+        "details": details or {},
+        "sampled": sampled,
+    }
+
+
+class _Context:
+    """Esquema leído al planificar, compartido (solo lectura) por las comprobaciones."""
+
+    def __init__(self, tables, row_estimates, rowid_tables, quick, sample_rows, seed):
+        self.tables = tables
+        self.row_estimates = row_estimates
+        self.rowid_tables = rowid_tables
+        self.quick = quick
+        self.sample_rows = sample_rows
+        self.seed = seed
+
+    def should_sample(self, table):
+        return (self.quick and table in self.rowid_tables
+                and self.row_estimates.get(table, 0) > self.sample_rows)
+
+    def sample_windows(self, connection, table):
+        """Tramos (desde, hasta) de rowid a revisar en una tabla grande."""
+        low, high = connection.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {_quote(table)}").fetchone()
+        width = max(1, self.sample_rows // SAMPLE_WINDOWS)
+        rng = random.Random(f"{self.seed}:{table}")
+        windows = []
+        for _ in range(SAMPLE_WINDOWS):
+            start = rng.randint(low, max(low, high - width))
+            windows.append((start, start + width - 1))
+        return sorted(windows)
+
+
+def check_tables(connection, context):
+    """Tablas requeridas por la aplicación."""
+    missing = [table for table in REQUIRED_COLUMNS if table not in context.tables]
+    return _result(
+        ERROR if missing else OK,
+        findings=[{"table": table, "problem": "missing_table"} for table in missing],
+        fixes=[{"action": "create_table", "table": table} for table in missing],
+        details={"tables": len(context.tables)},
+    )
+
+
+def check_structure(connection, context):
+    """Columnas mínimas de las tablas requeridas."""
+    findings = []
+    columns_by_table = {}
+    for table in context.tables:
+        columns = [row[1] for row in connection.execute(f"PRAGMA table_info({_quote(table)})")]
+        columns_by_table[table] = len(columns)
+        for column in REQUIRED_COLUMNS.get(table, ()):
+            if column not in columns:
+                findings.append({"table": table, "column": column, "problem": "missing_column"})
+    return _result(ERROR if findings else OK, findings=findings, details={"columns": columns_by_table})
+
+
+def check_sequences(connection, context):
+    """Secuencias AUTOINCREMENT por detrás del ID máximo (los INSERT fallarían)."""
+    if "sqlite_sequence" not in context.tables:
+        return _result(details={"tables": 0})
+    sequences = dict(connection.execute("SELECT name, seq FROM sqlite_sequence"))
+    findings = []
+    fixes = []
+    for table, seq in sequences.items():
+        if table not in context.tables:
+            continue
+        try:
+            max_id = connection.execute(f"SELECT MAX(rowid) FROM {_quote(table)}").fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            continue
+        if max_id > (seq or 0):
+            findings.append({"table": table, "sequence": seq, "max_id": max_id, "problem": "sequence_behind"})
+            fixes.append({"action": "reset_sequence", "table": table, "value": max_id})
+    return _result(WARNING if findings else OK, findings=findings, fixes=fixes,
+                   details={"tables": len(sequences)})
+
+
+def check_integrity(connection, context, table):
+    """Integridad de las páginas de una tabla y sus índices."""
+    if context.should_sample(table):
+        # Leer los tramos recorre sus páginas; una página dañada produce un error
+        rows = 0
+        columns = ", ".join(_quote(row[1]) for row in connection.execute(f"PRAGMA table_info({_quote(table)})"))
+        try:
+            for start, end in context.sample_windows(connection, table):
+                for _ in connection.execute(
+                    f"SELECT {columns} FROM {_quote(table)} WHERE rowid BETWEEN ? AND ?", (start, end)
+                ):
+                    rows += 1
+        except sqlite3.DatabaseError as e:
+            return _result(ERROR, findings=[{"table": table, "problem": "corrupt", "message": str(e)}],
+                           sampled=True, details={"rows_checked": rows})
+        return _result(sampled=True, details={"rows_checked": rows})
+
+    messages = [row[0] for row in connection.execute(f"PRAGMA integrity_check({_quote(table)})")]
+    if messages == ["ok"]:
+        return _result(details={"rows": context.row_estimates.get(table)})
+    return _result(ERROR, findings=[{"table": table, "problem": "corrupt", "message": message}
+                                    for message in messages])
+
+
+def check_foreign_keys(connection, context, table):
+    """Filas de una tabla que apuntan a registros inexistentes."""
+    references = {}
+    for row in connection.execute(f"PRAGMA foreign_key_list({_quote(table)})"):
+        fk_id, _, parent, child_column, parent_column = row[:5]
+        references.setdefault(fk_id, (parent, []))[1].append((child_column, parent_column))
+
+    findings = []
+    if context.should_sample(table):
+        windows = context.sample_windows(connection, table)
+        for parent, pairs in references.values():
+            if parent not in context.tables:
+                findings.append({"table": table, "parent": parent, "problem": "missing_parent_table"})
+                continue
+            join = " AND ".join(
+                f"p.{_quote(parent_column or 'rowid')} = c.{_quote(child_column)}"
+                for child_column, parent_column in pairs
+            )
+            not_null = " AND ".join(f"c.{_quote(child_column)} IS NOT NULL" for child_column, _ in pairs)
+            query = (
+                f"SELECT c.rowid FROM {_quote(table)} c LEFT JOIN {_quote(parent)} p ON {join} "
+                f"WHERE c.rowid BETWEEN ? AND ? AND {not_null} AND p.rowid IS NULL"
+            )
+            for start, end in windows:
+                for (rowid,) in connection.execute(query, (start, end)):
+                    findings.append({"table": table, "rowid": rowid, "parent": parent,
+                                     "problem": "orphan_reference"})
+        return _result(ERROR if findings else OK, findings=findings, sampled=True)
+
+    for row in connection.execute(f"PRAGMA foreign_key_check({_quote(table)})"):
+        findings.append({"table": row[0], "rowid": row[1], "parent": row[2], "problem": "orphan_reference"})
+    return _result(ERROR if findings else OK, findings=findings)
+
+
+def check_client_materials(connection, context):
+    """Relaciones cliente-material inválidas o duplicadas."""
+    if not {"clients", "materials", "client_materials"} <= set(context.tables):
+        return _result(SKIPPED, details={"reason": "faltan tablas"})
+    findings = []
+    fixes = []
+
+    invalid = connection.execute("""
+        SELECT cm.id, cm.client_id, cm.material_id,
+               c.id IS NULL AS missing_client, m.id IS NULL AS missing_material
+        FROM client_materials cm
+        LEFT JOIN clients c ON cm.client_id = c.id
+        LEFT JOIN materials m ON cm.material_id = m.id
+        WHERE c.id IS NULL OR m.id IS NULL
+    """).fetchall()
+    for row_id, client_id, material_id, missing_client, missing_material in invalid:
+        findings.append({
+            "id": row_id, "client_id": client_id, "material_id": material_id,
+            "problem": "missing_client" if missing_client else "missing_material",
+        })
+    if invalid:
+        fixes.append({"action": "delete_client_materials", "ids": [row[0] for row in invalid]})
+
+    for client_id, material_id, count in connection.execute("""
+        SELECT client_id, material_id, COUNT(*) FROM client_materials
+        GROUP BY client_id, material_id HAVING COUNT(*) > 1
+    """):
+        findings.append({"client_id": client_id, "material_id": material_id, "count": count,
+                         "problem": "duplicate"})
+        fixes.append({"action": "dedupe_client_materials", "client_id": client_id, "material_id": material_id})
+
+    # Informativo: clientes activos sin materiales asignados
+    without_materials = connection.execute("""
+        SELECT COUNT(*) FROM clients c
+        WHERE c.is_active = 1 AND NOT EXISTS (SELECT 1 FROM client_materials cm WHERE cm.client_id = c.id)
+    """).fetchone()[0]
+    return _result(ERROR if findings else OK, findings=findings, fixes=fixes,
+                   details={"active_clients_without_materials": without_materials})
+
+
+def check_users(connection, context):
+    """Al menos un administrador activo."""
+    if "users" not in context.tables:
+        return _result(SKIPPED, details={"reason": "falta la tabla users"})
+    admins = connection.execute(
+        "SELECT COUNT(*) FROM users WHERE role = 'admin' AND COALESCE(is_active, 1) = 1"
+    ).fetchone()[0]
+    if admins:
+        return _result(details={"admins": admins})
+    return _result(ERROR, findings=[{"problem": "no_admin"}], fixes=[{"action": "create_admin"}],
+                   details={"admins": 0})
+
+
+# Comprobaciones: nombre -> (función, por tabla)
+CHECKS = {
+    "tables": (check_tables, False),
+    "structure": (check_structure, False),
+    "sequences": (check_sequences, False),
+    "integrity": (check_integrity, True),
+    "foreign_keys": (check_foreign_keys, True),
+    "client_materials": (check_client_materials, False),
+    "users": (check_users, False),
+}
+
+
+class Diagnostics:
+    """Ejecuta las comprobaciones en paralelo y arma el informe."""
+
+    def __init__(self, db_path, quick=False, sample_rows=DEFAULT_SAMPLE_ROWS, workers=DEFAULT_WORKERS,
+                 checks=None, state_path=None, resume=False, seed=0):
+        """
+        Inicializa el diagnóstico.
+
+        Args:
+            db_path (str): Base de datos
+            quick (bool, optional): Revisar las tablas grandes por muestreo
+            sample_rows (int, optional): Filas desde las que se muestrea (y
+                filas revisadas por tabla muestreada)
+            workers (int, optional): Comprobaciones simultáneas
+            checks (list, optional): Comprobaciones a ejecutar (por defecto, todas)
+            state_path (str, optional): Archivo donde se guarda cada resultado
+            resume (bool, optional): Reutilizar los resultados del archivo de estado
+            seed (int, optional): Semilla del muestreo (mismo valor, mismos tramos)
+
+        Raises:
+            ValueError: Si se pide una comprobación desconocida
+        """
+        self.db_path = db_path
+        self.quick = quick
+        self.sample_rows = sample_rows
+        self.workers = max(1, workers)
+        self.checks = list(checks) if checks else list(CHECKS)
+        unknown = [name for name in self.checks if name not in CHECKS]
+        if unknown:
+            raise ValueError(f"Comprobaciones desconocidas: {', '.join(unknown)}")
+        self.state_path = state_path
+        self.resume = resume
+        self.seed = seed
+        self._state_lock = threading.Lock()
+
+    def run(self, progress=None):
+        """
+        Ejecuta el diagnóstico.
+
+        Args:
+            progress (callable, optional): Función (resultado, terminadas, total),
+                llamada desde el hilo que termina cada comprobación
+
+        Returns:
+            dict: Informe (database, mode, started_at, duration_ms, workers,
+                resumed, status, summary, checks)
+        """
+        started_at = datetime.now()
+        started = time.perf_counter()
+        report = {
+            "database": os.path.abspath(self.db_path),
+            "mode": "quick" if self.quick else "full",
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "workers": self.workers,
+            "resumed": 0,
+        }
+        if not os.path.exists(self.db_path):
+            failed = {"id": "database", "check": "database", "table": None, "duration_ms": 0}
+            failed.update(_result(ERROR, findings=[{"problem": "missing_database"}]))
+            return self._finish(report, [failed], started)
+
+        context, tasks = self._plan()
+        fingerprint = self._fingerprint()
+        state = self._load_state(fingerprint)
+        results = {task_id: state["results"][task_id] for task_id, _, _ in tasks
+                   if task_id in state["results"]}
+        report["resumed"] = len(results)
+        pending = [task for task in tasks if task[0] not in results]
+
+        done = len(results)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._run_task, context, *task) for task in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result["id"]] = result
+                done += 1
+                self._save_result(state, result)
+                if progress is not None:
+                    progress(result, done, len(tasks))
+
+        return self._finish(report, [results[task_id] for task_id, _, _ in tasks], started)
+
+    def _plan(self):
+        """Lee el esquema y arma la lista de tareas (las tablas grandes primero)."""
+        connection = connect_read_only(self.db_path)
+        try:
+            rows = connection.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY name"
+            ).fetchall()
+            tables = [name for name, _ in rows]
+            # Las tablas virtuales (FTS) se revisan a través de sus tablas internas
+            real_tables = [name for name, sql in rows
+                           if not (sql or "").upper().startswith("CREATE VIRTUAL TABLE")]
+            estimates = {}
+            rowid_tables = set()
+            for table in real_tables:
+                try:
+                    low, high = connection.execute(
+                        f"SELECT MIN(rowid), MAX(rowid) FROM {_quote(table)}"
+                    ).fetchone()
+                    estimates[table] = (high - low + 1) if high is not None else 0
+                    rowid_tables.add(table)
+                except sqlite3.OperationalError:
+                    # WITHOUT ROWID: se cuentan (son tablas pequeñas de control)
+                    estimates[table] = connection.execute(f"SELECT COUNT(*) FROM {_quote(table)}").fetchone()[0]
+            with_foreign_keys = [
+                table for table in real_tables
+                if connection.execute(f"PRAGMA foreign_key_list({_quote(table)})").fetchone() is not None
+            ]
+        finally:
+            connection.close()
+
+        context = _Context(tables, estimates, rowid_tables, self.quick, self.sample_rows, self.seed)
+        tasks = []
+        for name in self.checks:
+            _, per_table = CHECKS[name]
+            if not per_table:
+                tasks.append((name, name, None))
+                continue
+            targets = with_foreign_keys if name == "foreign_keys" else real_tables
+            tasks.extend((f"{name}:{table}", name, table) for table in targets)
+        # Las tareas por tabla más grandes primero
+        tasks.sort(key=lambda task: -estimates.get(task[2], 0) if task[2] else 0)
+        return context, tasks
+
+    def _run_task(self, context, task_id, name, table):
+        function, per_table = CHECKS[name]
+        started = time.perf_counter()
+        connection = None
+        try:
+            connection = connect_read_only(self.db_path)
+            result = function(connection, context, table) if per_table else function(connection, context)
+        except sqlite3.Error as e:
+            result = _result(FAILED, findings=[{"problem": "check_failed", "message": str(e)}])
+        finally:
+            if connection is not None:
+                connection.close()
+        result.update({"id": task_id, "check": name, "table": table,
+                       "duration_ms": round((time.perf_counter() - started) * 1000, 1)})
+        return result
+
+    def _finish(self, report, results, started):
+        summary = {OK: 0, WARNING: 0, ERROR: 0, FAILED: 0, SKIPPED: 0}
+        for result in results:
+            summary[result["status"]] += 1
+        worst = max((result["status"] for result in results), key=_SEVERITY.get, default=OK)
+        report.update({
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "status": OK if worst == SKIPPED else worst,
+            "summary": summary,
+            "checks": results,
+        })
+        return report
+
+    def _fingerprint(self):
+        parts = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                info = os.stat(path)
+                parts.append(f"{info.st_size}:{info.st_mtime_ns}")
+            except FileNotFoundError:
+                parts.append("-")
+        return "|".join(parts)
+
+    def _load_state(self, fingerprint):
+        """Estado previo si corresponde reanudar; si no, uno vacío."""
+        state = {
+            "version": STATE_VERSION,
+            "database": os.path.abspath(self.db_path),
+            "fingerprint": fingerprint,
+            "options": {"quick": self.quick, "sample_rows": self.sample_rows, "seed": self.seed},
+            "results": {},
+        }
+        if not (self.resume and self.state_path and os.path.exists(self.state_path)):
+            return state
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as handle:
+                previous = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return state
+        # Solo si es la misma base de datos, sin cambios y con las mismas opciones
+        if all(previous.get(key) == state[key] for key in ("version", "database", "fingerprint", "options")):
+            state["results"] = previous.get("results", {})
+        return state
+
+    def _save_result(self, state, result):
+        if not self.state_path:
+            return
+        with self._state_lock:
+            state["results"][result["id"]] = result
+            directory = os.path.dirname(os.path.abspath(self.state_path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(state, handle, ensure_ascii=False)
+                os.replace(temp_path, self.state_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
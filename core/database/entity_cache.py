@@ -0,0 +1,180 @@
+"""
+Caché de lectura de entidades para ISMAPP.
+
+Guarda en memoria los resultados de las consultas más repetidas (entidades
+por ID y listados) con desalojo LRU. Las claves son tuplas cuyo primer
+elemento es el espacio de nombres (normalmente la tabla) y el segundo el tipo
+de consulta, p. ej. ``("clients", "id", 5)`` o ``("clients", "list", "all")``.
+
+Se almacenan las filas tal como salen del cursor (tuplas inmutables); cada
+lectura construye objetos nuevos, de modo que modificar un objeto en la vista
+nunca altera el contenido del caché.
+"""
+import threading
+from collections import OrderedDict
+
+# Número de consultas en caché por defecto
+DEFAULT_CAPACITY = 256
+
+
+class EntityCache:
+    """Caché LRU con invalidación por entidad, por clave y por espacio de nombres."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Inicializa el caché.
+
+        Args:
+            capacity (int): Número máximo de consultas en caché (0 lo desactiva)
+        """
+        self.capacity = max(0, int(capacity))
+        self._entries = OrderedDict()
+        self._namespaces = {}   # espacio de nombres -> conjunto de claves
+        self._generations = {}  # espacio de nombres -> contador de invalidaciones
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, capacity):
+        """
+        Cambia la capacidad del caché.
+
+        Args:
+            capacity (int): Nuevo número máximo de consultas (0 lo desactiva)
+        """
+        with self._lock:
+            self.capacity = max(0, int(capacity))
+            self._evict_locked()
+
+    def get_or_load(self, key, loader):
+        """
+        Obtiene un valor del caché o lo carga y lo guarda.
+
+        Args:
+            key (tuple): Clave (espacio de nombres, tipo de consulta, argumentos...)
+            loader (callable): Función que carga el valor; si devuelve None
+                (error de consulta) no se guarda
+
+        Returns:
+            object: Valor en caché o recién cargado
+        """
+        namespace = key[0]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            generation = self._generations.get(namespace, 0)
+
+        value = loader()
+
+        with self._lock:
+            # Si hubo una escritura durante la carga, el valor puede estar obsoleto
+            if (value is not None and self.capacity
+                    and self._generations.get(namespace, 0) == generation):
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                self._namespaces.setdefault(namespace, set()).add(key)
+                self._evict_locked()
+        return value
+
+    def invalidate_entity(self, namespace, entity_id=None):
+        """
+        Invalida una entidad y todos los listados de su espacio de nombres.
+
+        Args:
+            namespace (str): Espacio de nombres (tabla)
+            entity_id (int, optional): ID de la entidad modificada; None en
+                inserciones, donde solo cambian los listados
+        """
+        with self._lock:
+            self._bump_locked(namespace)
+            for key in list(self._namespaces.get(namespace, ())):
+                if key[1] != "id" or (entity_id is not None and key[2] == entity_id):
+                    self._remove_locked(key)
+
+    def invalidate_keys(self, *keys):
+        """
+        Invalida claves concretas.
+
+        Args:
+            *keys (tuple): Claves a eliminar
+        """
+        with self._lock:
+            for key in keys:
+                self._bump_locked(key[0])
+                if key in self._entries:
+                    self._remove_locked(key)
+
+    def invalidate_namespace(self, namespace):
+        """
+        Invalida todas las consultas de un espacio de nombres.
+
+        Args:
+            namespace (str): Espacio de nombres (tabla)
+        """
+        with self._lock:
+            self._bump_locked(namespace)
+            for key in list(self._namespaces.get(namespace, ())):
+                self._remove_locked(key)
+
+    def clear(self):
+        """Vacía el caché por completo."""
+        with self._lock:
+            for namespace in list(self._namespaces):
+                self._bump_locked(namespace)
+            self._entries.clear()
+            self._namespaces.clear()
+
+    def stats(self):
+        """
+        Obtiene estadísticas del caché.
+
+        Returns:
+            dict: Capacidad, tamaño, aciertos, fallos, desalojos,
+            invalidaciones, tasa de aciertos y entradas por espacio de nombres
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "capacity": self.capacity,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "namespaces": {name: len(keys) for name, keys in self._namespaces.items() if keys},
+            }
+
+    def reset_stats(self):
+        """Pone a cero los contadores del caché."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    # ------------------------------------------------------------------
+    # Implementación interna (requieren el candado)
+    # ------------------------------------------------------------------
+
+    def _bump_locked(self, namespace):
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        self.invalidations += 1
+
+    def _remove_locked(self, key):
+        self._entries.pop(key, None)
+        keys = self._namespaces.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+
+    def _evict_locked(self):
+        while len(self._entries) > self.capacity:
+            key, _ = self._entries.popitem(last=False)
+            self._namespaces.get(key[0], set()).discard(key)
+            self.evictions += 1
@@ -0,0 +1,204 @@
+"""
+Índices de búsqueda de texto completo (FTS5) para ISMAPP.
+
+Cada tabla buscable tiene una tabla virtual ``<tabla>_fts`` sin contenido
+propio (``content=''``): solo guarda el índice, y los triggers la mantienen
+al día con las inserciones, cambios y borrados de la tabla original. El
+tokenizador ``unicode61 remove_diacritics 2`` ignora mayúsculas y tildes, de
+modo que "nunez" encuentra "Núñez", y los índices de prefijo aceleran la
+búsqueda mientras se escribe.
+
+Si el SQLite instalado no incluye FTS5, las tablas no se crean y los
+servicios vuelven a la búsqueda con LIKE. Al iniciar, DataManager crea los
+índices que falten (ver ``missing_indexes``): una base de datos migrada sin
+FTS5 queda indexada en cuanto se abre con un SQLite que lo incluya.
+"""
+import re
+import sqlite3
+
+# Tokenizador y prefijos indexados comunes a todas las tablas
+TOKENIZE = "unicode61 remove_diacritics 2"
+PREFIXES = "2 3 4"
+
+# Tablas indexadas: columnas con su peso en bm25 y columna de desempate
+FULL_TEXT_INDEXES = {
+    "clients": {
+        "columns": (("name", 10.0), ("business_name", 6.0),
+                    ("rut", 8.0), ("contact_person", 2.0)),
+        "order_by": "name",
+    },
+    "workers": {
+        "columns": (("name", 10.0), ("rut", 8.0), ("position", 3.0)),
+        "order_by": "name",
+    },
+    "materials": {
+        "columns": (("name", 10.0), ("description", 2.0)),
+        "order_by": "name",
+    },
+}
+
+# El RUT se indexa también sin puntos ni guion para encontrar "12345678"
+_COLUMN_EXPRESSIONS = {
+    "rut": "COALESCE({row}.rut, '') || ' ' || "
+           "REPLACE(REPLACE(COALESCE({row}.rut, ''), '.', ''), '-', '')",
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def fts_table(table):
+    """Nombre de la tabla virtual FTS5 de una tabla."""
+    return f"{table}_fts"
+
+
+def fts5_available(connection):
+    """
+    Comprueba si el SQLite en uso incluye el módulo FTS5.
+
+    Args:
+        connection (sqlite3.Connection): Conexión a la base de datos
+
+    Returns:
+        bool: True si se pueden crear tablas FTS5
+    """
+    try:
+        connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+        connection.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def indexed_tables(connection):
+    """
+    Obtiene las tablas que tienen índice de texto completo creado.
+
+    Args:
+        connection (sqlite3.Connection): Conexión a la base de datos
+
+    Returns:
+        set: Nombres de las tablas originales indexadas
+    """
+    names = {row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%\\_fts' ESCAPE '\\'"
+    )}
+    return {table for table in FULL_TEXT_INDEXES if fts_table(table) in names}
+
+
+def missing_indexes(connection):
+    """
+    Obtiene las tablas indexables que existen pero aún no tienen índice.
+
+    Args:
+        connection (sqlite3.Connection): Conexión a la base de datos
+
+    Returns:
+        list: Nombres de las tablas sin índice de texto completo
+    """
+    names = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [table for table in FULL_TEXT_INDEXES if table in names and fts_table(table) not in names]
+
+
+def _values(table, row):
+    """Expresiones SQL con los valores indexados de NEW u OLD."""
+    return ", ".join(
+        _COLUMN_EXPRESSIONS.get(column, "COALESCE({row}.%s, '')" % column).format(row=row)
+        for column, _ in FULL_TEXT_INDEXES[table]["columns"]
+    )
+
+
+def create_full_text_index(cursor, table):
+    """
+    Crea la tabla FTS5 de una tabla, sus triggers y la llena con las filas actuales.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor dentro de la transacción de la migración
+        table (str): Tabla a indexar (clave de FULL_TEXT_INDEXES)
+    """
+    fts = fts_table(table)
+    columns = [column for column, _ in FULL_TEXT_INDEXES[table]["columns"]]
+    column_list = ", ".join(columns)
+
+    cursor.execute(f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+        {column_list},
+        content = '',
+        tokenize = '{TOKENIZE}',
+        prefix = '{PREFIXES}'
+    )
+    ''')
+
+    # Una tabla sin contenido solo admite borrar entregando los valores
+    # originales, por eso los triggers repiten las mismas expresiones
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table}
+    BEGIN
+        INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.id, {_values(table, "NEW")});
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table}
+    BEGIN
+        INSERT INTO {fts} ({fts}, rowid, {column_list})
+        VALUES ('delete', OLD.id, {_values(table, "OLD")});
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update AFTER UPDATE OF {column_list} ON {table}
+    BEGIN
+        INSERT INTO {fts} ({fts}, rowid, {column_list})
+        VALUES ('delete', OLD.id, {_values(table, "OLD")});
+        INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.id, {_values(table, "NEW")});
+    END
+    ''')
+
+    cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('delete-all')")
+    cursor.execute(
+        f"INSERT INTO {fts} (rowid, {column_list}) "
+        f"SELECT id, {_values(table, table)} FROM {table}"
+    )
+
+
+def build_match_query(search_term):
+    """
+    Convierte el texto escrito por el usuario en una expresión MATCH.
+
+    Cada palabra se busca como prefijo y todas deben aparecer; la puntuación
+    se descarta, así "12.345" busca "12" y "345".
+
+    Args:
+        search_term (str): Término de búsqueda
+
+    Returns:
+        str: Expresión para MATCH, o None si no hay palabras que buscar
+    """
+    tokens = _TOKEN_PATTERN.findall((search_term or "").lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def build_search_query(table, conditions=()):
+    """
+    Construye la consulta de búsqueda ordenada por relevancia (bm25).
+
+    El primer parámetro de la consulta es la expresión MATCH; después van
+    los de ``conditions`` en orden.
+
+    Args:
+        table (str): Tabla a buscar (clave de FULL_TEXT_INDEXES)
+        conditions (tuple, optional): Condiciones SQL adicionales sobre la tabla
+
+    Returns:
+        str: Consulta SQL que devuelve las columnas de la tabla original
+    """
+    spec = FULL_TEXT_INDEXES[table]
+    fts = fts_table(table)
+    weights = ", ".join(str(weight) for _, weight in spec["columns"])
+    where = " AND ".join((f"{fts} MATCH ?", f"{table}.is_active = 1") + tuple(conditions))
+    return (
+        f"SELECT {table}.* FROM {fts} "
+        f"JOIN {table} ON {table}.id = {fts}.rowid "
+        f"WHERE {where} "
+        f"ORDER BY bm25({fts}, {weights}), {table}.{spec['order_by']}"
+    )
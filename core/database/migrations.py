@@ -0,0 +1,266 @@
+"""
+Migraciones del esquema de la base de datos de ISMAPP.
+
+La versión del esquema se guarda en ``PRAGMA user_version``. Al iniciar, el
+DataManager aplica en orden las migraciones pendientes; cada una se ejecuta
+en su propia transacción, de modo que varios puestos que arrancan a la vez
+sobre el mismo archivo no la aplican dos veces.
+"""
+import logging
+
+from core.database.full_text import FULL_TEXT_INDEXES, create_full_text_index, fts5_available
+from core.database.payroll_tables import create_payroll_tables
+from core.database.summaries import create_weighing_summaries
+
+logger = logging.getLogger(__name__)
+
+# Tablas cuyos cambios se registran en change_log y columna que identifica la
+# fila afectada. Para client_materials se registra el cliente, que es la
+# unidad que refrescan las vistas. Los pesajes se agregan en la migración 8.
+TRACKED_TABLES = {
+    "clients": "id",
+    "materials": "id",
+    "workers": "id",
+    "client_materials": "client_id",
+}
+
+
+def _table_exists(cursor, table):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return cursor.fetchone() is not None
+
+
+def _create_change_log_triggers(cursor, table, row_column):
+    """Crea los triggers que registran inserciones, cambios y borrados de una tabla."""
+    for operation, event, row in (("I", "INSERT", "NEW"),
+                                  ("U", "UPDATE", "NEW"),
+                                  ("D", "DELETE", "OLD")):
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_log_{event.lower()}
+        AFTER {event} ON {table}
+        BEGIN
+            INSERT INTO change_log (table_name, row_id, operation)
+            VALUES ('{table}', {row}.{row_column}, '{operation}');
+        END
+        ''')
+
+
+def _migration_1_change_log(cursor):
+    """Registro de cambios para la notificación entre puestos de trabajo."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS change_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        operation TEXT NOT NULL,
+        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON change_log (changed_at)")
+
+    for table, row_column in TRACKED_TABLES.items():
+        if _table_exists(cursor, table):
+            _create_change_log_triggers(cursor, table, row_column)
+
+
+# Columnas que WorkerService usa y que el esquema original de workers no tenía
+WORKER_COLUMNS = (
+    ("position", "TEXT"),
+    ("department", "TEXT"),
+    ("contract_type", "TEXT"),
+    ("hire_date", "TEXT"),
+    ("bank_name", "TEXT"),
+    ("account_type", "TEXT"),
+    ("account_number", "TEXT"),
+    ("account_holder", "TEXT"),
+    ("account_holder_rut", "TEXT"),
+)
+
+
+def _migration_2_workers(cursor):
+    """Alinea la tabla workers con el modelo y crea worker_bank_accounts."""
+    cursor.execute("PRAGMA table_info(workers)")
+    existing = {row[1] for row in cursor.fetchall()}
+    for column, column_type in WORKER_COLUMNS:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE workers ADD COLUMN {column} {column_type}")
+
+    # El cargo se guardaba en 'role'
+    if "role" in existing:
+        cursor.execute("UPDATE workers SET position = role WHERE position IS NULL AND role IS NOT NULL")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS worker_bank_accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        worker_id INTEGER NOT NULL,
+        is_primary INTEGER DEFAULT 0,
+        bank_name TEXT,
+        account_type TEXT,
+        account_number TEXT,
+        account_holder TEXT,
+        account_holder_rut TEXT,
+        FOREIGN KEY (worker_id) REFERENCES workers (id) ON DELETE CASCADE
+    )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_worker_bank_accounts_worker ON worker_bank_accounts (worker_id)"
+    )
+
+
+def _migration_3_full_text(cursor):
+    """Índices FTS5 para la búsqueda de clientes, trabajadores y materiales."""
+    if not fts5_available(cursor.connection):
+        # DataManager crea los índices al iniciar con un SQLite que incluya FTS5
+        logger.warning("SQLite sin FTS5: la búsqueda seguirá usando LIKE")
+        return
+
+    for table in FULL_TEXT_INDEXES:
+        if _table_exists(cursor, table):
+            create_full_text_index(cursor, table)
+
+
+def _migration_4_weighings(cursor):
+    """Tabla de pesajes y resumen mensual para el dashboard."""
+    # Tabla de solo inserción: la clave es el rowid y solo se indexa la fecha
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS weighings (
+        id INTEGER PRIMARY KEY,
+        weighed_at TEXT NOT NULL,
+        material_id INTEGER NOT NULL,
+        client_id INTEGER,
+        worker_id INTEGER,
+        net_weight_kg REAL NOT NULL,
+        plastic_state TEXT,
+        price_per_kg REAL DEFAULT 0.0,
+        amount REAL DEFAULT 0.0,
+        notes TEXT,
+        FOREIGN KEY (material_id) REFERENCES materials (id),
+        FOREIGN KEY (client_id) REFERENCES clients (id),
+        FOREIGN KEY (worker_id) REFERENCES workers (id)
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_weighings_weighed_at ON weighings (weighed_at)")
+
+    create_weighing_summaries(cursor)
+
+
+def _migration_5_weighing_sources(cursor):
+    """Origen de cada pesaje (balanza y número de lectura) para no duplicarlos."""
+    cursor.execute("PRAGMA table_info(weighings)")
+    existing = {row[1] for row in cursor.fetchall()}
+    if "source" not in existing:
+        cursor.execute("ALTER TABLE weighings ADD COLUMN source TEXT")
+    if "source_seq" not in existing:
+        cursor.execute("ALTER TABLE weighings ADD COLUMN source_seq INTEGER")
+    # Los pesajes manuales tienen source NULL y no chocan entre sí
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_weighings_source ON weighings (source, source_seq)"
+    )
+
+
+def _migration_6_payroll(cursor):
+    """Ajustes de liquidaciones y caché de liquidaciones calculadas."""
+    create_payroll_tables(cursor)
+
+
+def _migration_7_attachments(cursor):
+    """Archivos adjuntos de clientes, trabajadores y usuarios."""
+    # Un contenido (hash) por fila; cada adjunto lo enlaza a una entidad
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS attachment_blobs (
+        sha256 TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS attachments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity_type TEXT NOT NULL,
+        entity_id INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        file_name TEXT NOT NULL,
+        mime_type TEXT,
+        size INTEGER NOT NULL,
+        description TEXT,
+        uploaded_by TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (sha256) REFERENCES attachment_blobs (sha256)
+    )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_attachments_entity ON attachments (entity_type, entity_id)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attachments_sha256 ON attachments (sha256)")
+
+    # La entidad no es una clave foránea (puede ser de tres tablas): al
+    # borrarla se borran sus adjuntos, y los contenidos sin uso se eliminan
+    # con AttachmentService.collect_garbage
+    for entity_type, table in (("client", "clients"), ("worker", "workers"), ("user", "users")):
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_attachments_delete
+        AFTER DELETE ON {table}
+        BEGIN
+            DELETE FROM attachments WHERE entity_type = '{entity_type}' AND entity_id = OLD.id;
+        END
+        ''')
+
+
+def _migration_8_weighing_changes(cursor):
+    """Registro en change_log de los pesajes, para que las vistas no consulten por su cuenta."""
+    _create_change_log_triggers(cursor, "weighings", "id")
+
+
+# Lista ordenada de migraciones: (versión, descripción, función)
+MIGRATIONS = [
+    (1, "Registro de cambios (change_log)", _migration_1_change_log),
+    (2, "Columnas de trabajadores y cuentas bancarias", _migration_2_workers),
+    (3, "Búsqueda de texto completo (FTS5)", _migration_3_full_text),
+    (4, "Pesajes y resumen mensual", _migration_4_weighings),
+    (5, "Origen de los pesajes de balanza", _migration_5_weighing_sources),
+    (6, "Liquidaciones de sueldo", _migration_6_payroll),
+    (7, "Archivos adjuntos", _migration_7_attachments),
+    (8, "Registro de cambios de pesajes", _migration_8_weighing_changes),
+]
+
+
+def get_schema_version(connection):
+    """
+    Obtiene la versión del esquema de una conexión.
+
+    Args:
+        connection (sqlite3.Connection): Conexión a la base de datos
+
+    Returns:
+        int: Valor de PRAGMA user_version
+    """
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(data_manager):
+    """
+    Aplica las migraciones pendientes.
+
+    Args:
+        data_manager (DataManager): Gestor de datos
+
+    Returns:
+        int: Versión del esquema resultante
+    """
+    with data_manager.pool.connection() as connection:
+        version = get_schema_version(connection)
+
+    for target, description, migrate in MIGRATIONS:
+        if target <= version:
+            continue
+        with data_manager.transaction() as connection:
+            # Releer dentro de la transacción: otro puesto pudo migrar antes
+            version = get_schema_version(connection)
+            if target <= version:
+                continue
+            migrate(connection.cursor())
+            connection.execute(f"PRAGMA user_version = {int(target)}")
+            version = target
+        logger.info(f"Migración {target} aplicada: {description}")
+
+    return version
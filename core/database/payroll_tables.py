@@ -0,0 +1,139 @@
+"""
+Tablas de liquidaciones de sueldo para ISMAPP.
+
+- ``payroll_adjustments``: bonos y descuentos por trabajador y mes.
+- ``payroll_results``: liquidaciones ya calculadas (caché persistente,
+  compartido por todos los puestos).
+- ``payroll_input_versions``: un contador por trabajador y mes que los
+  triggers incrementan cada vez que cambia un dato del que depende su
+  liquidación (sus pesajes del mes, sus ajustes del mes). Los cambios de la
+  ficha del trabajador (sueldo, tipo de contrato) afectan a todos sus meses
+  y se cuentan en la fila del período ``ALL_PERIODS``.
+
+Una liquidación guardada sigue vigente mientras los dos contadores con que
+se calculó no hayan cambiado: así se recalcula solo el trabajador y el mes
+afectados, sin comparar los pesajes.
+"""
+
+ADJUSTMENTS_TABLE = "payroll_adjustments"
+RESULTS_TABLE = "payroll_results"
+VERSIONS_TABLE = "payroll_input_versions"
+
+# Período de los cambios que afectan a todos los meses de un trabajador
+ALL_PERIODS = "*"
+
+
+def _bump_statement(worker, period):
+    """Incrementa el contador de un trabajador y período."""
+    return f'''
+        INSERT INTO {VERSIONS_TABLE} (worker_id, period, version)
+        VALUES ({worker}, {period}, 1)
+        ON CONFLICT (worker_id, period) DO UPDATE SET version = version + 1;
+    '''
+
+
+def _weighing_bump(row):
+    return _bump_statement(f"{row}.worker_id", f"strftime('%Y-%m', {row}.weighed_at)")
+
+
+def create_payroll_tables(cursor):
+    """
+    Crea las tablas de liquidaciones y los triggers que invalidan el caché.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor dentro de la transacción de la migración
+    """
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS {ADJUSTMENTS_TABLE} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        worker_id INTEGER NOT NULL,
+        period TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (worker_id) REFERENCES workers (id) ON DELETE CASCADE
+    )
+    ''')
+    cursor.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_payroll_adjustments_period "
+        f"ON {ADJUSTMENTS_TABLE} (period, worker_id)"
+    )
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+        worker_id INTEGER NOT NULL,
+        period TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        PRIMARY KEY (worker_id, period)
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} (
+        worker_id INTEGER NOT NULL,
+        period TEXT NOT NULL,
+        input_version INTEGER NOT NULL,
+        worker_version INTEGER NOT NULL,
+        result TEXT NOT NULL,
+        computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (period, worker_id)
+    ) WITHOUT ROWID
+    ''')
+
+    # Pesajes de trabajadores (los de clientes no afectan a las liquidaciones)
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_weighings_payroll_insert
+    AFTER INSERT ON weighings WHEN NEW.worker_id IS NOT NULL
+    BEGIN
+        {_weighing_bump("NEW")}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_weighings_payroll_delete
+    AFTER DELETE ON weighings WHEN OLD.worker_id IS NOT NULL
+    BEGIN
+        {_weighing_bump("OLD")}
+    END
+    ''')
+    # Un cambio puede mover el pesaje de trabajador o de mes: se invalidan ambos
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_weighings_payroll_update_old
+    AFTER UPDATE OF weighed_at, worker_id, net_weight_kg ON weighings
+    WHEN OLD.worker_id IS NOT NULL
+    BEGIN
+        {_weighing_bump("OLD")}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_weighings_payroll_update_new
+    AFTER UPDATE OF weighed_at, worker_id, net_weight_kg ON weighings
+    WHEN NEW.worker_id IS NOT NULL
+    BEGIN
+        {_weighing_bump("NEW")}
+    END
+    ''')
+
+    for event, row in (("insert", "NEW"), ("delete", "OLD")):
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_payroll_adjustments_{event}
+        AFTER {event.upper()} ON {ADJUSTMENTS_TABLE}
+        BEGIN
+            {_bump_statement(f"{row}.worker_id", f"{row}.period")}
+        END
+        ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_payroll_adjustments_update
+    AFTER UPDATE ON {ADJUSTMENTS_TABLE}
+    BEGIN
+        {_bump_statement("OLD.worker_id", "OLD.period")}
+        {_bump_statement("NEW.worker_id", "NEW.period")}
+    END
+    ''')
+
+    # Ficha del trabajador: solo los datos que usa el cálculo
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_workers_payroll_update
+    AFTER UPDATE OF salary, contract_type, is_active, name, rut ON workers
+    BEGIN
+        {_bump_statement("NEW.id", f"'{ALL_PERIODS}'")}
+    END
+    ''')
@@ -0,0 +1,170 @@
+"""
+Perfiles de PRAGMA de SQLite para ISMAPP.
+
+Cada conexión del pool aplica una sola vez el perfil seleccionado al abrirse.
+"""
+import os
+import sys
+
+# Sistemas de archivos de red donde la memoria compartida de WAL no es fiable
+NETWORK_FILESYSTEMS = {
+    "cifs", "smb", "smb2", "smb3", "smbfs", "nfs", "nfs4",
+    "afs", "9p", "fuse.sshfs", "davfs", "fuse.davfs2",
+}
+
+
+class PragmaProfile:
+    """Conjunto de PRAGMA aplicados a cada conexión nueva."""
+
+    def __init__(self, name, journal_mode="wal", synchronous="normal",
+                 cache_size=-16000, mmap_size=64 * 1024 * 1024,
+                 temp_store="memory", busy_timeout=5000):
+        """
+        Inicializa el perfil.
+
+        Args:
+            name (str): Nombre del perfil
+            journal_mode (str): Modo de diario (wal, delete, truncate...)
+            synchronous (str): Nivel de sincronización (off, normal, full)
+            cache_size (int): Tamaño de caché; negativo = KiB, positivo = páginas
+            mmap_size (int): Bytes mapeados en memoria (0 lo desactiva)
+            temp_store (str): Almacenamiento temporal (default, file, memory)
+            busy_timeout (int): Milisegundos de espera ante un bloqueo
+        """
+        self.name = name
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.temp_store = temp_store
+        self.busy_timeout = busy_timeout
+
+    def apply(self, connection):
+        """
+        Aplica el perfil a una conexión.
+
+        Args:
+            connection (sqlite3.Connection): Conexión a configurar
+
+        Returns:
+            str: Modo de diario efectivo informado por SQLite
+        """
+        # busy_timeout primero para que el cambio de modo de diario espere bloqueos
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        row = connection.execute(f"PRAGMA journal_mode = {self.journal_mode}").fetchone()
+        connection.execute(f"PRAGMA synchronous = {self.synchronous}")
+        connection.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        connection.execute(f"PRAGMA temp_store = {self.temp_store}")
+        return str(row[0]).lower() if row else ""
+
+    def to_dict(self):
+        """
+        Convierte el perfil a diccionario.
+
+        Returns:
+            dict: Valores del perfil
+        """
+        return {
+            "name": self.name,
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "cache_size": self.cache_size,
+            "mmap_size": self.mmap_size,
+            "temp_store": self.temp_store,
+            "busy_timeout": self.busy_timeout,
+        }
+
+    def __str__(self):
+        return f"PragmaProfile({self.name}, journal_mode={self.journal_mode})"
+
+
+# Base de datos en disco local: lectores concurrentes con un escritor (WAL)
+LAN_PROFILE = PragmaProfile("lan")
+
+# Base de datos en carpeta compartida: diario clásico, sin mmap y con escritura
+# completa, ya que WAL requiere memoria compartida en el mismo equipo
+NETWORK_SHARE_PROFILE = PragmaProfile(
+    "network_share",
+    journal_mode="delete",
+    synchronous="full",
+    mmap_size=0,
+    busy_timeout=15000,
+)
+
+PROFILES = {
+    LAN_PROFILE.name: LAN_PROFILE,
+    NETWORK_SHARE_PROFILE.name: NETWORK_SHARE_PROFILE,
+}
+
+
+def is_network_path(path):
+    """
+    Determina si una ruta está en una unidad o carpeta compartida de red.
+
+    Args:
+        path (str): Ruta a verificar (no necesita existir)
+
+    Returns:
+        bool: True si la ruta parece estar en un sistema de archivos de red
+    """
+    path = os.path.abspath(path)
+
+    if sys.platform == "win32":
+        # Rutas UNC (\\servidor\recurso)
+        if path.startswith("\\\\"):
+            return True
+        try:
+            import ctypes
+            drive = os.path.splitdrive(path)[0] + "\\"
+            DRIVE_REMOTE = 4
+            return ctypes.windll.kernel32.GetDriveTypeW(drive) == DRIVE_REMOTE
+        except Exception:
+            return False
+
+    fstype = _mount_fstype(path)
+    return fstype in NETWORK_FILESYSTEMS
+
+
+def _mount_fstype(path):
+    """Obtiene el tipo de sistema de archivos del punto de montaje más específico."""
+    try:
+        with open("/proc/mounts", encoding="utf-8") as mounts:
+            entries = [line.split() for line in mounts]
+    except OSError:
+        return None
+
+    best_mount, best_type = "", None
+    for entry in entries:
+        if len(entry) < 3:
+            continue
+        # Los espacios en puntos de montaje se escapan como \040
+        mount_point = entry[1].replace("\\040", " ")
+        inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) > len(best_mount):
+            best_mount, best_type = mount_point, entry[2]
+    return best_type
+
+
+def select_profile(db_path, override=None):
+    """
+    Selecciona el perfil adecuado para la ubicación de la base de datos.
+
+    Args:
+        db_path (str): Ruta del archivo de base de datos
+        override (str, optional): Nombre de perfil forzado (p. ej. desde
+            la variable de entorno ISMAPP_DB_PROFILE)
+
+    Returns:
+        PragmaProfile: Perfil a aplicar
+    """
+    override = override or os.environ.get("ISMAPP_DB_PROFILE")
+    if override:
+        profile = PROFILES.get(override.strip().lower())
+        if profile is not None:
+            return profile
+        print(f"Perfil de base de datos desconocido: {override}")
+
+    if is_network_path(db_path):
+        return NETWORK_SHARE_PROFILE
+    return LAN_PROFILE
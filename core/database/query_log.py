@@ -0,0 +1,150 @@
+"""
+Registro de consultas SQL de ISMAPP.
+
+Sustituye la impresión por consola de cada consulta por un registro filtrado
+por nivel (logging), un búfer circular consultable bajo demanda y un umbral
+opcional de consultas lentas. Desactivado, su costo se reduce a una
+comprobación por consulta.
+"""
+import logging
+import sys
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class QueryLog:
+    """Registro estructurado de las consultas ejecutadas por el DataManager."""
+
+    def __init__(self, capacity=200, slow_query_threshold=None, recording=False):
+        """
+        Inicializa el registro.
+
+        Args:
+            capacity (int): Número de consultas conservadas en el búfer circular
+            slow_query_threshold (float, optional): Milisegundos a partir de los
+                cuales una consulta se registra como lenta (None lo desactiva)
+            recording (bool): Si se guardan las consultas en el búfer circular
+        """
+        self._buffer = deque(maxlen=max(1, int(capacity)))
+        self._buffer_lock = threading.Lock()
+        self.slow_query_threshold = slow_query_threshold
+        self.recording = recording
+        self.slow_queries = 0
+
+    def configure(self, recording=None, capacity=None, slow_query_threshold=False):
+        """
+        Ajusta la configuración del registro.
+
+        Args:
+            recording (bool, optional): Activa o desactiva el búfer circular
+            capacity (int, optional): Nuevo tamaño del búfer circular
+            slow_query_threshold (float, optional): Nuevo umbral en milisegundos;
+                None lo desactiva y False (por defecto) lo deja sin cambios
+        """
+        if recording is not None:
+            self.recording = recording
+        if capacity is not None:
+            with self._buffer_lock:
+                self._buffer = deque(self._buffer, maxlen=max(1, int(capacity)))
+        if slow_query_threshold is not False:
+            self.slow_query_threshold = slow_query_threshold
+
+    def is_active(self):
+        """
+        Indica si hay que medir y registrar las consultas.
+
+        Returns:
+            bool: True si algún destino del registro está habilitado
+        """
+        return (self.recording
+                or self.slow_query_threshold is not None
+                or logger.isEnabledFor(logging.DEBUG))
+
+    def record(self, query, params, elapsed, result=None, error=None, rows=None):
+        """
+        Registra una consulta ejecutada.
+
+        Args:
+            query (str): Consulta SQL
+            params (tuple): Parámetros de la consulta
+            elapsed (float): Duración en segundos
+            result: Resultado devuelto (lista de filas, ID o indicador)
+            error (Exception, optional): Error producido, si lo hubo
+            rows (int, optional): Filas afectadas o leídas, si no se deducen de result
+        """
+        elapsed_ms = elapsed * 1000
+        if rows is None and isinstance(result, list):
+            rows = len(result)
+
+        if self.recording:
+            entry = (time.time(), query, params, elapsed_ms, rows,
+                     None if error is None else str(error))
+            with self._buffer_lock:
+                self._buffer.append(entry)
+
+        threshold = self.slow_query_threshold
+        if threshold is not None and elapsed_ms >= threshold:
+            self.slow_queries += 1
+            logger.warning("Consulta lenta (%.1f ms): %s | parámetros: %r",
+                           elapsed_ms, _compact(query), params)
+        elif error is not None:
+            logger.debug("Consulta fallida (%.2f ms): %s | parámetros: %r | error: %s",
+                         elapsed_ms, _compact(query), params, error)
+        else:
+            logger.debug("Consulta (%.2f ms, filas: %s): %s | parámetros: %r",
+                         elapsed_ms, rows, _compact(query), params)
+
+    def entries(self):
+        """
+        Obtiene las consultas del búfer circular, de la más antigua a la más reciente.
+
+        Returns:
+            list: Lista de diccionarios con timestamp, query, params,
+            elapsed_ms, rows y error
+        """
+        with self._buffer_lock:
+            snapshot = list(self._buffer)
+        return [
+            {
+                "timestamp": timestamp,
+                "query": _compact(query),
+                "params": params,
+                "elapsed_ms": elapsed_ms,
+                "rows": rows,
+                "error": error,
+            }
+            for timestamp, query, params, elapsed_ms, rows, error in snapshot
+        ]
+
+    def dump(self, stream=None):
+        """
+        Escribe el contenido del búfer circular en un flujo de texto.
+
+        Args:
+            stream (file, optional): Destino (por defecto, la salida estándar)
+
+        Returns:
+            int: Número de consultas escritas
+        """
+        stream = stream or sys.stdout
+        entries = self.entries()
+        for entry in entries:
+            moment = time.strftime("%H:%M:%S", time.localtime(entry["timestamp"]))
+            status = f"ERROR: {entry['error']}" if entry["error"] else f"filas: {entry['rows']}"
+            stream.write(f"[{moment}] {entry['elapsed_ms']:8.2f} ms | {status} | "
+                         f"{entry['query']} | {entry['params']!r}\n")
+        return len(entries)
+
+    def clear(self):
+        """Vacía el búfer circular."""
+        with self._buffer_lock:
+            self._buffer.clear()
+        self.slow_queries = 0
+
+
+def _compact(query):
+    """Reduce los espacios de una consulta a una sola línea."""
+    return " ".join(query.split())
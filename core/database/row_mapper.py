@@ -0,0 +1,146 @@
+"""
+Mapeo directo de filas del cursor a objetos del modelo para ISMAPP.
+
+Evita el paso intermedio por diccionarios: para cada forma de consulta (tupla
+de nombres de columna) se calcula una sola vez qué índice de la fila alimenta
+cada campo del modelo, y luego cada fila se convierte con ese plan.
+
+Los modelos que se cargan por miles (clientes, materiales, pesajes...)
+declaran ``__slots__``: sin un ``__dict__`` por instancia ocupan menos
+memoria y se crean más rápido.
+"""
+import inspect
+from operator import itemgetter
+
+
+def as_bool(value):
+    """Convierte 0/1 (o None) de SQLite a bool."""
+    return bool(value)
+
+
+def as_float(value):
+    """Convierte un valor numérico de SQLite a float (None se trata como 0.0)."""
+    return float(value) if value is not None else 0.0
+
+
+class RowMapper:
+    """Convierte tuplas del cursor en instancias de un modelo."""
+
+    def __init__(self, model, fields=None, converters=None):
+        """
+        Inicializa el mapeador.
+
+        Args:
+            model (type): Clase del modelo a construir
+            fields (list, optional): Atributos a asignar tras crear el objeto sin
+                argumentos. Si se omite, se usan los parámetros de ``__init__``
+                del modelo y el objeto se construye con argumentos posicionales.
+            converters (dict, optional): Funciones de conversión por campo
+        """
+        self.model = model
+        self.converters = converters or {}
+        self._plans = {}
+
+        if fields is None:
+            parameters = [
+                p for p in list(inspect.signature(model.__init__).parameters.values())[1:]
+                if p.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD
+            ]
+            self.fields = tuple(p.name for p in parameters)
+            self.defaults = tuple(
+                None if p.default is inspect.Parameter.empty else p.default
+                for p in parameters
+            )
+            self.positional = True
+        else:
+            self.fields = tuple(fields)
+            self.defaults = (None,) * len(self.fields)
+            self.positional = False
+
+    def bind(self, columns, start=0, stop=None):
+        """
+        Obtiene la función que convierte una fila con estas columnas.
+
+        Args:
+            columns (tuple): Nombres de columna del resultado (cursor.description)
+            start (int, optional): Primera columna a considerar
+            stop (int, optional): Columna final (exclusiva); útil en consultas
+                con JOIN que repiten nombres como ``id``
+
+        Returns:
+            callable: Función fila -> instancia del modelo
+        """
+        key = (columns, start, stop)
+        build = self._plans.get(key)
+        if build is None:
+            build = self._plans[key] = self._compile(columns, start, stop)
+        return build
+
+    def map_rows(self, columns, rows, start=0, stop=None):
+        """
+        Convierte una lista de filas.
+
+        Args:
+            columns (tuple): Nombres de columna del resultado
+            rows (list): Filas (tuplas) devueltas por el cursor
+            start (int, optional): Primera columna a considerar
+            stop (int, optional): Columna final (exclusiva)
+
+        Returns:
+            list: Instancias del modelo
+        """
+        return list(map(self.bind(columns, start, stop), rows))
+
+    def _compile(self, columns, start, stop):
+        """Calcula el plan de conversión para una forma de consulta."""
+        stop = len(columns) if stop is None else stop
+        index_of = {}
+        for index in range(start, stop):
+            # Ante nombres repetidos dentro del rango, gana la primera columna
+            index_of.setdefault(columns[index], index)
+
+        model = self.model
+        steps = tuple(
+            (field, index_of.get(field), default, self.converters.get(field))
+            for field, default in zip(self.fields, self.defaults)
+        )
+
+        if not self.positional:
+            present = tuple((field, index, convert)
+                            for field, index, _, convert in steps if index is not None)
+
+            def build(row):
+                instance = model()
+                for field, index, convert in present:
+                    value = row[index]
+                    setattr(instance, field, convert(value) if convert else value)
+                return instance
+
+            return build
+
+        if all(index is not None for _, index, _, _ in steps) and len(steps) > 1:
+            # Caso habitual (SELECT *): extracción en bloque con itemgetter
+            getter = itemgetter(*(index for _, index, _, _ in steps))
+            conversions = tuple((position, convert)
+                                for position, (_, _, _, convert) in enumerate(steps) if convert)
+            if not conversions:
+                return lambda row: model(*getter(row))
+
+            def build(row):
+                values = list(getter(row))
+                for position, convert in conversions:
+                    values[position] = convert(values[position])
+                return model(*values)
+
+            return build
+
+        # Columnas faltantes: se usa el valor por defecto del constructor
+        plan = tuple((index, default, convert) for _, index, default, convert in steps)
+
+        def build(row):
+            return model(*[
+                default if index is None else (convert(row[index]) if convert else row[index])
+                for index, default, convert in plan
+            ])
+
+        return build
@@ -0,0 +1,165 @@
+"""
+Caché de sentencias preparadas de ISMAPP.
+
+El módulo sqlite3 mantiene en cada conexión un caché LRU de sentencias
+compiladas indexado por el texto SQL (parámetro ``cached_statements``). Con
+las conexiones persistentes del pool ese caché sobrevive entre consultas; esta
+clase fija su tamaño y lleva una réplica de sus claves para contar aciertos y
+fallos, ya que sqlite3 no expone esas cifras.
+"""
+import threading
+from collections import OrderedDict
+
+# Tamaño por defecto del caché de sentencias por conexión
+DEFAULT_CAPACITY = 128
+
+
+class _ConnectionEntries:
+    """Réplica del caché de una conexión y sus contadores."""
+
+    __slots__ = ("queries", "hits", "misses", "evictions")
+
+    def __init__(self):
+        self.queries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class StatementCache:
+    """
+    Contabilidad del caché de sentencias de cada conexión del pool.
+
+    ``touch`` está en el camino de cada consulta y no toma ningún candado:
+    cada conexión la usa un solo hilo a la vez (lo garantiza el pool), así
+    que su réplica y sus contadores solo los modifica ese hilo. El candado
+    solo protege el alta y baja de conexiones y los totales de las ya
+    cerradas; ``stats`` suma los contadores de todas.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Inicializa el caché.
+
+        Args:
+            capacity (int): Sentencias compiladas que conserva cada conexión
+        """
+        self.capacity = max(0, int(capacity))
+        self._entries = {}  # id de la conexión -> _ConnectionEntries
+        self._lock = threading.Lock()
+        # Contadores de las conexiones ya cerradas
+        self._closed_hits = 0
+        self._closed_misses = 0
+        self._closed_evictions = 0
+
+    def configure(self, capacity):
+        """
+        Cambia la capacidad (se aplica a las conexiones que se abran después).
+
+        Args:
+            capacity (int): Nueva capacidad por conexión
+        """
+        with self._lock:
+            self.capacity = max(0, int(capacity))
+            for entries in self._entries.values():
+                entries.queries = OrderedDict()
+
+    def touch(self, connection, query):
+        """
+        Registra el uso de una sentencia en una conexión.
+
+        Debe llamarse desde el hilo que está usando la conexión.
+
+        Args:
+            connection (sqlite3.Connection): Conexión que ejecuta la sentencia
+            query (str): Texto SQL, tal como se pasa a sqlite3
+
+        Returns:
+            bool: True si la sentencia ya estaba compilada en la conexión
+        """
+        entries = self._entries.get(id(connection))
+        if entries is None:
+            with self._lock:
+                entries = self._entries.setdefault(id(connection), _ConnectionEntries())
+
+        capacity = self.capacity
+        queries = entries.queries
+        if not capacity:
+            entries.misses += 1
+            return False
+
+        if query in queries:
+            queries.move_to_end(query)
+            entries.hits += 1
+            return True
+
+        entries.misses += 1
+        queries[query] = None
+        if len(queries) > capacity:
+            queries.popitem(last=False)
+            entries.evictions += 1
+        return False
+
+    def forget(self, connection):
+        """
+        Descarta la réplica de una conexión que se cierra.
+
+        Args:
+            connection (sqlite3.Connection): Conexión cerrada
+        """
+        with self._lock:
+            entries = self._entries.pop(id(connection), None)
+            if entries is not None:
+                self._closed_hits += entries.hits
+                self._closed_misses += entries.misses
+                self._closed_evictions += entries.evictions
+
+    @property
+    def hits(self):
+        """Aciertos de todas las conexiones."""
+        return self.stats()["hits"]
+
+    @property
+    def misses(self):
+        """Fallos de todas las conexiones."""
+        return self.stats()["misses"]
+
+    @property
+    def evictions(self):
+        """Desalojos de todas las conexiones."""
+        return self.stats()["evictions"]
+
+    def stats(self):
+        """
+        Obtiene las estadísticas del caché.
+
+        Returns:
+            dict: Capacidad, sentencias en caché, aciertos, fallos,
+            desalojos y tasa de aciertos
+        """
+        with self._lock:
+            connections = list(self._entries.values())
+            hits = self._closed_hits + sum(entries.hits for entries in connections)
+            misses = self._closed_misses + sum(entries.misses for entries in connections)
+            evictions = self._closed_evictions + sum(entries.evictions for entries in connections)
+        lookups = hits + misses
+        return {
+            "capacity": self.capacity,
+            "connections": len(connections),
+            "cached": sum(len(entries.queries) for entries in connections),
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self):
+        """Pone a cero los contadores de aciertos, fallos y desalojos."""
+        with self._lock:
+            self._closed_hits = 0
+            self._closed_misses = 0
+            self._closed_evictions = 0
+            for entries in self._entries.values():
+                entries.hits = 0
+                entries.misses = 0
+                entries.evictions = 0
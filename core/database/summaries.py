@@ -0,0 +1,110 @@
+"""
+Tablas de resumen de pesajes para ISMAPP.
+
+El dashboard no recorre la tabla de pesajes: lee ``weighing_monthly_summary``,
+que guarda por mes y material la cantidad de pesajes, los kilos y el monto
+estimado. Los triggers de ``weighings`` actualizan el resumen en la misma
+transacción que cada inserción, cambio o borrado, así que leerlo cuesta lo
+mismo con un mes de historia que con diez años.
+
+``rebuild_weighing_summaries`` recalcula el resumen desde los pesajes; se usa
+al crear las tablas y para reparar el resumen si se modificaron pesajes con
+los triggers desactivados (p. ej. una restauración parcial).
+"""
+
+SUMMARY_TABLE = "weighing_monthly_summary"
+
+# Mes de un pesaje (clave del resumen)
+_MONTH = "strftime('%Y-%m', {row}.weighed_at)"
+
+
+def _add_statement(row):
+    """Suma un pesaje (NEW u OLD) a su fila del resumen."""
+    month = _MONTH.format(row=row)
+    return f'''
+        INSERT INTO {SUMMARY_TABLE} (month, material_id, weighing_count, total_kg, total_amount)
+        VALUES ({month}, {row}.material_id, 1, {row}.net_weight_kg, COALESCE({row}.amount, 0))
+        ON CONFLICT (month, material_id) DO UPDATE SET
+            weighing_count = weighing_count + 1,
+            total_kg = total_kg + excluded.total_kg,
+            total_amount = total_amount + excluded.total_amount;
+    '''
+
+
+def _subtract_statement(row):
+    """Resta un pesaje (OLD) de su fila del resumen."""
+    month = _MONTH.format(row=row)
+    return f'''
+        UPDATE {SUMMARY_TABLE} SET
+            weighing_count = weighing_count - 1,
+            total_kg = total_kg - {row}.net_weight_kg,
+            total_amount = total_amount - COALESCE({row}.amount, 0)
+        WHERE month = {month} AND material_id = {row}.material_id;
+    '''
+
+
+def create_weighing_summaries(cursor):
+    """
+    Crea la tabla de resumen mensual y los triggers que la mantienen.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor dentro de la transacción de la migración
+    """
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+        month TEXT NOT NULL,
+        material_id INTEGER NOT NULL,
+        weighing_count INTEGER NOT NULL DEFAULT 0,
+        total_kg REAL NOT NULL DEFAULT 0.0,
+        total_amount REAL NOT NULL DEFAULT 0.0,
+        PRIMARY KEY (month, material_id)
+    ) WITHOUT ROWID
+    ''')
+
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_weighings_summary_insert
+    AFTER INSERT ON weighings
+    BEGIN
+        {_add_statement("NEW")}
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_weighings_summary_delete
+    AFTER DELETE ON weighings
+    BEGIN
+        {_subtract_statement("OLD")}
+    END
+    ''')
+    # Solo las columnas que afectan al resumen
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_weighings_summary_update
+    AFTER UPDATE OF weighed_at, material_id, net_weight_kg, amount ON weighings
+    BEGIN
+        {_subtract_statement("OLD")}
+        {_add_statement("NEW")}
+    END
+    ''')
+
+    rebuild_weighing_summaries(cursor)
+
+
+def rebuild_weighing_summaries(cursor):
+    """
+    Recalcula el resumen completo a partir de los pesajes.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor (la llamada debe ir en una transacción)
+
+    Returns:
+        int: Filas del resumen resultante
+    """
+    cursor.execute(f"DELETE FROM {SUMMARY_TABLE}")
+    cursor.execute(f'''
+    INSERT INTO {SUMMARY_TABLE} (month, material_id, weighing_count, total_kg, total_amount)
+    SELECT strftime('%Y-%m', weighed_at), material_id,
+           COUNT(*), SUM(net_weight_kg), SUM(COALESCE(amount, 0))
+    FROM weighings
+    GROUP BY 1, 2
+    ''')
+    cursor.execute(f"SELECT COUNT(*) FROM {SUMMARY_TABLE}")
+    return cursor.fetchone()[0]
@@ -0,0 +1 @@
+# Archivo de inicializacin de paquete
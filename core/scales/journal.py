@@ -0,0 +1,237 @@
+"""
+Bitácora local de lecturas de balanza para ISMAPP.
+
+La base de datos vive en una carpeta compartida y a veces no está disponible
+por unos segundos (la red, un bloqueo largo de otro puesto). Para no perder
+lecturas, cada una se escribe primero en una bitácora local de solo
+anexado, con su número de secuencia, y recién después se envía a la base de
+datos. El archivo ``checkpoint`` guarda hasta qué número está confirmado en
+la base de datos; al reiniciar se reenvía lo posterior.
+
+Formato:
+
+- Segmentos ``journal-<primer número>.log`` con una lectura JSON por línea.
+  Se rota a un segmento nuevo cada ``SEGMENT_RECORDS`` lecturas y se
+  eliminan los segmentos ya confirmados por completo.
+- Una línea final incompleta (corte de luz durante la escritura) se
+  descarta al abrir: esa lectura no alcanzó a quedar registrada.
+- ``checkpoint`` se reemplaza de forma atómica (archivo temporal + rename).
+"""
+import json
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Lecturas por segmento antes de rotar
+SEGMENT_RECORDS = 10000
+
+CHECKPOINT_FILE = "checkpoint"
+
+_SEGMENT_PATTERN = re.compile(r"^journal-(\d{12})\.log$")
+
+
+class ReadingJournal:
+    """Bitácora de solo anexado con las lecturas aún no confirmadas."""
+
+    def __init__(self, journal_dir, sync=True, segment_records=SEGMENT_RECORDS):
+        """
+        Abre (o crea) la bitácora de un directorio.
+
+        Args:
+            journal_dir (str): Directorio de la bitácora (uno por balanza)
+            sync (bool, optional): Sincronizar el disco en cada lectura (fsync)
+            segment_records (int, optional): Lecturas por segmento
+        """
+        self.journal_dir = journal_dir
+        self.sync = sync
+        self.segment_records = segment_records
+        self._lock = threading.Lock()
+        self._file = None
+        self._segment_count = 0
+
+        os.makedirs(journal_dir, exist_ok=True)
+        self.committed_seq = self._read_checkpoint()
+        self.last_seq = self.committed_seq
+        self._recover()
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def append(self, record):
+        """
+        Registra una lectura y le asigna el siguiente número de secuencia.
+
+        Args:
+            record (dict): Datos de la lectura (serializables en JSON)
+
+        Returns:
+            int: Número de secuencia asignado
+        """
+        with self._lock:
+            seq = self.last_seq + 1
+            if self._file is None or self._segment_count >= self.segment_records:
+                self._open_segment(seq)
+            line = json.dumps(dict(record, seq=seq), separators=(",", ":")) + "\n"
+            self._file.write(line.encode("utf-8"))
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+            self._segment_count += 1
+            self.last_seq = seq
+            return seq
+
+    def advance_to(self, seq):
+        """
+        Adelanta la secuencia (p. ej. si la base de datos ya tiene lecturas
+        posteriores a la bitácora, porque esta se borró).
+
+        Args:
+            seq (int): Último número ya usado
+        """
+        with self._lock:
+            if seq > self.last_seq:
+                self.last_seq = seq
+                self._close_segment()
+            if seq > self.committed_seq:
+                self._write_checkpoint(seq)
+
+    def mark_committed(self, seq):
+        """
+        Registra que las lecturas hasta ``seq`` están confirmadas en la base de datos.
+
+        Args:
+            seq (int): Último número confirmado
+        """
+        with self._lock:
+            if seq <= self.committed_seq:
+                return
+            self._write_checkpoint(seq)
+            self._remove_committed_segments()
+
+    def close(self):
+        """Cierra el segmento actual."""
+        with self._lock:
+            self._close_segment()
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    @property
+    def pending_count(self):
+        """Lecturas registradas en la bitácora y aún no confirmadas."""
+        return self.last_seq - self.committed_seq
+
+    def pending(self, after_seq=None):
+        """
+        Obtiene las lecturas aún no confirmadas, en orden.
+
+        Args:
+            after_seq (int, optional): Omitir las lecturas hasta este número
+                (por defecto, el checkpoint)
+
+        Returns:
+            list: Lecturas (dict con su 'seq')
+        """
+        after_seq = self.committed_seq if after_seq is None else max(after_seq, self.committed_seq)
+        records = []
+        for first_seq, path in self._segments():
+            for record in self._read_segment(path):
+                if record["seq"] > after_seq:
+                    records.append(record)
+        return records
+
+    # ------------------------------------------------------------------
+    # Implementación interna
+    # ------------------------------------------------------------------
+
+    def _segments(self):
+        """Segmentos existentes, ordenados: [(primer número, ruta)]."""
+        segments = []
+        for name in os.listdir(self.journal_dir):
+            match = _SEGMENT_PATTERN.match(name)
+            if match:
+                segments.append((int(match.group(1)), os.path.join(self.journal_dir, name)))
+        segments.sort()
+        return segments
+
+    def _read_segment(self, path):
+        """Lecturas completas de un segmento (omite líneas dañadas)."""
+        records = []
+        with open(path, "rb") as f:
+            for number, line in enumerate(f, 1):
+                if not line.endswith(b"\n"):
+                    break  # línea final incompleta
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Bitácora {path}: línea {number} dañada, se omite")
+        return records
+
+    def _recover(self):
+        """Descarta una línea final incompleta y obtiene el último número usado."""
+        segments = self._segments()
+        if not segments:
+            return
+        path = segments[-1][1]
+        with open(path, "rb") as f:
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            logger.warning(f"Bitácora {path}: se descarta una lectura incompleta")
+            with open(path, "r+b") as f:
+                f.truncate(complete)
+                f.flush()
+                os.fsync(f.fileno())
+        for first_seq, segment_path in reversed(segments):
+            records = self._read_segment(segment_path)
+            if records:
+                self.last_seq = max(self.last_seq, records[-1]["seq"])
+                break
+
+    def _open_segment(self, first_seq):
+        self._close_segment()
+        path = os.path.join(self.journal_dir, f"journal-{first_seq:012d}.log")
+        self._file = open(path, "ab")
+        self._segment_count = 0
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_checkpoint(self):
+        try:
+            with open(os.path.join(self.journal_dir, CHECKPOINT_FILE), "r", encoding="ascii") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            logger.warning(f"Bitácora {self.journal_dir}: checkpoint ilegible, se reenvía todo")
+            return 0
+
+    def _write_checkpoint(self, seq):
+        path = os.path.join(self.journal_dir, CHECKPOINT_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="ascii") as f:
+            f.write(str(seq))
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        self.committed_seq = seq
+
+    def _remove_committed_segments(self):
+        """Elimina los segmentos cuyas lecturas están todas confirmadas."""
+        segments = self._segments()
+        current = self._file.name if self._file is not None else None
+        for (first_seq, path), (next_first, _) in zip(segments, segments[1:]):
+            if next_first - 1 <= self.committed_seq and path != current:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"No se pudo eliminar el segmento {path}: {e}")
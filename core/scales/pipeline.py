@@ -0,0 +1,300 @@
+"""
+Ingreso continuo de pesajes desde una balanza.
+
+Recorrido de una lectura::
+
+    balanza (serie/TCP) -> trama -> LoadDetector -> bitácora local (fsync)
+        -> BatchWriter -> weighings (lotes) -> checkpoint de la bitácora
+
+Cada carga recibe un número de secuencia de la bitácora y se inserta con
+``source`` = nombre de la balanza y ``source_seq`` = ese número. La
+bitácora garantiza que ninguna lectura se pierda (se reenvía todo lo que no
+alcanzó a confirmarse), y el índice único (source, source_seq) garantiza
+que un reenvío no la duplique: cada lectura queda registrada exactamente
+una vez.
+
+El lector nunca espera a la base de datos: si está bloqueada o no
+disponible, las lecturas se acumulan en la bitácora y en la cola del
+escritor, que reintenta hasta lograrlo.
+
+Una balanza no sabe qué material ni de quién es la carga: el puesto lo
+indica con ``set_context`` antes de iniciar y cada vez que cambia. El
+contexto vigente se guarda junto con cada lectura en la bitácora.
+"""
+import collections
+import logging
+import threading
+import time
+from datetime import datetime
+
+from core.database.batch_writer import BatchWriter
+from core.scales.journal import ReadingJournal
+from core.scales.protocol import DEFAULT_MIN_WEIGHT_KG, LoadDetector, parse_frame
+from models.weighing import Weighing
+
+logger = logging.getLogger(__name__)
+
+# Espera entre intentos de reconexión con la balanza (segundos, se duplica)
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 10.0
+
+# Latencias (lectura -> confirmación) que se conservan para las métricas
+LATENCY_SAMPLES = 2000
+
+
+class ScaleIngestion:
+    """Lector de una balanza que registra cada carga como un pesaje."""
+
+    def __init__(self, weighing_service, source_name, source, journal_dir,
+                 min_weight_kg=DEFAULT_MIN_WEIGHT_KG, batch_size=None,
+                 flush_interval=None, sync=True):
+        """
+        Inicializa el lector (no se conecta hasta ``start``).
+
+        Args:
+            weighing_service (WeighingService): Servicio de pesajes
+            source_name (str): Nombre único de la balanza (se guarda en ``source``)
+            source: Fuente de tramas (TcpScaleSource, SerialScaleSource)
+            journal_dir (str): Directorio de la bitácora local de esta balanza
+            min_weight_kg (float, optional): Peso mínimo de una carga
+            batch_size (int, optional): Pesajes por transacción
+            flush_interval (float, optional): Segundos máximos antes de confirmar
+            sync (bool, optional): Sincronizar la bitácora en cada lectura
+        """
+        self.weighing_service = weighing_service
+        self.source_name = source_name
+        self.source = source
+        self.detector = LoadDetector(min_weight_kg)
+        self.journal = ReadingJournal(journal_dir, sync=sync)
+
+        options = {}
+        if batch_size is not None:
+            options["batch_size"] = batch_size
+        if flush_interval is not None:
+            options["flush_interval"] = flush_interval
+        self.writer = BatchWriter(
+            weighing_service.db_manager, weighing_service.write_weighings,
+            name=f"scale-writer-{source_name}", on_written=self._on_written,
+            on_rejected=self._on_rejected, **options
+        )
+
+        self._context = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._captured_at = {}
+        self._latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self._counters = collections.Counter()
+        self._connected = False
+
+    def set_context(self, material_id, client_id=None, worker_id=None, plastic_state=""):
+        """
+        Indica a qué material y cliente (o trabajador) corresponden las próximas cargas.
+
+        Args:
+            material_id (int): ID del material
+            client_id (int, optional): ID del cliente
+            worker_id (int, optional): ID del trabajador
+            plastic_state (str, optional): Condición del material (de PlasticState)
+
+        Raises:
+            ValueError: Si el contexto no es válido
+        """
+        probe = Weighing(material_id=material_id, client_id=client_id, worker_id=worker_id,
+                         net_weight_kg=1.0, plastic_state=plastic_state)
+        self.weighing_service.validate_weighing(probe)
+        with self._lock:
+            self._context = {
+                "material_id": material_id,
+                "client_id": client_id,
+                "worker_id": worker_id,
+                "plastic_state": plastic_state or "",
+            }
+
+    def start(self):
+        """
+        Reenvía lo pendiente de la bitácora y empieza a leer la balanza.
+
+        Raises:
+            ValueError: Si no se indicó el contexto (set_context)
+        """
+        if self._context is None:
+            raise ValueError("Debe indicar el material antes de leer la balanza")
+        self._replay()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._read_loop, name=f"scale-reader-{self.source_name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Deja de leer y confirma lo pendiente (lo que no alcance queda en la bitácora).
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera del escritor
+
+        Returns:
+            bool: True si se confirmaron todas las lecturas
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.source.close()
+        written = self.writer.close(timeout)
+        self.journal.close()
+        return written
+
+    def flush(self, timeout=None):
+        """
+        Espera a que se confirmen las lecturas recibidas hasta el momento.
+
+        Returns:
+            bool: True si se confirmaron todas
+        """
+        return self.writer.flush(timeout)
+
+    def metrics(self):
+        """
+        Obtiene las métricas del lector.
+
+        Returns:
+            dict: queue_depth (lecturas en la bitácora sin confirmar),
+                writer_pending, readings, replayed, rejected, frames,
+                frames_invalid, reconnects, connected, db_failures,
+                last_batch_ms, max_batch_ms y flush_latency_ms (p50, p95 y
+                max desde la lectura hasta su confirmación)
+        """
+        writer = self.writer.stats()
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+            connected = self._connected
+        return {
+            "queue_depth": self.journal.pending_count,
+            "writer_pending": writer["pending"],
+            "readings": counters.get("readings", 0),
+            "replayed": counters.get("replayed", 0),
+            "rejected": counters.get("rejected", 0),
+            "frames": counters.get("frames", 0),
+            "frames_invalid": counters.get("frames_invalid", 0),
+            "reconnects": counters.get("reconnects", 0),
+            "connected": connected,
+            "db_failures": writer["failures"],
+            "last_batch_ms": round(writer["last_batch_ms"], 1),
+            "max_batch_ms": round(writer["max_batch_ms"], 1),
+            "flush_latency_ms": {
+                "p50": _percentile(latencies, 0.50),
+                "p95": _percentile(latencies, 0.95),
+                "max": round(latencies[-1], 1) if latencies else 0.0,
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Implementación interna
+    # ------------------------------------------------------------------
+
+    def _replay(self):
+        """Reenvía las lecturas de la bitácora que no llegaron a confirmarse."""
+        last_in_db = self.weighing_service.get_last_source_seq(self.source_name)
+        if last_in_db is None:
+            # Sin base de datos: reenviar desde el checkpoint (el índice único evita duplicados)
+            logger.warning(f"{self.source_name}: base de datos no disponible, se reenvía desde el checkpoint")
+        elif last_in_db > self.journal.last_seq:
+            # La bitácora se perdió o es nueva: no reutilizar números ya registrados
+            self.journal.advance_to(last_in_db)
+        else:
+            # Los lotes se confirman en orden: todo lo anterior ya está registrado
+            self.journal.mark_committed(last_in_db)
+        records = self.journal.pending()
+        for record in records:
+            self._enqueue(record)
+        with self._lock:
+            self._counters["replayed"] += len(records)
+        if records:
+            logger.info(f"{self.source_name}: {len(records)} lecturas reenviadas desde la bitácora")
+
+    def _read_loop(self):
+        delay = RECONNECT_DELAY
+        while not self._stop.is_set():
+            try:
+                self.source.open()
+                with self._lock:
+                    self._connected = True
+                delay = RECONNECT_DELAY
+                while not self._stop.is_set():
+                    line = self.source.read_line()
+                    if line is not None:
+                        self._handle_line(line)
+            except OSError as e:
+                logger.warning(f"{self.source_name}: sin conexión con la balanza ({e})")
+            finally:
+                self.source.close()
+                with self._lock:
+                    if self._connected:
+                        self._counters["reconnects"] += 1
+                    self._connected = False
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _handle_line(self, line):
+        frame = parse_frame(line)
+        with self._lock:
+            self._counters["frames"] += 1
+            if frame is None:
+                self._counters["frames_invalid"] += 1
+                return
+        weight = self.detector.feed(frame)
+        if weight is None:
+            return
+        with self._lock:
+            record = dict(self._context)
+        record["weighed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        record["net_weight_kg"] = weight
+        record["seq"] = self.journal.append(record)
+        with self._lock:
+            self._counters["readings"] += 1
+        self._enqueue(record)
+
+    def _enqueue(self, record):
+        weighing = Weighing(
+            weighed_at=record["weighed_at"],
+            material_id=record["material_id"],
+            client_id=record.get("client_id"),
+            worker_id=record.get("worker_id"),
+            net_weight_kg=record["net_weight_kg"],
+            plastic_state=record.get("plastic_state", ""),
+            source=self.source_name,
+            source_seq=record["seq"],
+        )
+        with self._lock:
+            self._captured_at[record["seq"]] = time.monotonic()
+        self.writer.put(weighing)
+
+    def _on_rejected(self, weighings):
+        with self._lock:
+            self._counters["rejected"] += len(weighings)
+        for weighing in weighings:
+            logger.error(f"{self.source_name}: lectura {weighing.source_seq} rechazada por la base de datos")
+        self._on_written(weighings)
+
+    def _on_written(self, weighings):
+        """Adelanta el checkpoint: los lotes se confirman en orden de llegada."""
+        if not weighings:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for weighing in weighings:
+                captured = self._captured_at.pop(weighing.source_seq, None)
+                if captured is not None:
+                    self._latencies.append((now - captured) * 1000)
+        self.journal.mark_committed(max(w.source_seq for w in weighings))
+
+
+def _percentile(sorted_values, fraction):
+    """Percentil de una lista ya ordenada (redondeado a décimas)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return round(sorted_values[index], 1)
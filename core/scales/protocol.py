@@ -0,0 +1,120 @@
+"""
+Protocolo de las balanzas de ISMAPP.
+
+Las balanzas (serie o TCP) envían en modo continuo una trama de texto por
+lectura, terminada en CR/LF, con el formato habitual de los indicadores:
+
+    ST,GS,+001234.5kg     estable, peso bruto
+    US,NT,+000012.0kg     inestable, peso neto
+    OL,GS,+999999.9kg     sobrecarga
+
+Mientras una carga está sobre la plataforma la balanza repite la misma
+lectura estable muchas veces. ``LoadDetector`` convierte ese flujo en un
+pesaje por carga: registra la primera lectura estable sobre el umbral y no
+vuelve a registrar hasta que la plataforma se descarga.
+"""
+import re
+
+# Peso mínimo (kg) para considerar que hay una carga sobre la plataforma
+DEFAULT_MIN_WEIGHT_KG = 0.5
+
+_FRAME_PATTERN = re.compile(
+    r"^\s*(?P<status>ST|US|OL)\s*,\s*(?P<mode>GS|NT)\s*,\s*"
+    r"(?P<weight>[+-]?\s*\d+(?:[.,]\d+)?)\s*(?P<unit>kg|g|t)?\s*$",
+    re.IGNORECASE
+)
+
+_UNIT_FACTORS = {"kg": 1.0, "g": 0.001, "t": 1000.0}
+
+
+class ScaleFrame:
+    """Lectura decodificada de una trama de balanza."""
+
+    __slots__ = ("stable", "overload", "net", "weight_kg")
+
+    def __init__(self, stable, overload, net, weight_kg):
+        self.stable = stable
+        self.overload = overload
+        self.net = net
+        self.weight_kg = weight_kg
+
+    def __repr__(self):
+        state = "ST" if self.stable else ("OL" if self.overload else "US")
+        return f"<ScaleFrame({state}, {self.weight_kg} kg)>"
+
+
+def parse_frame(line):
+    """
+    Decodifica una trama de balanza.
+
+    Args:
+        line (str/bytes): Trama recibida (con o sin fin de línea)
+
+    Returns:
+        ScaleFrame: Lectura decodificada, o None si la trama no es válida
+    """
+    if isinstance(line, bytes):
+        line = line.decode("ascii", errors="replace")
+    match = _FRAME_PATTERN.match(line)
+    if not match:
+        return None
+    status = match.group("status").upper()
+    weight = float(match.group("weight").replace(" ", "").replace(",", "."))
+    unit = (match.group("unit") or "kg").lower()
+    return ScaleFrame(
+        stable=status == "ST",
+        overload=status == "OL",
+        net=match.group("mode").upper() == "NT",
+        weight_kg=round(weight * _UNIT_FACTORS[unit], 3),
+    )
+
+
+def format_frame(weight_kg, stable=True, net=False):
+    """
+    Codifica una lectura como trama (la usa el simulador de balanza).
+
+    Args:
+        weight_kg (float): Peso en kilos
+        stable (bool, optional): Lectura estable
+        net (bool, optional): Peso neto (si no, bruto)
+
+    Returns:
+        bytes: Trama terminada en CR/LF
+    """
+    return (f"{'ST' if stable else 'US'},{'NT' if net else 'GS'},"
+            f"{weight_kg:+09.1f}kg\r\n").encode("ascii")
+
+
+class LoadDetector:
+    """Convierte el flujo continuo de tramas en un pesaje por carga."""
+
+    def __init__(self, min_weight_kg=DEFAULT_MIN_WEIGHT_KG):
+        """
+        Inicializa el detector.
+
+        Args:
+            min_weight_kg (float, optional): Peso bajo el cual la plataforma
+                se considera descargada
+        """
+        self.min_weight_kg = min_weight_kg
+        self._armed = True
+
+    def feed(self, frame):
+        """
+        Procesa una lectura.
+
+        Args:
+            frame (ScaleFrame): Lectura decodificada
+
+        Returns:
+            float: Peso de la carga si esta lectura la registra, o None
+        """
+        if frame.overload:
+            return None
+        if frame.weight_kg < self.min_weight_kg:
+            self._armed = True
+            return None
+        if frame.stable and self._armed:
+            self._armed = False
+            return frame.weight_kg
+        return None
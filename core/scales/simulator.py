@@ -0,0 +1,155 @@
+"""
+Simulador de balanza para ISMAPP.
+
+Servidor TCP local que se comporta como una balanza en modo continuo: por
+cada carga envía algunas tramas inestables, varias estables con el mismo
+peso y luego la plataforma vacía. Sirve para probar el lector sin hardware
+(``TcpScaleSource("127.0.0.1", simulator.port)``).
+
+Las cargas enviadas quedan en ``simulator.loads``, para comparar con lo
+registrado en la base de datos.
+"""
+import random
+import socket
+import threading
+import time
+
+from core.scales.protocol import format_frame
+
+# Tramas de cada fase de una carga
+UNSTABLE_FRAMES = 3
+STABLE_FRAMES = 4
+EMPTY_FRAMES = 2
+
+
+class ScaleSimulator:
+    """Balanza simulada en un socket TCP local."""
+
+    def __init__(self, loads_per_second=5.0, frame_interval=0.0, seed=None, port=0):
+        """
+        Inicializa el simulador (sin empezar a escuchar).
+
+        Args:
+            loads_per_second (float, optional): Cargas por segundo
+            frame_interval (float, optional): Pausa entre tramas (0 = lo más rápido posible)
+            seed (int, optional): Semilla para pesos reproducibles
+            port (int, optional): Puerto TCP (0 = uno libre)
+        """
+        self.loads_per_second = loads_per_second
+        self.frame_interval = frame_interval
+        self.random = random.Random(seed)
+        self.loads = []             # pesos enviados (kg), en orden
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(("127.0.0.1", port))
+        self.port = self._server.getsockname()[1]
+        self._stop = threading.Event()
+        self._paused = threading.Event()
+        self._limit = None
+        self._thread = None
+        self._connection = None
+
+    def start(self, load_limit=None):
+        """
+        Empieza a aceptar una conexión y a enviar cargas.
+
+        Args:
+            load_limit (int, optional): Cargas a enviar antes de quedar en reposo
+        """
+        self._limit = load_limit
+        self._server.listen(1)
+        self._thread = threading.Thread(target=self._serve, name="scale-simulator", daemon=True)
+        self._thread.start()
+
+    def set_load_limit(self, load_limit):
+        """Cambia el total de cargas a enviar (None = sin límite)."""
+        self._limit = load_limit
+
+    def disconnect(self):
+        """Corta la conexión actual (simula un corte de red o del cable)."""
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+                connection.close()
+            except OSError:
+                pass
+
+    def pause(self, paused=True):
+        """Detiene o reanuda el envío de cargas (la conexión sigue abierta)."""
+        if paused:
+            self._paused.set()
+        else:
+            self._paused.clear()
+
+    def wait_until_sent(self, count, timeout=30.0):
+        """
+        Espera a que se hayan enviado una cantidad de cargas.
+
+        Returns:
+            bool: True si se enviaron a tiempo
+        """
+        deadline = time.monotonic() + timeout
+        while len(self.loads) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return len(self.loads) >= count
+
+    def stop(self):
+        """Detiene el simulador."""
+        self._stop.set()
+        self.disconnect()
+        try:
+            self._server.close()
+        except OSError:
+            pass
+        if self._thread is not None:
+            self._thread.join(2.0)
+
+    def _serve(self):
+        self._server.settimeout(0.2)
+        while not self._stop.is_set():
+            try:
+                connection, _ = self._server.accept()
+            except (socket.timeout, OSError):
+                continue
+            self._connection = connection
+            try:
+                self._send_loads(connection)
+            except OSError:
+                pass  # el lector se desconectó: esperar que vuelva
+            finally:
+                self._connection = None
+                try:
+                    connection.close()
+                except OSError:
+                    pass
+
+    def _send(self, connection, frames):
+        for frame in frames:
+            connection.sendall(frame)
+            if self.frame_interval:
+                time.sleep(self.frame_interval)
+
+    def _send_loads(self, connection):
+        interval = 1.0 / self.loads_per_second if self.loads_per_second else 0.0
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            if self._paused.is_set() or (self._limit is not None and len(self.loads) >= self._limit):
+                # En reposo la balanza sigue informando la plataforma vacía
+                self._send(connection, [format_frame(0.0)])
+                time.sleep(0.05)
+                continue
+
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_at = max(next_at + interval, time.monotonic() - 1.0)
+
+            weight = round(self.random.uniform(1.0, 1500.0), 1)
+            frames = [format_frame(weight * (0.5 + i / (2 * UNSTABLE_FRAMES)), stable=False)
+                      for i in range(UNSTABLE_FRAMES)]
+            frames += [format_frame(weight)] * STABLE_FRAMES
+            self._send(connection, frames)
+            # La carga cuenta como enviada cuando su primera trama estable salió
+            self.loads.append(weight)
+            self._send(connection, [format_frame(0.0)] * EMPTY_FRAMES)
@@ -0,0 +1,147 @@
+"""
+Conexiones con las balanzas de ISMAPP.
+
+Cada fuente entrega las tramas de la balanza de a una línea. Las fuentes no
+reintentan por su cuenta: si la conexión se corta, ``read_line`` lanza
+``OSError`` y el lector (ScaleIngestion) la vuelve a abrir con espera
+creciente.
+
+- ``TcpScaleSource``: balanzas con interfaz Ethernet o convertidores
+  serie/TCP, y el simulador local (ver simulator.py).
+- ``SerialScaleSource``: puerto serie directo; requiere el paquete opcional
+  ``pyserial``, que solo se importa al abrir la fuente.
+"""
+import socket
+
+# Segundos de espera por una trama antes de devolver el control al lector
+READ_TIMEOUT = 1.0
+
+# Largo máximo de una trama (protege de un flujo sin fines de línea)
+MAX_LINE_LENGTH = 256
+
+
+class TcpScaleSource:
+    """Balanza accesible por TCP."""
+
+    def __init__(self, host, port, timeout=READ_TIMEOUT):
+        """
+        Inicializa la fuente.
+
+        Args:
+            host (str): Dirección de la balanza o del convertidor
+            port (int): Puerto TCP
+            timeout (float, optional): Espera máxima por trama (segundos)
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._socket = None
+        self._buffer = b""
+
+    def __str__(self):
+        return f"tcp://{self.host}:{self.port}"
+
+    def open(self):
+        """Abre la conexión."""
+        self.close()
+        self._socket = socket.create_connection((self.host, self.port), timeout=5.0)
+        self._socket.settimeout(self.timeout)
+        self._buffer = b""
+
+    def read_line(self):
+        """
+        Lee una trama.
+
+        Returns:
+            bytes: Trama sin fin de línea, o None si no llegó ninguna a tiempo
+
+        Raises:
+            OSError: Si la conexión se cerró o falló
+        """
+        while b"\n" not in self._buffer:
+            if len(self._buffer) > MAX_LINE_LENGTH:
+                self._buffer = b""
+            try:
+                chunk = self._socket.recv(4096)
+            except socket.timeout:
+                return None
+            if not chunk:
+                raise ConnectionError("La balanza cerró la conexión")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line.rstrip(b"\r")
+
+    def close(self):
+        """Cierra la conexión."""
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+
+class SerialScaleSource:
+    """Balanza conectada a un puerto serie (requiere pyserial)."""
+
+    def __init__(self, port, baudrate=9600, timeout=READ_TIMEOUT):
+        """
+        Inicializa la fuente.
+
+        Args:
+            port (str): Puerto serie (p. ej. 'COM3' o '/dev/ttyUSB0')
+            baudrate (int, optional): Velocidad del puerto
+            timeout (float, optional): Espera máxima por trama (segundos)
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self._serial = None
+
+    def __str__(self):
+        return f"serial://{self.port}@{self.baudrate}"
+
+    def open(self):
+        """
+        Abre el puerto.
+
+        Raises:
+            OSError: Si pyserial no está instalado o el puerto no se pudo abrir
+        """
+        self.close()
+        try:
+            import serial
+        except ImportError:
+            raise OSError("Para leer balanzas por puerto serie instale el paquete 'pyserial'")
+        try:
+            self._serial = serial.Serial(self.port, self.baudrate, timeout=self.timeout)
+        except serial.SerialException as e:
+            raise OSError(str(e))
+
+    def read_line(self):
+        """
+        Lee una trama.
+
+        Returns:
+            bytes: Trama sin fin de línea, o None si no llegó ninguna a tiempo
+
+        Raises:
+            OSError: Si el puerto falló
+        """
+        import serial
+        try:
+            line = self._serial.readline(MAX_LINE_LENGTH)
+        except serial.SerialException as e:
+            raise OSError(str(e))
+        if not line or not line.endswith(b"\n"):
+            return None
+        return line.rstrip(b"\r\n")
+
+    def close(self):
+        """Cierra el puerto."""
+        if self._serial is not None:
+            try:
+                self._serial.close()
+            except Exception:
+                pass
+            self._serial = None
@@ -0,0 +1,268 @@
+"""
+Servicio de archivos adjuntos (PDF, imágenes, planillas) de clientes,
+trabajadores y usuarios.
+
+El contenido va al almacén por hash (ver core/attachments/store.py) y la
+base de datos guarda solo los datos del adjunto: ``attachment_blobs`` tiene
+una fila por contenido y ``attachments`` una por archivo adjuntado a una
+entidad. Adjuntar dos veces el mismo archivo (o la misma factura a dos
+clientes) crea dos adjuntos que comparten un contenido.
+
+Las operaciones con archivos leen y escriben por bloques y pueden tardar
+con archivos grandes o una carpeta compartida lenta: desde la interfaz se
+llaman a través del TaskExecutor, nunca en el hilo de Tk. La excepción es
+``is_thumbnail_cached``, que solo consulta el índice en memoria del caché
+de miniaturas.
+"""
+import logging
+import mimetypes
+import os
+
+from core.attachments.store import ContentStore
+from core.attachments.thumbnails import (
+    DEFAULT_CACHE_MB, THUMBNAIL_SIZE, ThumbnailCache, can_preview, render_thumbnail
+)
+from core.database.row_mapper import RowMapper
+from models.attachment import Attachment, AttachmentEntity
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENT_MAPPER = RowMapper(Attachment)
+
+_SELECT_ATTACHMENTS = """
+SELECT id, entity_type, entity_id, sha256, file_name, mime_type, size, description,
+       uploaded_by, created_at
+FROM attachments
+"""
+
+
+class AttachmentService:
+    """Servicio para operaciones con archivos adjuntos."""
+
+    def __init__(self, data_manager, store=None, thumbnail_cache_mb=DEFAULT_CACHE_MB):
+        """
+        Inicializa el servicio de adjuntos.
+
+        Args:
+            data_manager: Gestor de base de datos
+            store (ContentStore, optional): Almacén de contenidos (por defecto,
+                data/attachments junto a la base de datos)
+            thumbnail_cache_mb (float, optional): Tope del caché de miniaturas
+        """
+        self.db_manager = data_manager
+        if store is None:
+            root = os.path.join(os.path.dirname(data_manager.db_path), "attachments")
+            store = ContentStore(root)
+        self.store = store
+        self.thumbnails = ThumbnailCache(os.path.join(store.root, "thumbnails"), thumbnail_cache_mb)
+
+    def attach_file(self, source_path, entity_type, entity_id, description="",
+                    uploaded_by="", progress=None):
+        """
+        Adjunta un archivo a una entidad.
+
+        Args:
+            source_path (str): Archivo a adjuntar
+            entity_type (str): Entidad (de AttachmentEntity)
+            entity_id (int): ID del cliente, trabajador o usuario
+            description (str, optional): Descripción
+            uploaded_by (str, optional): Usuario que lo adjunta
+            progress (callable, optional): Función (bytes copiados, total),
+                llamada desde el hilo que copia
+
+        Returns:
+            Attachment: Adjunto creado
+
+        Raises:
+            ValueError: Si la entidad no es válida
+            OSError: Si el archivo no se pudo leer o guardar
+        """
+        if entity_type not in AttachmentEntity.get_all_types():
+            raise ValueError(f"Entidad no válida: {entity_type}")
+        if entity_id is None:
+            raise ValueError("Debe indicar a qué registro se adjunta el archivo")
+
+        digest, size, _ = self.store.put_file(source_path, progress)
+        file_name = os.path.basename(source_path)
+        attachment = Attachment(
+            entity_type=entity_type, entity_id=entity_id, sha256=digest,
+            file_name=file_name,
+            mime_type=mimetypes.guess_type(file_name)[0] or "application/octet-stream",
+            size=size, description=description, uploaded_by=uploaded_by,
+        )
+        with self.db_manager.transaction() as connection:
+            connection.execute(
+                "INSERT INTO attachment_blobs (sha256, size) VALUES (?, ?) "
+                "ON CONFLICT (sha256) DO NOTHING",
+                (digest, size)
+            )
+            attachment.id = connection.execute(
+                "INSERT INTO attachments (entity_type, entity_id, sha256, file_name, "
+                "mime_type, size, description, uploaded_by) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (entity_type, entity_id, digest, attachment.file_name, attachment.mime_type,
+                 size, description, uploaded_by)
+            ).lastrowid
+
+        # Otro puesto pudo eliminar el contenido sin uso entre la copia y el registro
+        if not self.store.exists(digest):
+            self.store.put_file(source_path)
+        self.db_manager.invalidate_cache("attachments")
+        return attachment
+
+    def get_attachments(self, entity_type, entity_id):
+        """
+        Obtiene los adjuntos de una entidad.
+
+        Args:
+            entity_type (str): Entidad (de AttachmentEntity)
+            entity_id (int): ID del registro
+
+        Returns:
+            list: Objetos Attachment, del más reciente al más antiguo
+        """
+        query = _SELECT_ATTACHMENTS + "WHERE entity_type = ? AND entity_id = ? ORDER BY id DESC"
+        try:
+            attachments = self.db_manager.fetch_models(ATTACHMENT_MAPPER, query, (entity_type, entity_id))
+            return attachments if attachments is not None else []
+        except Exception as e:
+            logger.error(f"Error al obtener adjuntos: {e}")
+            return []
+
+    def get_attachment(self, attachment_id):
+        """
+        Obtiene un adjunto por su ID.
+
+        Returns:
+            Attachment: El adjunto, o None si no existe
+        """
+        attachments = self.db_manager.fetch_models(
+            ATTACHMENT_MAPPER, _SELECT_ATTACHMENTS + "WHERE id = ?", (attachment_id,)
+        )
+        return attachments[0] if attachments else None
+
+    def open_attachment(self, attachment):
+        """
+        Abre el contenido de un adjunto para leerlo por bloques.
+
+        Args:
+            attachment (Attachment): Adjunto
+
+        Returns:
+            file: Archivo binario abierto (cerrarlo tras usarlo)
+        """
+        return self.store.open(attachment.sha256)
+
+    def export_attachment(self, attachment, destination_path, progress=None):
+        """
+        Guarda una copia de un adjunto (p. ej. para abrirla con otro programa).
+
+        Args:
+            attachment (Attachment): Adjunto
+            destination_path (str): Archivo de destino
+            progress (callable, optional): Función (bytes copiados, total)
+        """
+        self.store.copy_to(attachment.sha256, destination_path, progress)
+
+    def has_preview(self, attachment):
+        """Indica si el adjunto puede tener miniatura."""
+        return can_preview(attachment.mime_type)
+
+    def is_thumbnail_cached(self, attachment, size=THUMBNAIL_SIZE):
+        """
+        Indica si la miniatura de un adjunto ya está en el caché (no accede al disco).
+
+        Args:
+            attachment (Attachment): Adjunto
+            size (int, optional): Lado mayor en píxeles
+
+        Returns:
+            bool: True si ya se generó
+        """
+        return self.thumbnails.contains(ThumbnailCache.key_for(attachment.sha256, size))
+
+    def get_thumbnail(self, attachment, size=THUMBNAIL_SIZE):
+        """
+        Obtiene la miniatura de un adjunto, generándola si no está en el caché.
+
+        Args:
+            attachment (Attachment): Adjunto
+            size (int, optional): Lado mayor en píxeles
+
+        Returns:
+            str: Ruta del PNG, o None si el archivo no tiene miniatura
+        """
+        key = ThumbnailCache.key_for(attachment.sha256, size)
+        path = self.thumbnails.get(key)
+        if path is not None:
+            return path
+        data = render_thumbnail(self.store.path_for(attachment.sha256), attachment.mime_type, size)
+        if data is None:
+            return None
+        return self.thumbnails.put(key, data)
+
+    def delete_attachment(self, attachment_id):
+        """
+        Elimina un adjunto (y su contenido, si ningún otro adjunto lo usa).
+
+        Args:
+            attachment_id (int): ID del adjunto
+
+        Returns:
+            bool: True si se eliminó correctamente
+        """
+        result = self.db_manager.execute_query("DELETE FROM attachments WHERE id = ?", (attachment_id,))
+        if result is None or result is False:
+            return False
+        self.db_manager.invalidate_cache("attachments")
+        self.collect_garbage()
+        return True
+
+    def collect_garbage(self):
+        """
+        Elimina los contenidos que ya no usa ningún adjunto (incluidos los de
+        entidades borradas) y las copias temporales abandonadas.
+
+        Returns:
+            int: Contenidos eliminados
+        """
+        removed = 0
+        try:
+            with self.db_manager.transaction() as connection:
+                unused = [row[0] for row in connection.execute(
+                    "SELECT sha256 FROM attachment_blobs b WHERE NOT EXISTS "
+                    "(SELECT 1 FROM attachments a WHERE a.sha256 = b.sha256)"
+                )]
+                connection.executemany(
+                    "DELETE FROM attachment_blobs WHERE sha256 = ?", [(digest,) for digest in unused]
+                )
+                # Los archivos se eliminan con la transacción de escritura
+                # abierta: un attach_file de otro puesto que reutiliza el mismo
+                # contenido registra su adjunto después de este commit, y su
+                # comprobación posterior ve el archivo ya eliminado y lo repone
+                for digest in unused:
+                    if self.store.remove(digest):
+                        removed += 1
+        except Exception as e:
+            logger.error(f"Error al eliminar contenidos sin uso: {e}")
+            return removed
+
+        for digest in unused:
+            self.thumbnails.discard(digest)
+        self.store.clean_temp()
+        return removed
+
+    def get_storage_stats(self):
+        """
+        Obtiene el espacio usado por los adjuntos.
+
+        Returns:
+            dict: attachments, blobs, logical_bytes (suma de los adjuntos) y
+                stored_bytes (contenidos únicos guardados)
+        """
+        rows = self.db_manager.execute_query("""
+        SELECT (SELECT COUNT(*) FROM attachments) AS attachments,
+               (SELECT COALESCE(SUM(size), 0) FROM attachments) AS logical_bytes,
+               (SELECT COUNT(*) FROM attachment_blobs) AS blobs,
+               (SELECT COALESCE(SUM(size), 0) FROM attachment_blobs) AS stored_bytes
+        """)
+        return rows[0] if rows else {"attachments": 0, "logical_bytes": 0, "blobs": 0, "stored_bytes": 0}
@@ -0,0 +1,274 @@
+"""
+Servicio de copias de seguridad de la base de datos.
+
+Cada copia se hace en línea con la API de backup de SQLite (ver
+core/database/backup.py), se aplica la política de retención y se anota
+en ``backup_log.jsonl`` (una línea JSON por copia, con su duración y
+tamaño) dentro del directorio de respaldos.
+
+Si la base de datos no cambió desde la última copia, la copia programada
+se omite: el archivo principal y el WAL tienen el mismo tamaño y fecha de
+modificación que entonces.
+
+Con ``archive=True`` las copias no se guardan como archivos completos sino
+en el archivo deduplicado por bloques (ver core/database/backup_archive.py):
+cada copia solo agrega los bloques que cambiaron desde las anteriores.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+from core.database.backup import (
+    RetentionPolicy, backup_file_name, backup_name, list_backups, online_backup, parse_backup_file,
+    restore_file
+)
+from core.database.backup_archive import ArchiveError, BackupArchive
+
+logger = logging.getLogger(__name__)
+
+BACKUP_LOG_FILE = "backup_log.jsonl"
+
+# Registros del historial que se conservan en backup_log.jsonl
+MAX_LOG_ENTRIES = 500
+
+
+class BackupService:
+    """Servicio para copias de seguridad de la base de datos."""
+
+    def __init__(self, data_manager, backup_dir=None, retention=None, compress=True, archive=False,
+                 **backup_options):
+        """
+        Inicializa el servicio de respaldos.
+
+        Args:
+            data_manager: Gestor de base de datos
+            backup_dir (str, optional): Directorio de respaldos (por defecto,
+                data/backups junto a la base de datos)
+            retention (RetentionPolicy, optional): Copias que se conservan
+            compress (bool, optional): Guardar las copias comprimidas (copias completas)
+            archive (bool, optional): Guardar las copias en el archivo deduplicado
+                (data/backups/archive) en lugar de como archivos completos
+            **backup_options: pages_per_step, step_pause, max_restarts y verify
+                (ver online_backup)
+        """
+        self.db_manager = data_manager
+        self.db_path = data_manager.db_path
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(data_manager.db_path), "backups")
+        self.retention = retention or RetentionPolicy()
+        self.compress = compress
+        self.backup_options = backup_options
+        self.log_path = os.path.join(self.backup_dir, BACKUP_LOG_FILE)
+        self.archive = BackupArchive(os.path.join(self.backup_dir, "archive")) if archive else None
+        # Una copia a la vez (programada o pedida por el usuario)
+        self._lock = threading.Lock()
+        os.makedirs(self.backup_dir, exist_ok=True)
+
+    def run_backup(self, force=False, reason="manual"):
+        """
+        Hace una copia de seguridad y aplica la política de retención.
+
+        Args:
+            force (bool, optional): Copiar aunque la base de datos no haya cambiado
+            reason (str, optional): Origen de la copia ('manual', 'programada'...)
+
+        Returns:
+            dict: Informe de la copia (ver online_backup) con started_at, reason,
+                skipped y removed (copias eliminadas por la retención). En el
+                archivo deduplicado, size son los bytes agregados y se informan
+                además chunks y new_chunks
+
+        Raises:
+            sqlite3.Error: Si la base de datos no se pudo copiar
+            OSError: Si la copia no se pudo escribir
+        """
+        with self._lock:
+            started_at = datetime.now()
+            fingerprint = self._fingerprint()
+            last = self.get_last_backup()
+            if (not force and last is not None and last.get("fingerprint") == fingerprint
+                    and os.path.exists(last.get("path", ""))):
+                return {"started_at": started_at.isoformat(timespec="seconds"), "reason": reason,
+                        "skipped": True, "path": last["path"], "removed": []}
+
+            if self.archive is not None:
+                name = backup_name(started_at)
+                report = self._backup_to_archive(name)
+            else:
+                name = backup_file_name(started_at, self.compress)
+                report = online_backup(
+                    self.db_path, os.path.join(self.backup_dir, name),
+                    compress=self.compress, **self.backup_options
+                )
+            report.update({
+                "started_at": started_at.isoformat(timespec="seconds"),
+                "reason": reason,
+                "skipped": False,
+                "fingerprint": fingerprint,
+            })
+            report["removed"] = self.prune()
+            self._append_log(report)
+
+        logger.info(
+            f"Respaldo {name}: {report['size'] / 1024 / 1024:.1f} MB "
+            f"({report['database_size'] / 1024 / 1024:.1f} MB sin comprimir) "
+            f"en {report['duration_ms'] / 1000:.1f} s"
+        )
+        return report
+
+    def _backup_to_archive(self, name):
+        """Copia en línea a un temporal y la agrega al archivo deduplicado."""
+        temp_path = os.path.join(self.archive.root, name + ".db.tmp")
+        try:
+            report = online_backup(self.db_path, temp_path, compress=False, **self.backup_options)
+            added = self.archive.add_snapshot(temp_path, name)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        report.update({
+            "path": self.archive.manifest_path(name),
+            "size": added["new_bytes"],
+            "chunks": added["chunks"],
+            "new_chunks": added["new_chunks"],
+            "compressed": True,
+            "archive": True,
+            "duration_ms": report["duration_ms"] + added["duration_ms"],
+        })
+        return report
+
+    def prune(self):
+        """
+        Elimina las copias que la política de retención ya no conserva.
+
+        Returns:
+            list: Rutas eliminadas
+        """
+        removed = []
+        archived = False
+        for path in self.retention.select_expired(self.list_backups()):
+            try:
+                if self._is_snapshot(path):
+                    self.archive.delete_snapshot(os.path.basename(path)[:-len(".json")])
+                    archived = True
+                else:
+                    os.remove(path)
+                removed.append(path)
+            except OSError as e:
+                logger.warning(f"No se pudo eliminar el respaldo {path}: {e}")
+        if archived:
+            try:
+                self.archive.collect_garbage()
+            except ArchiveError as e:
+                # Otro puesto está usando el archivo; los bloques se liberan en la próxima poda
+                logger.warning(f"No se pudieron liberar los bloques del archivo: {e}")
+        return removed
+
+    def list_backups(self):
+        """
+        Lista las copias guardadas (archivos completos y copias del archivo deduplicado).
+
+        Returns:
+            list: Tuplas (fecha, ruta), de la más reciente a la más antigua
+        """
+        backups = list_backups(self.backup_dir)
+        if self.archive is not None:
+            for name in self.archive.list_snapshots():
+                path = self.archive.manifest_path(name)
+                timestamp = parse_backup_file(os.path.basename(path))
+                if timestamp is not None:
+                    backups.append((timestamp, path))
+            backups.sort(reverse=True)
+        return backups
+
+    def restore_backup(self, backup_path, destination_path):
+        """
+        Extrae una copia a un archivo de base de datos nuevo.
+
+        Args:
+            backup_path (str): Copia (de list_backups)
+            destination_path (str): Archivo de destino (no debe existir)
+        """
+        if self._is_snapshot(backup_path):
+            self.archive.restore(os.path.basename(backup_path)[:-len(".json")], destination_path)
+        else:
+            restore_file(backup_path, destination_path)
+
+    def _is_snapshot(self, path):
+        return (self.archive is not None and path.endswith(".json")
+                and os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.archive.snapshots_dir))
+
+    def get_history(self, limit=50):
+        """
+        Obtiene los informes de las últimas copias.
+
+        Args:
+            limit (int, optional): Cantidad máxima de informes
+
+        Returns:
+            list: Informes, del más reciente al más antiguo
+        """
+        return self._read_log()[-limit:][::-1]
+
+    def get_last_backup(self):
+        """
+        Obtiene el informe de la última copia realizada.
+
+        Returns:
+            dict: Informe, o None si no hay copias registradas
+        """
+        entries = self._read_log()
+        return entries[-1] if entries else None
+
+    def is_due(self, interval):
+        """
+        Indica si corresponde hacer una copia programada.
+
+        Args:
+            interval (timedelta): Tiempo mínimo entre copias
+
+        Returns:
+            bool: True si la última copia es más antigua que el intervalo
+        """
+        backups = self.list_backups()
+        if not backups:
+            return True
+        return datetime.now() - backups[0][0] >= interval
+
+    def _fingerprint(self):
+        """Tamaño y fecha de modificación de la base de datos y su WAL."""
+        parts = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                info = os.stat(path)
+                parts.append(f"{info.st_size}:{info.st_mtime_ns}")
+            except FileNotFoundError:
+                parts.append("-")
+        return "|".join(parts)
+
+    def _read_log(self):
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as log:
+                entries = []
+                for line in log:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # línea cortada por un cierre durante la escritura
+                return entries
+        except FileNotFoundError:
+            return []
+
+    def _append_log(self, report):
+        entries = self._read_log()
+        if len(entries) >= MAX_LOG_ENTRIES:
+            # Reescribir solo los más recientes
+            entries = entries[-(MAX_LOG_ENTRIES - 1):] + [report]
+            temp_path = self.log_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as log:
+                for entry in entries:
+                    log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(temp_path, self.log_path)
+            return
+        with open(self.log_path, "a", encoding="utf-8") as log:
+            log.write(json.dumps(report, ensure_ascii=False) + "\n")
@@ -1,8 +1,7 @@
 """
 Servicio para la gestión de la relación entre clientes y materiales.
 """
-from models.client_material import ClientMaterial
-from models.material import Material
+from core.services.material_service import CLIENT_MATERIAL_MAPPER, MATERIAL_MAPPER
 
 class ClientMaterialService:
     """Servicio para operaciones de precios de materiales por cliente."""
@@ -34,38 +33,14 @@ class ClientMaterialService:
         """
         
         try:
-            results = self.db_manager.execute_query(query, (client_id,))
-            client_materials = []
+            columns, rows = self.db_manager.fetch_rows(query, (client_id,))
             
-            for row in results:
-                # Dividir el resultado en dos partes: datos de la relación y datos del material
-                cm_data = {
-                    'id': row[0],
-                    'client_id': row[1],
-                    'material_id': row[2],
-                    'price': row[3],
-                    'includes_tax': row[4],
-                    'notes': row[5]
-                }
-                
-                m_data = {
-                    'id': row[6],
-                    'name': row[7],
-                    'description': row[8],
-                    'material_type': row[9],
-                    'is_plastic_subtype': row[10],
-                    'plastic_subtype': row[11],
-                    'plastic_state': row[12],
-                    'custom_subtype': row[13],
-                    'is_active': row[14]
-                }
-                
-                client_material = ClientMaterial.from_dict(cm_data)
-                material = Material.from_dict(m_data)
-                
-                client_materials.append((client_material, material))
+            # Dividir cada fila en dos partes: datos de la relación (cm.*) y del material (m.*)
+            split = columns.index('id', 1) if rows else 0
+            build_relation = CLIENT_MATERIAL_MAPPER.bind(columns, 0, split)
+            build_material = MATERIAL_MAPPER.bind(columns, split)
             
-            return client_materials
+            return [(build_relation(row), build_material(row)) for row in rows]
         except Exception as e:
             print(f"Error al obtener materiales del cliente: {e}")
             return []
@@ -89,8 +64,8 @@ class ClientMaterialService:
         """
         
         try:
-            results = self.db_manager.execute_query(query, (client_id,))
-            return [Material.from_dict(row) for row in results]
+            materials = self.db_manager.fetch_models(MATERIAL_MAPPER, query, (client_id,))
+            return materials if materials is not None else []
         except Exception as e:
             print(f"Error al obtener materiales disponibles: {e}")
             return []
@@ -105,10 +80,17 @@ class ClientMaterialService:
         Returns:
             bool: True si se guardó correctamente
         """
-        if client_material.id is None:
-            return self._create_client_material(client_material)
-        else:
-            return self._update_client_material(client_material)
+        try:
+            if client_material.id is None:
+                return self._create_client_material(client_material)
+            else:
+                return self._update_client_material(client_material)
+        finally:
+            # Mismas claves de caché que MaterialService
+            self.db_manager.invalidate_cache("client_materials", keys=[
+                ("client_materials", "client", client_material.client_id),
+                ("client_materials", "available", client_material.client_id),
+            ])
     
     def _create_client_material(self, client_material):
         """Crea una nueva relación cliente-material."""
@@ -123,9 +105,11 @@ class ClientMaterialService:
         )
         
         try:
-            self.db_manager.execute_query(query, params)
-            result = self.db_manager.execute_query("SELECT last_insert_rowid()")
-            client_material.id = result[0][0] if result else None
+            # execute_query devuelve el ID insertado: no hace falta otra consulta
+            result = self.db_manager.execute_query(query, params)
+            if result is None:
+                return False
+            client_material.id = result
             return True
         except Exception as e:
             print(f"Error al crear relación cliente-material: {e}")
@@ -168,4 +152,6 @@ class ClientMaterialService:
             return True
         except Exception as e:
             print(f"Error al eliminar relación cliente-material: {e}")
-            return False
\ No newline at end of file
+            return False
+        finally:
+            self.db_manager.invalidate_cache("client_materials")
\ No newline at end of file
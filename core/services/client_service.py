@@ -1,8 +1,13 @@
 """
 Servicio para la gestión de clientes.
 """
+from core.database.full_text import build_match_query, build_search_query
+from core.database.row_mapper import RowMapper
 from models.client import Client
 
+# Conversión directa de filas de 'clients' a objetos Client
+CLIENT_MAPPER = RowMapper(Client)
+
 class ClientService:
     """Servicio para operaciones CRUD de clientes."""
     
@@ -25,14 +30,10 @@ class ClientService:
         query = "SELECT * FROM clients WHERE is_active = 1 ORDER BY name"
         
         try:
-            results = self.db_manager.execute_query(query)
-            clients = []
-            
-            for row in results:
-                client = Client.from_dict(row)
-                clients.append(client)
-                
-            return clients
+            clients = self.db_manager.fetch_models(
+                CLIENT_MAPPER, query, cache_key=("clients", "list", "all")
+            )
+            return clients if clients is not None else []
         except Exception as e:
             print(f"Error al obtener clientes: {e}")
             return []
@@ -50,10 +51,12 @@ class ClientService:
         query = "SELECT * FROM clients WHERE id = ?"
         
         try:
-            results = self.db_manager.execute_query(query, (client_id,))
+            results = self.db_manager.fetch_models(
+                CLIENT_MAPPER, query, (client_id,), cache_key=("clients", "id", client_id)
+            )
             
             if results:
-                return Client.from_dict(results[0])
+                return results[0]
             return None
         except Exception as e:
             print(f"Error al obtener cliente por ID: {e}")
@@ -82,6 +85,9 @@ class ClientService:
         except Exception as e:
             print(f"Error al guardar cliente: {e}")
             return False
+        finally:
+            # Invalidar aunque la escritura falle: el estado en disco es incierto
+            self.db_manager.invalidate_cache("clients", client.id)
     
     def _create_client(self, client):
         """
@@ -193,17 +199,34 @@ class ClientService:
         except Exception as e:
             print(f"Error al eliminar cliente: {e}")
             return False
+        finally:
+            self.db_manager.invalidate_cache("clients", client_id)
     
     def search_clients(self, search_term):
         """
         Busca clientes que coincidan con el término de búsqueda.
         
+        Usa el índice de texto completo (prefijos, sin distinguir tildes) con
+        los resultados ordenados por relevancia; si no está disponible, busca
+        con LIKE.
+        
         Args:
             search_term (str): Término de búsqueda
             
         Returns:
             list: Lista de objetos Client que coinciden
         """
+        match = build_match_query(search_term)
+        if match and self.db_manager.has_full_text_index("clients"):
+            try:
+                clients = self.db_manager.fetch_models(
+                    CLIENT_MAPPER, build_search_query("clients"), (match,)
+                )
+                return clients if clients is not None else []
+            except Exception as e:
+                print(f"Error al buscar clientes: {e}")
+                return []
+        
         search_pattern = f"%{search_term}%"
         
         query = """
@@ -219,14 +242,8 @@ class ClientService:
         
         try:
             params = (search_pattern, search_pattern, search_pattern, search_pattern)
-            results = self.db_manager.execute_query(query, params)
-            
-            clients = []
-            for row in results:
-                client = Client.from_dict(row)
-                clients.append(client)
-                
-            return clients
+            clients = self.db_manager.fetch_models(CLIENT_MAPPER, query, params)
+            return clients if clients is not None else []
         except Exception as e:
             print(f"Error al buscar clientes: {e}")
             return []
@@ -244,14 +261,11 @@ class ClientService:
         query = "SELECT * FROM clients WHERE is_active = 1 AND client_type = ? ORDER BY name"
         
         try:
-            results = self.db_manager.execute_query(query, (client_type,))
-            
-            clients = []
-            for row in results:
-                client = Client.from_dict(row)
-                clients.append(client)
-                
-            return clients
+            clients = self.db_manager.fetch_models(
+                CLIENT_MAPPER, query, (client_type,),
+                cache_key=("clients", "list", "type", client_type)
+            )
+            return clients if clients is not None else []
         except Exception as e:
             print(f"Error al obtener clientes por tipo: {e}")
             return []
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Servicio con las métricas del dashboard.
+
+Las métricas se leen de la tabla de resumen mensual de pesajes (ver
+core/database/summaries.py), nunca de la tabla de pesajes: el costo de cada
+consulta depende de la cantidad de materiales, no de los años de historia.
+"""
+from datetime import date
+
+from core.database.summaries import SUMMARY_TABLE, rebuild_weighing_summaries
+
+
+def month_key(day=None):
+    """
+    Obtiene la clave de mes del resumen ('YYYY-MM').
+
+    Args:
+        day (date, optional): Fecha del mes (por defecto, hoy)
+
+    Returns:
+        str: Mes en formato 'YYYY-MM'
+    """
+    day = day or date.today()
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def previous_month_key(month):
+    """
+    Obtiene el mes anterior a una clave 'YYYY-MM'.
+
+    Args:
+        month (str): Mes en formato 'YYYY-MM'
+
+    Returns:
+        str: Mes anterior en formato 'YYYY-MM'
+    """
+    year, number = (int(part) for part in month.split("-"))
+    if number == 1:
+        return f"{year - 1:04d}-12"
+    return f"{year:04d}-{number - 1:02d}"
+
+
+class DashboardService:
+    """Servicio de consulta de métricas agregadas."""
+
+    def __init__(self, data_manager):
+        """
+        Inicializa el servicio del dashboard.
+
+        Args:
+            data_manager: Gestor de base de datos
+        """
+        self.db_manager = data_manager
+
+    def get_month_totals(self, month=None):
+        """
+        Obtiene los totales de un mes.
+
+        Args:
+            month (str, optional): Mes 'YYYY-MM' (por defecto, el actual)
+
+        Returns:
+            dict: month, weighing_count, total_kg y total_amount
+        """
+        month = month or month_key()
+        query = f"""
+        SELECT COALESCE(SUM(weighing_count), 0) AS weighing_count,
+               COALESCE(SUM(total_kg), 0.0) AS total_kg,
+               COALESCE(SUM(total_amount), 0.0) AS total_amount
+        FROM {SUMMARY_TABLE}
+        WHERE month = ?
+        """
+        try:
+            rows = self.db_manager.execute_query(query, (month,))
+            totals = rows[0] if rows else {}
+        except Exception as e:
+            print(f"Error al obtener totales del mes: {e}")
+            totals = {}
+        return {
+            "month": month,
+            "weighing_count": totals.get("weighing_count", 0),
+            "total_kg": totals.get("total_kg", 0.0),
+            "total_amount": totals.get("total_amount", 0.0),
+        }
+
+    def get_material_totals(self, month=None):
+        """
+        Obtiene los kilos y montos de un mes por material.
+
+        Args:
+            month (str, optional): Mes 'YYYY-MM' (por defecto, el actual)
+
+        Returns:
+            list: Diccionarios con material_id, name, weighing_count, total_kg y
+                total_amount, de mayor a menor cantidad de kilos
+        """
+        query = f"""
+        SELECT s.material_id, COALESCE(m.name, 'Material ' || s.material_id) AS name,
+               s.weighing_count, s.total_kg, s.total_amount
+        FROM {SUMMARY_TABLE} s
+        LEFT JOIN materials m ON m.id = s.material_id
+        WHERE s.month = ? AND s.weighing_count > 0
+        ORDER BY s.total_kg DESC
+        """
+        try:
+            results = self.db_manager.execute_query(query, (month or month_key(),))
+            return results if results else []
+        except Exception as e:
+            print(f"Error al obtener totales por material: {e}")
+            return []
+
+    def get_dashboard_data(self, month=None):
+        """
+        Obtiene todas las métricas que muestra el dashboard.
+
+        Args:
+            month (str, optional): Mes 'YYYY-MM' (por defecto, el actual)
+
+        Returns:
+            dict: current y previous (totales del mes y del anterior) y
+                materials (totales por material del mes)
+        """
+        month = month or month_key()
+        return {
+            "current": self.get_month_totals(month),
+            "previous": self.get_month_totals(previous_month_key(month)),
+            "materials": self.get_material_totals(month),
+        }
+
+    def rebuild_summaries(self):
+        """
+        Recalcula el resumen mensual desde la tabla de pesajes (reparación).
+
+        Returns:
+            int: Filas del resumen, o None si hubo un error
+        """
+        try:
+            with self.db_manager.transaction() as connection:
+                return rebuild_weighing_summaries(connection.cursor())
+        except Exception as e:
+            print(f"Error al recalcular el resumen de pesajes: {e}")
+            return None
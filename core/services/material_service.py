@@ -1,9 +1,25 @@
 """
 Servicio para la gestión de materiales y relaciones cliente-material.
 """
+import logging
+
+from core.database.full_text import build_match_query, build_search_query
+from core.database.row_mapper import RowMapper, as_bool, as_float
 from models.material import Material
 from models.client_material import ClientMaterial
 
+logger = logging.getLogger(__name__)
+
+# Conversión directa de filas a objetos del modelo (mismas conversiones que from_dict)
+MATERIAL_MAPPER = RowMapper(Material, converters={
+    'is_plastic_subtype': as_bool,
+    'is_active': as_bool,
+})
+CLIENT_MATERIAL_MAPPER = RowMapper(ClientMaterial, converters={
+    'price': as_float,
+    'includes_tax': as_bool,
+})
+
 class MaterialService:
     """Servicio para operaciones con materiales."""
     
@@ -26,18 +42,44 @@ class MaterialService:
         query = "SELECT * FROM materials WHERE is_active = 1 ORDER BY name"
         
         try:
-            results = self.db_manager.execute_query(query)
-            materials = []
-            
-            for row in results:
-                material = Material.from_dict(row)
-                materials.append(material)
-                
-            return materials
+            materials = self.db_manager.fetch_models(
+                MATERIAL_MAPPER, query, cache_key=("materials", "list", "all")
+            )
+            return materials if materials is not None else []
         except Exception as e:
             print(f"Error al obtener materiales: {e}")
             return []
     
+    def search_materials(self, search_term):
+        """
+        Busca materiales por nombre o descripción, ordenados por relevancia.
+        
+        Args:
+            search_term (str): Término de búsqueda
+            
+        Returns:
+            list: Lista de objetos Material que coinciden
+        """
+        match = build_match_query(search_term)
+        if match and self.db_manager.has_full_text_index("materials"):
+            query = build_search_query("materials")
+            params = (match,)
+        else:
+            query = """
+            SELECT * FROM materials
+            WHERE is_active = 1 AND (name LIKE ? OR description LIKE ?)
+            ORDER BY name
+            """
+            search_pattern = f"%{search_term}%"
+            params = (search_pattern, search_pattern)
+        
+        try:
+            materials = self.db_manager.fetch_models(MATERIAL_MAPPER, query, params)
+            return materials if materials is not None else []
+        except Exception as e:
+            print(f"Error al buscar materiales: {e}")
+            return []
+    
     def get_material_by_id(self, material_id):
         """
         Obtiene un material por su ID.
@@ -51,9 +93,11 @@ class MaterialService:
         query = "SELECT * FROM materials WHERE id = ?"
         
         try:
-            results = self.db_manager.execute_query(query, (material_id,))
+            results = self.db_manager.fetch_models(
+                MATERIAL_MAPPER, query, (material_id,), cache_key=("materials", "id", material_id)
+            )
             if results:
-                return Material.from_dict(results[0])
+                return results[0]
             return None
         except Exception as e:
             print(f"Error al obtener material por ID: {e}")
@@ -82,6 +126,9 @@ class MaterialService:
         except Exception as e:
             print(f"Error al guardar material: {e}")
             return False
+        finally:
+            # Invalidar aunque la escritura falle: el estado en disco es incierto
+            self._invalidate_material(material.id)
     
     def _create_material(self, material):
         """
@@ -187,6 +234,8 @@ class MaterialService:
         except Exception as e:
             print(f"Error al eliminar material: {e}")
             return False
+        finally:
+            self._invalidate_material(material_id)
     
     def assign_material_to_client(self, client_id, material_id, price=0.0, includes_tax=False, notes=""):
         """
@@ -219,6 +268,46 @@ class MaterialService:
         except Exception as e:
             print(f"Error al crear relación cliente-material: {e}")
             return False
+        finally:
+            self._invalidate_client_materials(client_id)
+    
+    def assign_materials_to_client(self, client_id, assignments):
+        """
+        Asigna varios materiales a un cliente en una sola transacción.
+        
+        Args:
+            client_id (int): ID del cliente
+            assignments (list): Lista de diccionarios con material_id y,
+                opcionalmente, price, includes_tax y notes
+            
+        Returns:
+            bool: True si se asignaron todos los materiales
+        """
+        query = """
+        INSERT INTO client_materials (client_id, material_id, price, includes_tax, notes)
+        VALUES (?, ?, ?, ?, ?)
+        """
+        
+        rows = [
+            (client_id,
+             assignment['material_id'],
+             assignment.get('price', 0.0),
+             assignment.get('includes_tax', False),
+             assignment.get('notes', ""))
+            for assignment in assignments
+        ]
+        
+        if not rows:
+            return True
+        
+        try:
+            # Si falla una fila no se asigna ninguna
+            return self.db_manager.execute_many(query, rows) is not None
+        except Exception as e:
+            print(f"Error al asignar materiales al cliente: {e}")
+            return False
+        finally:
+            self._invalidate_client_materials(client_id)
     
     def get_client_materials(self, client_id):
         """
@@ -238,48 +327,31 @@ class MaterialService:
         """
         
         try:
-            results = self.db_manager.execute_query(query, (client_id,))
+            result = self.db_manager.fetch_rows(
+                query, (client_id,), cache_key=("client_materials", "client", client_id)
+            )
             
             # IMPORTANTE: Un resultado vacío (lista vacía) es diferente a un error
-            # Si results es None, hubo un error; si es [], simplemente no hay materiales
-            if results is None:
+            # Si result es None, hubo un error; si no hay filas, simplemente no hay materiales
+            if result is None:
                 print("La consulta devolvió None")
                 return []
-                
-            client_materials = []
             
-            # Mapeo correcto de columnas evitando conflictos con nombres duplicados
-            for row in results:
-                try:
-                    # Crear objeto Material
-                    material = Material(
-                        id=row.get('material_id', None),  # Usar material_id de client_materials
-                        name=row.get('name', ''),
-                        description=row.get('description', ''),
-                        material_type=row.get('material_type', ''),
-                        is_plastic_subtype=row.get('is_plastic_subtype', 0),
-                        plastic_subtype=row.get('plastic_subtype', ''),
-                        plastic_state=row.get('plastic_state', ''),
-                        custom_subtype=row.get('custom_subtype', ''),
-                        is_active=row.get('is_active', 1)
-                    )
-                    
-                    # Crear objeto ClientMaterial
-                    client_material = ClientMaterial(
-                        id=row.get('id', None),
-                        client_id=row.get('client_id', client_id),
-                        material_id=row.get('material_id', material.id),
-                        price=row.get('price', 0.0),
-                        includes_tax=bool(row.get('includes_tax', 0)),
-                        notes=row.get('notes', '')
-                    )
-                    client_material.material = material
-                    
-                    client_materials.append(client_material)
-                except Exception as e:
-                    print(f"Error procesando fila: {e}")
-                    # Continuamos con el siguiente material en vez de fallar completamente
-                    continue
+            columns, rows = result
+            if not rows:
+                return []
+            
+            # Las columnas de cm.* van antes que las de m.*; ambas empiezan por 'id'.
+            # Se mapea cada tramo por separado para no mezclar nombres duplicados.
+            split = columns.index('id', 1)
+            build_relation = CLIENT_MATERIAL_MAPPER.bind(columns, 0, split)
+            build_material = MATERIAL_MAPPER.bind(columns, split)
+            
+            client_materials = []
+            for row in rows:
+                client_material = build_relation(row)
+                client_material.material = build_material(row)
+                client_materials.append(client_material)
                 
             return client_materials
         except Exception as e:
@@ -315,6 +387,8 @@ class MaterialService:
         except Exception as e:
             print(f"Error al actualizar relación cliente-material: {e}")
             return False
+        finally:
+            self._invalidate_client_materials(client_material.client_id)
     
     def remove_material_from_client(self, client_material_id):
         """
@@ -334,6 +408,9 @@ class MaterialService:
         except Exception as e:
             print(f"Error al eliminar relación cliente-material: {e}")
             return False
+        finally:
+            # Solo se conoce el ID de la relación: invalidar todas las relaciones
+            self._invalidate_client_materials()
     
     def get_available_materials_for_client(self, client_id):
         """
@@ -355,28 +432,46 @@ class MaterialService:
         """
         
         try:
-            results = self.db_manager.execute_query(query, (client_id,))
-            
-            # DEPURACIÓN: Verificar resultados crudos
-            print(f"DEBUG - get_available_materials_for_client({client_id}) devuelve {len(results) if results else 0} materiales")
+            materials = self.db_manager.fetch_models(
+                MATERIAL_MAPPER, query, (client_id,),
+                cache_key=("client_materials", "available", client_id)
+            )
             
-            materials = []
+            logger.debug("get_available_materials_for_client(%s) devuelve %d materiales",
+                         client_id, len(materials) if materials else 0)
             
             # Si no hay resultados o es None, devolver lista vacía
-            if not results:
-                print("DEBUG - No hay materiales disponibles para este cliente")
+            if not materials:
+                logger.debug("No hay materiales disponibles para el cliente %s", client_id)
                 return []
                 
-            # Procesar resultados
-            for row in results:
-                try:
-                    material = Material.from_dict(row)
-                    materials.append(material)
-                except Exception as e:
-                    print(f"ERROR al procesar material: {e}")
-                    continue
-                    
             return materials
         except Exception as e:
             print(f"Error al obtener materiales disponibles: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    def _invalidate_material(self, material_id):
+        """
+        Invalida el caché tras escribir un material.
+        
+        Args:
+            material_id (int): ID del material (None si no llegó a crearse)
+        """
+        self.db_manager.invalidate_cache("materials", material_id)
+        # Los listados por cliente incluyen los datos del material
+        self.db_manager.invalidate_cache("client_materials")
+    
+    def _invalidate_client_materials(self, client_id=None):
+        """
+        Invalida el caché de materiales asignados y disponibles de un cliente.
+        
+        Args:
+            client_id (int, optional): ID del cliente; None invalida todos
+        """
+        if client_id is None:
+            self.db_manager.invalidate_cache("client_materials")
+        else:
+            self.db_manager.invalidate_cache("client_materials", keys=[
+                ("client_materials", "client", client_id),
+                ("client_materials", "available", client_id),
+            ])
@@ -0,0 +1,389 @@
+"""
+Servicio de liquidaciones de sueldo.
+
+Calcula en una sola pasada la liquidación de todos los trabajadores activos
+para uno o varios meses:
+
+- Sueldo base según el tipo de contrato (ver PayScheme): mensual fijo,
+  valor del día por los días con entregas, o valor por kilo de la
+  producción del mes.
+- Producción: pesajes del trabajador en el mes, agregados por la base de
+  datos (cantidad, gramos exactos y días distintos).
+- Bonos y descuentos de payroll_adjustments.
+
+Los montos son pesos enteros, con el mismo redondeo que la valorización de
+pesajes (ver pricing_service.py).
+
+Cada liquidación se guarda en payroll_results junto con los contadores de
+cambios del trabajador y el mes (ver core/database/payroll_tables.py). Al
+volver a calcular, solo se recalculan los pares (trabajador, mes) cuyos
+datos cambiaron; si son varios meses, la agregación de cada mes se reparte
+en un pool de procesos, cada uno con su propia conexión de solo lectura.
+"""
+import json
+import logging
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from core.database.payroll_tables import (
+    ADJUSTMENTS_TABLE, ALL_PERIODS, RESULTS_TABLE, VERSIONS_TABLE
+)
+from core.services.pricing_service import month_bounds, to_cents, weight_amount
+from models.payroll import AdjustmentKind, PayScheme, PayrollAdjustment
+
+logger = logging.getLogger(__name__)
+
+# Meses a recalcular desde los que conviene repartir el trabajo en procesos
+PARALLEL_MIN_MONTHS = 2
+
+# Producción de un mes por trabajador: pesajes, gramos exactos y días con entregas
+_PRODUCTION_QUERY = """
+SELECT worker_id, COUNT(*), SUM(CAST(net_weight_kg * 1000 + 0.5 AS INTEGER)),
+       COUNT(DISTINCT substr(weighed_at, 1, 10))
+FROM weighings
+WHERE weighed_at >= ? AND weighed_at < ? AND worker_id IS NOT NULL
+GROUP BY worker_id
+"""
+
+
+def month_range(start_month, end_month=None):
+    """
+    Obtiene los meses de un rango, ambos incluidos.
+
+    Args:
+        start_month (str): Primer mes ('YYYY-MM')
+        end_month (str, optional): Último mes (por defecto, el primero)
+
+    Returns:
+        list: Meses en formato 'YYYY-MM'
+
+    Raises:
+        ValueError: Si el rango no es válido
+    """
+    end_month = end_month or start_month
+    year, number = (int(part) for part in start_month.split("-"))
+    months = []
+    while True:
+        month = f"{year:04d}-{number:02d}"
+        if month > end_month:
+            break
+        months.append(month)
+        year, number = (year + 1, 1) if number == 12 else (year, number + 1)
+    if not months:
+        raise ValueError(f"Rango de meses no válido: {start_month} a {end_month}")
+    return months
+
+
+def aggregate_production(db_path, month):
+    """
+    Agrega la producción de un mes desde una conexión propia (se ejecuta en
+    los procesos del pool).
+
+    Args:
+        db_path (str): Ruta absoluta de la base de datos
+        month (str): Mes 'YYYY-MM'
+
+    Returns:
+        tuple: (mes, dict worker_id -> (pesajes, gramos, días))
+    """
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+    try:
+        rows = connection.execute(_PRODUCTION_QUERY, month_bounds(month)).fetchall()
+    finally:
+        connection.close()
+    return month, {row[0]: tuple(row[1:]) for row in rows}
+
+
+def compute_payslip(worker, month, production, bonuses, deductions):
+    """
+    Calcula la liquidación de un trabajador en un mes.
+
+    Args:
+        worker (tuple): (id, nombre, rut, tipo de contrato, sueldo)
+        month (str): Mes 'YYYY-MM'
+        production (tuple): (pesajes, gramos, días con entregas)
+        bonuses (int): Suma de bonos (pesos)
+        deductions (int): Suma de descuentos (pesos)
+
+    Returns:
+        dict: Liquidación (montos en pesos enteros)
+    """
+    worker_id, name, rut, contract_type, salary = worker
+    weighing_count, grams, days = production
+    scheme = PayScheme.for_contract(contract_type)
+    if scheme == PayScheme.PRODUCTION:
+        base = weight_amount(grams, to_cents(salary))
+    elif scheme == PayScheme.DAILY:
+        base = days * int((salary or 0.0) + 0.5)
+    else:
+        base = int((salary or 0.0) + 0.5)
+    return {
+        "worker_id": worker_id,
+        "worker_name": name,
+        "rut": rut,
+        "period": month,
+        "scheme": scheme,
+        "weighing_count": weighing_count,
+        "total_kg": grams / 1000,
+        "days_worked": days,
+        "base": base,
+        "bonuses": bonuses,
+        "deductions": deductions,
+        "net": base + bonuses - deductions,
+    }
+
+
+class PayrollService:
+    """Servicio de cálculo de liquidaciones de sueldo."""
+
+    def __init__(self, data_manager):
+        """
+        Inicializa el servicio de liquidaciones.
+
+        Args:
+            data_manager: Gestor de base de datos
+        """
+        self.db_manager = data_manager
+
+    # ------------------------------------------------------------------
+    # Bonos y descuentos
+    # ------------------------------------------------------------------
+
+    def get_adjustments(self, worker_id, period):
+        """
+        Obtiene los bonos y descuentos de un trabajador en un mes.
+
+        Args:
+            worker_id (int): ID del trabajador
+            period (str): Mes 'YYYY-MM'
+
+        Returns:
+            list: Objetos PayrollAdjustment
+        """
+        result = self.db_manager.execute_query(
+            f"SELECT id, worker_id, period, kind, amount, description FROM {ADJUSTMENTS_TABLE} "
+            f"WHERE period = ? AND worker_id = ? ORDER BY id",
+            (period, worker_id)
+        )
+        return [PayrollAdjustment.from_dict(row) for row in result or []]
+
+    def save_adjustment(self, adjustment):
+        """
+        Registra un bono o descuento (invalida la liquidación de ese trabajador y mes).
+
+        Args:
+            adjustment (PayrollAdjustment): Ajuste a registrar
+
+        Returns:
+            int: ID del ajuste, o None si hubo un error
+
+        Raises:
+            ValueError: Si el ajuste no es válido
+        """
+        if adjustment.kind not in AdjustmentKind.get_all_kinds():
+            raise ValueError("Tipo de ajuste no válido")
+        if int(adjustment.amount) <= 0:
+            raise ValueError("El monto debe ser mayor que cero")
+        month_range(adjustment.period)
+        if adjustment.id:
+            result = self.db_manager.execute_query(
+                f"UPDATE {ADJUSTMENTS_TABLE} SET period = ?, kind = ?, amount = ?, description = ? "
+                f"WHERE id = ?",
+                (adjustment.period, adjustment.kind, int(adjustment.amount),
+                 adjustment.description, adjustment.id)
+            )
+            return adjustment.id if result else None
+        adjustment.id = self.db_manager.execute_query(
+            f"INSERT INTO {ADJUSTMENTS_TABLE} (worker_id, period, kind, amount, description) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            (adjustment.worker_id, adjustment.period, adjustment.kind,
+             int(adjustment.amount), adjustment.description)
+        )
+        return adjustment.id
+
+    def delete_adjustment(self, adjustment_id):
+        """
+        Elimina un bono o descuento.
+
+        Args:
+            adjustment_id (int): ID del ajuste
+
+        Returns:
+            bool: True si se eliminó correctamente
+        """
+        result = self.db_manager.execute_query(
+            f"DELETE FROM {ADJUSTMENTS_TABLE} WHERE id = ?", (adjustment_id,)
+        )
+        return result is not None and result is not False
+
+    # ------------------------------------------------------------------
+    # Cálculo
+    # ------------------------------------------------------------------
+
+    def run_payroll(self, start_month, end_month=None, processes=None, use_cache=True):
+        """
+        Calcula las liquidaciones de todos los trabajadores activos.
+
+        Args:
+            start_month (str): Primer mes ('YYYY-MM')
+            end_month (str, optional): Último mes, incluido (por defecto, el primero)
+            processes (int, optional): Procesos para agregar la producción
+                (por defecto, uno por CPU; 1 = sin pool)
+            use_cache (bool, optional): Reutilizar las liquidaciones vigentes
+
+        Returns:
+            dict: months, results (liquidaciones ordenadas por mes y nombre),
+                computed y cached (cuántas se calcularon y cuántas se
+                reutilizaron); None si hubo un error
+        """
+        months = month_range(start_month, end_month)
+        result = self.db_manager.fetch_rows(
+            "SELECT id, name, rut, contract_type, salary FROM workers WHERE is_active = 1"
+        )
+        if result is None:
+            return None
+        workers = {row[0]: row for row in result[1]}
+
+        # Los contadores se leen antes que los datos: si algo cambia durante
+        # el cálculo, la liquidación guardada queda vencida y se recalcula
+        versions = self._load_versions(months)
+        cached = self._load_cached(months) if use_cache else {}
+
+        results = []
+        stale = {}
+        for month in months:
+            for worker_id in workers:
+                key = (worker_id, month)
+                current = (versions.get(key, 0), versions.get((worker_id, ALL_PERIODS), 0))
+                entry = cached.get(key)
+                if entry is not None and entry[0] == current:
+                    results.append(entry[1])
+                else:
+                    stale.setdefault(month, {})[worker_id] = current
+        cached_count = len(results)
+
+        if stale:
+            production = self._aggregate(sorted(stale), processes)
+            adjustments = self._load_adjustment_totals(sorted(stale))
+            computed = []
+            for month, month_workers in stale.items():
+                for worker_id, current in month_workers.items():
+                    bonuses, deductions = adjustments.get((worker_id, month), (0, 0))
+                    payslip = compute_payslip(
+                        workers[worker_id], month,
+                        production[month].get(worker_id, (0, 0, 0)), bonuses, deductions
+                    )
+                    computed.append((worker_id, month, current, payslip))
+            self._store(computed)
+            results.extend(payslip for _, _, _, payslip in computed)
+
+        results.sort(key=lambda payslip: (payslip["period"], payslip["worker_name"], payslip["worker_id"]))
+        return {
+            "months": months,
+            "results": results,
+            "computed": len(results) - cached_count,
+            "cached": cached_count,
+        }
+
+    def invalidate(self, start_month=None, end_month=None):
+        """
+        Descarta liquidaciones guardadas (p. ej. tras cambiar las reglas de cálculo).
+
+        Args:
+            start_month (str, optional): Primer mes (por defecto, todas)
+            end_month (str, optional): Último mes, incluido
+
+        Returns:
+            bool: True si se eliminaron correctamente
+        """
+        if start_month is None:
+            return self.db_manager.execute_query(f"DELETE FROM {RESULTS_TABLE}") is not None
+        months = month_range(start_month, end_month)
+        placeholders = ", ".join("?" * len(months))
+        result = self.db_manager.execute_query(
+            f"DELETE FROM {RESULTS_TABLE} WHERE period IN ({placeholders})", tuple(months)
+        )
+        return result is not None
+
+    # ------------------------------------------------------------------
+    # Implementación interna
+    # ------------------------------------------------------------------
+
+    def _aggregate(self, months, processes):
+        """Producción por trabajador de cada mes: {mes: {worker_id: (pesajes, gramos, días)}}."""
+        processes = processes or os.cpu_count() or 1
+        if processes > 1 and len(months) >= PARALLEL_MIN_MONTHS:
+            db_path = os.path.abspath(self.db_manager.db_path)
+            try:
+                with ProcessPoolExecutor(max_workers=min(processes, len(months))) as pool:
+                    return dict(pool.map(aggregate_production, [db_path] * len(months), months))
+            except Exception as e:
+                logger.warning(f"No se pudo usar el pool de procesos ({e}); se calcula en este proceso")
+        production = {}
+        for month in months:
+            result = self.db_manager.fetch_rows(_PRODUCTION_QUERY, month_bounds(month))
+            rows = result[1] if result is not None else []
+            production[month] = {row[0]: tuple(row[1:]) for row in rows}
+        return production
+
+    def _in_months(self, column, months):
+        return f"{column} IN ({', '.join('?' * len(months))})"
+
+    def _load_versions(self, months):
+        periods = tuple(months) + (ALL_PERIODS,)
+        result = self.db_manager.fetch_rows(
+            f"SELECT worker_id, period, version FROM {VERSIONS_TABLE} "
+            f"WHERE {self._in_months('period', periods)}",
+            periods
+        )
+        rows = result[1] if result is not None else []
+        return {(worker_id, period): version for worker_id, period, version in rows}
+
+    def _load_cached(self, months):
+        result = self.db_manager.fetch_rows(
+            f"SELECT worker_id, period, input_version, worker_version, result FROM {RESULTS_TABLE} "
+            f"WHERE {self._in_months('period', months)}",
+            tuple(months)
+        )
+        rows = result[1] if result is not None else []
+        return {
+            (worker_id, period): ((input_version, worker_version), json.loads(payslip))
+            for worker_id, period, input_version, worker_version, payslip in rows
+        }
+
+    def _load_adjustment_totals(self, months):
+        result = self.db_manager.fetch_rows(
+            f"SELECT worker_id, period, kind, SUM(amount) FROM {ADJUSTMENTS_TABLE} "
+            f"WHERE {self._in_months('period', months)} GROUP BY worker_id, period, kind",
+            tuple(months)
+        )
+        totals = {}
+        for worker_id, period, kind, amount in (result[1] if result is not None else []):
+            bonuses, deductions = totals.get((worker_id, period), (0, 0))
+            if kind == AdjustmentKind.BONUS:
+                bonuses += amount
+            elif kind == AdjustmentKind.DEDUCTION:
+                deductions += amount
+            totals[(worker_id, period)] = (bonuses, deductions)
+        return totals
+
+    def _store(self, computed):
+        """Guarda las liquidaciones calculadas con los contadores usados."""
+        try:
+            with self.db_manager.transaction() as connection:
+                connection.executemany(f"""
+                INSERT INTO {RESULTS_TABLE} (worker_id, period, input_version, worker_version, result)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (period, worker_id) DO UPDATE SET
+                    input_version = excluded.input_version,
+                    worker_version = excluded.worker_version,
+                    result = excluded.result,
+                    computed_at = CURRENT_TIMESTAMP
+                """, [
+                    (worker_id, month, current[0], current[1], json.dumps(payslip))
+                    for worker_id, month, current, payslip in computed
+                ])
+        except Exception as e:
+            # Sin caché el resultado sigue siendo correcto: se recalculará la próxima vez
+            logger.error(f"Error al guardar liquidaciones: {e}")
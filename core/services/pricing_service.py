@@ -0,0 +1,324 @@
+"""
+Valorización de pesajes: montos neto, IVA y total.
+
+Los montos se calculan en pesos enteros, con aritmética exacta: el peso se
+lleva a gramos y el precio por kilo a centavos, y cada redondeo es "mitad
+hacia arriba" sobre enteros. Así un cierre da siempre el mismo resultado,
+sin los errores acumulados de sumar miles de montos en coma flotante.
+
+Reglas (IVA de ``IVA_PERCENT``):
+
+- Precio sin IVA (``includes_tax`` = 0): la línea vale peso x precio
+  redondeado al peso; ese es su neto.
+- Precio con IVA (``includes_tax`` = 1): la línea vale peso x precio; ese
+  es su total, y el neto se obtiene descontando el IVA.
+- En un documento el IVA se calcula una sola vez sobre el total de sus
+  líneas (como lo exige el SII), no sumando el IVA redondeado de cada
+  línea.
+
+Los cálculos trabajan sobre columnas (listas paralelas) en una sola pasada.
+El cierre lee ``client_materials`` una vez y la une en memoria con los
+pesajes del mes, en lugar de buscar el precio de cada pesaje en la base de
+datos: cerrar un mes con 100.000 pesajes toma unas décimas de segundo.
+"""
+from datetime import date
+
+from models.client import ClientType
+
+# Tasa de IVA (porcentaje entero)
+IVA_PERCENT = 19
+
+# Escala de los montos de una línea: gramos x centavos por kilo
+_LINE_SCALE = 1000 * 100
+
+
+class DocumentKind:
+    """Constantes para el tipo de documento que genera un cierre."""
+    PURCHASE = "purchase"
+    SALE = "sale"
+
+    @classmethod
+    def for_client_type(cls, client_type):
+        """Retorna el tipo de documento según el tipo de cliente"""
+        return cls.SALE if client_type == ClientType.BUYER else cls.PURCHASE
+
+    @classmethod
+    def get_display_name(cls, kind):
+        """Retorna el nombre para mostrar de un tipo de documento"""
+        display_names = {
+            cls.PURCHASE: "Compra",
+            cls.SALE: "Venta"
+        }
+        return display_names.get(kind, "Desconocido")
+
+
+def _round_div(numerator, denominator):
+    """División entera redondeada mitad hacia arriba (numerador >= 0)."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def to_grams(weight_kg):
+    """Convierte kilos (no negativos) a gramos enteros."""
+    return int(weight_kg * 1000 + 0.5)
+
+
+def to_cents(price):
+    """Convierte un precio en pesos (no negativo) a centavos enteros."""
+    return int((price or 0.0) * 100 + 0.5)
+
+
+def weight_amount(grams, cents):
+    """
+    Valoriza un peso a un precio por kilo.
+
+    Args:
+        grams (int): Peso en gramos
+        cents (int): Precio por kilo en centavos
+
+    Returns:
+        int: Monto redondeado al peso
+    """
+    return _round_div(grams * cents, _LINE_SCALE)
+
+
+def net_from_gross(gross):
+    """
+    Obtiene el neto de un monto que incluye IVA.
+
+    Args:
+        gross (int): Monto con IVA (pesos)
+
+    Returns:
+        int: Monto neto (pesos)
+    """
+    return _round_div(gross * 100, 100 + IVA_PERCENT)
+
+
+def iva_from_net(net):
+    """
+    Obtiene el IVA de un monto neto.
+
+    Args:
+        net (int): Monto neto (pesos)
+
+    Returns:
+        int: IVA (pesos)
+    """
+    return _round_div(net * IVA_PERCENT, 100)
+
+
+def line_amounts(grams, cents, includes_tax):
+    """
+    Valoriza un conjunto de líneas en una sola pasada.
+
+    Args:
+        grams (list): Peso de cada línea en gramos
+        cents (list): Precio por kilo de cada línea en centavos
+        includes_tax (list): Si el precio de cada línea incluye IVA
+
+    Returns:
+        tuple: Listas (neto, iva, total) en pesos, paralelas a la entrada
+    """
+    amounts = [_round_div(g * c, _LINE_SCALE) for g, c in zip(grams, cents)]
+    nets = [net_from_gross(a) if taxed else a for a, taxed in zip(amounts, includes_tax)]
+    grosses = [a if taxed else a + iva_from_net(a) for a, taxed in zip(amounts, includes_tax)]
+    ivas = [gross - net for net, gross in zip(nets, grosses)]
+    return nets, ivas, grosses
+
+
+def document_totals(untaxed_net, taxed_gross):
+    """
+    Calcula los totales de un documento con el IVA sobre el total.
+
+    Args:
+        untaxed_net (int): Suma de las líneas con precio sin IVA (pesos)
+        taxed_gross (int): Suma de las líneas con precio con IVA (pesos)
+
+    Returns:
+        tuple: (neto, iva, total) del documento en pesos
+    """
+    taxed_net = net_from_gross(taxed_gross)
+    net = untaxed_net + taxed_net
+    iva = iva_from_net(untaxed_net) + (taxed_gross - taxed_net)
+    return net, iva, net + iva
+
+
+def month_bounds(month):
+    """
+    Obtiene el rango de fechas de un mes, para comparar con weighed_at.
+
+    Args:
+        month (str): Mes en formato 'YYYY-MM'
+
+    Returns:
+        tuple: (inicio incluido, fin excluido) en formato 'YYYY-MM-DD HH:MM:SS'
+    """
+    year, number = (int(part) for part in month.split("-"))
+    start = date(year, number, 1)
+    end = date(year + 1, 1, 1) if number == 12 else date(year, number + 1, 1)
+    return f"{start.isoformat()} 00:00:00", f"{end.isoformat()} 00:00:00"
+
+
+class PricingService:
+    """Servicio de valorización de pesajes y cierre mensual."""
+
+    def __init__(self, data_manager):
+        """
+        Inicializa el servicio de valorización.
+
+        Args:
+            data_manager: Gestor de base de datos
+        """
+        self.db_manager = data_manager
+
+    def get_prices(self, client_ids=None):
+        """
+        Obtiene los precios acordados con los clientes (una sola consulta).
+
+        Args:
+            client_ids (iterable, optional): IDs de cliente (por defecto, todos)
+
+        Returns:
+            dict: (client_id, material_id) -> (precio, incluye IVA)
+        """
+        query = "SELECT client_id, material_id, price, includes_tax FROM client_materials"
+        params = ()
+        if client_ids is not None:
+            params = tuple(sorted(set(client_ids)))
+            if not params:
+                return {}
+            query += f" WHERE client_id IN ({', '.join('?' * len(params))})"
+        result = self.db_manager.fetch_rows(query, params)
+        if result is None:
+            return {}
+        return {
+            (client_id, material_id): (price or 0.0, bool(includes_tax))
+            for client_id, material_id, price, includes_tax in result[1]
+        }
+
+    def price_weighings(self, weighings):
+        """
+        Valoriza un lote de pesajes de clientes.
+
+        Se usa el precio registrado en el pesaje y, si no tiene, el acordado
+        con el cliente; si el precio incluye IVA o no lo indica siempre el
+        acuerdo con el cliente. Los pesajes de trabajadores valen 0.
+
+        Args:
+            weighings (list): Objetos Weighing
+
+        Returns:
+            list: Tuplas (neto, iva, total) en pesos, en el orden de entrada
+        """
+        prices = self.get_prices(w.client_id for w in weighings if w.client_id is not None)
+        grams, cents, taxed = _price_columns(
+            [(w.client_id, w.material_id, w.net_weight_kg if w.client_id is not None else 0.0,
+              w.price_per_kg) for w in weighings],
+            prices
+        )
+        return list(zip(*line_amounts(grams, cents, taxed)))
+
+    def close_month(self, month):
+        """
+        Calcula las compras y ventas de un mes a partir de los pesajes.
+
+        Se genera un documento por cliente: venta si el cliente es comprador
+        y compra en los demás casos. Los pesajes de trabajadores no generan
+        documentos.
+
+        Args:
+            month (str): Mes en formato 'YYYY-MM'
+
+        Returns:
+            dict: month, documents (lista de dict con client_id, client_name,
+                rut, kind, weighing_count, total_kg, net, iva, gross y
+                unpriced, los pesajes sin precio) y totals (neto, iva y total
+                por tipo de documento); None si hubo un error
+        """
+        start, end = month_bounds(month)
+        # client_materials es pequeña: se une en memoria, sin una búsqueda por pesaje
+        prices = self.get_prices()
+        result = self.db_manager.fetch_rows("""
+        SELECT client_id, material_id, net_weight_kg, price_per_kg
+        FROM weighings
+        WHERE weighed_at >= ? AND weighed_at < ? AND client_id IS NOT NULL
+        """, (start, end))
+        if result is None:
+            return None
+        rows = result[1]
+        grams, cents, taxed = _price_columns(rows, prices)
+        nets, _, grosses = line_amounts(grams, cents, taxed)
+
+        # Acumuladores por cliente: [pesajes, gramos, neto sin IVA, total con IVA, sin precio]
+        documents = {}
+        for row, g, c, is_taxed, net, gross in zip(rows, grams, cents, taxed, nets, grosses):
+            totals = documents.get(row[0])
+            if totals is None:
+                totals = documents[row[0]] = [0, 0, 0, 0, 0]
+            totals[0] += 1
+            totals[1] += g
+            if is_taxed:
+                totals[3] += gross
+            else:
+                totals[2] += net
+            if not c:
+                totals[4] += 1
+
+        return self._build_close(month, documents)
+
+    def _build_close(self, month, documents):
+        """Arma el resultado del cierre con los datos de cada cliente."""
+        clients = {}
+        if documents:
+            placeholders = ", ".join("?" * len(documents))
+            result = self.db_manager.fetch_rows(
+                f"SELECT id, name, rut, client_type FROM clients WHERE id IN ({placeholders})",
+                tuple(documents)
+            )
+            if result is not None:
+                clients = {row[0]: row[1:] for row in result[1]}
+
+        summary = {
+            kind: {"net": 0, "iva": 0, "gross": 0}
+            for kind in (DocumentKind.PURCHASE, DocumentKind.SALE)
+        }
+        output = []
+        for client_id, (count, grams, untaxed_net, taxed_gross, unpriced) in documents.items():
+            name, rut, client_type = clients.get(client_id, ("", "", ClientType.BOTH))
+            kind = DocumentKind.for_client_type(client_type)
+            net, iva, gross = document_totals(untaxed_net, taxed_gross)
+            output.append({
+                "client_id": client_id,
+                "client_name": name,
+                "rut": rut,
+                "kind": kind,
+                "weighing_count": count,
+                "total_kg": grams / 1000,
+                "net": net,
+                "iva": iva,
+                "gross": gross,
+                "unpriced": unpriced,
+            })
+            summary[kind]["net"] += net
+            summary[kind]["iva"] += iva
+            summary[kind]["gross"] += gross
+
+        output.sort(key=lambda document: (document["kind"], document["client_name"]))
+        return {"month": month, "documents": output, "totals": summary}
+
+
+def _price_columns(rows, prices):
+    """
+    Convierte filas (client_id, material_id, kilos, precio del pesaje) en
+    columnas de gramos, centavos por kilo e incluye IVA.
+    """
+    grams = []
+    cents = []
+    taxed = []
+    no_price = (0.0, False)
+    for client_id, material_id, weight_kg, price_per_kg in rows:
+        agreed_price, includes_tax = prices.get((client_id, material_id), no_price)
+        grams.append(int(weight_kg * 1000 + 0.5))
+        cents.append(int((price_per_kg or agreed_price) * 100 + 0.5))
+        taxed.append(includes_tax)
+    return grams, cents, taxed
@@ -0,0 +1,271 @@
+"""
+Servicio para el registro y la consulta de pesajes.
+
+Los pesajes son los datos de mayor volumen: varias balanzas envían cientos
+de lecturas por minuto. ``record_weighing`` solo valida y encola; un
+BatchWriter las confirma por lotes en su propio hilo, de modo que quien
+registra (la interfaz o el lector de una balanza) nunca espera a la base de
+datos.
+
+La tabla ``weighings`` es de solo inserción: la clave es el rowid (crece
+siempre al final del árbol) y solo tiene los índices imprescindibles: la
+fecha y el origen de las lecturas de balanza (que evita duplicarlas).
+Las consultas de la interfaz recorren por ``id`` descendente con LIMIT, y
+las métricas agregadas salen del resumen mensual (ver summaries.py).
+
+``amount`` es el neto de la línea en pesos enteros, calculado con las
+mismas reglas que el cierre mensual (ver pricing_service.py). El cierre
+calcula el IVA sobre el total de cada documento, así que en los precios
+con IVA la suma de ``amount`` puede diferir del neto del cierre en unos
+pesos de redondeo.
+"""
+import logging
+
+from core.database.batch_writer import BatchWriter
+from core.database.row_mapper import RowMapper, as_float
+from core.services.pricing_service import net_from_gross, to_cents, to_grams, weight_amount
+from models.weighing import PlasticState, Weighing
+
+logger = logging.getLogger(__name__)
+
+# Conversión directa de filas a objetos Weighing
+WEIGHING_MAPPER = RowMapper(Weighing, converters={
+    'net_weight_kg': as_float,
+    'price_per_kg': as_float,
+    'amount': as_float,
+})
+
+# Límites de una lectura válida (kilos)
+MAX_WEIGHT_KG = 100000.0
+
+# Pesajes que muestra la vista por defecto
+RECENT_LIMIT = 500
+
+_SELECT_WEIGHINGS = """
+SELECT w.*, m.name AS material_name, c.name AS client_name, k.name AS worker_name
+FROM weighings w
+LEFT JOIN materials m ON m.id = w.material_id
+LEFT JOIN clients c ON c.id = w.client_id
+LEFT JOIN workers k ON k.id = w.worker_id
+"""
+
+# Una lectura de balanza ya registrada (mismo source y source_seq) se omite
+_INSERT_WEIGHING = """
+INSERT INTO weighings (
+    weighed_at, material_id, client_id, worker_id, net_weight_kg,
+    plastic_state, price_per_kg, amount, notes, source, source_seq
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, source_seq) DO NOTHING
+"""
+
+
+class WeighingService:
+    """Servicio para operaciones con pesajes."""
+
+    def __init__(self, data_manager, batch_size=None, flush_interval=None):
+        """
+        Inicializa el servicio de pesajes.
+
+        Args:
+            data_manager: Gestor de base de datos
+            batch_size (int, optional): Pesajes por transacción
+            flush_interval (float, optional): Segundos máximos antes de confirmar
+        """
+        self.db_manager = data_manager
+        options = {}
+        if batch_size is not None:
+            options["batch_size"] = batch_size
+        if flush_interval is not None:
+            options["flush_interval"] = flush_interval
+        self.writer = BatchWriter(
+            data_manager, self.write_weighings, name="weighing-writer", **options
+        )
+
+    def validate_weighing(self, weighing):
+        """
+        Valida un pesaje antes de registrarlo.
+
+        Args:
+            weighing (Weighing): Pesaje a validar
+
+        Raises:
+            ValueError: Si el pesaje no es válido (el mensaje explica el motivo)
+        """
+        if weighing.material_id is None:
+            raise ValueError("Debe indicar el material")
+        if (weighing.client_id is None) == (weighing.worker_id is None):
+            raise ValueError("Debe indicar un cliente o un trabajador")
+        try:
+            weight = float(weighing.net_weight_kg)
+        except (TypeError, ValueError):
+            raise ValueError("El peso debe ser un número")
+        if not 0 < weight <= MAX_WEIGHT_KG:
+            raise ValueError(f"El peso debe estar entre 0 y {MAX_WEIGHT_KG:,.0f} kg")
+        if weighing.plastic_state and weighing.plastic_state not in PlasticState.get_all_states():
+            raise ValueError("Condición del material no válida")
+        weighing.net_weight_kg = weight
+
+    def record_weighing(self, weighing):
+        """
+        Registra un pesaje. Vuelve de inmediato: se confirma en el próximo lote.
+
+        Args:
+            weighing (Weighing): Pesaje a registrar (recibe su ID al confirmarse)
+
+        Raises:
+            ValueError: Si el pesaje no es válido
+        """
+        self.validate_weighing(weighing)
+        self.writer.put(weighing)
+
+    def flush(self, timeout=None):
+        """
+        Espera a que se confirmen los pesajes registrados hasta el momento.
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera
+
+        Returns:
+            bool: True si se confirmaron todos
+        """
+        return self.writer.flush(timeout)
+
+    def close(self):
+        """Confirma los pesajes pendientes y detiene el escritor."""
+        return self.writer.close()
+
+    def get_recent_weighings(self, limit=RECENT_LIMIT):
+        """
+        Obtiene los últimos pesajes registrados.
+
+        Args:
+            limit (int, optional): Máximo de pesajes
+
+        Returns:
+            list: Objetos Weighing, del más reciente al más antiguo
+        """
+        query = _SELECT_WEIGHINGS + "ORDER BY w.id DESC LIMIT ?"
+        try:
+            weighings = self.db_manager.fetch_models(WEIGHING_MAPPER, query, (limit,))
+            return weighings if weighings is not None else []
+        except Exception as e:
+            logger.error(f"Error al obtener pesajes recientes: {e}")
+            return []
+
+    def get_weighings_since(self, last_id, limit=RECENT_LIMIT):
+        """
+        Obtiene los pesajes registrados después de un ID (los nuevos desde la última consulta).
+
+        Args:
+            last_id (int): Último ID ya conocido
+            limit (int, optional): Máximo de pesajes
+
+        Returns:
+            list: Objetos Weighing, del más reciente al más antiguo
+        """
+        query = _SELECT_WEIGHINGS + "WHERE w.id > ? ORDER BY w.id DESC LIMIT ?"
+        try:
+            weighings = self.db_manager.fetch_models(WEIGHING_MAPPER, query, (last_id, limit))
+            return weighings if weighings is not None else []
+        except Exception as e:
+            logger.error(f"Error al obtener pesajes nuevos: {e}")
+            return []
+
+    def get_weighings_between(self, start, end):
+        """
+        Obtiene los pesajes de un período.
+
+        Args:
+            start (str): Fecha y hora inicial, incluida ('YYYY-MM-DD HH:MM:SS')
+            end (str): Fecha y hora final, excluida
+
+        Returns:
+            list: Objetos Weighing en orden cronológico
+        """
+        query = _SELECT_WEIGHINGS + "WHERE w.weighed_at >= ? AND w.weighed_at < ? ORDER BY w.weighed_at"
+        try:
+            weighings = self.db_manager.fetch_models(WEIGHING_MAPPER, query, (start, end))
+            return weighings if weighings is not None else []
+        except Exception as e:
+            logger.error(f"Error al obtener pesajes del período: {e}")
+            return []
+
+    def delete_weighing(self, weighing_id):
+        """
+        Elimina un pesaje (el resumen mensual se corrige con los triggers).
+
+        Args:
+            weighing_id (int): ID del pesaje
+
+        Returns:
+            bool: True si se eliminó correctamente
+        """
+        result = self.db_manager.execute_query("DELETE FROM weighings WHERE id = ?", (weighing_id,))
+        return result is not None and result is not False
+
+    def _load_prices(self, connection, weighings):
+        """Obtiene el precio por kilo y si incluye IVA de cada par (cliente, material) del lote."""
+        client_ids = sorted({w.client_id for w in weighings if w.client_id is not None})
+        if not client_ids:
+            return {}
+        placeholders = ", ".join("?" * len(client_ids))
+        rows = connection.execute(
+            f"SELECT client_id, material_id, price, includes_tax FROM client_materials "
+            f"WHERE client_id IN ({placeholders})",
+            client_ids
+        ).fetchall()
+        return {
+            (client_id, material_id): (price or 0.0, bool(includes_tax))
+            for client_id, material_id, price, includes_tax in rows
+        }
+
+    def get_last_source_seq(self, source):
+        """
+        Obtiene el último número de lectura registrado de una balanza.
+
+        Args:
+            source (str): Balanza de origen
+
+        Returns:
+            int: Último source_seq (0 si no hay lecturas), o None si hubo un error
+        """
+        result = self.db_manager.execute_query(
+            "SELECT COALESCE(MAX(source_seq), 0) AS last_seq FROM weighings WHERE source = ?",
+            (source,)
+        )
+        return result[0]["last_seq"] if result else None
+
+    def write_weighings(self, connection, weighings):
+        """
+        Inserta un lote de pesajes dentro de una transacción abierta.
+
+        Las lecturas de balanza ya registradas (mismo source y source_seq) se
+        omiten, de modo que reenviar un lote no las duplica.
+
+        Args:
+            connection (sqlite3.Connection): Conexión de la transacción
+            weighings (list): Pesajes validados
+
+        Returns:
+            int: Pesajes insertados
+        """
+        prices = self._load_prices(connection, weighings)
+        no_price = (0.0, False)
+        cursor = connection.cursor()
+        inserted = 0
+        for weighing in weighings:
+            agreed_price, includes_tax = prices.get((weighing.client_id, weighing.material_id), no_price)
+            if not weighing.price_per_kg and weighing.client_id is not None:
+                weighing.price_per_kg = agreed_price
+            amount = weight_amount(to_grams(weighing.net_weight_kg), to_cents(weighing.price_per_kg))
+            weighing.amount = net_from_gross(amount) if includes_tax else amount
+            cursor.execute(_INSERT_WEIGHING, (
+                weighing.weighed_at, weighing.material_id, weighing.client_id,
+                weighing.worker_id, weighing.net_weight_kg, weighing.plastic_state or None,
+                weighing.price_per_kg, weighing.amount, weighing.notes,
+                weighing.source, weighing.source_seq,
+            ))
+            if cursor.rowcount == 1:
+                weighing.id = cursor.lastrowid
+                inserted += 1
+        return inserted
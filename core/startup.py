@@ -0,0 +1,67 @@
+"""
+Arranque de ISMAPP sin interfaz: importaciones y servicios de la aplicación.
+
+main.py importa la aplicación y crea sus servicios a través de este módulo,
+y scripts/check_startup_budget.py (modo core) hace lo mismo. Así la
+verificación del arranque en frío mide el camino real de main.py y no una
+lista copiada que se desactualiza al agregar un servicio.
+
+Uso:
+    from core.startup import DataManager, create_services
+
+    data_manager = DataManager()
+    services = create_services(data_manager)
+"""
+from importlib import import_module
+
+# Importaciones de la aplicación necesarias antes del login (las vistas de
+# los módulos se importan al construir cada uno, ver ISMV3App.VIEW_CLASSES)
+from core.database.data_manager import DataManager
+from core.database.change_tracker import ChangeTracker
+from core.utils.task_executor import TaskExecutor
+from models.user import User
+from user_preferences import UserPreferences
+
+# Servicios creados al arrancar, en orden: (nombre, módulo, descripción, argumentos)
+SERVICES = (
+    ("ClientService", "core.services.client_service", "clientes", {}),
+    ("MaterialService", "core.services.material_service", "materiales", {}),
+    ("UserService", "core.services.user_service", "usuarios", {}),
+    ("WorkerService", "services.worker_service", "trabajadores", {}),
+    # Escribe por lotes en su propio hilo y vive mientras la aplicación
+    # esté abierta (no depende de la vista)
+    ("WeighingService", "core.services.weighing_service", "pesajes", {}),
+    # Almacén por contenido en data/attachments
+    ("AttachmentService", "core.services.attachment_service", "adjuntos", {}),
+    # Copias en línea programadas tras el login, en el archivo deduplicado:
+    # cada copia diaria solo agrega lo que cambió
+    ("BackupService", "core.services.backup_service", "respaldos", {"archive": True}),
+)
+
+
+def create_services(data_manager, services=None):
+    """
+    Crea los servicios de la aplicación.
+
+    Un servicio cuyo módulo no se puede importar se informa y se omite; la
+    aplicación continúa sin él.
+
+    Args:
+        data_manager (DataManager): Gestor de datos compartido
+        services (dict, optional): Diccionario a completar; si un servicio
+            falla al crearse, conserva los creados hasta ese momento
+
+    Returns:
+        dict: Nombre del servicio -> instancia
+    """
+    if services is None:
+        services = {}
+    for name, module_name, description, kwargs in SERVICES:
+        try:
+            service_class = getattr(import_module(module_name), name)
+        except ImportError as e:
+            print(f"Error al importar {name}: {e}")
+            continue
+        services[name] = service_class(data_manager, **kwargs)
+        print(f"Servicio de {description} inicializado correctamente")
+    return services
@@ -0,0 +1,123 @@
+"""
+Copias de seguridad programadas para ISMAPP.
+
+El programador revisa cada ``CHECK_INTERVAL_MS`` (con ``after()``, desde el
+ciclo de Tk) si corresponde una copia. Solo la lanza cuando el usuario
+lleva ``idle_seconds`` sin usar el teclado ni el ratón, y la ejecuta en el
+TaskExecutor: la copia nunca se nota en la interfaz. La revisión en sí no
+toca el disco; la fecha de la última copia se lee una vez al iniciar, en
+segundo plano.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Intervalo entre revisiones
+CHECK_INTERVAL_MS = 60 * 1000
+
+# Espera antes de reintentar una copia que falló
+RETRY_DELAY = timedelta(hours=1)
+
+_TASK_KEY = "backup.scheduled"
+
+
+class BackupScheduler:
+    """Lanza copias de seguridad periódicas cuando la aplicación está ociosa."""
+
+    def __init__(self, root, backup_service, task_executor, interval_hours=24, idle_seconds=120,
+                 on_report=None):
+        """
+        Inicializa el programador.
+
+        Args:
+            root: Ventana principal (para after() y los eventos de uso)
+            backup_service (BackupService): Servicio de respaldos
+            task_executor (TaskExecutor): Ejecutor de tareas en segundo plano
+            interval_hours (float, optional): Horas entre copias
+            idle_seconds (float, optional): Inactividad requerida antes de copiar
+            on_report (callable, optional): Función informe -> None, llamada en
+                el hilo de Tk tras cada copia
+        """
+        self.root = root
+        self.backup_service = backup_service
+        self.task_executor = task_executor
+        self.interval = timedelta(hours=interval_hours)
+        self.idle_seconds = idle_seconds
+        self.on_report = on_report
+
+        self.last_backup_at = None
+        self.last_report = None
+        self._next_attempt_at = None
+        self._last_activity = time.monotonic()
+        self._job = None
+        self._running = False
+        self._ready = False
+
+    def start(self):
+        """Empieza a revisar si corresponde una copia."""
+        if self._job is not None:
+            return
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>", "<Motion>"):
+            self.root.bind_all(sequence, self._on_activity, add="+")
+        # La fecha de la última copia se lee del disco en segundo plano
+        self.task_executor.submit(
+            "backup.last", self.backup_service.list_backups, on_success=self._on_backups_listed
+        )
+        self._job = self.root.after(CHECK_INTERVAL_MS, self._check)
+
+    def stop(self):
+        """Deja de revisar (una copia en curso termina normalmente)."""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def run_now(self):
+        """Lanza una copia de inmediato, aunque la base de datos no haya cambiado."""
+        self._launch(force=True, reason="manual")
+
+    def _on_activity(self, _event=None):
+        self._last_activity = time.monotonic()
+
+    def _on_backups_listed(self, backups):
+        self.last_backup_at = backups[0][0] if backups else None
+        self._ready = True
+
+    def _is_due(self, now):
+        if self._next_attempt_at is not None and now < self._next_attempt_at:
+            return False
+        return self.last_backup_at is None or now - self.last_backup_at >= self.interval
+
+    def _check(self):
+        """Revisión periódica: solo comparaciones en memoria."""
+        self._job = self.root.after(CHECK_INTERVAL_MS, self._check)
+        if not self._ready or self._running:
+            return
+        if time.monotonic() - self._last_activity < self.idle_seconds:
+            return
+        if self._is_due(datetime.now()):
+            self.root.after_idle(self._launch)
+
+    def _launch(self, force=False, reason="programada"):
+        if self._running:
+            return
+        self._running = True
+        self.task_executor.submit(
+            _TASK_KEY, self.backup_service.run_backup, force, reason,
+            on_success=self._on_finished, on_error=self._on_failed
+        )
+
+    def _on_finished(self, report):
+        self._running = False
+        self._next_attempt_at = None
+        # Una copia omitida (sin cambios) también cuenta para el intervalo
+        self.last_backup_at = datetime.now()
+        self.last_report = report
+        if self.on_report is not None:
+            self.on_report(report)
+
+    def _on_failed(self, error):
+        self._running = False
+        self._next_attempt_at = datetime.now() + RETRY_DELAY
+        logger.error(f"Error en la copia de seguridad programada: {error}")
@@ -0,0 +1,131 @@
+"""
+Medición del arranque de ISMAPP.
+
+Registra el tiempo de pared de cada fase del arranque (importaciones,
+verificación de la base de datos, tema, ventana de login, construcción de
+módulos) para detectar qué fase se encarece de una versión a otra.
+
+Las fases se registran siempre (el costo es despreciable); el resumen solo
+se imprime si la variable de entorno ``ISMAPP_PROFILE_STARTUP`` está
+definida. Si su valor termina en ``.json`` el resumen además se guarda en
+ese archivo, que es lo que usa ``scripts/check_startup_budget.py``.
+
+Uso:
+    from core.utils.startup_profiler import profiler
+
+    with profiler.phase("imports"):
+        import modulo_pesado
+    ...
+    profiler.report()
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Variable de entorno que activa el resumen ("1" o ruta a un archivo .json)
+ENV_VAR = "ISMAPP_PROFILE_STARTUP"
+
+# Si está definida, la aplicación se cierra al mostrar el login (medición automatizada)
+EXIT_ENV_VAR = "ISMAPP_PROFILE_STARTUP_EXIT"
+
+
+class StartupProfiler:
+    """Cronómetro de las fases del arranque."""
+
+    def __init__(self, setting=None, exit_after_startup=None):
+        """
+        Inicializa el cronómetro; el origen de tiempos es el momento de creación.
+
+        Args:
+            setting (str, optional): Valor de activación (por defecto, el de ENV_VAR)
+            exit_after_startup (bool, optional): Cerrar la aplicación al terminar
+                el arranque (por defecto, según EXIT_ENV_VAR)
+        """
+        if setting is None:
+            setting = os.environ.get(ENV_VAR, "")
+        if exit_after_startup is None:
+            exit_after_startup = bool(os.environ.get(EXIT_ENV_VAR))
+
+        self.enabled = bool(setting)
+        self.output_path = setting if setting.lower().endswith(".json") else None
+        self.exit_after_startup = exit_after_startup
+        self.origin = time.perf_counter()
+        self.phases = []      # [(nombre, inicio_ms, duración_ms)]
+        self.marks = {}       # nombre -> ms desde el origen
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Mide la duración de un bloque.
+
+        Args:
+            name (str): Nombre de la fase
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            self.phases.append((
+                name,
+                (started - self.origin) * 1000,
+                (finished - started) * 1000,
+            ))
+
+    def mark(self, name):
+        """
+        Registra un hito (p. ej. "login_shown") como milisegundos desde el origen.
+
+        Args:
+            name (str): Nombre del hito
+
+        Returns:
+            float: Milisegundos desde el origen
+        """
+        elapsed_ms = (time.perf_counter() - self.origin) * 1000
+        self.marks[name] = elapsed_ms
+        return elapsed_ms
+
+    def summary(self):
+        """
+        Obtiene el resumen del arranque.
+
+        Returns:
+            dict: Fases (con inicio y duración en ms), hitos y total por fase
+        """
+        totals = {}
+        for name, _, duration_ms in self.phases:
+            totals[name] = totals.get(name, 0.0) + duration_ms
+        return {
+            "phases": [
+                {"name": name, "start_ms": round(start_ms, 2), "duration_ms": round(duration_ms, 2)}
+                for name, start_ms, duration_ms in self.phases
+            ],
+            "totals_ms": {name: round(ms, 2) for name, ms in totals.items()},
+            "marks_ms": {name: round(ms, 2) for name, ms in self.marks.items()},
+        }
+
+    def report(self):
+        """Imprime el resumen (y lo guarda en JSON) si la medición está activada."""
+        if not self.enabled:
+            return
+        summary = self.summary()
+
+        print("Arranque (ms desde el inicio del proceso de la aplicación):")
+        for phase in summary["phases"]:
+            print(f"  {phase['name']:<32} {phase['duration_ms']:8.1f} ms "
+                  f"(inicio {phase['start_ms']:.1f})")
+        for name, elapsed_ms in summary["marks_ms"].items():
+            print(f"  [{name}] {elapsed_ms:.1f} ms")
+
+        if self.output_path:
+            try:
+                with open(self.output_path, "w", encoding="utf-8") as f:
+                    json.dump(summary, f, indent=2)
+            except OSError as e:
+                print(f"Error al guardar la medición del arranque: {e}")
+
+
+# Cronómetro de la aplicación (se crea al importar este módulo, lo primero en main.py)
+profiler = StartupProfiler()
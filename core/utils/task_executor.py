@@ -0,0 +1,194 @@
+"""
+Ejecución de tareas en segundo plano para la interfaz de ISMAPP.
+
+Las consultas a la base de datos (que puede estar en una carpeta compartida
+lenta) se ejecutan en un pool de hilos; los resultados vuelven al hilo de
+Tk a través de una cola que se vacía con ``after()``, porque los widgets
+solo pueden tocarse desde el hilo principal.
+
+Cada tarea tiene una clave (p. ej. ``"clients"``). Enviar una tarea con una
+clave ya en curso la reemplaza: el resultado de la anterior se descarta
+aunque termine después, de modo que un resultado tardío nunca pisa a uno
+más reciente.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Hilos del pool por defecto
+DEFAULT_MAX_WORKERS = 4
+
+# Intervalo con que el hilo de Tk revisa los resultados pendientes
+POLL_INTERVAL_MS = 30
+
+
+class Task:
+    """Tarea enviada al ejecutor."""
+
+    __slots__ = ("key", "owner", "on_success", "on_error", "future", "cancelled")
+
+    def __init__(self, key, owner, on_success, on_error):
+        self.key = key
+        self.owner = owner
+        self.on_success = on_success
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Cancela la tarea: no se ejecuta si no empezó y su resultado se descarta."""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskExecutor:
+    """Pool de hilos cuyos resultados se entregan en el hilo de Tk."""
+
+    def __init__(self, root, max_workers=DEFAULT_MAX_WORKERS, poll_interval_ms=POLL_INTERVAL_MS):
+        """
+        Inicializa el ejecutor.
+
+        Args:
+            root: Ventana principal (para programar la entrega con after())
+            max_workers (int, optional): Hilos del pool
+            poll_interval_ms (int, optional): Intervalo de revisión de resultados
+        """
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ismapp-task")
+        self._results = queue.Queue()
+        self._latest = {}          # clave -> tarea vigente
+        self._lock = threading.Lock()
+        self._poll_job = None
+        self._closed = False
+
+    def submit(self, key, function, *args, on_success=None, on_error=None, owner=None):
+        """
+        Ejecuta una función en segundo plano.
+
+        Args:
+            key (str): Clave de la tarea; reemplaza a la tarea vigente con la misma clave
+            function (callable): Función a ejecutar en el pool (sin tocar widgets)
+            *args: Argumentos de la función
+            on_success (callable, optional): Función resultado -> None, llamada en el hilo de Tk
+            on_error (callable, optional): Función excepción -> None, llamada en el hilo de Tk
+            owner (optional): Widget dueño; si ya no existe, el resultado se descarta
+
+        Returns:
+            Task: Tarea enviada (permite cancelarla)
+        """
+        task = Task(key, owner, on_success, on_error)
+        if self._closed:
+            task.cancelled = True
+            return task
+
+        with self._lock:
+            previous = self._latest.get(key)
+            self._latest[key] = task
+        if previous is not None:
+            previous.cancel()
+
+        task.future = self._pool.submit(self._run, task, function, args)
+        self._schedule_poll()
+        return task
+
+    def cancel(self, key):
+        """
+        Cancela la tarea vigente de una clave.
+
+        Args:
+            key (str): Clave de la tarea
+        """
+        with self._lock:
+            task = self._latest.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def is_pending(self, key):
+        """
+        Indica si hay una tarea vigente (sin entregar) con esa clave.
+
+        Args:
+            key (str): Clave de la tarea
+
+        Returns:
+            bool: True si la tarea aún no entregó su resultado
+        """
+        with self._lock:
+            return key in self._latest
+
+    def shutdown(self):
+        """Cancela lo pendiente y detiene el pool (al cerrar la aplicación)."""
+        self._closed = True
+        with self._lock:
+            tasks = list(self._latest.values())
+            self._latest.clear()
+        for task in tasks:
+            task.cancel()
+        if self._poll_job is not None:
+            try:
+                self.root.after_cancel(self._poll_job)
+            except Exception:
+                pass
+            self._poll_job = None
+        self._pool.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Implementación interna
+    # ------------------------------------------------------------------
+
+    def _run(self, task, function, args):
+        """Ejecuta la función en un hilo del pool y encola el resultado."""
+        if task.cancelled:
+            return
+        try:
+            self._results.put((task, function(*args), None))
+        except Exception as e:
+            self._results.put((task, None, e))
+
+    def _schedule_poll(self):
+        if self._poll_job is None and not self._closed:
+            self._poll_job = self.root.after(self.poll_interval_ms, self._drain)
+
+    def _drain(self):
+        """Entrega en el hilo de Tk los resultados disponibles."""
+        self._poll_job = None
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(task, result, error)
+
+        with self._lock:
+            pending = bool(self._latest)
+        if pending:
+            self._schedule_poll()
+
+    def _deliver(self, task, result, error):
+        with self._lock:
+            if task.cancelled or self._latest.get(task.key) is not task:
+                return  # reemplazada por una tarea más reciente
+            del self._latest[task.key]
+
+        owner = task.owner
+        try:
+            if owner is not None and not owner.winfo_exists():
+                return
+        except Exception:
+            return
+
+        try:
+            if error is None:
+                if task.on_success is not None:
+                    task.on_success(result)
+            elif task.on_error is not None:
+                task.on_error(error)
+            else:
+                logger.error(f"Error en tarea '{task.key}': {error}")
+        except Exception as e:
+            logger.error(f"Error al entregar resultado de '{task.key}': {e}")
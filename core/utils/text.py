@@ -0,0 +1,43 @@
+"""
+Utilidades de texto para búsquedas en ISMAPP.
+
+Las vistas filtran en memoria comparando el término escrito con una clave de
+búsqueda por entidad: los campos relevantes en minúsculas y sin tildes, de
+modo que "nunez" encuentre "Núñez" igual que la búsqueda FTS5.
+"""
+import unicodedata
+
+# Separador entre campos de una clave (no aparece en lo que escribe el usuario)
+KEY_SEPARATOR = "\x1f"
+
+
+def normalize_text(value):
+    """
+    Normaliza un texto para compararlo: minúsculas, sin tildes ni espacios extremos.
+
+    Args:
+        value (str): Texto a normalizar (None se trata como cadena vacía)
+
+    Returns:
+        str: Texto normalizado
+    """
+    if not value:
+        return ""
+    text = value.strip().casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def build_search_key(*fields):
+    """
+    Construye la clave de búsqueda de una entidad a partir de sus campos.
+
+    Args:
+        *fields (str): Campos buscables (los vacíos o None se omiten)
+
+    Returns:
+        str: Campos normalizados unidos por KEY_SEPARATOR
+    """
+    return KEY_SEPARATOR.join(normalize_text(field) for field in fields if field)
@@ -4,9 +4,9 @@ Sistema de gestión para empresas de reciclaje.
 """
 import os
 import sys
-import tkinter as tk
-from tkinter import messagebox
-import customtkinter as ctk
+import importlib
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Any, Optional
 
@@ -14,39 +14,75 @@ from typing import Dict, Any, Optional
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-# Importaciones de la aplicación
-try:
-    from core.database.data_manager import DataManager
-    from views.login_view import LoginView
-    from views.worker_view import WorkerView
-    from views.user_admin_view import UserAdminView
-    from views.dashboard_view import DashboardView
-    from views.client_view import ClientView  # Vista para el módulo de clientes
-    from views.material_view import MaterialView  # Vista para el módulo de materiales
-    from models.user import User
-    # Importar la nueva clase de preferencias de usuario
-    from user_preferences import UserPreferences
-except ImportError as e:
-    print(f"Error de importación: {e}")
-    # Crear directorios necesarios si no existen
-    for path in ['core/database', 'views', 'models']:
-        os.makedirs(path, exist_ok=True)
-    print("Se han creado los directorios necesarios. Por favor, asegúrate de tener todos los archivos requeridos.")
-    sys.exit(1)
+# Medición del arranque: se importa antes que todo lo demás
+from core.utils.startup_profiler import profiler
+
+with profiler.phase("imports: tkinter/customtkinter"):
+    import tkinter as tk
+    from tkinter import messagebox
+    import customtkinter as ctk
+
+# Importaciones de la aplicación (core/startup.py; las vistas de los módulos
+# se importan al construir cada módulo, ver ISMV3App.VIEW_CLASSES)
+with profiler.phase("imports: aplicación"):
+    try:
+        from core.startup import (
+            ChangeTracker, DataManager, TaskExecutor, User, UserPreferences, create_services
+        )
+        from views.login_view import LoginView
+    except ImportError as e:
+        print(f"Error de importación: {e}")
+        # Crear directorios necesarios si no existen
+        for path in ['core/database', 'views', 'models']:
+            os.makedirs(path, exist_ok=True)
+        print("Se han creado los directorios necesarios. Por favor, asegúrate de tener todos los archivos requeridos.")
+        sys.exit(1)
 
 
 class ISMV3App(ctk.CTk):
     """Aplicación principal de ISMV3."""
     
+    # Intervalo de sondeo de cambios hechos por otros puestos (milisegundos)
+    CHANGE_POLL_INTERVAL_MS = 2000
+    
+    # Módulos que se construyen en tiempo ocioso tras el login, en este orden
+    PREWARM_FRAMES = ("clients", "materials", "workers")
+    PREWARM_DELAY_MS = 1500
+    
+    # Presupuesto de widgets de los módulos construidos; al superarlo se
+    # liberan los menos usados (se reconstruyen al volver a mostrarlos)
+    FRAME_WIDGET_BUDGET = 6000
+    
+    # Vista de cada módulo (módulo, clase). Se importan la primera vez que se
+    # construye el módulo y no al arrancar: algunas arrastran dependencias
+    # pesadas (el dashboard carga PIL)
+    VIEW_CLASSES = {
+        "dashboard": ("views.dashboard_view", "DashboardView"),
+        "workers": ("views.worker_view", "WorkerView"),
+        "clients": ("views.client_view", "ClientView"),
+        "materials": ("views.material_view", "MaterialView"),
+        "users": ("views.user_admin_view", "UserAdminView"),
+        "weighing": ("views.weighing_view", "WeighingView"),
+    }
+    
     def __init__(self):
         super().__init__()
         
         # Estado de la aplicación
         self.current_user: Optional[User] = None
         self.user_preferences = None
+        self.change_tracker = None
+        self._change_poll_job = None
+        self.backup_scheduler = None
+        self._prewarm_job = None
+        self._login_started = None
+        
+        # Consultas de las vistas en segundo plano (resultados vía after())
+        self.task_executor = TaskExecutor(self)
         
         # Cargar tema personalizado
-        self._load_custom_theme()
+        with profiler.phase("tema"):
+            self._load_custom_theme()
         
         # Configuración inicial
         self.title("ISMV3 - Sistema de Gestión")
@@ -58,58 +94,44 @@ class ISMV3App(ctk.CTk):
         ctk.set_default_color_theme("blue")  # Temas: "blue" (por defecto), "green", "dark-blue"
         
         # Asegurar que existe la base de datos
-        self._setup_database()
+        with profiler.phase("verificación de base de datos"):
+            self._setup_database()
         
         # Inicializar gestor de datos (singleton)
         try:
-            self.data_manager = DataManager()
+            with profiler.phase("DataManager y migraciones"):
+                self.data_manager = DataManager()
+            
+            # Detección de cambios de otros puestos (las vistas se suscriben)
+            self.change_tracker = ChangeTracker(self.data_manager)
             
             # AGREGADO: Inicializar servicios
-            self._initialize_services()
+            with profiler.phase("servicios"):
+                self._initialize_services()
         except Exception as e:
             print(f"Error al inicializar DataManager: {e}")
         
         # Mostrar login antes de la interfaz principal
         self.withdraw()  # Ocultar ventana principal primero
-        self._show_login()
+        with profiler.phase("ventana de login"):
+            self._show_login()
+            self.update_idletasks()
+        profiler.mark("login visible")
+        
+        if profiler.exit_after_startup:
+            # Medición automatizada (scripts/check_startup_budget.py)
+            profiler.report()
+            self.after_idle(self.destroy)
     
     # AGREGADO: Método para inicializar servicios
     def _initialize_services(self):
-        """Inicializa los servicios necesarios para la aplicación."""
+        """Inicializa los servicios necesarios para la aplicación (ver core/startup.py)."""
         try:
             # Crear diccionario para almacenar los servicios
             self.services = {}
             
-            # Inicializar servicios de forma robusta, manejando posibles errores
-            try:
-                from core.services.client_service import ClientService
-                self.services["ClientService"] = ClientService(self.data_manager)
-                print("Servicio de clientes inicializado correctamente")
-            except ImportError as e:
-                print(f"Error al importar ClientService: {e}")
-            
-            try:
-                from core.services.material_service import MaterialService
-                self.services["MaterialService"] = MaterialService(self.data_manager)
-                print("Servicio de materiales inicializado correctamente")
-            except ImportError as e:
-                print(f"Error al importar MaterialService: {e}")
-            
-            # Intentar cargar UserService pero continuar sin él si no está disponible
-            try:
-                from core.services.user_service import UserService
-                self.services["UserService"] = UserService(self.data_manager)
-                print("Servicio de usuarios inicializado correctamente")
-            except ImportError as e:
-                print(f"Error al importar UserService: {e}")
-                
-            # CORREGIDO: Pasar el data_manager completo en lugar de session_factory
-            try:
-                from services.worker_service import WorkerService
-                self.services["WorkerService"] = WorkerService(self.data_manager)
-                print("Servicio de trabajadores inicializado correctamente")
-            except ImportError as e:
-                print(f"Error al importar WorkerService: {e}")
+            # Los servicios que no se pueden importar se omiten
+            create_services(self.data_manager, self.services)
             
             print(f"Servicios disponibles: {len(self.services)}")
             for service_name in self.services:
@@ -159,6 +181,8 @@ class ISMV3App(ctk.CTk):
         Args:
             user_data: Datos del usuario autenticado.
         """
+        self._login_started = time.perf_counter()
+        
         # Crear objeto User
         self.current_user = User(
             username=user_data['username'],
@@ -212,6 +236,69 @@ class ISMV3App(ctk.CTk):
         # Mostrar el frame inicial
         self.current_frame = None
         self.show_frame("dashboard")  # Iniciar con dashboard
+        
+        # Medir cuando la primera pantalla ya está dibujada
+        self.update_idletasks()
+        self._report_first_paint()
+        
+        # Construir los demás módulos cuando la interfaz esté ociosa
+        if self._prewarm_job is not None:
+            self.after_cancel(self._prewarm_job)
+        self._prewarm_job = self.after(
+            self.PREWARM_DELAY_MS, lambda: self.after_idle(self._prewarm_frames)
+        )
+        
+        # Empezar a sondear cambios de otros puestos
+        self._start_change_polling()
+        
+        # Copias de seguridad periódicas cuando la aplicación esté ociosa
+        self._start_backup_scheduler()
+    
+    def _start_backup_scheduler(self):
+        """Inicia las copias de seguridad programadas."""
+        backup_service = getattr(self, "services", {}).get("BackupService")
+        if not backup_service or self.backup_scheduler is not None:
+            return
+        from core.utils.backup_scheduler import BackupScheduler
+        self.backup_scheduler = BackupScheduler(
+            self, backup_service, self.task_executor, on_report=self._show_backup_report
+        )
+        self.backup_scheduler.start()
+    
+    def _show_backup_report(self, report):
+        """Muestra el resultado de una copia de seguridad en la barra de estado."""
+        if report.get("skipped"):
+            return
+        self.status_msg.configure(
+            text=f"Respaldo creado: {report['size'] / 1024 / 1024:.1f} MB "
+                 f"en {report['duration_ms'] / 1000:.1f} s"
+        )
+    
+    def _start_change_polling(self):
+        """Inicia el sondeo periódico de cambios en la base de datos compartida."""
+        if not self.change_tracker or self._change_poll_job is not None:
+            return
+        if self.change_tracker.start():
+            self._change_poll_job = self.after(self.CHANGE_POLL_INTERVAL_MS, self._poll_changes)
+    
+    def _poll_changes(self):
+        """Comprueba cambios y notifica a las vistas suscritas."""
+        try:
+            self.change_tracker.poll()
+        except Exception as e:
+            print(f"Error al sondear cambios: {e}")
+        self._change_poll_job = self.after(self.CHANGE_POLL_INTERVAL_MS, self._poll_changes)
+    
+    def destroy(self):
+        """Detiene las tareas en segundo plano antes de cerrar la ventana."""
+        if self.backup_scheduler:
+            self.backup_scheduler.stop()
+        self.task_executor.shutdown()
+        # Confirmar los pesajes que aún esperan su lote
+        weighing_service = getattr(self, "services", {}).get("WeighingService")
+        if weighing_service:
+            weighing_service.close()
+        super().destroy()
     
     def _create_top_bar(self):
         """Crea la barra superior con menú y usuario."""
@@ -390,136 +477,195 @@ class ISMV3App(ctk.CTk):
         self.menu_buttons[frame_name] = btn
     
     def _setup_content_frames(self):
-        """Inicializa los frames de contenido de la aplicación."""
-        # Diccionario para almacenar frames
+        """
+        Registra los frames de contenido de la aplicación.
+        
+        Los frames no se construyen aquí: cada uno se crea la primera vez que
+        se muestra (o en tiempo ocioso, ver _prewarm_frames), de modo que tras
+        el login solo se construye el dashboard.
+        """
+        # Frames ya construidos y orden de uso (el último es el más reciente)
         self.frames = {}
+        self._frame_usage = OrderedDict()
+        self._frame_sizes = {}
+        
+        # Constructores de cada frame
+        self.frame_builders = {
+            "dashboard": self._build_dashboard_frame,
+            "workers": lambda: self._build_view_frame("workers", "Módulo de Trabajadores"),
+            "clients": lambda: self._build_view_frame("clients", "Módulo de Clientes"),
+            "materials": lambda: self._build_view_frame("materials", "Módulo de Materiales"),
+            "weighing": lambda: self._build_view_frame("weighing", "Módulo de Pesajes"),
+            # Aquí añadir el contenido específico del módulo de transacciones
+            "transactions": lambda: self._create_scrollable_frame("Módulo de Transacciones")[0],
+        }
         
-        # MODIFICADO: Función auxiliar para crear frames con scroll
-        def create_scrollable_frame(title):
-            # Crear un frame contenedor
-            container = ctk.CTkFrame(self.main_view)
-            container.grid_rowconfigure(0, weight=1)
-            container.grid_columnconfigure(0, weight=1)
-            
-            # Crear el frame con scroll
-            scrollable = ctk.CTkScrollableFrame(container)
-            scrollable.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-            
-            # Añadir título
-            ctk.CTkLabel(
-                scrollable, 
-                text=title, 
-                font=ctk.CTkFont(size=20, weight="bold")
-            ).pack(pady=20, anchor="w")
-            
-            return container, scrollable
+        # Solo para administradores
+        if self.current_user and self.current_user.role == "admin":
+            self.frame_builders["users"] = lambda: self._build_view_frame(
+                "users", "Módulo de Usuarios"
+            )
+            # Aquí añadir el contenido específico del módulo de configuración
+            self.frame_builders["settings"] = lambda: self._create_scrollable_frame(
+                "Configuración del Sistema"
+            )[0]
+    
+    def _create_scrollable_frame(self, title):
+        """
+        Crea un frame contenedor con scroll y título (módulos sin vista propia).
         
-        # Frame Dashboard - Usando la nueva vista mejorada
-        try:
-            # Manejar el DashboardView de manera especial si es una clase personalizada
-            dashboard_container = ctk.CTkFrame(self.main_view)
-            dashboard_container.grid_rowconfigure(0, weight=1)
-            dashboard_container.grid_columnconfigure(0, weight=1)
-            
-            dashboard_content = DashboardView(dashboard_container)
-            dashboard_content.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        Args:
+            title (str): Título del módulo
             
-            self.frames["dashboard"] = dashboard_container
-        except Exception as e:
-            print(f"Error al cargar DashboardView: {e}")
-            # Fallback a dashboard simple con scroll
-            container, scrollable = create_scrollable_frame("Dashboard - Bienvenido a ISMV3")
-            self.frames["dashboard"] = container
+        Returns:
+            tuple: (contenedor, frame con scroll)
+        """
+        # Crear un frame contenedor
+        container = ctk.CTkFrame(self.main_view)
+        container.grid_rowconfigure(0, weight=1)
+        container.grid_columnconfigure(0, weight=1)
         
-        # Frame Trabajadores
-        try:
-            # Intentar usar WorkerView, si es una clase personalizada
-            workers_container = ctk.CTkFrame(self.main_view)
-            workers_container.grid_rowconfigure(0, weight=1)
-            workers_container.grid_columnconfigure(0, weight=1)
-            
-            workers_content = WorkerView(workers_container)
-            workers_content.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-            
-            self.frames["workers"] = workers_container
-        except Exception as e:
-            print(f"Error al cargar WorkerView: {e}")
-            # Fallback
-            container, scrollable = create_scrollable_frame("Módulo de Trabajadores")
-            ctk.CTkLabel(scrollable, text=f"Error al cargar: {str(e)}", text_color="red").pack(pady=10)
-            self.frames["workers"] = container
+        # Crear el frame con scroll
+        scrollable = ctk.CTkScrollableFrame(container)
+        scrollable.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
         
-        # MODIFICADO: Frame Clientes - Usando ClientView en lugar de placeholder
-        try:
-            # Intentar usar ClientView
-            clients_container = ctk.CTkFrame(self.main_view)
-            clients_container.grid_rowconfigure(0, weight=1)
-            clients_container.grid_columnconfigure(0, weight=1)
+        # Añadir título
+        ctk.CTkLabel(
+            scrollable, 
+            text=title, 
+            font=ctk.CTkFont(size=20, weight="bold")
+        ).pack(pady=20, anchor="w")
+        
+        return container, scrollable
+    
+    def _load_view_class(self, frame_name):
+        """
+        Importa la vista de un módulo (solo la primera vez que se construye).
+        
+        Args:
+            frame_name (str): Nombre del módulo en VIEW_CLASSES
             
-            clients_content = ClientView(clients_container)
-            clients_content.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+        Returns:
+            type: Clase de la vista
+        """
+        module_name, class_name = self.VIEW_CLASSES[frame_name]
+        with profiler.phase(f"import: {module_name}"):
+            module = importlib.import_module(module_name)
+        return getattr(module, class_name)
+    
+    def _build_view_frame(self, frame_name, fallback_title):
+        """
+        Construye el frame de un módulo con su vista.
+        
+        Args:
+            frame_name (str): Nombre del módulo en VIEW_CLASSES
+            fallback_title (str): Título del frame de error si la vista falla
             
-            self.frames["clients"] = clients_container
-            print("Vista de Clientes cargada correctamente")
+        Returns:
+            CTkFrame: Contenedor del módulo
+        """
+        container = ctk.CTkFrame(self.main_view)
+        container.grid_rowconfigure(0, weight=1)
+        container.grid_columnconfigure(0, weight=1)
+        try:
+            view_class = self._load_view_class(frame_name)
+            content = view_class(container)
+            content.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+            return container
         except Exception as e:
-            print(f"Error al cargar ClientView: {e}")
+            print(f"Error al cargar {self.VIEW_CLASSES[frame_name][1]}: {e}")
+            container.destroy()
             # Fallback si hay error
-            container, scrollable = create_scrollable_frame("Módulo de Clientes")
+            container, scrollable = self._create_scrollable_frame(fallback_title)
             ctk.CTkLabel(scrollable, text=f"Error al cargar módulo: {str(e)}", text_color="red").pack(pady=10)
-            self.frames["clients"] = container
-        
-        # MODIFICADO: Frame Materiales - Usando MaterialView en lugar de placeholder
+            return container
+    
+    def _build_dashboard_frame(self):
+        """Construye el frame del dashboard (con fallback a uno simple con scroll)."""
         try:
-            # Intentar usar MaterialView
-            materials_container = ctk.CTkFrame(self.main_view)
-            materials_container.grid_rowconfigure(0, weight=1)
-            materials_container.grid_columnconfigure(0, weight=1)
-            
-            materials_content = MaterialView(materials_container)
-            materials_content.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+            dashboard_container = ctk.CTkFrame(self.main_view)
+            dashboard_container.grid_rowconfigure(0, weight=1)
+            dashboard_container.grid_columnconfigure(0, weight=1)
             
-            self.frames["materials"] = materials_container
-            print("Vista de Materiales cargada correctamente")
+            dashboard_view = self._load_view_class("dashboard")
+            dashboard_content = dashboard_view(dashboard_container)
+            dashboard_content.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
+            return dashboard_container
         except Exception as e:
-            print(f"Error al cargar MaterialView: {e}")
-            # Fallback si hay error
-            container, scrollable = create_scrollable_frame("Módulo de Materiales")
-            ctk.CTkLabel(scrollable, text=f"Error al cargar módulo: {str(e)}", text_color="red").pack(pady=10)
-            self.frames["materials"] = container
-        
-        # Frame Pesajes (con scroll)
-        container, scrollable = create_scrollable_frame("Módulo de Pesajes")
-        # Aquí añadir el contenido específico del módulo de pesajes
-        self.frames["weighing"] = container
-        
-        # Frame Transacciones (con scroll)
-        container, scrollable = create_scrollable_frame("Módulo de Transacciones")
-        # Aquí añadir el contenido específico del módulo de transacciones
-        self.frames["transactions"] = container
+            print(f"Error al cargar DashboardView: {e}")
+            return self._create_scrollable_frame("Dashboard - Bienvenido a ISMV3")[0]
+    
+    def _get_frame(self, frame_name):
+        """
+        Obtiene un frame, construyéndolo si todavía no existe.
         
-        # Solo para administradores
-        if self.current_user and self.current_user.role == "admin":
-            try:
-                # Frame Usuarios
-                users_container = ctk.CTkFrame(self.main_view)
-                users_container.grid_rowconfigure(0, weight=1)
-                users_container.grid_columnconfigure(0, weight=1)
-                
-                users_content = UserAdminView(users_container)
-                users_content.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-                
-                self.frames["users"] = users_container
-            except Exception as e:
-                print(f"Error al cargar UserAdminView: {e}")
-                # Fallback
-                container, scrollable = create_scrollable_frame("Módulo de Usuarios")
-                ctk.CTkLabel(scrollable, text=f"Error al cargar: {str(e)}", text_color="red").pack(pady=10)
-                self.frames["users"] = container
+        Args:
+            frame_name (str): Nombre del frame
             
-            # Frame Configuración (con scroll)
-            container, scrollable = create_scrollable_frame("Configuración del Sistema")
-            # Aquí añadir el contenido específico del módulo de configuración
-            self.frames["settings"] = container
+        Returns:
+            CTkFrame: Frame del módulo o None si no está disponible
+        """
+        frame = self.frames.get(frame_name)
+        if frame is None:
+            builder = self.frame_builders.get(frame_name)
+            if builder is None:
+                return None
+            with profiler.phase(f"módulo: {frame_name}"):
+                frame = builder()
+            self.frames[frame_name] = frame
+            self._frame_sizes[frame_name] = self._count_widgets(frame)
+        return frame
+    
+    def _count_widgets(self, widget):
+        """Cuenta los widgets de un frame (medida aproximada de su memoria)."""
+        count = 1
+        pending = list(widget.winfo_children())
+        while pending:
+            child = pending.pop()
+            count += 1
+            pending.extend(child.winfo_children())
+        return count
+    
+    def _evict_frames(self):
+        """Destruye los frames menos usados mientras se supere el presupuesto de widgets."""
+        total = sum(self._frame_sizes.values())
+        for frame_name in list(self._frame_usage):
+            if total <= self.FRAME_WIDGET_BUDGET:
+                break
+            if frame_name in (self.current_frame, "dashboard") or frame_name not in self.frames:
+                continue
+            self.frames.pop(frame_name).destroy()
+            total -= self._frame_sizes.pop(frame_name, 0)
+            del self._frame_usage[frame_name]
+    
+    def _prewarm_frames(self):
+        """Construye en tiempo ocioso, de a uno, los módulos más usados aún no creados."""
+        self._prewarm_job = None
+        if not hasattr(self, "frame_builders"):
+            return
+        if sum(self._frame_sizes.values()) >= self.FRAME_WIDGET_BUDGET:
+            return
+        
+        for frame_name in self.PREWARM_FRAMES:
+            if frame_name in self.frame_builders and frame_name not in self.frames:
+                self._get_frame(frame_name)
+                self._frame_usage[frame_name] = None
+                self._frame_usage.move_to_end(frame_name, last=False)
+                # Siguiente módulo cuando la interfaz vuelva a estar ociosa
+                self._prewarm_job = self.after(
+                    self.PREWARM_DELAY_MS, lambda: self.after_idle(self._prewarm_frames)
+                )
+                return
+    
+    def _report_first_paint(self):
+        """Registra el tiempo entre el login y la primera pantalla dibujada."""
+        if self._login_started is None:
+            return
+        elapsed_ms = (time.perf_counter() - self._login_started) * 1000
+        self._login_started = None
+        self.status_msg.configure(text=f"Listo ({elapsed_ms:.0f} ms)")
+        profiler.mark("primera pantalla")
+        profiler.report()
     
     def show_frame(self, frame_name):
         """
@@ -535,20 +681,26 @@ class ISMV3App(ctk.CTk):
                                 "No tiene permisos para acceder a esta funcionalidad.")
             return
         
-        # Verificar que el frame existe
-        if frame_name not in self.frames:
+        # Verificar que el frame existe (se construye la primera vez)
+        frame = self._get_frame(frame_name)
+        if frame is None:
             messagebox.showerror("Error", f"El módulo '{frame_name}' no está disponible")
             return
         
         # MODIFICADO: Usar grid en lugar de pack/forget para mejor gestión del espacio
         
-        # Ocultar frame actual
+        # Ocultar frame actual (su tamaño pudo cambiar mientras se usaba)
         if self.current_frame and self.current_frame in self.frames:
-            self.frames[self.current_frame].grid_forget()
+            previous = self.frames[self.current_frame]
+            previous.grid_forget()
+            self._frame_sizes[self.current_frame] = self._count_widgets(previous)
         
         # Mostrar nuevo frame
-        self.frames[frame_name].grid(row=0, column=0, sticky="nsew")
+        frame.grid(row=0, column=0, sticky="nsew")
         self.current_frame = frame_name
+        self._frame_usage[frame_name] = None
+        self._frame_usage.move_to_end(frame_name)
+        self._evict_frames()
         
         # Actualizar estado
         self.status_msg.configure(text=f"Módulo: {frame_name.capitalize()}")
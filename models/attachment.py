@@ -0,0 +1,110 @@
+"""
+Modelo de datos para los archivos adjuntos.
+"""
+
+
+class AttachmentEntity:
+    """Constantes para las entidades a las que se puede adjuntar un archivo"""
+    CLIENT = "client"
+    WORKER = "worker"
+    USER = "user"
+
+    @classmethod
+    def get_all_types(cls):
+        """Retorna todas las entidades disponibles"""
+        return [cls.CLIENT, cls.WORKER, cls.USER]
+
+    @classmethod
+    def get_display_name(cls, entity_type):
+        """Retorna el nombre para mostrar de una entidad"""
+        display_names = {
+            cls.CLIENT: "Cliente",
+            cls.WORKER: "Trabajador",
+            cls.USER: "Usuario"
+        }
+        return display_names.get(entity_type, "Desconocido")
+
+
+class Attachment:
+    """Archivo adjunto a un cliente, trabajador o usuario."""
+
+    __slots__ = (
+        'id', 'entity_type', 'entity_id', 'sha256', 'file_name', 'mime_type',
+        'size', 'description', 'uploaded_by', 'created_at',
+    )
+
+    def __init__(self, id=None, entity_type="", entity_id=None, sha256="", file_name="",
+                 mime_type="", size=0, description="", uploaded_by="", created_at=None):
+        """
+        Inicializa un nuevo adjunto.
+
+        Args:
+            id (int, optional): ID único del adjunto
+            entity_type (str): Entidad (de AttachmentEntity)
+            entity_id (int): ID del cliente, trabajador o usuario
+            sha256 (str): Hash del contenido (clave en el almacén de archivos)
+            file_name (str): Nombre original del archivo
+            mime_type (str): Tipo de contenido (p. ej. 'application/pdf')
+            size (int): Tamaño en bytes
+            description (str): Descripción
+            uploaded_by (str): Usuario que lo adjuntó
+            created_at (str, optional): Fecha en que se adjuntó
+        """
+        self.id = id
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.sha256 = sha256
+        self.file_name = file_name
+        self.mime_type = mime_type
+        self.size = size
+        self.description = description
+        self.uploaded_by = uploaded_by
+        self.created_at = created_at
+
+    @property
+    def extension(self):
+        """Extensión del archivo en minúsculas, sin el punto."""
+        _, dot, extension = self.file_name.rpartition(".")
+        return extension.lower() if dot else ""
+
+    def to_dict(self):
+        """Convierte el adjunto a un diccionario para almacenamiento."""
+        return {
+            'id': self.id,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'sha256': self.sha256,
+            'file_name': self.file_name,
+            'mime_type': self.mime_type,
+            'size': self.size,
+            'description': self.description,
+            'uploaded_by': self.uploaded_by,
+            'created_at': self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crea una instancia de Attachment desde un diccionario.
+
+        Args:
+            data (dict): Diccionario con datos del adjunto
+
+        Returns:
+            Attachment: Nueva instancia de Attachment
+        """
+        return cls(
+            id=data.get('id'),
+            entity_type=data.get('entity_type', ''),
+            entity_id=data.get('entity_id'),
+            sha256=data.get('sha256', ''),
+            file_name=data.get('file_name', ''),
+            mime_type=data.get('mime_type', ''),
+            size=data.get('size', 0),
+            description=data.get('description', ''),
+            uploaded_by=data.get('uploaded_by', ''),
+            created_at=data.get('created_at')
+        )
+
+    def __repr__(self):
+        return f"<Attachment(file_name='{self.file_name}', sha256='{self.sha256[:12]}')>"
@@ -26,6 +26,14 @@ class ClientType:
 class Client:
     """Representación de un cliente en el sistema."""
     
+    __slots__ = (
+        'id', 'name', 'business_name', 'rut', 'address', 'phone', 'email',
+        'contact_person', 'notes', 'is_active', 'client_type',
+        # Datos bancarios (los completa el formulario de la vista)
+        'bank_name', 'account_type', 'account_number', 'account_holder',
+        'account_holder_rut',
+    )
+    
     def __init__(self, id=None, name="", business_name="", rut="", address="", 
                  phone="", email="", contact_person="", notes="", is_active=True,
                  client_type=ClientType.BOTH):
@@ -56,6 +64,11 @@ class Client:
         self.notes = notes
         self.is_active = is_active
         self.client_type = client_type
+        self.bank_name = ""
+        self.account_type = ""
+        self.account_number = ""
+        self.account_holder = ""
+        self.account_holder_rut = ""
     
     def to_dict(self):
         """Convierte el cliente a un diccionario para almacenamiento."""
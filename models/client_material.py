@@ -5,6 +5,11 @@ Modelo de datos para la relación entre Cliente y Material.
 class ClientMaterial:
     """Representación de la relación entre un cliente y un material, incluyendo precio."""
     
+    __slots__ = (
+        'id', 'client_id', 'material_id', 'price', 'includes_tax', 'notes',
+        'material',  # Material asociado, cuando la consulta lo incluye
+    )
+    
     def __init__(self, id=None, client_id=None, material_id=None, price=0.0, 
                  includes_tax=False, notes=""):
         """
@@ -24,6 +29,7 @@ class ClientMaterial:
         self.price = price
         self.includes_tax = includes_tax
         self.notes = notes
+        self.material = None
     
     def to_dict(self):
         """Convierte la relación a un diccionario para almacenamiento."""
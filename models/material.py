@@ -46,6 +46,11 @@ class PlasticSubtype:
 class Material:
     """Representación de un material en el sistema."""
     
+    __slots__ = (
+        'id', 'name', 'description', 'material_type', 'is_plastic_subtype',
+        'plastic_subtype', 'plastic_state', 'custom_subtype', 'is_active',
+    )
+    
     def __init__(self, id=None, name="", description="", material_type="", 
                  is_plastic_subtype=False, plastic_subtype="", 
                  plastic_state="", custom_subtype="", is_active=True):
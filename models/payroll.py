@@ -0,0 +1,113 @@
+"""
+Modelo de datos para las liquidaciones de sueldo.
+"""
+
+
+class PayScheme:
+    """Forma de cálculo del sueldo según el tipo de contrato del trabajador"""
+    MONTHLY = "monthly"        # sueldo mensual fijo
+    DAILY = "daily"            # salary = valor del día trabajado
+    PRODUCTION = "production"  # salary = valor por kilo entregado
+
+    # Tipos de contrato de la ficha del trabajador con un cálculo distinto del mensual
+    _CONTRACT_SCHEMES = {
+        "por día": DAILY,
+        "por dia": DAILY,
+        "por producción": PRODUCTION,
+        "por produccion": PRODUCTION,
+    }
+
+    @classmethod
+    def for_contract(cls, contract_type):
+        """Retorna la forma de cálculo de un tipo de contrato"""
+        return cls._CONTRACT_SCHEMES.get((contract_type or "").strip().lower(), cls.MONTHLY)
+
+    @classmethod
+    def get_display_name(cls, scheme):
+        """Retorna el nombre para mostrar de una forma de cálculo"""
+        display_names = {
+            cls.MONTHLY: "Mensual",
+            cls.DAILY: "Por día",
+            cls.PRODUCTION: "Por producción"
+        }
+        return display_names.get(scheme, "Desconocido")
+
+
+class AdjustmentKind:
+    """Constantes para los tipos de ajuste de una liquidación"""
+    BONUS = "bonus"
+    DEDUCTION = "deduction"
+
+    @classmethod
+    def get_all_kinds(cls):
+        """Retorna todos los tipos de ajuste disponibles"""
+        return [cls.BONUS, cls.DEDUCTION]
+
+    @classmethod
+    def get_display_name(cls, kind):
+        """Retorna el nombre para mostrar de un tipo de ajuste"""
+        display_names = {
+            cls.BONUS: "Bono",
+            cls.DEDUCTION: "Descuento"
+        }
+        return display_names.get(kind, "Desconocido")
+
+
+class PayrollAdjustment:
+    """Bono o descuento de un trabajador en un período."""
+
+    __slots__ = ('id', 'worker_id', 'period', 'kind', 'amount', 'description')
+
+    def __init__(self, id=None, worker_id=None, period="", kind=AdjustmentKind.BONUS,
+                 amount=0, description=""):
+        """
+        Inicializa un nuevo ajuste.
+
+        Args:
+            id (int, optional): ID único del ajuste
+            worker_id (int): ID del trabajador
+            period (str): Mes de la liquidación ('YYYY-MM')
+            kind (str): Tipo de ajuste (de AdjustmentKind)
+            amount (int): Monto en pesos (positivo)
+            description (str): Motivo del ajuste
+        """
+        self.id = id
+        self.worker_id = worker_id
+        self.period = period
+        self.kind = kind
+        self.amount = amount
+        self.description = description
+
+    def to_dict(self):
+        """Convierte el ajuste a un diccionario para almacenamiento."""
+        return {
+            'id': self.id,
+            'worker_id': self.worker_id,
+            'period': self.period,
+            'kind': self.kind,
+            'amount': self.amount,
+            'description': self.description,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crea una instancia de PayrollAdjustment desde un diccionario.
+
+        Args:
+            data (dict): Diccionario con datos del ajuste
+
+        Returns:
+            PayrollAdjustment: Nueva instancia de PayrollAdjustment
+        """
+        return cls(
+            id=data.get('id'),
+            worker_id=data.get('worker_id'),
+            period=data.get('period', ''),
+            kind=data.get('kind', AdjustmentKind.BONUS),
+            amount=int(data.get('amount', 0)),
+            description=data.get('description', '')
+        )
+
+    def __repr__(self):
+        return f"<PayrollAdjustment(worker_id={self.worker_id}, {self.kind}={self.amount})>"
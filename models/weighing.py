@@ -0,0 +1,129 @@
+"""
+Modelo de datos para los pesajes.
+"""
+from datetime import datetime
+
+
+class PlasticState:
+    """Constantes para la condición del material pesado"""
+    CLEAN = "clean"
+    DIRTY = "dirty"
+
+    @classmethod
+    def get_all_states(cls):
+        """Retorna todas las condiciones disponibles"""
+        return [cls.CLEAN, cls.DIRTY]
+
+    @classmethod
+    def get_display_name(cls, state):
+        """Retorna el nombre para mostrar de una condición"""
+        display_names = {
+            cls.CLEAN: "Limpio",
+            cls.DIRTY: "Sucio"
+        }
+        return display_names.get(state, "Sin especificar")
+
+
+class Weighing:
+    """Representación de un pesaje (lectura de balanza)."""
+
+    __slots__ = (
+        'id', 'weighed_at', 'material_id', 'client_id', 'worker_id',
+        'net_weight_kg', 'plastic_state', 'price_per_kg', 'amount', 'notes',
+        # Balanza de origen y número de lectura (None en los pesajes manuales)
+        'source', 'source_seq',
+        # Nombres para mostrar, cuando la consulta los incluye
+        'material_name', 'client_name', 'worker_name',
+    )
+
+    def __init__(self, id=None, weighed_at=None, material_id=None, client_id=None,
+                 worker_id=None, net_weight_kg=0.0, plastic_state="", price_per_kg=0.0,
+                 amount=0.0, notes="", source=None, source_seq=None,
+                 material_name="", client_name="", worker_name=""):
+        """
+        Inicializa un nuevo pesaje.
+
+        Args:
+            id (int, optional): ID único del pesaje
+            weighed_at (str, optional): Fecha y hora del pesaje ('YYYY-MM-DD HH:MM:SS');
+                por defecto, el momento actual
+            material_id (int): ID del material pesado
+            client_id (int, optional): ID del cliente (si el material es de un cliente)
+            worker_id (int, optional): ID del trabajador (si lo entrega un trabajador)
+            net_weight_kg (float): Peso neto en kilos
+            plastic_state (str): Condición del material (de PlasticState)
+            price_per_kg (float): Precio por kilo aplicado
+            amount (float): Monto neto en pesos (lo calcula write_weighings)
+            notes (str): Notas adicionales
+            source (str, optional): Balanza de origen
+            source_seq (int, optional): Número de lectura en la balanza de origen
+            material_name (str): Nombre del material (solo para mostrar)
+            client_name (str): Nombre del cliente (solo para mostrar)
+            worker_name (str): Nombre del trabajador (solo para mostrar)
+        """
+        self.id = id
+        self.weighed_at = weighed_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.material_id = material_id
+        self.client_id = client_id
+        self.worker_id = worker_id
+        self.net_weight_kg = net_weight_kg
+        self.plastic_state = plastic_state
+        self.price_per_kg = price_per_kg
+        self.amount = amount
+        self.notes = notes
+        self.source = source
+        self.source_seq = source_seq
+        self.material_name = material_name
+        self.client_name = client_name
+        self.worker_name = worker_name
+
+    @property
+    def partner_name(self):
+        """Nombre del cliente o trabajador asociado al pesaje."""
+        return self.client_name or self.worker_name or ""
+
+    def to_dict(self):
+        """Convierte el pesaje a un diccionario para almacenamiento."""
+        return {
+            'id': self.id,
+            'weighed_at': self.weighed_at,
+            'material_id': self.material_id,
+            'client_id': self.client_id,
+            'worker_id': self.worker_id,
+            'net_weight_kg': self.net_weight_kg,
+            'plastic_state': self.plastic_state,
+            'price_per_kg': self.price_per_kg,
+            'amount': self.amount,
+            'notes': self.notes,
+            'source': self.source,
+            'source_seq': self.source_seq,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crea una instancia de Weighing desde un diccionario.
+
+        Args:
+            data (dict): Diccionario con datos del pesaje
+
+        Returns:
+            Weighing: Nueva instancia de Weighing
+        """
+        return cls(
+            id=data.get('id'),
+            weighed_at=data.get('weighed_at'),
+            material_id=data.get('material_id'),
+            client_id=data.get('client_id'),
+            worker_id=data.get('worker_id'),
+            net_weight_kg=data.get('net_weight_kg', 0.0),
+            plastic_state=data.get('plastic_state', ''),
+            price_per_kg=data.get('price_per_kg', 0.0),
+            amount=data.get('amount', 0.0),
+            notes=data.get('notes', ''),
+            source=data.get('source'),
+            source_seq=data.get('source_seq')
+        )
+
+    def __repr__(self):
+        return f"<Weighing(material_id={self.material_id}, kg={self.net_weight_kg})>"
@@ -1,60 +1,163 @@
 """
 Modelo para representar a los trabajadores en ISMAPP.
-"""
-from sqlalchemy import Column, Integer, String, Boolean, Float, Date, ForeignKey
-from sqlalchemy.orm import relationship
-from sqlalchemy.ext.declarative import declarative_base
 
-Base = declarative_base()
+Clases simples de Python: WorkerService accede a la base de datos con SQL
+directo a través del DataManager, así que no hace falta la maquinaria
+declarativa de un ORM (que además encarecía el arranque).
+"""
 
-class Worker(Base):
+class Worker:
     """Modelo que representa a un trabajador de la empresa."""
-    
-    __tablename__ = 'workers'
-    
-    id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
-    rut = Column(String(20), nullable=False, unique=True)
-    address = Column(String(255))
-    phone = Column(String(20))
-    email = Column(String(100))
-    position = Column(String(100))  # Cargo
-    department = Column(String(100))  # Departamento
-    contract_type = Column(String(50))  # NUEVO: Tipo de contrato (por día, producción o contrato)
-    hire_date = Column(Date)  # Fecha de contratación
-    salary = Column(Float)  # Salario o remuneración
-    is_active = Column(Boolean, default=True)
-    notes = Column(String(500))
-    
-    # Datos bancarios
-    bank_name = Column(String(100))  # Mantener para compatibilidad con versiones anteriores
-    account_type = Column(String(50))  # Mantener para compatibilidad con versiones anteriores
-    account_number = Column(String(50))  # Mantener para compatibilidad con versiones anteriores
-    account_holder = Column(String(100))  # Mantener para compatibilidad con versiones anteriores
-    account_holder_rut = Column(String(20))  # Mantener para compatibilidad con versiones anteriores
-    
-    # Relación con cuentas bancarias
-    bank_accounts = relationship("BankAccount", back_populates="worker", cascade="all, delete-orphan")
-    
+
+    __slots__ = (
+        'id', 'name', 'rut', 'address', 'phone', 'email',
+        'position', 'department', 'contract_type', 'hire_date', 'salary',
+        'is_active', 'notes',
+        # Datos bancarios (se mantienen para compatibilidad con versiones anteriores)
+        'bank_name', 'account_type', 'account_number', 'account_holder',
+        'account_holder_rut',
+        # Cuentas bancarias asociadas (tabla worker_bank_accounts)
+        'bank_accounts',
+    )
+
+    def __init__(self, id=None, name="", rut="", address="", phone="", email="",
+                 position="", department="", contract_type="", hire_date=None,
+                 salary=0.0, is_active=True, notes="", bank_name="", account_type="",
+                 account_number="", account_holder="", account_holder_rut=""):
+        """
+        Inicializa un nuevo trabajador.
+
+        Args:
+            id (int, optional): ID único del trabajador
+            name (str): Nombre completo
+            rut (str): RUT
+            address (str): Dirección
+            phone (str): Teléfono de contacto
+            email (str): Correo electrónico
+            position (str): Cargo
+            department (str): Departamento
+            contract_type (str): Tipo de contrato (por día, producción o contrato)
+            hire_date (str, optional): Fecha de contratación (YYYY-MM-DD)
+            salary (float): Salario o remuneración
+            is_active (bool): Estado del trabajador (activo/inactivo)
+            notes (str): Notas adicionales
+            bank_name (str): Banco (datos bancarios anteriores a las cuentas múltiples)
+            account_type (str): Tipo de cuenta
+            account_number (str): Número de cuenta
+            account_holder (str): Titular de la cuenta
+            account_holder_rut (str): RUT del titular
+        """
+        self.id = id
+        self.name = name
+        self.rut = rut
+        self.address = address
+        self.phone = phone
+        self.email = email
+        self.position = position
+        self.department = department
+        self.contract_type = contract_type
+        self.hire_date = hire_date
+        self.salary = salary
+        self.is_active = is_active
+        self.notes = notes
+        self.bank_name = bank_name
+        self.account_type = account_type
+        self.account_number = account_number
+        self.account_holder = account_holder
+        self.account_holder_rut = account_holder_rut
+        self.bank_accounts = []
+
+    def to_dict(self):
+        """Convierte el trabajador a un diccionario para almacenamiento."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'rut': self.rut,
+            'address': self.address,
+            'phone': self.phone,
+            'email': self.email,
+            'position': self.position,
+            'department': self.department,
+            'contract_type': self.contract_type,
+            'hire_date': self.hire_date,
+            'salary': self.salary,
+            'is_active': self.is_active,
+            'notes': self.notes,
+            'bank_name': self.bank_name,
+            'account_type': self.account_type,
+            'account_number': self.account_number,
+            'account_holder': self.account_holder,
+            'account_holder_rut': self.account_holder_rut,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crea una instancia de Worker desde un diccionario.
+
+        Args:
+            data (dict): Diccionario con datos del trabajador
+
+        Returns:
+            Worker: Nueva instancia de Worker
+        """
+        return cls(
+            id=data.get('id'),
+            name=data.get('name', ''),
+            rut=data.get('rut', ''),
+            address=data.get('address', ''),
+            phone=data.get('phone', ''),
+            email=data.get('email', ''),
+            position=data.get('position', ''),
+            department=data.get('department', ''),
+            contract_type=data.get('contract_type', ''),
+            hire_date=data.get('hire_date'),
+            salary=data.get('salary', 0.0),
+            is_active=data.get('is_active', True),
+            notes=data.get('notes', ''),
+            bank_name=data.get('bank_name', ''),
+            account_type=data.get('account_type', ''),
+            account_number=data.get('account_number', ''),
+            account_holder=data.get('account_holder', ''),
+            account_holder_rut=data.get('account_holder_rut', '')
+        )
+
     def __repr__(self):
         return f"<Worker(name='{self.name}', position='{self.position}')>"
 
 
-class BankAccount(Base):
+class BankAccount:
     """Modelo que representa una cuenta bancaria de un trabajador."""
-    
-    __tablename__ = 'worker_bank_accounts'
-    
-    id = Column(Integer, primary_key=True)
-    worker_id = Column(Integer, ForeignKey('workers.id'), nullable=False)
-    worker = relationship("Worker", back_populates="bank_accounts")
-    
-    is_primary = Column(Boolean, default=False)  # Indica si es la cuenta principal
-    bank_name = Column(String(100))
-    account_type = Column(String(50))
-    account_number = Column(String(50))
-    account_holder = Column(String(100))
-    account_holder_rut = Column(String(20))
-    
+
+    __slots__ = (
+        'id', 'worker_id', 'is_primary', 'bank_name', 'account_type',
+        'account_number', 'account_holder', 'account_holder_rut',
+    )
+
+    def __init__(self, id=None, worker_id=None, is_primary=False, bank_name="",
+                 account_type="", account_number="", account_holder="",
+                 account_holder_rut=""):
+        """
+        Inicializa una cuenta bancaria.
+
+        Args:
+            id (int, optional): ID único de la cuenta
+            worker_id (int): ID del trabajador
+            is_primary (bool): Indica si es la cuenta principal
+            bank_name (str): Banco
+            account_type (str): Tipo de cuenta
+            account_number (str): Número de cuenta
+            account_holder (str): Titular
+            account_holder_rut (str): RUT del titular
+        """
+        self.id = id
+        self.worker_id = worker_id
+        self.is_primary = is_primary
+        self.bank_name = bank_name
+        self.account_type = account_type
+        self.account_number = account_number
+        self.account_holder = account_holder
+        self.account_holder_rut = account_holder_rut
+
     def __repr__(self):
-        return f"<BankAccount(bank='{self.bank_name}', number='{self.account_number}')>"
\ No newline at end of file
+        return f"<BankAccount(bank='{self.bank_name}', number='{self.account_number}')>"
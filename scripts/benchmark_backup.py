@@ -0,0 +1,126 @@
+"""
+Benchmark de copias de seguridad en línea.
+
+Crea una base de datos de ``--size-mb`` MB en un directorio temporal y la
+copia con ``online_backup`` mientras otra conexión (otro "puesto") inserta
+pesajes cada 20 ms. Mide la duración y el tamaño de la copia y la espera
+máxima del puesto que escribe, comparando la copia por tramos con la copia
+en un solo paso.
+
+Termina con código 1 si la copia por tramos no tiene los datos originales
+o, en modo WAL, si detiene al puesto que escribe más de ``--max-stall-ms``
+(con diario de reversión la copia termina en un solo paso y la espera
+equivale a lo que dura esa copia).
+
+Uso:
+    python scripts/benchmark_backup.py
+    python scripts/benchmark_backup.py --size-mb 200 --journal-mode delete
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.backup import online_backup
+
+
+def prepare_database(path, size_mb, journal_mode):
+    """Crea una base de datos de prueba del tamaño pedido."""
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+    connection.execute("CREATE TABLE weighings (id INTEGER PRIMARY KEY, weighed_at TEXT, notes TEXT)")
+    rows = size_mb * 1024 * 1024 // 1100
+    connection.executemany(
+        "INSERT INTO weighings (weighed_at, notes) VALUES ('2024-01-01 08:00:00', ?)",
+        ((f"{index:08d}" * 125,) for index in range(rows))
+    )
+    connection.commit()
+    connection.close()
+    return rows
+
+
+class Writer(threading.Thread):
+    """Puesto que registra un pesaje cada 20 ms y anota su espera máxima."""
+
+    def __init__(self, path):
+        super().__init__(daemon=True)
+        self.path = path
+        self.stop_event = threading.Event()
+        self.max_wait_ms = 0.0
+        self.writes = 0
+
+    def run(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        while not self.stop_event.is_set():
+            started = time.perf_counter()
+            connection.execute(
+                "INSERT INTO weighings (weighed_at, notes) VALUES (datetime('now'), 'nuevo')"
+            )
+            connection.commit()
+            self.max_wait_ms = max(self.max_wait_ms, (time.perf_counter() - started) * 1000)
+            self.writes += 1
+            time.sleep(0.02)
+        connection.close()
+
+
+def run_case(label, db_path, destination, **options):
+    writer = Writer(db_path)
+    writer.start()
+    time.sleep(0.1)
+    report = online_backup(db_path, destination, **options)
+    writer.stop_event.set()
+    writer.join()
+    mode = "un paso" if report["single_step"] else f"{report['steps']} tramos"
+    print(f"{label:<28} {report['duration_ms']:>8.0f} ms  {report['size'] / 1024 / 1024:>7.1f} MB  "
+          f"{mode:<12} reinicios {report['restarts']:>2}   espera máx. del puesto "
+          f"{writer.max_wait_ms:>6.0f} ms ({writer.writes} escrituras)")
+    return report, writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de copias de seguridad en línea")
+    parser.add_argument("--size-mb", type=int, default=50, help="Tamaño de la base de datos")
+    parser.add_argument("--journal-mode", default="wal", help="Modo de diario (wal o delete)")
+    parser.add_argument("--max-stall-ms", type=float, default=1000, help="Espera máxima aceptable")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ismapp-backup-") as temp_dir:
+        # Los archivos de prueba se crean con rutas relativas a la carpeta de trabajo
+        os.chdir(temp_dir)
+        try:
+            db_path = os.path.abspath("ismv3.db")
+            rows = prepare_database(db_path, args.size_mb, args.journal_mode)
+            print(f"Base de datos: {os.path.getsize(db_path) / 1024 / 1024:.0f} MB, "
+                  f"modo {args.journal_mode}, {rows} filas\n")
+
+            stepped, writer = run_case("Por tramos", db_path, "por_tramos.db")
+            run_case("Por tramos, comprimida", db_path, "comprimida.db.gz", compress=True)
+            run_case("Un solo paso", db_path, "un_paso.db", pages_per_step=-1)
+
+            errors = []
+            copied = sqlite3.connect(stepped["path"]).execute("SELECT COUNT(*) FROM weighings").fetchone()[0]
+            if copied < rows:
+                errors.append(f"la copia tiene {copied} filas (se esperaban al menos {rows})")
+            if stepped["snapshot"] and writer.max_wait_ms > args.max_stall_ms:
+                errors.append(f"la copia por tramos detuvo al puesto {writer.max_wait_ms:.0f} ms")
+
+            if errors:
+                for error in errors:
+                    print(f"ERROR: {error}")
+                sys.exit(1)
+            print("OK")
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
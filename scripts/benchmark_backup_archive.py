@@ -0,0 +1,167 @@
+"""
+Benchmark del archivo de respaldos deduplicado.
+
+Crea una base de datos con ``--rows`` pesajes en un directorio temporal y
+simula ``--days`` días de operación (pesajes nuevos y algunas
+correcciones). Tras cada día agrega una copia al archivo y compara lo que
+crece el archivo con lo que ocuparía una copia completa. Después:
+
+1. Verifica todas las copias con 1 y con ``--workers`` hilos.
+2. Restaura la última copia y la compara con la base de datos.
+3. Daña un bloque y comprueba que la verificación lo detecte.
+
+Termina con código 1 si la restauración no coincide, si la verificación
+no detecta el daño, o si algún día agrega más de ``--max-daily-percent``
+del tamaño de la base de datos.
+
+Uso:
+    python scripts/benchmark_backup_archive.py
+    python scripts/benchmark_backup_archive.py --rows 1000000 --days 14 --workers 8
+"""
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.backup import backup_name, online_backup
+from core.database.backup_archive import BackupArchive
+
+
+def file_hash(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def prepare_database(path, rows, rng):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = wal")
+    connection.execute("""
+        CREATE TABLE weighings (
+            id INTEGER PRIMARY KEY, weighed_at TEXT, worker_id INTEGER,
+            net_weight_kg REAL, notes TEXT
+        )
+    """)
+    connection.execute("CREATE INDEX idx_weighings_date ON weighings (weighed_at)")
+    insert_day(connection, 0, rows, rng)
+    connection.close()
+
+
+def insert_day(connection, day, rows, rng):
+    connection.executemany(
+        "INSERT INTO weighings (weighed_at, worker_id, net_weight_kg, notes) VALUES (?, ?, ?, ?)",
+        ((f"2024-{1 + day // 28:02d}-{1 + day % 28:02d} {rng.randint(6, 18):02d}:00:00",
+          rng.randint(1, 300), round(rng.uniform(0.5, 80), 1), "Pesaje de prueba " * rng.randint(1, 4))
+         for _ in range(rows))
+    )
+    connection.commit()
+
+
+def simulate_day(path, day, new_rows, corrections, rng):
+    """Un día de operación: pesajes nuevos y correcciones de pesajes anteriores."""
+    connection = sqlite3.connect(path)
+    insert_day(connection, day, new_rows, rng)
+    last_id = connection.execute("SELECT MAX(id) FROM weighings").fetchone()[0]
+    connection.executemany(
+        "UPDATE weighings SET net_weight_kg = net_weight_kg + 0.5 WHERE id = ?",
+        ((rng.randint(1, last_id),) for _ in range(corrections))
+    )
+    connection.commit()
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del archivo de respaldos deduplicado")
+    parser.add_argument("--rows", type=int, default=300000, help="Pesajes iniciales")
+    parser.add_argument("--days", type=int, default=7, help="Días simulados")
+    parser.add_argument("--daily-rows", type=int, default=2000, help="Pesajes nuevos por día")
+    parser.add_argument("--corrections", type=int, default=50, help="Correcciones por día")
+    parser.add_argument("--workers", type=int, default=4, help="Hilos de verificación")
+    parser.add_argument("--max-daily-percent", type=float, default=15.0,
+                        help="Crecimiento diario máximo aceptable (%% de la base de datos)")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ismapp-archive-") as temp_dir:
+        # Los archivos de prueba se crean con rutas relativas a la carpeta de trabajo
+        os.chdir(temp_dir)
+        try:
+            rng = random.Random(24)
+            db_path = os.path.abspath("ismv3.db")
+            prepare_database(db_path, args.rows, rng)
+            archive = BackupArchive(os.path.abspath("archive"))
+
+            errors = []
+            full_total = 0
+            print(f"{'Copia':<8} {'Base de datos':>14} {'Agregado':>12} {'Bloques nuevos':>16} {'Tiempo':>9}")
+            for day in range(args.days + 1):
+                if day:
+                    simulate_day(db_path, day, args.daily_rows, args.corrections, rng)
+                temp_path = os.path.abspath(f"copia-{day}.db")
+                backup = online_backup(db_path, temp_path)
+                added = archive.add_snapshot(temp_path, backup_name(datetime(2024, 1, 1) + timedelta(days=day)))
+                os.remove(temp_path)
+                full_total += backup["database_size"]
+                percent = added["new_bytes"] * 100 / backup["database_size"]
+                print(f"Día {day:<4} {backup['database_size'] / 1024 / 1024:>11.1f} MB "
+                      f"{added['new_bytes'] / 1024:>9.0f} KB {added['new_chunks']:>7}/{added['chunks']:<8} "
+                      f"{backup['duration_ms'] + added['duration_ms']:>6.0f} ms")
+                if day and percent > args.max_daily_percent:
+                    errors.append(f"el día {day} agregó {percent:.1f}% del tamaño de la base de datos")
+
+            stats = archive.stats()
+            print(f"\nArchivo: {stats['stored_bytes'] / 1024 / 1024:.1f} MB para {stats['snapshots']} copias "
+                  f"(copias completas: {full_total / 1024 / 1024:.1f} MB)")
+
+            for workers in (1, args.workers):
+                started = time.perf_counter()
+                result = archive.verify(workers=workers)
+                print(f"Verificación con {workers} hilo(s): {(time.perf_counter() - started) * 1000:.0f} ms, "
+                      f"{result['chunks']} bloques, {result['bytes'] / 1024 / 1024:.0f} MB")
+                if result["bad_chunks"]:
+                    errors.append("la verificación encontró bloques dañados en un archivo sano")
+
+            latest = archive.list_snapshots()[0]
+            restored = os.path.abspath("restaurada.db")
+            started = time.perf_counter()
+            archive.restore(latest, restored)
+            print(f"Restauración de {latest}: {(time.perf_counter() - started) * 1000:.0f} ms")
+            reference = os.path.abspath("referencia.db")
+            online_backup(db_path, reference)
+            if file_hash(restored) != file_hash(reference):
+                errors.append("la copia restaurada no coincide con la base de datos")
+
+            # Dañar un bloque de la última copia
+            damaged = archive.load_manifest(latest)["chunks"][-1]
+            with open(archive.chunk_path(damaged), "r+b") as handle:
+                handle.seek(10)
+                handle.write(b"\xff\xff\xff\xff")
+            result = archive.verify(workers=args.workers)
+            print(f"Tras dañar un bloque: {len(result['bad_chunks'])} bloque(s) y "
+                  f"{len(result['damaged_snapshots'])} copia(s) afectadas")
+            if damaged not in result["bad_chunks"] or latest not in result["damaged_snapshots"]:
+                errors.append("la verificación no detectó el bloque dañado")
+
+            if errors:
+                for error in errors:
+                    print(f"ERROR: {error}")
+                sys.exit(1)
+            print("OK")
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
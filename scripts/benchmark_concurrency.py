@@ -0,0 +1,258 @@
+"""
+Benchmark de concurrencia de la base de datos de ISMAPP.
+
+Simula N puestos de trabajo (procesos independientes, como equipos distintos
+de la red local) que leen y escriben simultáneamente sobre la misma base de
+datos, y compara el rendimiento de los perfiles de PRAGMA.
+
+Uso:
+    python scripts/benchmark_concurrency.py --workstations 6 --duration 10
+    python scripts/benchmark_concurrency.py --db "\\\\servidor\\ismapp\\bench.db" --profile network_share
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.pragmas import PROFILES, PragmaProfile
+
+# Perfil equivalente al comportamiento original (diario clásico por defecto)
+DEFAULT_PROFILE = PragmaProfile(
+    "default",
+    journal_mode="delete",
+    synchronous="full",
+    cache_size=-2000,
+    mmap_size=0,
+    temp_store="default",
+    busy_timeout=5000,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    business_name TEXT NOT NULL,
+    rut TEXT NOT NULL,
+    is_active INTEGER DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_clients_name ON clients (name);
+CREATE TABLE IF NOT EXISTS materials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    material_type TEXT NOT NULL,
+    is_active INTEGER DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS client_materials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER NOT NULL,
+    material_id INTEGER NOT NULL,
+    price REAL DEFAULT 0.0,
+    UNIQUE(client_id, material_id)
+);
+"""
+
+
+def prepare_database(db_path, clients=2000, materials=50):
+    """
+    Crea la base de datos de prueba con datos iniciales.
+
+    Args:
+        db_path (str): Ruta del archivo a crear
+        clients (int): Número de clientes iniciales
+        materials (int): Número de materiales iniciales
+    """
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            "INSERT INTO clients (name, business_name, rut) VALUES (?, ?, ?)",
+            [(f"Cliente {i:05d}", f"Empresa {i:05d} Ltda.", f"{10000000 + i}-{i % 10}")
+             for i in range(clients)]
+        )
+        connection.executemany(
+            "INSERT INTO materials (name, material_type) VALUES (?, ?)",
+            [(f"Material {i:03d}", "Plástico" if i % 2 else "Cartón") for i in range(materials)]
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO client_materials (client_id, material_id, price) VALUES (?, ?, ?)",
+            [(random.randint(1, clients), random.randint(1, materials), random.uniform(50, 500))
+             for _ in range(clients * 3)]
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def run_workstation(db_path, profile, duration, write_ratio, seed, results):
+    """
+    Ejecuta la carga de un puesto de trabajo durante el tiempo indicado.
+
+    Args:
+        db_path (str): Ruta de la base de datos
+        profile (PragmaProfile): Perfil a aplicar en la conexión
+        duration (float): Segundos de ejecución
+        write_ratio (float): Proporción de operaciones de escritura (0-1)
+        seed (int): Semilla aleatoria del puesto
+        results (multiprocessing.Queue): Cola donde se publican los resultados
+    """
+    rng = random.Random(seed)
+    connection = sqlite3.connect(db_path, timeout=profile.busy_timeout / 1000)
+    profile.apply(connection)
+    max_client = connection.execute("SELECT MAX(id) FROM clients").fetchone()[0]
+
+    reads = writes = errors = 0
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                if rng.random() < 0.5:
+                    connection.execute(
+                        "INSERT INTO clients (name, business_name, rut) VALUES (?, ?, ?)",
+                        (f"Nuevo {seed}-{writes}", "Empresa nueva", "11111111-1")
+                    )
+                else:
+                    connection.execute(
+                        "UPDATE clients SET business_name = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                        (f"Empresa {rng.random():.6f}", rng.randint(1, max_client))
+                    )
+                connection.commit()
+                writes += 1
+            else:
+                if rng.random() < 0.5:
+                    connection.execute(
+                        "SELECT * FROM clients WHERE is_active = 1 AND name LIKE ? ORDER BY name LIMIT 50",
+                        (f"Cliente {rng.randint(0, 99):02d}%",)
+                    ).fetchall()
+                else:
+                    connection.execute(
+                        """SELECT cm.price, m.name FROM client_materials cm
+                           JOIN materials m ON cm.material_id = m.id
+                           WHERE cm.client_id = ? ORDER BY m.name""",
+                        (rng.randint(1, max_client),)
+                    ).fetchall()
+                reads += 1
+        except sqlite3.OperationalError:
+            # Típicamente "database is locked" tras agotar busy_timeout
+            errors += 1
+            try:
+                connection.rollback()
+            except sqlite3.Error:
+                pass
+        latencies.append(time.perf_counter() - started)
+
+    connection.close()
+    results.put((reads, writes, errors, latencies))
+
+
+def run_benchmark(db_path, profile, workstations, duration, write_ratio):
+    """
+    Ejecuta el benchmark con un perfil y devuelve las métricas agregadas.
+
+    Args:
+        db_path (str): Ruta de la base de datos
+        profile (PragmaProfile): Perfil a evaluar
+        workstations (int): Número de puestos simulados
+        duration (float): Segundos de ejecución
+        write_ratio (float): Proporción de escrituras
+
+    Returns:
+        dict: Métricas de rendimiento
+    """
+    prepare_database(db_path)
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=run_workstation,
+            args=(db_path, profile, duration, write_ratio, seed, results)
+        )
+        for seed in range(workstations)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    reads = sum(r[0] for r in collected)
+    writes = sum(r[1] for r in collected)
+    errors = sum(r[2] for r in collected)
+    latencies = sorted(l for r in collected for l in r[3])
+
+    def percentile(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "profile": profile.name,
+        "reads_per_s": reads / duration,
+        "writes_per_s": writes / duration,
+        "errors": errors,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concurrencia de SQLite")
+    parser.add_argument("--workstations", type=int, default=4, help="Puestos simulados")
+    parser.add_argument("--duration", type=float, default=5.0, help="Segundos por perfil")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Proporción de escrituras")
+    parser.add_argument("--profile", default="all",
+                        help="Perfil a evaluar: default, " + ", ".join(PROFILES) + " o all")
+    parser.add_argument("--db", help="Archivo de prueba (por defecto, uno temporal)")
+    args = parser.parse_args()
+
+    profiles = {"default": DEFAULT_PROFILE, **PROFILES}
+    if args.profile == "all":
+        selected = list(profiles.values())
+    elif args.profile in profiles:
+        selected = [profiles[args.profile]]
+    else:
+        parser.error(f"Perfil desconocido: {args.profile}")
+
+    temp_dir = None
+    db_path = args.db
+    if not db_path:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, "benchmark.db")
+
+    print(f"Base de datos: {db_path}")
+    print(f"Puestos: {args.workstations}, duración: {args.duration}s, "
+          f"escrituras: {args.write_ratio:.0%}")
+    print()
+    print(f"{'Perfil':<15}{'Lect/s':>10}{'Escr/s':>10}{'Errores':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+
+    try:
+        for profile in selected:
+            m = run_benchmark(db_path, profile, args.workstations,
+                              args.duration, args.write_ratio)
+            print(f"{m['profile']:<15}{m['reads_per_s']:>10.0f}{m['writes_per_s']:>10.0f}"
+                  f"{m['errors']:>9}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}{m['p99_ms']:>9.2f}")
+    finally:
+        if temp_dir:
+            temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
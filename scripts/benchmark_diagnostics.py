@@ -0,0 +1,96 @@
+"""
+Benchmark del diagnóstico de la base de datos.
+
+Crea en un directorio temporal una base de datos con el esquema de la
+aplicación y ``--rows`` pesajes, de los cuales un 1% apunta a un trabajador
+inexistente. La diagnostica en modo completo y en modo rápido con
+``--workers`` hilos y compara los tiempos.
+
+Termina con código 1 si algún modo no detecta los pesajes huérfanos o si
+el modo rápido tarda más de ``--max-quick-seconds``.
+
+Uso:
+    python scripts/benchmark_diagnostics.py
+    python scripts/benchmark_diagnostics.py --rows 5000000 --workers 8
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.database.diagnostics import Diagnostics
+
+
+def prepare_database(rows, rng):
+    """Crea la base de datos con el esquema de la aplicación y los pesajes."""
+    data_manager = DataManager()
+    db_path = os.path.abspath(data_manager.db_path)
+    data_manager.close()
+
+    connection = sqlite3.connect(db_path)
+    connection.executemany(
+        "INSERT INTO workers (name, rut) VALUES (?, ?)",
+        ((f"Trabajador {index}", f"{index}-K") for index in range(1, 301))
+    )
+    connection.execute("INSERT INTO materials (name, material_type) VALUES ('Cobre', 'metal')")
+    connection.executemany(
+        "INSERT INTO weighings (weighed_at, material_id, worker_id, net_weight_kg, notes) "
+        "VALUES (?, 1, ?, ?, ?)",
+        ((f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 08:00:00",
+          rng.randint(1, 300) if rng.random() > 0.01 else 999999,
+          round(rng.uniform(0.5, 80), 1), "Pesaje de prueba " * rng.randint(1, 4))
+         for _ in range(rows))
+    )
+    connection.commit()
+    connection.close()
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del diagnóstico de la base de datos")
+    parser.add_argument("--rows", type=int, default=1000000, help="Pesajes")
+    parser.add_argument("--workers", type=int, default=4, help="Comprobaciones simultáneas")
+    parser.add_argument("--max-quick-seconds", type=float, default=5.0, help="Duración máxima del modo rápido")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ismapp-diagnostics-") as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            db_path = prepare_database(args.rows, random.Random(25))
+            print(f"Base de datos: {os.path.getsize(db_path) / 1024 / 1024:.0f} MB, {args.rows} pesajes\n")
+
+            errors = []
+            for quick in (False, True):
+                report = Diagnostics(db_path, quick=quick, workers=args.workers).run()
+                weighings = next(check for check in report["checks"] if check["id"] == "foreign_keys:weighings")
+                integrity = next(check for check in report["checks"] if check["id"] == "integrity:weighings")
+                print(f"Modo {report['mode']:<6} {report['duration_ms'] / 1000:>7.2f} s  "
+                      f"integridad de pesajes {integrity['duration_ms']:>7.0f} ms  "
+                      f"huérfanos encontrados {weighings['finding_count']:>6}"
+                      f"{' (muestreo)' if weighings['sampled'] else ''}")
+                if not weighings["finding_count"]:
+                    errors.append(f"el modo {report['mode']} no detectó los pesajes huérfanos")
+                if quick and report["duration_ms"] / 1000 > args.max_quick_seconds:
+                    errors.append(f"el modo rápido tardó {report['duration_ms'] / 1000:.1f} s")
+
+            if errors:
+                for error in errors:
+                    print(f"ERROR: {error}")
+                sys.exit(1)
+            print("OK")
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark de liquidaciones de sueldo.
+
+Crea trabajadores con los distintos tipos de contrato y un año de pesajes
+en una base de datos temporal, y mide ``PayrollService.run_payroll``:
+
+1. Cálculo completo en un proceso y con el pool de procesos.
+2. Repetición con el caché vigente.
+3. Repetición tras cambiar un pesaje de un trabajador y agregar un bono a
+   otro: solo esas dos liquidaciones deben recalcularse.
+
+Termina con código 1 si los resultados con y sin pool difieren, o si el
+caché recalcula de más o devuelve datos vencidos.
+
+Uso:
+    python scripts/benchmark_payroll.py
+    python scripts/benchmark_payroll.py --workers 500 --per-month 200000 --processes 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.services.payroll_service import PayrollService
+from models.payroll import AdjustmentKind, PayrollAdjustment
+
+YEAR = 2024
+CONTRACTS = [("Por Producción", 120.0), ("Por Día", 35000.0), ("Contrato Indefinido", 650000.0)]
+
+
+def prepare_database(data_manager, workers, per_month):
+    """Crea trabajadores y pesajes de un año."""
+    rng = random.Random(20)
+    with data_manager.transaction() as connection:
+        connection.execute("INSERT INTO materials (name, material_type) VALUES ('PET', 'plastic')")
+        connection.executemany(
+            "INSERT INTO workers (name, rut, contract_type, salary) VALUES (?, ?, ?, ?)",
+            [(f"Trabajador {i:04d}", f"{20000000 + i}-{i % 10}", *CONTRACTS[i % len(CONTRACTS)])
+             for i in range(workers)]
+        )
+        for month in range(1, 13):
+            rows = sorted(
+                (f"{YEAR}-{month:02d}-{rng.randint(1, 28):02d} {rng.randint(6, 18):02d}:00:00",
+                 rng.randint(1, workers), round(rng.uniform(0.5, 80.0), 1))
+                for _ in range(per_month)
+            )
+            connection.executemany(
+                "INSERT INTO weighings (weighed_at, material_id, worker_id, net_weight_kg) "
+                "VALUES (?, 1, ?, ?)",
+                rows
+            )
+
+
+def timed(label, function):
+    started = time.perf_counter()
+    result = function()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{label:<38} {elapsed:>9.0f} ms   calculadas {result['computed']:>6}   "
+          f"del caché {result['cached']:>6}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de liquidaciones de sueldo")
+    parser.add_argument("--workers", type=int, default=300, help="Trabajadores activos")
+    parser.add_argument("--per-month", type=int, default=50000, help="Pesajes por mes")
+    parser.add_argument("--processes", type=int, default=None, help="Procesos del pool")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ismapp-payroll-") as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            data_manager = DataManager()
+            print(f"Creando {args.workers} trabajadores y {args.per_month * 12} pesajes...")
+            prepare_database(data_manager, args.workers, args.per_month)
+            service = PayrollService(data_manager)
+            start, end = f"{YEAR}-01", f"{YEAR}-12"
+
+            print()
+            sequential = timed("Año completo, un proceso", lambda: service.run_payroll(
+                start, end, processes=1, use_cache=False))
+            pooled = timed("Año completo, pool de procesos", lambda: service.run_payroll(
+                start, end, processes=args.processes, use_cache=False))
+            cached = timed("Año completo, con caché", lambda: service.run_payroll(start, end))
+
+            # Cambiar un pesaje de marzo y agregar un bono en julio
+            changed = data_manager.execute_query(
+                f"SELECT id, worker_id FROM weighings WHERE weighed_at >= '{YEAR}-03-01' LIMIT 1"
+            )[0]
+            data_manager.execute_query(
+                "UPDATE weighings SET net_weight_kg = net_weight_kg + 10 WHERE id = ?", (changed["id"],)
+            )
+            bonus_worker = changed["worker_id"] % args.workers + 1
+            service.save_adjustment(PayrollAdjustment(
+                worker_id=bonus_worker, period=f"{YEAR}-07", kind=AdjustmentKind.BONUS,
+                amount=25000, description="Bono de prueba"
+            ))
+            updated = timed("Tras cambiar un pesaje y un bono", lambda: service.run_payroll(start, end))
+            fresh = service.run_payroll(start, end, processes=1, use_cache=False)
+
+            errors = []
+            if sequential["results"] != pooled["results"]:
+                errors.append("los resultados con y sin pool de procesos difieren")
+            if cached["computed"] != 0 or cached["results"] != sequential["results"]:
+                errors.append("el caché no reutilizó las liquidaciones vigentes")
+            if updated["computed"] != 2:
+                errors.append(f"tras los cambios se recalcularon {updated['computed']} liquidaciones (se esperaban 2)")
+            if updated["results"] != fresh["results"]:
+                errors.append("el caché devolvió liquidaciones vencidas")
+
+            total = sum(payslip["net"] for payslip in fresh["results"])
+            print(f"\nLiquidaciones: {len(fresh['results'])}   total a pagar: ${total:,}")
+            if errors:
+                for error in errors:
+                    print(f"ERROR: {error}")
+                sys.exit(1)
+            print("OK")
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark del cierre mensual de compras y ventas.
+
+Crea un mes con la cantidad indicada de pesajes de clientes (precios con y
+sin IVA) en una base de datos temporal y mide cuánto tarda
+``PricingService.close_month``. Comprueba además que los totales coincidan
+con un cálculo independiente con Decimal.
+
+Termina con código 1 si el cierre supera el presupuesto o los montos no
+coinciden.
+
+Uso:
+    python scripts/benchmark_pricing.py --weighings 100000
+    python scripts/benchmark_pricing.py --weighings 250000 --budget-ms 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.services.pricing_service import IVA_PERCENT, PricingService
+
+MATERIALS = 20
+CLIENTS = 200
+MONTH = "2024-03"
+
+
+def prepare_database(data_manager, weighings):
+    """Crea clientes, precios y los pesajes del mes."""
+    rng = random.Random(19)
+    with data_manager.transaction() as connection:
+        connection.executemany(
+            "INSERT INTO materials (name, material_type) VALUES (?, 'plastic')",
+            [(f"Material {i}",) for i in range(MATERIALS)]
+        )
+        connection.executemany(
+            "INSERT INTO clients (name, business_name, rut, client_type) VALUES (?, ?, ?, ?)",
+            [(f"Cliente {i}", f"Empresa {i}", f"{10000000 + i}-{i % 10}",
+              rng.choice(["buyer", "supplier", "both"])) for i in range(CLIENTS)]
+        )
+        prices = {}
+        for client in range(1, CLIENTS + 1):
+            for material in range(1, MATERIALS + 1):
+                if rng.random() < 0.5:
+                    prices[(client, material)] = (rng.randint(5000, 90000) / 100, rng.random() < 0.4)
+        connection.executemany(
+            "INSERT INTO client_materials (client_id, material_id, price, includes_tax) VALUES (?, ?, ?, ?)",
+            [(client, material, price, int(taxed)) for (client, material), (price, taxed) in prices.items()]
+        )
+        pairs = list(prices)
+        rows = []
+        for i in range(weighings):
+            client, material = rng.choice(pairs)
+            day = 1 + i % 28
+            rows.append((f"{MONTH}-{day:02d} {i % 24:02d}:{i % 60:02d}:00", material, client,
+                         round(rng.uniform(0.5, 1500.0), 1)))
+        rows.sort()  # los pesajes llegan en orden cronológico
+        connection.executemany(
+            "INSERT INTO weighings (weighed_at, material_id, client_id, net_weight_kg) VALUES (?, ?, ?, ?)",
+            rows
+        )
+    return prices, rows
+
+
+def reference_totals(prices, rows):
+    """Totales por documento calculados con Decimal (referencia)."""
+    untaxed = {}
+    taxed = {}
+    for _, material, client, weight in rows:
+        price, includes_tax = prices[(client, material)]
+        amount = (Decimal(str(weight)) * Decimal(str(price))).quantize(Decimal(1), ROUND_HALF_UP)
+        target = taxed if includes_tax else untaxed
+        target[client] = target.get(client, 0) + int(amount)
+    rate = Decimal(IVA_PERCENT) / 100
+    totals = {}
+    for client in set(untaxed) | set(taxed):
+        gross_taxed = taxed.get(client, 0)
+        net_taxed = int((Decimal(gross_taxed) / (1 + rate)).quantize(Decimal(1), ROUND_HALF_UP))
+        net_untaxed = untaxed.get(client, 0)
+        iva_untaxed = int((net_untaxed * rate).quantize(Decimal(1), ROUND_HALF_UP))
+        net = net_untaxed + net_taxed
+        totals[client] = (net, iva_untaxed + gross_taxed - net_taxed)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del cierre mensual")
+    parser.add_argument("--weighings", type=int, default=100000, help="Pesajes del mes")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Tiempo máximo del cierre")
+    parser.add_argument("--runs", type=int, default=3, help="Repeticiones (se informa la mejor)")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ismapp-pricing-") as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            data_manager = DataManager()
+            print(f"Creando {args.weighings} pesajes...")
+            prices, rows = prepare_database(data_manager, args.weighings)
+
+            service = PricingService(data_manager)
+            timings = []
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                result = service.close_month(MONTH)
+                timings.append((time.perf_counter() - started) * 1000)
+            best = min(timings)
+
+            expected = reference_totals(prices, rows)
+            mismatches = [
+                document["client_id"] for document in result["documents"]
+                if expected.get(document["client_id"]) != (document["net"], document["iva"])
+            ]
+            count = sum(document["weighing_count"] for document in result["documents"])
+
+            print(f"Documentos: {len(result['documents'])}  pesajes: {count}")
+            for kind, totals in result["totals"].items():
+                print(f"  {kind:<9} neto {totals['net']:>16,}  IVA {totals['iva']:>14,}  total {totals['gross']:>16,}")
+            print(f"Cierre: {best:.0f} ms (mejor de {args.runs}; presupuesto {args.budget_ms:.0f} ms)")
+
+            failed = False
+            if count != args.weighings or len(expected) != len(result["documents"]):
+                print("ERROR: el cierre no incluye todos los pesajes")
+                failed = True
+            if mismatches:
+                print(f"ERROR: {len(mismatches)} documentos no coinciden con el cálculo de referencia")
+                failed = True
+            if best > args.budget_ms:
+                print("ERROR: el cierre supera el presupuesto")
+                failed = True
+            sys.exit(1 if failed else 0)
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark de la conversión de filas a objetos del modelo.
+
+Compara la ruta anterior (execute_query -> diccionario -> Client.from_dict)
+con el mapeo directo de tuplas (ClientService.get_all_clients con RowMapper)
+sobre una base de datos temporal con N clientes.
+
+Uso:
+    python scripts/benchmark_row_mapping.py --clients 50000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.services.client_service import ClientService
+from models.client import Client
+
+QUERY = "SELECT * FROM clients WHERE is_active = 1 ORDER BY name"
+
+
+def load_with_dicts(data_manager):
+    """Ruta anterior: filas como diccionarios y Client.from_dict."""
+    return [Client.from_dict(row) for row in data_manager.execute_query(QUERY)]
+
+
+def load_with_mapper(data_manager):
+    """Ruta nueva: tuplas del cursor mapeadas directamente a Client."""
+    return ClientService(data_manager).get_all_clients()
+
+
+def measure(function, data_manager, repeats):
+    """
+    Mide el mejor tiempo y el pico de memoria de una función de carga.
+
+    Returns:
+        tuple: (segundos, pico de memoria en MB, número de objetos)
+    """
+    best = float("inf")
+    count = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        count = len(function(data_manager))
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    result = function(data_manager)
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    del result
+    return best, peak, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del mapeo de filas")
+    parser.add_argument("--clients", type=int, default=50000, help="Clientes de prueba")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeticiones por ruta")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            data_manager = DataManager()
+            data_manager.execute_many(
+                """INSERT INTO clients (name, business_name, rut, address, phone, email,
+                                        contact_person, notes, client_type)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                ((f"Cliente {i:06d}", f"Empresa {i:06d} Ltda.", f"{10000000 + i}-{i % 10}",
+                  f"Calle {i}", "+56 9 1234 5678", f"cliente{i}@correo.cl",
+                  "Contacto", "", "both") for i in range(args.clients))
+            )
+
+            print(f"Clientes: {args.clients}")
+            print(f"{'Ruta':<30}{'tiempo':>12}{'pico memoria':>16}")
+            for name, function in (("diccionarios + from_dict", load_with_dicts),
+                                   ("RowMapper (tuplas)", load_with_mapper)):
+                seconds, peak, count = measure(function, data_manager, args.repeats)
+                print(f"{name:<30}{seconds * 1000:>9.1f} ms{peak:>13.1f} MB")
+            data_manager.close()
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark de la búsqueda de clientes y trabajadores.
+
+Compara la búsqueda anterior con LIKE '%término%' (recorre la tabla entera)
+con la búsqueda por el índice de texto completo FTS5 sobre una base de datos
+temporal con N clientes y N trabajadores.
+
+Uso:
+    python scripts/benchmark_search.py --rows 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.services.client_service import CLIENT_MAPPER, ClientService
+from services.worker_service import WORKER_MAPPER, WorkerService
+
+FIRST_NAMES = ["José", "María", "Ángela", "Raúl", "Sofía", "Martín", "Inés", "Andrés",
+               "Lucía", "Tomás", "Verónica", "Héctor", "Camila", "Joaquín", "Begoña"]
+LAST_NAMES = ["Núñez", "Pérez", "González", "Muñoz", "Rodríguez", "Díaz", "Fernández",
+              "Jiménez", "Ibáñez", "Gutiérrez", "Sepúlveda", "Peña", "Araya", "Zúñiga"]
+POSITIONS = ["Operario", "Chofer", "Bodeguero", "Administrativo", "Supervisor", "Pesador"]
+
+SEARCH_TERMS = ["nunez", "Pérez", "jose gonz", "12.345", "Empresa 0999", "zzz"]
+
+CLIENT_LIKE_QUERY = """
+SELECT * FROM clients
+WHERE is_active = 1 AND (name LIKE ? OR business_name LIKE ? OR rut LIKE ? OR contact_person LIKE ?)
+ORDER BY name
+"""
+WORKER_LIKE_QUERY = """
+SELECT * FROM workers
+WHERE is_active = 1 AND (name LIKE ? OR rut LIKE ? OR position LIKE ?)
+"""
+
+
+def random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def random_rut(i):
+    number = 10000000 + i * 37
+    text = f"{number:,}".replace(",", ".")
+    return f"{text}-{i % 10}"
+
+
+def populate(data_manager, rows, seed):
+    """Inserta N clientes y N trabajadores de prueba."""
+    rng = random.Random(seed)
+    data_manager.execute_many(
+        """INSERT INTO clients (name, business_name, rut, address, phone, email,
+                                contact_person, notes, client_type)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        ((random_name(rng), f"Empresa {i:06d} Ltda.", random_rut(i), f"Calle {i}",
+          "+56 9 1234 5678", f"cliente{i}@correo.cl", random_name(rng), "", "both")
+         for i in range(rows))
+    )
+    data_manager.execute_many(
+        "INSERT INTO workers (name, rut, position, department) VALUES (?, ?, ?, ?)",
+        ((random_name(rng), random_rut(i), rng.choice(POSITIONS), "Planta")
+         for i in range(rows))
+    )
+
+
+def best_time(function, repeats):
+    """Devuelve (mejor tiempo en segundos, resultados de la última ejecución)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda LIKE vs FTS5")
+    parser.add_argument("--rows", type=int, default=100000, help="Clientes y trabajadores de prueba")
+    parser.add_argument("--repeats", type=int, default=5, help="Repeticiones por búsqueda")
+    parser.add_argument("--seed", type=int, default=7, help="Semilla de los datos")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            data_manager = DataManager()
+            if not data_manager.has_full_text_index("clients"):
+                print("Este SQLite no incluye FTS5; no hay nada que comparar")
+                return
+
+            started = time.perf_counter()
+            populate(data_manager, args.rows, args.seed)
+            print(f"Filas por tabla: {args.rows} (carga con triggers FTS: "
+                  f"{time.perf_counter() - started:.1f} s)")
+
+            client_service = ClientService(data_manager)
+            worker_service = WorkerService(data_manager)
+
+            print(f"{'Tabla':<10}{'Término':<16}{'LIKE':>11}{'FTS5':>11}{'filas LIKE':>12}{'filas FTS':>11}")
+            for term in SEARCH_TERMS:
+                pattern = f"%{term}%"
+                cases = (
+                    ("clients",
+                     lambda: data_manager.fetch_models(CLIENT_MAPPER, CLIENT_LIKE_QUERY, (pattern,) * 4),
+                     lambda: client_service.search_clients(term)),
+                    ("workers",
+                     lambda: data_manager.fetch_models(WORKER_MAPPER, WORKER_LIKE_QUERY, (pattern,) * 3),
+                     lambda: worker_service.search_workers(term)),
+                )
+                for table, like_search, fts_search in cases:
+                    like_seconds, like_rows = best_time(like_search, args.repeats)
+                    fts_seconds, fts_rows = best_time(fts_search, args.repeats)
+                    print(f"{table:<10}{term:<16}{like_seconds * 1000:>8.1f} ms{fts_seconds * 1000:>8.1f} ms"
+                          f"{len(like_rows or []):>12}{len(fts_rows):>11}")
+            data_manager.close()
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
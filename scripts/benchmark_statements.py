@@ -0,0 +1,133 @@
+"""
+Micro-benchmark del caché de sentencias preparadas de ISMAPP.
+
+Compara, para las consultas principales de los servicios, tres escenarios:
+    - conexión nueva por consulta (comportamiento anterior al pool),
+    - conexión del pool sin caché de sentencias (compilación en frío),
+    - conexión del pool con caché de sentencias (ejecución en caliente).
+
+Se ejecuta sobre una base de datos temporal con datos de ejemplo.
+
+Uso:
+    python scripts/benchmark_statements.py --iterations 2000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager, STATEMENT_CACHE_SIZE
+
+# Consultas principales de los servicios (texto idéntico al de cada servicio)
+SERVICE_QUERIES = [
+    ("ClientService.get_client_by_id",
+     "SELECT * FROM clients WHERE id = ?", lambda i: (i % 500 + 1,)),
+    ("ClientService.get_all_clients",
+     "SELECT * FROM clients WHERE is_active = 1 ORDER BY name", lambda i: ()),
+    ("MaterialService.get_material_by_id",
+     "SELECT * FROM materials WHERE id = ?", lambda i: (i % 40 + 1,)),
+    ("MaterialService.get_client_materials",
+     """
+        SELECT cm.*, m.* FROM client_materials cm
+        JOIN materials m ON cm.material_id = m.id
+        WHERE cm.client_id = ?
+        ORDER BY m.name
+        """, lambda i: (i % 500 + 1,)),
+    ("UserService.authenticate",
+     "SELECT * FROM users WHERE username = ? AND password = ? AND is_active = 1",
+     lambda i: ("admin", "admin123")),
+]
+
+
+def populate(data_manager):
+    """
+    Carga datos de ejemplo en la base de datos temporal.
+
+    Args:
+        data_manager (DataManager): Gestor de datos
+    """
+    data_manager.execute_many(
+        "INSERT INTO clients (name, business_name, rut) VALUES (?, ?, ?)",
+        [(f"Cliente {i:04d}", f"Empresa {i:04d}", f"{10000000 + i}-{i % 10}") for i in range(500)]
+    )
+    data_manager.execute_many(
+        "INSERT INTO materials (name, material_type) VALUES (?, ?)",
+        [(f"Material {i:02d}", "plastic") for i in range(40)]
+    )
+    data_manager.execute_many(
+        "INSERT OR IGNORE INTO client_materials (client_id, material_id, price) VALUES (?, ?, ?)",
+        [(c, m, 100.0) for c in range(1, 501) for m in range(1, 41, 7)]
+    )
+
+
+def time_connect_per_query(db_path, query, make_params, iterations):
+    """Mide la ejecución abriendo y cerrando una conexión por consulta."""
+    started = time.perf_counter()
+    for i in range(iterations):
+        connection = sqlite3.connect(db_path)
+        try:
+            connection.execute(query, make_params(i)).fetchall()
+        finally:
+            connection.close()
+    return time.perf_counter() - started
+
+
+def time_data_manager(data_manager, query, make_params, iterations):
+    """Mide la ejecución a través de DataManager.execute_query."""
+    started = time.perf_counter()
+    for i in range(iterations):
+        data_manager.execute_query(query, make_params(i))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del caché de sentencias")
+    parser.add_argument("--iterations", type=int, default=2000, help="Ejecuciones por consulta")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            data_manager = DataManager()
+            populate(data_manager)
+            db_path = os.path.abspath(data_manager.db_path)
+
+            print(f"{'Consulta':<40}{'conexión/consulta':>19}{'pool en frío':>14}"
+                  f"{'pool en caliente':>18}{'mejora':>8}")
+
+            for name, query, make_params in SERVICE_QUERIES:
+                per_query = time_connect_per_query(db_path, query, make_params, args.iterations)
+
+                data_manager.configure_statement_cache(0)
+                cold = time_data_manager(data_manager, query, make_params, args.iterations)
+
+                data_manager.configure_statement_cache(STATEMENT_CACHE_SIZE)
+                data_manager.reset_statement_cache_stats()
+                warm = time_data_manager(data_manager, query, make_params, args.iterations)
+
+                def us(seconds):
+                    return seconds / args.iterations * 1e6
+
+                print(f"{name:<40}{us(per_query):>16.1f} µs{us(cold):>11.1f} µs"
+                      f"{us(warm):>15.1f} µs{cold / warm:>7.2f}x")
+
+            stats = data_manager.get_statement_cache_stats()
+            print()
+            print(f"Caché (última consulta): aciertos={stats['hits']} fallos={stats['misses']} "
+                  f"tasa={stats['hit_ratio']:.1%}")
+            data_manager.close()
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark de escritura de pesajes.
+
+Compara el rendimiento máximo de inserción de pesajes (incluidos los
+triggers del resumen mensual y de change_log) confirmando cada lectura por
+separado, como haría un INSERT por lectura con execute_query, con el
+escritor por lotes de WeighingService con distintos tamaños de lote.
+
+Uso:
+    python scripts/benchmark_weighings.py --readings 20000
+    python scripts/benchmark_weighings.py --profile network_share --batch-sizes 100 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.database.pragmas import PROFILES
+from core.services.weighing_service import WeighingService
+from models.weighing import PlasticState, Weighing
+
+
+MATERIALS = 20
+CLIENTS = 200
+
+
+def prepare_database(data_manager):
+    """Crea los materiales y clientes a los que apuntan las lecturas."""
+    with data_manager.transaction() as connection:
+        connection.executemany(
+            "INSERT INTO materials (name, material_type) VALUES (?, 'plastic')",
+            [(f"Material {i}",) for i in range(MATERIALS)]
+        )
+        connection.executemany(
+            "INSERT INTO clients (name, business_name, rut) VALUES (?, ?, ?)",
+            [(f"Cliente {i}", f"Empresa {i}", f"{10000000 + i}-{i % 10}") for i in range(CLIENTS)]
+        )
+        connection.executemany(
+            "INSERT INTO client_materials (client_id, material_id, price) VALUES (?, ?, ?)",
+            [(client, material, 100 + material)
+             for client in range(1, CLIENTS + 1) for material in range(1, MATERIALS + 1)]
+        )
+
+
+def make_readings(count, seed):
+    """Genera lecturas de prueba."""
+    rng = random.Random(seed)
+    return [
+        Weighing(
+            material_id=rng.randint(1, MATERIALS),
+            client_id=rng.randint(1, CLIENTS),
+            net_weight_kg=round(rng.uniform(0.5, 1500), 1),
+            plastic_state=rng.choice(PlasticState.get_all_states()),
+        )
+        for _ in range(count)
+    ]
+
+
+def bench_single_commits(data_manager, readings):
+    """Una transacción por lectura (execute_query)."""
+    query = """
+    INSERT INTO weighings (weighed_at, material_id, client_id, worker_id, net_weight_kg,
+                           plastic_state, price_per_kg, amount, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    started = time.perf_counter()
+    for w in readings:
+        data_manager.execute_query(query, (
+            w.weighed_at, w.material_id, w.client_id, w.worker_id, w.net_weight_kg,
+            w.plastic_state, 0.0, 0.0, w.notes,
+        ))
+    return time.perf_counter() - started, None
+
+
+def bench_batch_writer(data_manager, readings, batch_size):
+    """WeighingService con el escritor por lotes."""
+    service = WeighingService(data_manager, batch_size=batch_size)
+    started = time.perf_counter()
+    longest_record = 0.0
+    for weighing in readings:
+        before = time.perf_counter()
+        service.record_weighing(weighing)
+        longest_record = max(longest_record, time.perf_counter() - before)
+    service.close()
+    return time.perf_counter() - started, service.writer.stats(), longest_record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escritura de pesajes")
+    parser.add_argument("--readings", type=int, default=10000, help="Lecturas por prueba")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[50, 500, 2000],
+                        help="Tamaños de lote a evaluar")
+    parser.add_argument("--single-limit", type=int, default=2000,
+                        help="Lecturas de la prueba sin lotes (es mucho más lenta)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), help="Perfil de PRAGMA")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            data_manager = DataManager()
+            if args.profile:
+                data_manager.configure_pragmas(args.profile)
+            prepare_database(data_manager)
+
+            print(f"{'Prueba':<28}{'Lecturas':>10}{'Segundos':>10}{'Lecturas/min':>15}"
+                  f"{'Máx. espera ms':>16}")
+
+            readings = make_readings(min(args.readings, args.single_limit), args.seed)
+            elapsed, _ = bench_single_commits(data_manager, readings)
+            print(f"{'Un commit por lectura':<28}{len(readings):>10}{elapsed:>10.2f}"
+                  f"{len(readings) / elapsed * 60:>15,.0f}{'-':>16}")
+
+            for batch_size in args.batch_sizes:
+                readings = make_readings(args.readings, args.seed)
+                elapsed, stats, longest_record = bench_batch_writer(data_manager, readings, batch_size)
+                label = f"Lotes de {batch_size} ({stats['batches']} lotes)"
+                print(f"{label:<28}{stats['written']:>10}{elapsed:>10.2f}"
+                      f"{stats['written'] / elapsed * 60:>15,.0f}{longest_record * 1000:>16.3f}")
+
+            data_manager.close()
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Verificación del almacén de archivos adjuntos.
+
+En una base de datos temporal:
+
+1. Adjunta un archivo grande (``--size-mb``) y mide la memoria máxima
+   usada durante la copia: debe ser del orden de un bloque, no del archivo.
+2. Adjunta el mismo contenido a otro cliente y a un trabajador: debe
+   guardarse una sola vez.
+3. Exporta el adjunto y compara el hash de la copia.
+4. Elimina los adjuntos y el cliente: el contenido sin uso debe borrarse.
+
+Termina con código 1 si alguna comprobación falla.
+
+Uso:
+    python scripts/check_attachment_store.py
+    python scripts/check_attachment_store.py --size-mb 500
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.attachments.store import CHUNK_SIZE
+from core.database.data_manager import DataManager
+from core.services.attachment_service import AttachmentService
+from models.attachment import AttachmentEntity
+
+
+def write_sample(path, size_mb):
+    """Crea un archivo de prueba y devuelve su hash."""
+    sha256 = hashlib.sha256()
+    block = os.urandom(CHUNK_SIZE)
+    with open(path, "wb") as target:
+        for index in range(size_mb):
+            chunk = index.to_bytes(8, "big") + block[8:]
+            sha256.update(chunk)
+            target.write(chunk)
+    return sha256.hexdigest()
+
+
+def file_hash(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificación del almacén de adjuntos")
+    parser.add_argument("--size-mb", type=int, default=64, help="Tamaño del archivo de prueba")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ismapp-attachments-") as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            data_manager = DataManager()
+            service = AttachmentService(data_manager)
+            with data_manager.transaction() as connection:
+                for index in (1, 2):
+                    connection.execute(
+                        "INSERT INTO clients (name, business_name, rut, client_type) VALUES (?, ?, ?, 'both')",
+                        (f"Cliente {index}", f"Cliente {index} Ltda.", f"7600000{index}-{index}")
+                    )
+                connection.execute("INSERT INTO workers (name, rut) VALUES ('Trabajador 1', '20000001-1')")
+
+            sample = os.path.abspath("escaneo.pdf")
+            expected = write_sample(sample, args.size_mb)
+            errors = []
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            first = service.attach_file(sample, AttachmentEntity.CLIENT, 1, uploaded_by="admin")
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"Adjuntar {args.size_mb} MB: {elapsed * 1000:.0f} ms, memoria máxima {peak / 1024 / 1024:.1f} MB")
+            if first.sha256 != expected:
+                errors.append("el hash calculado durante la copia no coincide")
+            if peak > 4 * CHUNK_SIZE:
+                errors.append(f"la copia usó {peak} bytes de memoria (se esperaba del orden de un bloque)")
+
+            service.attach_file(sample, AttachmentEntity.CLIENT, 2)
+            service.attach_file(sample, AttachmentEntity.WORKER, 1)
+            stats = service.get_storage_stats()
+            print(f"Adjuntos: {stats['attachments']}   contenidos guardados: {stats['blobs']}   "
+                  f"{stats['stored_bytes'] / 1024 / 1024:.0f} MB de {stats['logical_bytes'] / 1024 / 1024:.0f} MB")
+            if stats["attachments"] != 3 or stats["blobs"] != 1:
+                errors.append("el mismo contenido se guardó más de una vez")
+
+            exported = os.path.abspath("exportado.pdf")
+            service.export_attachment(first, exported)
+            if file_hash(exported) != expected or not service.store.verify(expected):
+                errors.append("la copia exportada no coincide con el original")
+
+            # Eliminar adjuntos uno a uno y el último con su cliente (trigger de borrado)
+            for attachment in service.get_attachments(AttachmentEntity.CLIENT, 1):
+                service.delete_attachment(attachment.id)
+            for attachment in service.get_attachments(AttachmentEntity.WORKER, 1):
+                service.delete_attachment(attachment.id)
+            if not service.store.exists(expected):
+                errors.append("se eliminó un contenido que otro adjunto aún usa")
+            data_manager.execute_query("DELETE FROM clients WHERE id = 2")
+            service.collect_garbage()
+            if service.store.exists(expected) or service.get_storage_stats()["blobs"] != 0:
+                errors.append("el contenido sin uso no se eliminó")
+
+            if errors:
+                for error in errors:
+                    print(f"ERROR: {error}")
+                sys.exit(1)
+            print("OK")
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
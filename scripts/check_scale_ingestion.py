@@ -0,0 +1,182 @@
+"""
+Verificación del ingreso de pesajes desde balanzas.
+
+Conecta el lector a un simulador de balanza y comprueba que cada carga
+enviada quede registrada exactamente una vez, en las situaciones que se ven
+en los puestos:
+
+1. Ráfaga de cargas (el simulador envía tan rápido como puede).
+2. Base de datos bloqueada por otro puesto más allá del busy_timeout.
+3. Corte de la conexión con la balanza.
+4. Cierre del programa con lecturas sin confirmar y la base de datos
+   bloqueada. Al reiniciar (con el checkpoint borrado, que se recupera de
+   la base de datos) se reenvía la bitácora mientras el escritor anterior
+   todavía reintenta los mismos lotes: el índice único evita duplicarlos.
+
+Usa una base de datos temporal. Termina con código 1 si alguna carga se
+perdió o se duplicó.
+
+Uso:
+    python scripts/check_scale_ingestion.py
+    python scripts/check_scale_ingestion.py --loads 5000 --lock-seconds 8
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.scales.journal import CHECKPOINT_FILE
+from core.scales.pipeline import ScaleIngestion
+from core.scales.simulator import ScaleSimulator
+from core.scales.sources import TcpScaleSource
+from core.services.weighing_service import WeighingService
+
+SOURCE_NAME = "balanza-prueba"
+
+
+def hold_exclusive_lock(db_path, seconds):
+    """Bloquea la base de datos desde otra conexión (como otro puesto)."""
+    connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    connection.execute("BEGIN EXCLUSIVE")
+    time.sleep(seconds)
+    connection.execute("COMMIT")
+    connection.close()
+
+
+def start_pipeline(service, simulator, journal_dir, context):
+    pipeline = ScaleIngestion(
+        service, SOURCE_NAME, TcpScaleSource("127.0.0.1", simulator.port, timeout=0.2),
+        journal_dir
+    )
+    pipeline.set_context(**context)
+    pipeline.start()
+    return pipeline
+
+
+def wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica el ingreso de pesajes desde balanzas")
+    parser.add_argument("--loads", type=int, default=3000, help="Cargas por etapa")
+    parser.add_argument("--lock-seconds", type=float, default=7.0,
+                        help="Segundos de bloqueo de la base de datos")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ismapp-scales-") as work_dir:
+        os.chdir(work_dir)
+        try:
+            data_manager = DataManager()
+            with data_manager.transaction() as connection:
+                material_id = connection.execute(
+                    "INSERT INTO materials (name, material_type) VALUES ('PET', 'plastic')"
+                ).lastrowid
+                client_id = connection.execute(
+                    "INSERT INTO clients (name, business_name, rut) VALUES ('Cliente', 'Empresa', '1-9')"
+                ).lastrowid
+            context = {"material_id": material_id, "client_id": client_id}
+            service = WeighingService(data_manager)
+            journal_dir = os.path.join(work_dir, "journal")
+
+            simulator = ScaleSimulator(loads_per_second=0, seed=18)
+            simulator.start(load_limit=args.loads)
+            pipeline = start_pipeline(service, simulator, journal_dir, context)
+            max_depth = 0
+
+            # 1-2. Ráfaga con la base de datos bloqueada a la mitad
+            wait_for(lambda: len(simulator.loads) >= args.loads // 2, 60)
+            print(f"Bloqueando la base de datos {args.lock_seconds:.0f} s durante la ráfaga...")
+            locker = threading.Thread(target=hold_exclusive_lock,
+                                      args=(data_manager.db_path, args.lock_seconds))
+            locker.start()
+            while locker.is_alive():
+                max_depth = max(max_depth, pipeline.metrics()["queue_depth"])
+                time.sleep(0.1)
+            locker.join()
+            simulator.wait_until_sent(args.loads, 60)
+
+            # 3. Corte de la conexión con la balanza
+            simulator.disconnect()
+            wait_for(lambda: pipeline.metrics()["connected"], 30)
+            simulator.set_load_limit(args.loads * 2)
+            simulator.wait_until_sent(args.loads * 2, 60)
+            wait_for(lambda: pipeline.metrics()["readings"] >= len(simulator.loads), 10)
+            pipeline.flush(60)
+            print("Tras ráfaga, bloqueo y corte:", json.dumps(pipeline.metrics()))
+
+            # 4. Cierre con la base de datos bloqueada y reinicio
+            simulator.set_load_limit(args.loads * 3)
+            locker = threading.Thread(target=hold_exclusive_lock,
+                                      args=(data_manager.db_path, args.lock_seconds))
+            locker.start()
+            time.sleep(0.2)
+            simulator.wait_until_sent(args.loads * 3, 60)
+            wait_for(lambda: pipeline.metrics()["readings"] >= len(simulator.loads), 10)
+            max_depth = max(max_depth, pipeline.metrics()["queue_depth"])
+            pipeline.stop(timeout=0.5)
+            locker.join()
+            os.remove(os.path.join(journal_dir, CHECKPOINT_FILE))
+
+            pipeline = start_pipeline(service, simulator, journal_dir, context)
+            replayed = pipeline.metrics()["replayed"]
+            pipeline.flush(60)
+            final_metrics = pipeline.metrics()
+            pipeline.stop()
+            simulator.stop()
+            print("Tras reinicio:", json.dumps(final_metrics))
+
+            rows = data_manager.execute_query(
+                "SELECT source_seq, net_weight_kg FROM weighings WHERE source = ? ORDER BY source_seq",
+                (SOURCE_NAME,)
+            )
+            sent = sorted(simulator.loads)
+            stored = sorted(row["net_weight_kg"] for row in rows)
+            sequences = [row["source_seq"] for row in rows]
+            summary = data_manager.execute_query(
+                "SELECT COALESCE(SUM(weighing_count), 0) AS n FROM weighing_monthly_summary"
+            )[0]["n"]
+
+            print(f"\nCargas enviadas:        {len(sent)}")
+            print(f"Pesajes registrados:    {len(rows)}")
+            print(f"Reenviadas al reiniciar: {replayed}")
+            print(f"Profundidad máxima:     {max_depth}")
+            print(f"Latencia hasta confirmar: {final_metrics['flush_latency_ms']}")
+
+            errors = []
+            if stored != sent:
+                missing = len(sent) - len(set(stored) & set(sent))
+                errors.append(f"los pesos registrados no coinciden con los enviados "
+                              f"({len(stored)} registrados, {len(sent)} enviados, ~{missing} distintos)")
+            if len(set(sequences)) != len(sequences):
+                errors.append("hay números de lectura duplicados")
+            if summary != len(rows):
+                errors.append(f"el resumen mensual cuenta {summary} pesajes")
+            if final_metrics["queue_depth"] != 0:
+                errors.append(f"quedaron {final_metrics['queue_depth']} lecturas sin confirmar")
+
+            if errors:
+                for error in errors:
+                    print(f"ERROR: {error}")
+                sys.exit(1)
+            print("\nOK: cada carga quedó registrada exactamente una vez")
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
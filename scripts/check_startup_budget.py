@@ -0,0 +1,173 @@
+"""
+Verificación del tiempo de arranque en frío de ISMAPP.
+
+Arranca la aplicación en un proceso nuevo (importaciones en frío, base de
+datos nueva en una carpeta temporal) con la medición de arranque activada
+(core/utils/startup_profiler.py) y falla si el arranque supera el
+presupuesto o si se cargó alguna dependencia pesada que debería importarse
+solo al usarse.
+
+Modos:
+    --mode core  Importaciones de la aplicación, DataManager y servicios,
+                 los mismos de main.py (core/startup.py); sin interfaz, sirve
+                 en servidores de integración sin pantalla
+    --mode app   main.py completo hasta mostrar la ventana de login
+                 (requiere pantalla)
+
+Uso:
+    python scripts/check_startup_budget.py --budget-ms 800
+    python scripts/check_startup_budget.py --mode app --runs 3
+
+El presupuesto también puede fijarse con ISMAPP_STARTUP_BUDGET_MS. Sale con
+código 1 si se supera; tests/test_startup_budget.py lo ejecuta como prueba.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.utils.startup_profiler import ENV_VAR, EXIT_ENV_VAR
+
+# Presupuesto por defecto de cada modo (milisegundos)
+DEFAULT_BUDGETS_MS = {"core": 1000, "app": 3000}
+
+# Dependencias que no deben cargarse durante el arranque
+HEAVY_MODULES = ("sqlalchemy", "PIL", "numpy", "pandas", "matplotlib")
+
+# Arranque sin interfaz: mismas fases que main.py hasta el login, con las
+# importaciones y los servicios de core/startup.py (los que usa main.py)
+CORE_STARTUP = """
+import sys
+sys.path.insert(0, {root!r})
+from core.utils.startup_profiler import profiler
+
+with profiler.phase("imports: aplicación"):
+    from core.startup import ChangeTracker, DataManager, create_services
+
+with profiler.phase("DataManager y migraciones"):
+    data_manager = DataManager()
+ChangeTracker(data_manager)
+
+with profiler.phase("servicios"):
+    create_services(data_manager)
+profiler.mark("login visible")
+profiler.report()
+"""
+
+# Arranque completo: main.py termina solo al mostrar el login (EXIT_ENV_VAR)
+APP_STARTUP = """
+import runpy, sys
+sys.argv = [{main!r}]
+runpy.run_path({main!r}, run_name="__main__")
+"""
+
+# Al final de cada arranque se informan las dependencias pesadas cargadas
+REPORT_MODULES = """
+import json, sys
+print("HEAVY_MODULES=" + json.dumps(sorted(
+    name for name in {heavy!r} if name in sys.modules
+)))
+"""
+
+
+def run_once(mode):
+    """
+    Arranca la aplicación en un proceso nuevo y devuelve su medición.
+
+    Args:
+        mode (str): "core" o "app"
+
+    Returns:
+        tuple: (resumen del profiler, dependencias pesadas cargadas)
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_path = os.path.join(work_dir, "startup.json")
+        if mode == "core":
+            code = CORE_STARTUP.format(root=parent_dir)
+        else:
+            code = APP_STARTUP.format(main=os.path.join(parent_dir, "main.py"))
+        code += REPORT_MODULES.format(heavy=HEAVY_MODULES)
+
+        env = dict(os.environ)
+        env[ENV_VAR] = output_path
+        env[EXIT_ENV_VAR] = "1"
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+        # La base de datos se crea en data/ relativo a la carpeta de trabajo
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=work_dir, env=env, capture_output=True, text=True
+        )
+        if process.returncode != 0 or not os.path.exists(output_path):
+            print(process.stdout)
+            print(process.stderr, file=sys.stderr)
+            raise RuntimeError(f"El arranque terminó con código {process.returncode}")
+
+        with open(output_path, encoding="utf-8") as f:
+            summary = json.load(f)
+
+    heavy = []
+    for line in process.stdout.splitlines():
+        if line.startswith("HEAVY_MODULES="):
+            heavy = json.loads(line.split("=", 1)[1])
+    return summary, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica el presupuesto de arranque en frío")
+    parser.add_argument("--mode", choices=sorted(DEFAULT_BUDGETS_MS), default="core",
+                        help="core (sin interfaz) o app (main.py hasta el login)")
+    parser.add_argument("--budget-ms", type=float,
+                        default=os.environ.get("ISMAPP_STARTUP_BUDGET_MS"),
+                        help="Presupuesto del arranque en milisegundos")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Arranques a medir (se compara la mediana)")
+    args = parser.parse_args()
+
+    budget_ms = float(args.budget_ms) if args.budget_ms else DEFAULT_BUDGETS_MS[args.mode]
+
+    totals = []
+    phases = {}
+    heavy_loaded = set()
+    for _ in range(max(1, args.runs)):
+        try:
+            summary, heavy = run_once(args.mode)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        totals.append(summary["marks_ms"]["login visible"])
+        for name, duration_ms in summary["totals_ms"].items():
+            phases.setdefault(name, []).append(duration_ms)
+        heavy_loaded.update(heavy)
+
+    print(f"Modo: {args.mode}, arranques: {len(totals)}")
+    print(f"{'Fase':<36}{'mediana ms':>12}")
+    for name, values in phases.items():
+        print(f"{name:<36}{statistics.median(values):12.1f}")
+
+    startup_ms = statistics.median(totals)
+    print(f"{'Arranque hasta el login':<36}{startup_ms:12.1f}   (presupuesto {budget_ms:.0f} ms)")
+
+    failed = False
+    if startup_ms > budget_ms:
+        print(f"FALLO: el arranque supera el presupuesto en {startup_ms - budget_ms:.0f} ms")
+        failed = True
+    if heavy_loaded:
+        print(f"FALLO: dependencias pesadas cargadas al arrancar: {', '.join(sorted(heavy_loaded))}")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Verificación del caché de miniaturas de adjuntos.
+
+1. Llena el caché por encima de su tope y comprueba que se descarten las
+   miniaturas menos usadas (no las recién consultadas) y que el tamaño en
+   disco quede bajo el tope.
+2. Reabre el caché y comprueba que conserve el orden de uso.
+3. Si Pillow está instalado, adjunta ``--images`` imágenes JPEG grandes y
+   mide la primera carga de miniaturas (se generan) y la segunda (desde el
+   caché, debe ser inmediata).
+
+Termina con código 1 si alguna comprobación falla.
+
+Uso:
+    python scripts/check_thumbnail_cache.py
+    python scripts/check_thumbnail_cache.py --images 40
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.attachments.thumbnails import ThumbnailCache, can_preview
+
+
+def check_lru(root, errors):
+    """Comprueba el descarte por tope y la persistencia del orden de uso."""
+    cache = ThumbnailCache(root, max_mb=1)
+    entry = os.urandom(100 * 1024)
+    for index in range(8):
+        cache.put(f"{index:064x}-64", entry)
+        time.sleep(0.01)
+
+    # Usar la primera: la siguiente en salir debe ser la segunda
+    if cache.get(f"{0:064x}-64") is None:
+        errors.append("el caché perdió una miniatura bajo el tope")
+    time.sleep(0.01)
+    for index in range(8, 12):
+        cache.put(f"{index:064x}-64", entry)
+        time.sleep(0.01)
+
+    stats = cache.stats()
+    on_disk = sum(os.path.getsize(os.path.join(root, name)) for name in os.listdir(root))
+    print(f"Caché: {stats['entries']} miniaturas, {on_disk / 1024:.0f} KB en disco "
+          f"(tope {stats['max_bytes'] / 1024:.0f} KB)")
+    if on_disk > stats["max_bytes"]:
+        errors.append("el caché supera su tope en disco")
+    if cache.get(f"{0:064x}-64") is None:
+        errors.append("se descartó la miniatura recién usada")
+    if cache.get(f"{1:064x}-64") is not None:
+        errors.append("no se descartó la miniatura menos usada")
+
+    # Al reabrirlo, la menos usada sigue siendo la primera en salir
+    reopened = ThumbnailCache(root, max_mb=1)
+    reopened.put(f"{12:064x}-64", entry)
+    if reopened.get(f"{2:064x}-64") is not None or reopened.get(f"{0:064x}-64") is None:
+        errors.append("el caché no conservó el orden de uso al reabrirlo")
+
+
+def check_service(count, errors):
+    """Adjunta imágenes y mide las miniaturas sin y con caché."""
+    from PIL import Image
+
+    from core.database.data_manager import DataManager
+    from core.services.attachment_service import AttachmentService
+    from models.attachment import AttachmentEntity
+
+    data_manager = DataManager()
+    data_manager.execute_query(
+        "INSERT INTO clients (name, business_name, rut, client_type) "
+        "VALUES ('Cliente', 'Cliente Ltda.', '76000000-0', 'both')"
+    )
+    service = AttachmentService(data_manager)
+    for index in range(count):
+        path = os.path.abspath(f"escaneo-{index}.jpg")
+        Image.new("RGB", (2480, 3508), (index * 6 % 256, 120, 200)).save(path, quality=85)
+        service.attach_file(path, AttachmentEntity.CLIENT, 1)
+
+    attachments = service.get_attachments(AttachmentEntity.CLIENT, 1)
+    started = time.perf_counter()
+    generated = [service.get_thumbnail(attachment) for attachment in attachments]
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    cached = [service.get_thumbnail(attachment) for attachment in attachments]
+    warm = time.perf_counter() - started
+    print(f"{count} escaneos A4: generar {cold * 1000:.0f} ms, desde el caché {warm * 1000:.1f} ms")
+    if (None in generated or cached != generated
+            or not all(service.is_thumbnail_cached(attachment) for attachment in attachments)):
+        errors.append("faltan miniaturas en el caché tras generarlas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verificación del caché de miniaturas")
+    parser.add_argument("--images", type=int, default=20, help="Imágenes de prueba (requiere Pillow)")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ismapp-thumbnails-") as temp_dir:
+        # DataManager usa la ruta relativa data/ismv3.db
+        os.chdir(temp_dir)
+        try:
+            errors = []
+            check_lru(os.path.abspath("lru"), errors)
+            if can_preview("image/jpeg"):
+                check_service(args.images, errors)
+            else:
+                print("Pillow no está instalado: se omite la generación de miniaturas")
+
+            if errors:
+                for error in errors:
+                    print(f"ERROR: {error}")
+                sys.exit(1)
+            print("OK")
+        finally:
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Generador de carga de pesajes para ISMAPP.
+
+Simula varios puestos de trabajo (procesos independientes sobre el mismo
+archivo de base de datos), cada uno con varias balanzas que envían lecturas
+a ritmo constante a través de WeighingService. Informa cuánto tarda
+``record_weighing`` (lo que espera la interfaz o el lector de la balanza) y
+cuánto tarda cada lectura en quedar confirmada.
+
+Uso:
+    python scripts/generate_weighing_load.py --workstations 3 --scales 4 --rate 300 --duration 20
+    python scripts/generate_weighing_load.py --db-dir "\\\\servidor\\ismapp" --duration 60
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.services.weighing_service import WeighingService
+from models.weighing import PlasticState, Weighing
+
+MATERIALS = 20
+CLIENTS = 200
+WORKERS = 30
+
+
+def prepare_database():
+    """Crea materiales, clientes y trabajadores de prueba si no existen."""
+    data_manager = DataManager()
+    if data_manager.execute_query("SELECT COUNT(*) AS n FROM materials")[0]["n"] >= MATERIALS:
+        return
+    with data_manager.transaction() as connection:
+        connection.executemany(
+            "INSERT INTO materials (name, material_type, plastic_state) VALUES (?, 'plastic', ?)",
+            [(f"Material {i}", random.choice(PlasticState.get_all_states())) for i in range(MATERIALS)]
+        )
+        connection.executemany(
+            "INSERT INTO clients (name, business_name, rut) VALUES (?, ?, ?)",
+            [(f"Cliente {i}", f"Empresa {i}", f"{10000000 + i}-{i % 10}") for i in range(CLIENTS)]
+        )
+        connection.executemany(
+            "INSERT INTO workers (name, rut) VALUES (?, ?)",
+            [(f"Trabajador {i}", f"{20000000 + i}-{i % 10}") for i in range(WORKERS)]
+        )
+        connection.executemany(
+            "INSERT INTO client_materials (client_id, material_id, price) VALUES (?, ?, ?)",
+            [(client, material, random.randint(50, 400))
+             for client in range(1, CLIENTS + 1) for material in range(1, MATERIALS + 1)
+             if random.random() < 0.3]
+        )
+
+
+def run_scale(service, rate_per_minute, deadline, record_ms, sent_at, lock):
+    """Envía lecturas de una balanza a ritmo constante hasta el plazo."""
+    interval = 60.0 / rate_per_minute
+    next_at = time.monotonic()
+    while next_at < deadline:
+        delay = next_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        is_client = random.random() < 0.8
+        weighing = Weighing(
+            material_id=random.randint(1, MATERIALS),
+            client_id=random.randint(1, CLIENTS) if is_client else None,
+            worker_id=None if is_client else random.randint(1, WORKERS),
+            net_weight_kg=round(random.uniform(0.5, 1500), 1),
+            plastic_state=random.choice(PlasticState.get_all_states()),
+        )
+        started = time.perf_counter()
+        service.record_weighing(weighing)
+        finished = time.perf_counter()
+        with lock:
+            record_ms.append((finished - started) * 1000)
+            sent_at[id(weighing)] = started
+        next_at += interval
+
+
+def run_workstation(db_dir, scales, rate_per_minute, duration, batch_size, results):
+    """Proceso de un puesto: varias balanzas sobre un WeighingService."""
+    os.chdir(db_dir)
+    service = WeighingService(DataManager(), batch_size=batch_size)
+
+    lock = threading.Lock()
+    record_ms = []
+    sent_at = {}
+    commit_ms = []
+
+    def on_written(batch):
+        now = time.perf_counter()
+        with lock:
+            for weighing in batch:
+                started = sent_at.pop(id(weighing), None)
+                if started is not None:
+                    commit_ms.append((now - started) * 1000)
+
+    service.writer.on_written = on_written
+
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=run_scale,
+                         args=(service, rate_per_minute, deadline, record_ms, sent_at, lock))
+        for _ in range(scales)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.close()
+
+    stats = service.writer.stats()
+    results.put((record_ms, commit_ms, stats))
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga de pesajes")
+    parser.add_argument("--workstations", type=int, default=2, help="Puestos (procesos)")
+    parser.add_argument("--scales", type=int, default=3, help="Balanzas por puesto")
+    parser.add_argument("--rate", type=float, default=300, help="Lecturas por minuto por balanza")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de carga")
+    parser.add_argument("--batch-size", type=int, default=None, help="Pesajes por transacción")
+    parser.add_argument("--db-dir", help="Carpeta de la base de datos (por defecto, una temporal)")
+    args = parser.parse_args()
+
+    temp_dir = None
+    db_dir = args.db_dir
+    if not db_dir:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_dir = temp_dir.name
+
+    original_dir = os.getcwd()
+    os.chdir(db_dir)
+    try:
+        prepare_database()
+        DataManager().close()
+    finally:
+        os.chdir(original_dir)
+
+    total_rate = args.workstations * args.scales * args.rate
+    print(f"Base de datos: {os.path.join(db_dir, 'data', 'ismv3.db')}")
+    print(f"Puestos: {args.workstations}, balanzas por puesto: {args.scales}, "
+          f"lecturas/min por balanza: {args.rate:.0f} (total {total_rate:.0f}/min)")
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_workstation,
+                                args=(db_dir, args.scales, args.rate, args.duration,
+                                      args.batch_size, results))
+        for _ in range(args.workstations)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    record_ms = [ms for result in collected for ms in result[0]]
+    commit_ms = [ms for result in collected for ms in result[1]]
+    written = sum(result[2]["written"] for result in collected)
+    batches = sum(result[2]["batches"] for result in collected)
+    failures = sum(result[2]["failures"] for result in collected)
+
+    print()
+    print(f"Lecturas enviadas: {len(record_ms)}, confirmadas: {written} "
+          f"en {batches} lotes ({failures} reintentos)")
+    print(f"Rendimiento: {written / elapsed * 60:,.0f} lecturas/min")
+    print(f"record_weighing: p50 {percentile(record_ms, 0.5):.3f} ms, "
+          f"p99 {percentile(record_ms, 0.99):.3f} ms, máx {max(record_ms, default=0):.3f} ms")
+    print(f"Hasta confirmarse: p50 {percentile(commit_ms, 0.5):.1f} ms, "
+          f"p99 {percentile(commit_ms, 0.99):.1f} ms")
+
+    if temp_dir:
+        temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
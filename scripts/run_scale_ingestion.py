@@ -0,0 +1,86 @@
+"""
+Lector de balanza para ISMAPP.
+
+Registra como pesajes las cargas de una balanza (TCP o puerto serie) e
+informa periódicamente las métricas del lector: lecturas en la bitácora
+sin confirmar (queue_depth) y latencia hasta quedar confirmadas.
+
+Uso:
+    python scripts/run_scale_ingestion.py --tcp 192.168.1.50:4001 --name balanza-1 --material 3 --client 12
+    python scripts/run_scale_ingestion.py --serial COM3 --baudrate 9600 --name balanza-2 --material 3 --worker 4
+    python scripts/run_scale_ingestion.py --simulate 20 --name balanza-sim --material 1 --client 1
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+# Añadir directorio raíz al path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.database.data_manager import DataManager
+from core.scales.pipeline import ScaleIngestion
+from core.scales.simulator import ScaleSimulator
+from core.scales.sources import SerialScaleSource, TcpScaleSource
+from core.services.weighing_service import WeighingService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registra los pesajes de una balanza")
+    origin = parser.add_mutually_exclusive_group(required=True)
+    origin.add_argument("--tcp", metavar="HOST:PUERTO", help="Balanza por TCP")
+    origin.add_argument("--serial", metavar="PUERTO", help="Balanza por puerto serie (requiere pyserial)")
+    origin.add_argument("--simulate", type=float, metavar="CARGAS_POR_SEG",
+                        help="Balanza simulada local")
+    parser.add_argument("--baudrate", type=int, default=9600, help="Velocidad del puerto serie")
+    parser.add_argument("--name", required=True, help="Nombre único de la balanza")
+    parser.add_argument("--material", type=int, required=True, help="ID del material")
+    parser.add_argument("--client", type=int, help="ID del cliente")
+    parser.add_argument("--worker", type=int, help="ID del trabajador")
+    parser.add_argument("--journal-dir", help="Directorio de la bitácora (por defecto data/scales/<nombre>)")
+    parser.add_argument("--interval", type=float, default=5.0, help="Segundos entre informes de métricas")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    simulator = None
+    if args.tcp:
+        host, _, port = args.tcp.rpartition(":")
+        source = TcpScaleSource(host, int(port))
+    elif args.serial:
+        source = SerialScaleSource(args.serial, args.baudrate)
+    else:
+        simulator = ScaleSimulator(loads_per_second=args.simulate)
+        simulator.start()
+        source = TcpScaleSource("127.0.0.1", simulator.port)
+
+    journal_dir = args.journal_dir or os.path.join("data", "scales", args.name)
+    service = WeighingService(DataManager())
+    ingestion = ScaleIngestion(service, args.name, source, journal_dir)
+    try:
+        ingestion.set_context(args.material, client_id=args.client, worker_id=args.worker)
+    except ValueError as e:
+        parser.error(str(e))
+
+    ingestion.start()
+    print(f"Leyendo {source} (Ctrl+C para terminar)")
+    try:
+        while True:
+            time.sleep(args.interval)
+            print(json.dumps(ingestion.metrics()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if not ingestion.stop():
+            print("Quedaron lecturas sin confirmar: se reenviarán al volver a iniciar")
+        if simulator is not None:
+            simulator.stop()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
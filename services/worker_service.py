@@ -2,8 +2,15 @@
 Servicio para gestionar operaciones con trabajadores en ISMAPP.
 """
 import logging
+
+from core.database.full_text import build_match_query, build_search_query
+from core.database.row_mapper import RowMapper, as_bool
 from models.worker import Worker, BankAccount
 
+# Conversión directa de filas a objetos del modelo (argumentos de __init__)
+WORKER_MAPPER = RowMapper(Worker)
+BANK_ACCOUNT_MAPPER = RowMapper(BankAccount, converters={'is_primary': as_bool})
+
 class WorkerService:
     """Servicio para operaciones relacionadas con trabajadores."""
     
@@ -26,14 +33,10 @@ class WorkerService:
         """
         try:
             # Implementación simplificada que debe adaptarse a tu DataManager
-            results = self.data_manager.execute_query("SELECT * FROM workers WHERE is_active = 1")
-            
-            workers = []
-            for result in results:
-                worker = self._create_worker_from_result(result)
-                workers.append(worker)
-                
-            return workers
+            workers = self.data_manager.fetch_models(
+                WORKER_MAPPER, "SELECT * FROM workers WHERE is_active = 1"
+            )
+            return workers if workers is not None else []
         except Exception as e:
             self.logger.error(f"Error al obtener trabajadores: {e}")
             return []
@@ -49,13 +52,14 @@ class WorkerService:
             Worker: Objeto trabajador o None si no se encuentra
         """
         try:
-            results = self.data_manager.execute_query(
+            results = self.data_manager.fetch_models(
+                WORKER_MAPPER,
                 "SELECT * FROM workers WHERE id = ? AND is_active = 1", 
                 (worker_id,)
             )
             
             if results:
-                return self._create_worker_from_result(results[0])
+                return results[0]
             return None
         except Exception as e:
             self.logger.error(f"Error al obtener trabajador #{worker_id}: {e}")
@@ -106,11 +110,10 @@ class WorkerService:
                      worker.email, worker.position, worker.department, worker.contract_type,
                      worker.hire_date, worker.salary, 1, worker.notes,
                      worker.bank_name, worker.account_type, worker.account_number,
-                     worker.account_holder, worker.account_holder_rut),
-                    get_last_id=True
+                     worker.account_holder, worker.account_holder_rut)
                 )
                 
-                # Obtener el ID asignado si la base de datos lo devuelve
+                # execute_query devuelve el ID asignado en los INSERT
                 if isinstance(result, int):
                     worker.id = result
                 
@@ -146,6 +149,9 @@ class WorkerService:
         """
         Busca trabajadores según criterios.
         
+        Con índice de texto completo, el término se busca por prefijo en
+        nombre, RUT y cargo, y los resultados se ordenan por relevancia.
+        
         Args:
             search_term: Término de búsqueda para nombre o RUT
             department: Filtrar por departamento
@@ -154,6 +160,15 @@ class WorkerService:
             list: Lista de trabajadores que coinciden con los criterios
         """
         try:
+            match = build_match_query(search_term) if search_term else None
+            if match and self.data_manager.has_full_text_index("workers"):
+                conditions = ("workers.department = ?",) if department else ()
+                params = [match, department] if department else [match]
+                workers = self.data_manager.fetch_models(
+                    WORKER_MAPPER, build_search_query("workers", conditions), tuple(params)
+                )
+                return workers if workers is not None else []
+            
             query = "SELECT * FROM workers WHERE is_active = 1"
             params = []
             
@@ -166,14 +181,8 @@ class WorkerService:
                 query += " AND department = ?"
                 params.append(department)
                 
-            results = self.data_manager.execute_query(query, tuple(params))
-            
-            workers = []
-            for result in results:
-                worker = self._create_worker_from_result(result)
-                workers.append(worker)
-                
-            return workers
+            workers = self.data_manager.fetch_models(WORKER_MAPPER, query, tuple(params))
+            return workers if workers is not None else []
             
         except Exception as e:
             self.logger.error(f"Error al buscar trabajadores: {e}")
@@ -190,17 +199,12 @@ class WorkerService:
             list: Lista de objetos BankAccount
         """
         try:
-            results = self.data_manager.execute_query(
+            accounts = self.data_manager.fetch_models(
+                BANK_ACCOUNT_MAPPER,
                 "SELECT * FROM worker_bank_accounts WHERE worker_id = ?", 
                 (worker_id,)
             )
-            
-            accounts = []
-            for result in results:
-                account = self._create_bank_account_from_result(result)
-                accounts.append(account)
-                
-            return accounts
+            return accounts if accounts is not None else []
             
         except Exception as e:
             self.logger.error(f"Error al obtener cuentas bancarias del trabajador #{worker_id}: {e}")
@@ -218,97 +222,30 @@ class WorkerService:
             bool: True si se guardó correctamente, False en caso contrario
         """
         try:
-            # Eliminar cuentas existentes
-            self.data_manager.execute_query(
-                "DELETE FROM worker_bank_accounts WHERE worker_id = ?", 
-                (worker_id,)
-            )
-            
-            # Insertar nuevas cuentas
-            for account in accounts:
-                query = """
-                INSERT INTO worker_bank_accounts (
-                    worker_id, is_primary, bank_name, account_type,
-                    account_number, account_holder, account_holder_rut
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                """
+            query = """
+            INSERT INTO worker_bank_accounts (
+                worker_id, is_primary, bank_name, account_type,
+                account_number, account_holder, account_holder_rut
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """
+            rows = [
+                (worker_id, 1 if account.is_primary else 0,
+                 account.bank_name, account.account_type, account.account_number,
+                 account.account_holder, account.account_holder_rut)
+                for account in accounts
+            ]
+            
+            # Reemplazar las cuentas existentes en una sola transacción
+            with self.data_manager.transaction():
                 self.data_manager.execute_query(
-                    query,
-                    (worker_id, 1 if account.is_primary else 0, 
-                     account.bank_name, account.account_type, account.account_number, 
-                     account.account_holder, account.account_holder_rut)
+                    "DELETE FROM worker_bank_accounts WHERE worker_id = ?", 
+                    (worker_id,)
                 )
+                if rows:
+                    self.data_manager.execute_many(query, rows)
             
             return True
             
         except Exception as e:
             self.logger.error(f"Error al guardar cuentas bancarias del trabajador #{worker_id}: {e}")
             return False
-    
-    def _create_worker_from_result(self, result):
-        """
-        Crea un objeto Worker a partir de un resultado de consulta.
-        
-        Args:
-            result: Resultado de la consulta (diccionario o tupla)
-            
-        Returns:
-            Worker: Objeto trabajador
-        """
-        worker = Worker()
-        
-        # Si el resultado es un diccionario
-        if isinstance(result, dict):
-            for key, value in result.items():
-                if hasattr(worker, key):
-                    setattr(worker, key, value)
-        # Si el resultado es una tupla/lista
-        else:
-            # Mapeo de índices de columnas (ajustar según estructura de la base de datos)
-            columns = ['id', 'name', 'rut', 'address', 'phone', 'email', 
-                      'position', 'department', 'contract_type', 'hire_date', 'salary', 
-                      'is_active', 'notes', 'bank_name', 'account_type', 
-                      'account_number', 'account_holder', 'account_holder_rut']
-            
-            for i, value in enumerate(result):
-                if i < len(columns) and hasattr(worker, columns[i]):
-                    setattr(worker, columns[i], value)
-        
-        return worker
-    
-    def _create_bank_account_from_result(self, result):
-        """
-        Crea un objeto BankAccount a partir de un resultado de consulta.
-        
-        Args:
-            result: Resultado de la consulta (diccionario o tupla)
-            
-        Returns:
-            BankAccount: Objeto cuenta bancaria
-        """
-        account = BankAccount()
-        
-        # Si el resultado es un diccionario
-        if isinstance(result, dict):
-            for key, value in result.items():
-                if hasattr(account, key):
-                    # Convertir is_primary de 0/1 a False/True
-                    if key == 'is_primary':
-                        setattr(account, key, bool(value))
-                    else:
-                        setattr(account, key, value)
-        # Si el resultado es una tupla/lista
-        else:
-            # Mapeo de índices de columnas (ajustar según estructura de la base de datos)
-            columns = ['id', 'worker_id', 'is_primary', 'bank_name', 'account_type',
-                      'account_number', 'account_holder', 'account_holder_rut']
-            
-            for i, value in enumerate(result):
-                if i < len(columns) and hasattr(account, columns[i]):
-                    # Convertir is_primary de 0/1 a False/True
-                    if columns[i] == 'is_primary':
-                        setattr(account, columns[i], bool(value))
-                    else:
-                        setattr(account, columns[i], value)
-        
-        return account
\ No newline at end of file
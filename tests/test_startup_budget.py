@@ -0,0 +1,57 @@
+"""
+Pruebas del presupuesto de arranque en frío de ISMAPP.
+
+Ejecutan scripts/check_startup_budget.py, que arranca la aplicación en un
+proceso nuevo con las importaciones y servicios de core/startup.py (los
+mismos de main.py), y fallan si el arranque supera el presupuesto o si se
+carga alguna dependencia pesada. El presupuesto puede fijarse con
+ISMAPP_STARTUP_BUDGET_MS.
+
+Uso:
+    python -m pytest tests/test_startup_budget.py
+    python -m unittest tests.test_startup_budget
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHECK_SCRIPT = os.path.join(ROOT_DIR, "scripts", "check_startup_budget.py")
+
+
+def run_check(mode):
+    """
+    Ejecuta la verificación del arranque en un modo.
+
+    Args:
+        mode (str): "core" o "app"
+
+    Returns:
+        subprocess.CompletedProcess: Resultado del script
+    """
+    return subprocess.run(
+        [sys.executable, CHECK_SCRIPT, "--mode", mode],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+
+
+class StartupBudgetTest(unittest.TestCase):
+    """Arranque en frío dentro del presupuesto."""
+
+    def test_core_startup_within_budget(self):
+        process = run_check("core")
+        self.assertEqual(process.returncode, 0, process.stdout + process.stderr)
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("customtkinter") and (os.environ.get("DISPLAY") or sys.platform == "win32"),
+        "requiere customtkinter y una pantalla"
+    )
+    def test_app_startup_within_budget(self):
+        process = run_check("app")
+        self.assertEqual(process.returncode, 0, process.stdout + process.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
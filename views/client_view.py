@@ -5,6 +5,12 @@ import tkinter as tk
 from tkinter import ttk  # Importamos ttk para usar PanedWindow
 from tkinter import messagebox
 import customtkinter as ctk
+from core.database.change_tracker import apply_row_changes, load_changed_rows
+from core.utils.text import build_search_key
+from views.components.attachments_panel import AttachmentsPanel
+from views.components.incremental_filter import IncrementalFilter
+from views.components.virtual_list import VirtualList
+from models.attachment import AttachmentEntity
 from models.client import Client
 
 class ClientView(ctk.CTkFrame):
@@ -26,6 +32,9 @@ class ClientView(ctk.CTkFrame):
         try:
             self.client_service = main_window.services.get("ClientService")
             self.material_service = main_window.services.get("MaterialService")
+            self.attachment_service = main_window.services.get("AttachmentService")
+            self.task_executor = main_window.task_executor
+            self.username = main_window.current_user.username if main_window.current_user else ""
         except AttributeError:
             messagebox.showerror("Error", "No se pudo acceder a los servicios necesarios")
             return
@@ -34,12 +43,33 @@ class ClientView(ctk.CTkFrame):
         self.clients = []
         self.current_client = None
         self.client_materials = []
+        self._materials_client_id = None
+        self._pending_client_changes = None
         
         # Crear UI
         self._create_ui()
         
         # Cargar datos iniciales
         self._load_clients()
+        
+        # Refrescar solo las filas que cambien en otros puestos
+        self.change_tracker = getattr(main_window, "change_tracker", None)
+        self._subscriptions = [
+            ("clients", self._on_clients_changed),
+            ("client_materials", self._on_client_materials_changed),
+            ("materials", self._on_materials_changed),
+        ]
+        if self.change_tracker:
+            for table, callback in self._subscriptions:
+                self.change_tracker.subscribe(table, callback)
+    
+    def destroy(self):
+        """Cancela las suscripciones a cambios antes de destruir la vista."""
+        change_tracker = getattr(self, "change_tracker", None)
+        if change_tracker:
+            for table, callback in self._subscriptions:
+                change_tracker.unsubscribe(table, callback)
+        super().destroy()
     
     def _create_ui(self):
         """Crea la interfaz de usuario."""
@@ -98,10 +128,10 @@ class ClientView(ctk.CTkFrame):
             values=["Todos", "Compradores", "Proveedores", "Ambos"],
             variable=self.filter_var,
             state="readonly",
-            width=120
+            width=120,
+            command=self._apply_type_filter
         )
         type_filter.grid(row=0, column=0, padx=5, pady=5)
-        type_filter.bind("<<ComboboxSelected>>", self._apply_filter)
         
         # Campo de búsqueda
         self.search_var = tk.StringVar()
@@ -115,10 +145,22 @@ class ClientView(ctk.CTkFrame):
         search_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
         filter_frame.columnconfigure(1, weight=1)
         
-        # Lista de clientes con scroll
-        self.clients_frame = ctk.CTkScrollableFrame(self.left_panel)
-        self.clients_frame.grid(row=2, column=0, sticky="nsew", pady=10)
+        # Lista de clientes con scroll (virtualizada: filas reutilizadas)
+        self.clients_list = VirtualList(
+            self.left_panel,
+            row_height=60,
+            create_row=self._create_client_row,
+            update_row=self._fill_client_row,
+            on_select=self._select_client,
+            empty_text="No se encontraron clientes"
+        )
+        self.clients_list.grid(row=2, column=0, sticky="nsew", pady=10)
         self.left_panel.rowconfigure(2, weight=1)
+        
+        # Filtro con retardo que acota el resultado anterior mientras se escribe
+        self.client_filter = IncrementalFilter(
+            self, self._client_search_key, self._show_filtered_clients
+        )
     
     def _create_right_panel(self):
         """Configura el panel derecho con los detalles del cliente."""
@@ -130,6 +172,7 @@ class ClientView(ctk.CTkFrame):
         self.tabs.add("Detalles")
         self.tabs.add("Datos Bancarios")
         self.tabs.add("Materiales")
+        self.tabs.add("Adjuntos")
         
         # Configurar pestaña de detalles
         self._setup_details_tab(self.tabs.tab("Detalles"))
@@ -139,6 +182,13 @@ class ClientView(ctk.CTkFrame):
         
         # Configurar pestaña de materiales
         self._setup_materials_tab(self.tabs.tab("Materiales"))
+        
+        # Configurar pestaña de archivos adjuntos
+        self.attachments_panel = AttachmentsPanel(
+            self.tabs.tab("Adjuntos"), self.attachment_service, self.task_executor,
+            AttachmentEntity.CLIENT, uploaded_by=self.username
+        )
+        self.attachments_panel.pack(fill="both", expand=True, padx=5, pady=5)
     
     def _setup_details_tab(self, parent):
         """Configura la pestaña de detalles del cliente."""
@@ -408,108 +458,184 @@ class ClientView(ctk.CTkFrame):
         self.materials_list.grid(row=1, column=0, sticky="nsew", pady=5)
     
     def _load_clients(self):
-        """Carga la lista de clientes desde la base de datos."""
-        self.clients = self.client_service.get_all_clients()
+        """Carga la lista de clientes desde la base de datos (en segundo plano)."""
+        self._pending_client_changes = None
+        self.clients_list.set_loading(True)
+        self.task_executor.submit(
+            "clients.list", self.client_service.get_all_clients,
+            on_success=self._on_clients_loaded, owner=self
+        )
+    
+    def _on_clients_loaded(self, clients):
+        """
+        Muestra los clientes recién cargados.
+        
+        Args:
+            clients (list): Clientes activos
+        """
+        self.clients = clients
         self._update_clients_list()
     
-    def _update_clients_list(self):
-        """Actualiza la lista visual de clientes según filtros."""
-        # Limpiar lista actual
-        for widget in self.clients_frame.winfo_children():
-            widget.destroy()
-            
-        # Obtener filtros
-        search_term = self.search_var.get().lower()
-        filter_type = self.filter_var.get()
+    def _on_clients_changed(self, changes):
+        """
+        Actualiza la lista con los clientes modificados en otros puestos.
         
-        # Mapear el filtro a los valores de la base de datos
-        type_mapping = {
-            "Todos": None,
-            "Compradores": "buyer",
-            "Proveedores": "supplier",
-            "Ambos": "both"
-        }
-        selected_type = type_mapping.get(filter_type)
+        Args:
+            changes (dict): {id: operación}, o None para recargar todo
+        """
+        if not self.winfo_exists():
+            return
         
-        # Filtrar clientes
-        filtered_clients = self.clients
+        # Una recarga completa en curso pudo leer el estado anterior: se repite
+        full_reload_pending = (self.task_executor.is_pending("clients.list")
+                               and self._pending_client_changes is None)
+        if changes is None or full_reload_pending:
+            self._load_clients()
+            return
         
-        # Filtrar por tipo
-        if selected_type:
-            filtered_clients = [c for c in filtered_clients if c.client_type == selected_type]
-            
-        # Filtrar por término de búsqueda
-        if search_term:
-            filtered_clients = [
-                c for c in filtered_clients 
-                if search_term in c.name.lower() or 
-                   search_term in c.business_name.lower() or
-                   search_term in (c.rut.lower() if c.rut else "") or
-                   search_term in (c.contact_person.lower() if c.contact_person else "")
-            ]
-        
-        # Mostrar mensaje si no hay clientes
-        if not filtered_clients:
-            no_results = ctk.CTkLabel(
-                self.clients_frame,
-                text="No se encontraron clientes",
-                font=ctk.CTkFont(size=14),
-                text_color="gray"
-            )
-            no_results.pack(pady=20)
+        # La carga más reciente reemplaza a la anterior, así que incluye sus filas
+        pending = dict(self._pending_client_changes or {})
+        pending.update(changes)
+        self._pending_client_changes = pending
+        self.task_executor.submit(
+            "clients.list", load_changed_rows, pending, self._load_active_client,
+            on_success=self._on_client_rows_loaded, owner=self
+        )
+    
+    def _on_client_rows_loaded(self, rows):
+        """
+        Aplica a la lista los clientes cambiados ya cargados.
+        
+        Args:
+            rows (dict): {id: cliente o None si ya no debe mostrarse}
+        """
+        self._pending_client_changes = None
+        self.clients = apply_row_changes(
+            self.clients, rows, rows.get,
+            sort_key=lambda client: client.name
+        )
+        self._update_clients_list(keep_position=True)
+    
+    def _load_active_client(self, client_id):
+        """Obtiene un cliente si sigue activo (None si debe salir de la lista)."""
+        client = self.client_service.get_client_by_id(client_id)
+        return client if client and client.is_active else None
+    
+    def _on_client_materials_changed(self, changes):
+        """
+        Recarga los materiales del cliente seleccionado si otro puesto los cambió.
+        
+        Args:
+            changes (dict): {id del cliente: operación}, o None si no se sabe
+        """
+        if not self.winfo_exists() or not self.current_client:
             return
+        if changes is None or self.current_client.id in changes:
+            self._load_client_materials()
+    
+    def _on_materials_changed(self, changes):
+        """
+        Recarga los materiales del cliente seleccionado (muestran datos del material).
         
-        # Crear elementos visuales para cada cliente
-        for i, client in enumerate(filtered_clients):
-            # Alternar colores para mejor visualización
-            bg_color = "#F0F0F0" if i % 2 == 0 else "#FFFFFF"
-            
-            client_frame = ctk.CTkFrame(self.clients_frame)
-            client_frame.pack(fill="x", pady=2)
-            
-            # Al hacer clic, seleccionar el cliente
-            client_frame.bind("<Button-1>", lambda e, c=client: self._select_client(c))
-            
-            # Nombre del cliente
-            name_label = ctk.CTkLabel(
-                client_frame,
-                text=client.name,
-                font=ctk.CTkFont(weight="bold")
-            )
-            name_label.bind("<Button-1>", lambda e, c=client: self._select_client(c))
-            name_label.pack(anchor="w", pady=(5, 0), padx=10)
-            
-            # RUT
-            info_frame = ctk.CTkFrame(client_frame, fg_color="transparent")
-            info_frame.pack(fill="x", padx=10, pady=(0, 5))
-            
-            rut_label = ctk.CTkLabel(
-                info_frame,
-                text=f"RUT: {client.rut}" if client.rut else "",
-                font=ctk.CTkFont(size=12)
-            )
-            rut_label.bind("<Button-1>", lambda e, c=client: self._select_client(c))
-            rut_label.pack(side="left")
-            
-            # Tipo
-            type_mapping = {
-                "buyer": "Comprador",
-                "supplier": "Proveedor",
-                "both": "Ambos"
-            }
+        Args:
+            changes (dict): {id del material: operación}, o None si no se sabe
+        """
+        if not self.winfo_exists() or not self.current_client:
+            return
+        shown = {cm.material_id for cm in self.client_materials}
+        if changes is None or shown.intersection(changes):
+            self._load_client_materials()
+    
+    def _update_clients_list(self, keep_position=False):
+        """
+        Actualiza la lista visual de clientes según filtros.
+        
+        Args:
+            keep_position (bool, optional): Conservar el desplazamiento actual
+        """
+        # Solo se calculan claves de búsqueda para los clientes nuevos
+        self.client_filter.set_items(self.clients, keep_position=keep_position)
+    
+    def _show_filtered_clients(self, clients, keep_position):
+        """
+        Muestra el resultado del filtro (solo se crean widgets para las filas visibles).
+        
+        Args:
+            clients (list): Clientes que cumplen los filtros
+            keep_position (bool): Conservar el desplazamiento actual
+        """
+        self.clients_list.set_items(clients, keep_position=keep_position)
+    
+    @staticmethod
+    def _client_search_key(client):
+        """Clave de búsqueda normalizada de un cliente (se calcula una vez)."""
+        return build_search_key(client.name, client.business_name, client.rut, client.contact_person)
+    
+    def _create_client_row(self, parent):
+        """
+        Crea una fila vacía de la lista de clientes (se reutiliza al desplazar).
+        
+        Args:
+            parent: Contenedor de la lista
             
-            type_label = ctk.CTkLabel(
-                info_frame,
-                text=type_mapping.get(client.client_type, ""),
-                font=ctk.CTkFont(size=12),
-                text_color="gray50"
-            )
-            type_label.bind("<Button-1>", lambda e, c=client: self._select_client(c))
-            type_label.pack(side="right")
+        Returns:
+            CTkFrame: Fila con sus etiquetas
+        """
+        row = ctk.CTkFrame(parent)
+        
+        # Nombre del cliente
+        row.name_label = ctk.CTkLabel(row, text="", font=ctk.CTkFont(weight="bold"))
+        row.name_label.pack(anchor="w", pady=(5, 0), padx=10)
+        
+        # RUT y tipo
+        info_frame = ctk.CTkFrame(row, fg_color="transparent")
+        info_frame.pack(fill="x", padx=10, pady=(0, 5))
+        
+        row.rut_label = ctk.CTkLabel(info_frame, text="", font=ctk.CTkFont(size=12))
+        row.rut_label.pack(side="left")
+        
+        row.type_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray50"
+        )
+        row.type_label.pack(side="right")
+        return row
+    
+    def _fill_client_row(self, row, client, index):
+        """
+        Muestra un cliente en una fila de la lista.
+        
+        Args:
+            row: Fila creada por _create_client_row
+            client: Cliente a mostrar
+            index (int): Posición en la lista filtrada
+        """
+        type_mapping = {
+            "buyer": "Comprador",
+            "supplier": "Proveedor",
+            "both": "Ambos"
+        }
+        row.name_label.configure(text=client.name)
+        row.rut_label.configure(text=f"RUT: {client.rut}" if client.rut else "")
+        row.type_label.configure(text=type_mapping.get(client.client_type, ""))
     
     def _apply_filter(self, *args):
-        """Aplica los filtros de búsqueda."""
-        self._update_clients_list()
+        """Aplica el término de búsqueda (tras una breve pausa al escribir)."""
+        self.client_filter.set_query(self.search_var.get())
+    
+    def _apply_type_filter(self, *args):
+        """Aplica el filtro por tipo de cliente."""
+        type_mapping = {
+            "Compradores": "buyer",
+            "Proveedores": "supplier",
+            "Ambos": "both"
+        }
+        selected_type = type_mapping.get(self.filter_var.get())
+        self.client_filter.set_predicate(
+            (lambda client: client.client_type == selected_type) if selected_type else None
+        )
     
     def _select_client(self, client):
         """
@@ -552,16 +678,42 @@ class ClientView(ctk.CTkFrame):
         # Cambiar a la pestaña de detalles
         self.tabs.set("Detalles")
         
-        # Cargar materiales del cliente
+        # Cargar materiales y adjuntos del cliente
         self._load_client_materials()
+        self.attachments_panel.set_entity(client.id)
     
     def _load_client_materials(self):
-        """Carga los materiales asociados al cliente actual."""
+        """Carga los materiales asociados al cliente actual (en segundo plano)."""
         if not self.current_client:
             return
-            
-        # Obtener materiales del cliente
-        self.client_materials = self.material_service.get_client_materials(self.current_client.id)
+        
+        # Aviso de carga solo al cambiar de cliente (no al refrescar el mismo)
+        if self._materials_client_id != self.current_client.id:
+            self.client_materials = []
+            for widget in self.materials_list.winfo_children():
+                widget.destroy()
+            ctk.CTkLabel(
+                self.materials_list,
+                text="Cargando...",
+                font=ctk.CTkFont(size=14),
+                text_color="gray"
+            ).pack(pady=20)
+        
+        # Al cambiar de cliente, la carga anterior se descarta
+        self.task_executor.submit(
+            "clients.materials", self.material_service.get_client_materials,
+            self.current_client.id, on_success=self._show_client_materials, owner=self
+        )
+    
+    def _show_client_materials(self, client_materials):
+        """
+        Muestra los materiales del cliente actual.
+        
+        Args:
+            client_materials (list): Materiales asociados al cliente
+        """
+        self.client_materials = client_materials
+        self._materials_client_id = self.current_client.id if self.current_client else None
         
         # Limpiar lista actual
         for widget in self.materials_list.winfo_children():
@@ -1044,6 +1196,7 @@ class ClientView(ctk.CTkFrame):
     def _create_client(self):
         """Resetea el formulario para crear un nuevo cliente."""
         self.current_client = None
+        self.task_executor.cancel("clients.materials")
         
         # Limpiar formulario
         for var in self.form_vars.values():
@@ -1064,9 +1217,10 @@ class ClientView(ctk.CTkFrame):
         # Cambiar a pestaña de detalles
         self.tabs.set("Detalles")
         
-        # Limpiar lista de materiales
+        # Limpiar lista de materiales y adjuntos
         for widget in self.materials_list.winfo_children():
             widget.destroy()
+        self.attachments_panel.set_entity(None)
             
         # Dar foco al campo de nombre
         self.name_entry.focus_set()
@@ -1128,6 +1282,8 @@ class ClientView(ctk.CTkFrame):
             
             # Habilitar botón de añadir material si es un cliente existente
             self.add_material_btn.configure(state="normal")
+            if self.attachments_panel.entity_id != client.id:
+                self.attachments_panel.set_entity(client.id)
             
             # NUEVO: Habilitar botón de guardar datos bancarios
             if hasattr(self, 'save_banking_btn'):
@@ -1165,9 +1321,26 @@ class ClientView(ctk.CTkFrame):
             messagebox.showerror("Error", "Debe seleccionar un cliente primero")
             return
         
-        # Obtener lista de materiales disponibles para este cliente
-        available_materials = self.material_service.get_available_materials_for_client(
-            self.current_client.id)
+        # Obtener lista de materiales disponibles para este cliente (en segundo plano)
+        client_id = self.current_client.id
+        self.task_executor.submit(
+            "clients.available_materials",
+            self.material_service.get_available_materials_for_client, client_id,
+            on_success=lambda materials: self._open_add_material_dialog(client_id, materials),
+            owner=self
+        )
+    
+    def _open_add_material_dialog(self, client_id, available_materials):
+        """
+        Abre el diálogo para añadir un material con los materiales ya cargados.
+        
+        Args:
+            client_id (int): Cliente para el que se cargaron los materiales
+            available_materials (list): Materiales que aún no tiene asignados
+        """
+        # Si entretanto se seleccionó otro cliente, no abrir el diálogo
+        if not self.current_client or self.current_client.id != client_id:
+            return
         
         if not available_materials:
             messagebox.showinfo("Información", 
@@ -0,0 +1,333 @@
+"""
+Panel de archivos adjuntos para las vistas de detalle de ISMAPP.
+
+Copiar, exportar o eliminar un archivo puede tardar (escaneos grandes,
+carpeta compartida lenta), así que todas las operaciones se ejecutan en el
+TaskExecutor. El avance de las copias lo escribe el hilo que copia y el
+panel lo lee cada ``PROGRESS_INTERVAL_MS`` con ``after()``: la interfaz
+nunca espera a un archivo.
+
+Las miniaturas se leen (o generan, si faltan) y decodifican de a una en
+segundo plano, para no ocupar todos los hilos del ejecutor con un cliente
+de muchos escaneos; el hilo de Tk solo consulta el índice en memoria del
+caché para cargar primero las que ya existen y luego crea la imagen ya
+decodificada.
+"""
+import collections
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+from tkinter import filedialog, messagebox
+
+import customtkinter as ctk
+
+# Intervalo con que se refresca el avance de las copias
+PROGRESS_INTERVAL_MS = 200
+
+# Lado de las miniaturas de la lista (píxeles)
+PREVIEW_SIZE = 64
+
+
+def format_size(size):
+    """
+    Formatea un tamaño en bytes para mostrarlo.
+
+    Args:
+        size (int): Tamaño en bytes
+
+    Returns:
+        str: Tamaño con unidad (p. ej. '1.5 MB')
+    """
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def open_with_system(path):
+    """Abre un archivo con el programa predeterminado del sistema."""
+    if sys.platform.startswith("win"):
+        os.startfile(path)
+    elif sys.platform == "darwin":
+        subprocess.Popen(["open", path])
+    else:
+        subprocess.Popen(["xdg-open", path])
+
+
+class AttachmentsPanel(ctk.CTkFrame):
+    """Lista de adjuntos de un registro, con botones para adjuntar, abrir y eliminar."""
+
+    # Claves únicas para las copias: varias pueden estar en curso a la vez
+    _upload_ids = itertools.count(1)
+
+    def __init__(self, parent, attachment_service, task_executor, entity_type, uploaded_by=""):
+        """
+        Inicializa el panel.
+
+        Args:
+            parent: Widget contenedor
+            attachment_service: Servicio de adjuntos (None si no está disponible)
+            task_executor: Ejecutor de tareas en segundo plano
+            entity_type (str): Entidad (de AttachmentEntity)
+            uploaded_by (str, optional): Usuario que adjunta los archivos
+        """
+        super().__init__(parent, fg_color="transparent")
+        self.attachment_service = attachment_service
+        self.task_executor = task_executor
+        self.entity_type = entity_type
+        self.uploaded_by = uploaded_by
+
+        self.entity_id = None
+        self.attachments = []
+        self._progress = {}     # clave de la copia -> [nombre, copiados, total]
+        self._progress_job = None
+        self._preview_labels = {}   # id del adjunto -> etiqueta de su miniatura
+        self._pending_previews = collections.deque()
+
+        self._create_ui()
+        self.set_entity(None)
+
+    def _create_ui(self):
+        """Crea los botones, la lista y la línea de avance."""
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        buttons = ctk.CTkFrame(self, fg_color="transparent")
+        buttons.grid(row=0, column=0, sticky="ew", pady=(0, 5))
+        self.attach_btn = ctk.CTkButton(buttons, text="Adjuntar…", width=110, command=self._choose_files)
+        self.attach_btn.pack(side="left", padx=5)
+
+        self.file_list = ctk.CTkScrollableFrame(self)
+        self.file_list.grid(row=1, column=0, sticky="nsew")
+        self.file_list.grid_columnconfigure(0, weight=1)
+
+        self.status_label = ctk.CTkLabel(self, text="", text_color="gray", anchor="w")
+        self.status_label.grid(row=2, column=0, sticky="ew", padx=5, pady=(5, 0))
+
+    def set_entity(self, entity_id):
+        """
+        Muestra los adjuntos de otro registro.
+
+        Args:
+            entity_id (int): ID del registro (None si no hay ninguno seleccionado)
+        """
+        self.entity_id = entity_id
+        enabled = entity_id is not None and self.attachment_service is not None
+        self.attach_btn.configure(state="normal" if enabled else "disabled")
+        if not enabled:
+            self.task_executor.cancel(self._list_key)
+            self.task_executor.cancel(self._preview_key)
+            self._show_attachments([])
+            return
+        self._show_message("Cargando...")
+        self.reload()
+
+    @property
+    def _list_key(self):
+        return f"attachments.{self.entity_type}.list"
+
+    @property
+    def _preview_key(self):
+        return f"attachments.{self.entity_type}.preview"
+
+    def reload(self):
+        """Vuelve a cargar la lista de adjuntos del registro actual."""
+        if self.entity_id is None or self.attachment_service is None:
+            return
+        entity_id = self.entity_id
+        self.task_executor.submit(
+            self._list_key, self.attachment_service.get_attachments, self.entity_type, entity_id,
+            on_success=lambda attachments: self._on_loaded(entity_id, attachments), owner=self
+        )
+
+    def _on_loaded(self, entity_id, attachments):
+        # Si entretanto se seleccionó otro registro, descartar
+        if entity_id == self.entity_id:
+            self._show_attachments(attachments)
+
+    def _show_message(self, text):
+        for widget in self.file_list.winfo_children():
+            widget.destroy()
+        ctk.CTkLabel(self.file_list, text=text, text_color="gray").grid(row=0, column=0, pady=20)
+
+    def _show_attachments(self, attachments):
+        """Dibuja una fila por adjunto."""
+        self.attachments = attachments
+        self._preview_labels = {}
+        self._pending_previews.clear()
+        if not attachments:
+            self._show_message("Sin archivos adjuntos" if self.entity_id is not None else "")
+            return
+
+        for widget in self.file_list.winfo_children():
+            widget.destroy()
+        for row, attachment in enumerate(attachments):
+            item = ctk.CTkFrame(self.file_list)
+            item.grid(row=row, column=0, sticky="ew", padx=5, pady=2)
+            item.grid_columnconfigure(1, weight=1)
+
+            preview = ctk.CTkLabel(item, text=(attachment.extension or "?").upper(), width=PREVIEW_SIZE,
+                                   height=PREVIEW_SIZE, fg_color="gray30", corner_radius=4)
+            preview.grid(row=0, column=0, rowspan=2, padx=5, pady=5)
+            self._preview_labels[attachment.id] = preview
+
+            created = (attachment.created_at or "")[:16]
+            ctk.CTkLabel(item, text=attachment.file_name, anchor="w",
+                         font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, sticky="sw", padx=10)
+            ctk.CTkLabel(item, text=f"{format_size(attachment.size)}   {created}", anchor="w",
+                         text_color="gray").grid(row=1, column=1, sticky="nw", padx=10)
+            ctk.CTkButton(item, text="Abrir", width=70,
+                          command=lambda a=attachment: self._open(a)).grid(row=0, column=2, rowspan=2, padx=5)
+            ctk.CTkButton(item, text="Eliminar", width=70, fg_color="#AA3333",
+                          command=lambda a=attachment: self._delete(a)).grid(row=0, column=3, rowspan=2, padx=5)
+
+            if not self.attachment_service.has_preview(attachment):
+                continue
+            # Las que ya están en el caché primero: aparecen casi de inmediato
+            if self.attachment_service.is_thumbnail_cached(attachment, PREVIEW_SIZE):
+                self._pending_previews.appendleft(attachment)
+            else:
+                self._pending_previews.append(attachment)
+        self._next_preview()
+
+    def _next_preview(self):
+        """Carga en segundo plano la siguiente miniatura pendiente."""
+        if not self._pending_previews:
+            return
+        attachment = self._pending_previews.popleft()
+        self.task_executor.submit(
+            self._preview_key, self._load_preview, attachment,
+            on_success=lambda image: self._preview_ready(attachment.id, image),
+            on_error=lambda _error: self._next_preview(),
+            owner=self
+        )
+
+    def _load_preview(self, attachment):
+        """Obtiene y decodifica una miniatura (en el hilo del ejecutor)."""
+        path = self.attachment_service.get_thumbnail(attachment, PREVIEW_SIZE)
+        if path is None:
+            return None
+        # Solo hay miniaturas si Pillow está instalado
+        from PIL import Image
+        with Image.open(path) as image:
+            image.load()
+            return image.copy()
+
+    def _preview_ready(self, attachment_id, image):
+        if image is not None:
+            self._set_preview(attachment_id, image)
+        self._next_preview()
+
+    def _set_preview(self, attachment_id, image):
+        """Muestra una miniatura ya decodificada en la fila de su adjunto."""
+        label = self._preview_labels.get(attachment_id)
+        if label is None or not label.winfo_exists():
+            return
+        preview = ctk.CTkImage(light_image=image, size=image.size)
+        label.configure(image=preview, text="", fg_color="transparent")
+
+    def _choose_files(self):
+        """Pide los archivos a adjuntar y los copia en segundo plano."""
+        if self.entity_id is None:
+            return
+        paths = filedialog.askopenfilenames(
+            title="Adjuntar archivos",
+            filetypes=[
+                ("Documentos", "*.pdf *.png *.jpg *.jpeg *.xlsx *.xls *.csv *.docx"),
+                ("Todos los archivos", "*.*"),
+            ]
+        )
+        for path in paths:
+            self._upload(path, self.entity_id)
+
+    def _upload(self, path, entity_id):
+        """Copia un archivo al almacén en segundo plano."""
+        key = f"attachments.upload.{next(self._upload_ids)}"
+        state = [os.path.basename(path), 0, 0]
+        self._progress[key] = state
+
+        def progress(copied, total):
+            # Se llama desde el hilo que copia; el panel solo lee estos valores
+            state[1] = copied
+            state[2] = total or 0
+
+        self.task_executor.submit(
+            key, self.attachment_service.attach_file, path, self.entity_type, entity_id,
+            "", self.uploaded_by, progress,
+            on_success=lambda _attachment: self._upload_finished(key, entity_id),
+            on_error=lambda error: self._upload_failed(key, error),
+            owner=self
+        )
+        self._schedule_progress()
+
+    def _upload_finished(self, key, entity_id):
+        self._progress.pop(key, None)
+        self._update_progress()
+        if entity_id == self.entity_id:
+            self.reload()
+
+    def _upload_failed(self, key, error):
+        name = self._progress.pop(key, ["archivo"])[0]
+        self._update_progress()
+        messagebox.showerror("Error", f"No se pudo adjuntar {name}: {error}")
+
+    def _schedule_progress(self):
+        if self._progress_job is None:
+            self._progress_job = self.after(PROGRESS_INTERVAL_MS, self._update_progress)
+
+    def _update_progress(self):
+        """Muestra el avance de las copias en curso."""
+        self._progress_job = None
+        if not self.winfo_exists():
+            return
+        if not self._progress:
+            self.status_label.configure(text="")
+            return
+        parts = []
+        for name, copied, total in list(self._progress.values()):
+            percent = f" {copied * 100 // total}%" if total else ""
+            parts.append(f"{name}{percent}")
+        self.status_label.configure(text="Adjuntando: " + ", ".join(parts))
+        self._schedule_progress()
+
+    def _open(self, attachment):
+        """Exporta el adjunto a una copia temporal y la abre con el programa del sistema."""
+        folder = tempfile.mkdtemp(prefix="ismapp-")
+        destination = os.path.join(folder, attachment.file_name)
+        self.status_label.configure(text=f"Abriendo {attachment.file_name}...")
+        self.task_executor.submit(
+            f"attachments.open.{attachment.id}", self.attachment_service.export_attachment,
+            attachment, destination,
+            on_success=lambda _result: self._opened(destination),
+            on_error=lambda error: self._open_failed(attachment, error),
+            owner=self
+        )
+
+    def _opened(self, path):
+        self._update_progress()
+        try:
+            open_with_system(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo abrir el archivo: {e}")
+
+    def _open_failed(self, attachment, error):
+        self._update_progress()
+        messagebox.showerror("Error", f"No se pudo abrir {attachment.file_name}: {error}")
+
+    def _delete(self, attachment):
+        """Elimina un adjunto tras confirmar."""
+        if not messagebox.askyesno("Confirmar eliminación",
+                                   f"¿Está seguro de eliminar el archivo {attachment.file_name}?"):
+            return
+        self.task_executor.submit(
+            f"attachments.delete.{attachment.id}", self.attachment_service.delete_attachment,
+            attachment.id, on_success=self._deleted, owner=self
+        )
+
+    def _deleted(self, success):
+        if not success:
+            messagebox.showerror("Error", "Error al eliminar el archivo")
+        self.reload()
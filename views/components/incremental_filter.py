@@ -0,0 +1,162 @@
+"""
+Filtro incremental con retardo para las listas de ISMAPP.
+
+Mientras el usuario escribe, cada tecla reprograma el filtrado en lugar de
+ejecutarlo: solo se filtra cuando pasan ``delay_ms`` sin escribir. Si el
+término nuevo contiene al anterior (el usuario siguió escribiendo), se
+filtra sobre el resultado previo en vez de sobre la lista completa.
+
+Las listas grandes se recorren por tramos con ``after``; un término nuevo
+descarta el recorrido en curso, de modo que un filtrado obsoleto nunca llega
+a la pantalla ni bloquea la interfaz.
+
+Las claves de búsqueda (campos normalizados) se calculan una sola vez por
+entidad y se conservan mientras el objeto siga en la lista.
+"""
+from core.utils.text import normalize_text
+
+# Espera tras la última tecla antes de filtrar
+DEFAULT_DELAY_MS = 150
+
+# Elementos revisados por tramo antes de devolver el control a la interfaz
+CHUNK_SIZE = 5000
+
+
+class IncrementalFilter:
+    """Filtra una lista en memoria por término de búsqueda y condición opcional."""
+
+    def __init__(self, widget, key_func, on_result, delay_ms=DEFAULT_DELAY_MS):
+        """
+        Inicializa el filtro.
+
+        Args:
+            widget: Widget usado para programar tareas con after()
+            key_func (callable): Función entidad -> clave de búsqueda normalizada
+            on_result (callable): Función (elementos filtrados, keep_position)
+                llamada al terminar cada filtrado
+            delay_ms (int, optional): Espera tras la última tecla
+        """
+        self.widget = widget
+        self.key_func = key_func
+        self.on_result = on_result
+        self.delay_ms = delay_ms
+
+        self.predicate = None
+        self._entries = []     # [(clave, entidad)] de la lista completa
+        self._keys = {}        # id(entidad) -> (entidad, clave)
+        self._query = ""
+        self._last_query = None
+        self._last_result = None
+        self._last_basis = None  # (lista, condición) sobre la que se obtuvo _last_result
+        self._job = None
+        self._generation = 0
+
+    def set_items(self, items, keep_position=False):
+        """
+        Reemplaza la lista completa y la vuelve a filtrar de inmediato.
+
+        Solo se calculan claves para las entidades nuevas.
+
+        Args:
+            items (list): Entidades
+            keep_position (bool, optional): Se entrega a on_result
+        """
+        previous = self._keys
+        keys = {}
+        entries = []
+        for item in items:
+            cached = previous.get(id(item))
+            key = cached[1] if cached is not None and cached[0] is item else self.key_func(item)
+            keys[id(item)] = (item, key)
+            entries.append((key, item))
+        self._keys = keys
+        self._entries = entries
+        self._last_query = self._last_result = None
+        self._start(keep_position=keep_position, incremental=False)
+
+    def set_query(self, text):
+        """
+        Cambia el término de búsqueda; el filtrado se ejecuta tras el retardo.
+
+        Args:
+            text (str): Texto escrito por el usuario
+        """
+        self._query = normalize_text(text)
+        self._cancel()
+        self._job = self.widget.after(self.delay_ms, self._debounced)
+
+    def set_predicate(self, predicate):
+        """
+        Cambia la condición adicional (p. ej. tipo o departamento) y filtra de inmediato.
+
+        Args:
+            predicate (callable): Función entidad -> bool, o None para no filtrar
+        """
+        self.predicate = predicate
+        self._last_query = self._last_result = None
+        self._start(keep_position=False, incremental=False)
+
+    def cancel(self):
+        """Cancela el filtrado pendiente o en curso (p. ej. al cerrar la vista)."""
+        self._cancel()
+
+    # ------------------------------------------------------------------
+    # Implementación interna
+    # ------------------------------------------------------------------
+
+    def _cancel(self):
+        self._generation += 1
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _debounced(self):
+        self._job = None
+        self._start(keep_position=False, incremental=True)
+
+    def _start(self, keep_position, incremental):
+        """Inicia un filtrado, partiendo del resultado anterior si es posible."""
+        self._cancel()
+        query = self._query
+        basis = (self._entries, self.predicate)
+
+        # Solo se parte de un resultado completado sobre la lista y condición actuales
+        if (incremental and self._last_result is not None
+                and self._last_basis is not None
+                and self._last_basis[0] is basis[0] and self._last_basis[1] is basis[1]
+                and self._last_query is not None and self._last_query in query):
+            # El término creció: el resultado nuevo es un subconjunto del anterior
+            if query == self._last_query:
+                return
+            source = [(self._keys[id(item)][1], item) for item in self._last_result]
+            predicate = None  # ya aplicada en el resultado anterior
+        else:
+            source = self._entries
+            predicate = self.predicate
+
+        self._run(self._generation, basis, source, query, predicate, 0, [], keep_position)
+
+    def _run(self, generation, basis, source, query, predicate, start, result, keep_position):
+        """Filtra un tramo de la lista y programa el siguiente."""
+        self._job = None
+        if generation != self._generation:
+            return
+
+        stop = min(start + CHUNK_SIZE, len(source))
+        for key, item in source[start:stop]:
+            if query in key and (predicate is None or predicate(item)):
+                result.append(item)
+
+        if stop < len(source):
+            self._job = self.widget.after(
+                1, self._run, generation, basis, source, query, predicate, stop, result, keep_position
+            )
+            return
+
+        self._last_query = query
+        self._last_result = result
+        self._last_basis = basis
+        self.on_result(result, keep_position)
@@ -0,0 +1,266 @@
+"""
+Lista virtualizada para ISMAPP.
+
+Muestra listas de miles de elementos creando widgets solo para las filas
+visibles. Al desplazarse, las mismas filas se reutilizan con los datos de
+otros elementos en lugar de destruirse y crearse de nuevo, de modo que el
+costo de filtrar o desplazar no depende del tamaño de la lista.
+
+Uso:
+    lista = VirtualList(parent, row_height=56,
+                        create_row=crear_fila, update_row=llenar_fila,
+                        on_select=seleccionar, empty_text="Sin resultados")
+    lista.set_items(elementos)
+
+``create_row(parent)`` construye una fila vacía y la devuelve;
+``update_row(row, item, index)`` la llena con un elemento. El elemento
+mostrado en cada fila queda en ``row.item`` para usarlo en los comandos de
+botones de la fila; un clic en esos botones no llama a ``on_select``.
+"""
+import itertools
+import math
+import tkinter as tk
+from tkinter import ttk
+
+import customtkinter as ctk
+
+# Filas que avanza cada paso de la rueda del ratón
+WHEEL_ROWS = 3
+
+# Widgets de la fila cuyo clic no la selecciona (tienen su propio comando)
+BUTTON_TYPES = (ctk.CTkButton, tk.Button, ttk.Button)
+
+_list_ids = itertools.count()
+
+
+class VirtualList(ctk.CTkFrame):
+    """Lista con desplazamiento que reutiliza un número fijo de filas."""
+
+    def __init__(self, master, row_height, create_row, update_row, on_select=None,
+                 empty_text="", **kwargs):
+        """
+        Inicializa la lista.
+
+        Args:
+            master: Widget padre
+            row_height (int): Alto de cada fila en píxeles
+            create_row (callable): Función parent -> fila nueva (widget)
+            update_row (callable): Función (fila, elemento, índice) que llena la fila
+            on_select (callable, optional): Función llamada con el elemento al hacer clic
+            empty_text (str, optional): Mensaje cuando no hay elementos
+            **kwargs: Opciones adicionales de CTkFrame
+        """
+        super().__init__(master, **kwargs)
+
+        self.row_height = row_height
+        self.create_row = create_row
+        self.update_row = update_row
+        self.on_select = on_select
+
+        self.items = []
+        self._first = 0          # índice del primer elemento visible
+        self._rows = []          # filas creadas (reutilizables)
+        self._shown = []         # (índice, id) mostrado por cada fila, o None
+        self._visible_rows = 0
+        self._loading = False
+
+        # Etiquetas de eventos compartidas por todos los widgets de las filas
+        list_id = next(_list_ids)
+        self._wheel_tag = f"VirtualListWheel{list_id}"
+        self._row_tag = f"VirtualListRow{list_id}"
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.empty_label = ctk.CTkLabel(
+            self.viewport,
+            text=empty_text,
+            font=ctk.CTkFont(size=14),
+            text_color="gray"
+        )
+        self.loading_label = ctk.CTkLabel(
+            self.viewport,
+            text="Cargando...",
+            font=ctk.CTkFont(size=14),
+            text_color="gray"
+        )
+
+        self.viewport.bind("<Configure>", self._on_resize)
+        self.bind_class(self._wheel_tag, "<MouseWheel>", self._on_mousewheel)
+        self.bind_class(self._wheel_tag, "<Button-4>", lambda e: self.scroll_rows(-WHEEL_ROWS))
+        self.bind_class(self._wheel_tag, "<Button-5>", lambda e: self.scroll_rows(WHEEL_ROWS))
+        self.bind_class(self._row_tag, "<Button-1>", self._on_click)
+        self._add_tags(self.viewport, (self._wheel_tag,))
+
+    def set_items(self, items, keep_position=False):
+        """
+        Reemplaza los elementos mostrados.
+
+        Args:
+            items (list): Elementos a mostrar
+            keep_position (bool, optional): Conservar el desplazamiento actual
+                (p. ej. al actualizar unas pocas filas); si no, vuelve al inicio
+        """
+        self.items = list(items)
+        if not keep_position:
+            self._first = 0
+        self._shown = [None] * len(self._rows)
+        self.set_loading(False)
+        self._render()
+
+    def set_loading(self, loading, text="Cargando..."):
+        """
+        Muestra u oculta el aviso de carga mientras llegan los datos.
+
+        Args:
+            loading (bool): True mientras se cargan los elementos
+            text (str, optional): Texto del aviso
+        """
+        self._loading = loading
+        if loading:
+            self.empty_label.place_forget()
+            self.loading_label.configure(text=text)
+            self.loading_label.place(relx=0.5, y=20, anchor="n")
+            self.loading_label.lift()
+        else:
+            self.loading_label.place_forget()
+            if not self.items:
+                self.empty_label.place(relx=0.5, y=20, anchor="n")
+
+    def refresh(self):
+        """Vuelve a llenar las filas visibles (tras modificar los elementos en sitio)."""
+        self._shown = [None] * len(self._rows)
+        self._render()
+
+    def scroll_rows(self, count):
+        """
+        Desplaza la lista un número de filas.
+
+        Args:
+            count (int): Filas a desplazar (negativo hacia arriba)
+        """
+        self._scroll_to(self._first + count)
+
+    def scroll_to(self, index):
+        """
+        Desplaza la lista para que un elemento quede visible.
+
+        Args:
+            index (int): Índice del elemento
+        """
+        if index < self._first:
+            self._scroll_to(index)
+        elif self._visible_rows and index >= self._first + self._visible_rows - 1:
+            self._scroll_to(index - self._visible_rows + 2)
+
+    # ------------------------------------------------------------------
+    # Implementación interna
+    # ------------------------------------------------------------------
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, self._max_first()))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _max_first(self):
+        # La última fila visible puede quedar cortada: se reserva una de margen
+        return max(0, len(self.items) - max(1, self._visible_rows - 1))
+
+    def _on_resize(self, event):
+        visible = max(1, math.ceil(event.height / self.row_height))
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._first = min(self._first, self._max_first())
+            self._render()
+
+    def _ensure_rows(self, count):
+        """Crea las filas que falten para cubrir el alto visible."""
+        while len(self._rows) < count:
+            slot = len(self._rows)
+            row = self.create_row(self.viewport)
+            row.item = None
+            # CTk no acepta el alto en place(): se fija en la fila y se
+            # impide que su contenido lo cambie
+            row.configure(height=self.row_height)
+            row.pack_propagate(False)
+            self._add_tags(row, (self._wheel_tag, self._row_tag, f"{self._row_tag}_{slot}"))
+            self._rows.append(row)
+            self._shown.append(None)
+
+    def _add_tags(self, widget, tags):
+        """Añade etiquetas de eventos a un widget y a todos sus descendientes."""
+        if isinstance(widget, BUTTON_TYPES):
+            # El botón y sus partes internas no seleccionan la fila
+            tags = tuple(tag for tag in tags if tag != self._row_tag)
+        widget.bindtags(tags + tuple(t for t in widget.bindtags() if t not in tags))
+        for child in widget.winfo_children():
+            self._add_tags(child, tags)
+
+    def _render(self):
+        """Coloca y llena las filas visibles."""
+        if not self.items:
+            for row in self._rows:
+                row.place_forget()
+                row.item = None
+            self._shown = [None] * len(self._rows)
+            if not self._loading:
+                self.empty_label.place(relx=0.5, y=20, anchor="n")
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.empty_label.place_forget()
+
+        count = min(self._visible_rows, len(self.items) - self._first)
+        self._ensure_rows(count)
+
+        for slot, row in enumerate(self._rows):
+            index = self._first + slot
+            if slot >= count:
+                if row.item is not None:
+                    row.place_forget()
+                    row.item = None
+                self._shown[slot] = None
+                continue
+
+            item = self.items[index]
+            if row.item is None:
+                # Cada fila ocupa siempre la misma posición; solo cambia su contenido
+                row.place(x=0, y=slot * self.row_height, relwidth=1.0)
+            if self._shown[slot] != (index, id(item)):
+                row.item = item
+                self.update_row(row, item, index)
+                self._shown[slot] = (index, id(item))
+
+        total = len(self.items)
+        self.scrollbar.set(self._first / total,
+                           min(1.0, (self._first + self._visible_rows) / total))
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(round(float(value) * len(self.items))))
+        elif action == "scroll":
+            step = max(1, self._visible_rows - 1) if unit == "pages" else 1
+            self.scroll_rows(int(value) * step)
+
+    def _on_mousewheel(self, event):
+        if not event.delta:
+            return
+        # Windows entrega múltiplos de 120; macOS, valores pequeños
+        notches = event.delta / 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_rows(-int(math.copysign(max(1, abs(notches)), notches)) * WHEEL_ROWS)
+
+    def _on_click(self, event):
+        if self.on_select is None:
+            return
+        for tag in event.widget.bindtags():
+            if tag.startswith(f"{self._row_tag}_"):
+                row = self._rows[int(tag.rsplit("_", 1)[1])]
+                if row.item is not None:
+                    self.on_select(row.item)
+                return
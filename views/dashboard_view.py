@@ -1,19 +1,35 @@
 """
 Vista del dashboard principal con elementos visuales mejorados.
+
+Las métricas se leen del resumen mensual de pesajes (DashboardService) en
+segundo plano y se actualizan periódicamente mientras la vista existe.
 """
 import tkinter as tk
 import customtkinter as ctk
-from PIL import Image, ImageTk
 import os
 from datetime import datetime
-import random  # Solo para datos de ejemplo
+from core.services.dashboard_service import DashboardService
 
 class DashboardView(ctk.CTkFrame):
     """Dashboard mejorado con elementos visuales atractivos"""
     
+    # Intervalo de actualización de las métricas (milisegundos)
+    REFRESH_INTERVAL_MS = 30000
+    
+    # Materiales con barra propia en el gráfico; el resto se agrupa en "Otros"
+    CHART_MATERIALS = 5
+    CHART_COLORS = ["#E76F51", "#F4A261", "#E9C46A", "#2A9D8F", "#264653", "#6C757D"]
+    
     def __init__(self, parent, **kwargs):
         super().__init__(parent, **kwargs)
         
+        # Servicios de la ventana principal (sin ellos se muestra la vista vacía)
+        main_window = self.winfo_toplevel()
+        data_manager = getattr(main_window, "data_manager", None)
+        self.task_executor = getattr(main_window, "task_executor", None)
+        self.dashboard_service = DashboardService(data_manager) if data_manager else None
+        self._refresh_job = None
+        
         # Configuración de la cuadrícula
         self.columnconfigure((0, 1, 2), weight=1, uniform="equal")
         self.rowconfigure(0, weight=0)  # Espacio para encabezado
@@ -44,6 +60,58 @@ class DashboardView(ctk.CTkFrame):
         # Sección de actividades recientes
         self._create_recent_activities()
         
+        # Cargar métricas
+        self._refresh_metrics()
+    
+    def destroy(self):
+        """Cancela la actualización periódica antes de destruir la vista."""
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        if self.task_executor:
+            self.task_executor.cancel("dashboard.metrics")
+        super().destroy()
+    
+    def _refresh_metrics(self):
+        """Consulta las métricas en segundo plano y programa la próxima actualización."""
+        self._refresh_job = None
+        if self.dashboard_service is None or self.task_executor is None:
+            return
+        self.task_executor.submit(
+            "dashboard.metrics", self.dashboard_service.get_dashboard_data,
+            on_success=self._show_metrics, owner=self
+        )
+        self._refresh_job = self.after(self.REFRESH_INTERVAL_MS, self._refresh_metrics)
+    
+    def _show_metrics(self, data):
+        """
+        Muestra las métricas en las tarjetas y el gráfico.
+        
+        Args:
+            data (dict): Resultado de DashboardService.get_dashboard_data
+        """
+        current = data["current"]
+        previous = data["previous"]
+        
+        self.card_values["weighings"].configure(text=f"{current['weighing_count']:,}")
+        self.card_values["kg"].configure(text=f"{current['total_kg']:,.0f} kg")
+        self.card_values["income"].configure(text=f"${current['total_amount']:,.0f}")
+        
+        for key, field in (("weighings", "weighing_count"), ("kg", "total_kg"),
+                           ("income", "total_amount")):
+            self.card_details[key].configure(
+                text=self._format_change(current[field], previous[field])
+            )
+        
+        self._show_material_chart(data["materials"])
+    
+    def _format_change(self, current, previous):
+        """Texto de la variación respecto al mes anterior."""
+        if not previous:
+            return "Sin datos del mes anterior"
+        change = (current - previous) / previous * 100
+        return f"{change:+.0f}% vs. mes anterior"
+    
     def _load_icons(self):
         """Carga iconos para la interfaz"""
         icons = {}
@@ -62,24 +130,26 @@ class DashboardView(ctk.CTkFrame):
         cards_frame.grid(row=1, column=0, columnspan=3, sticky="nsew", padx=20, pady=10)
         cards_frame.columnconfigure((0, 1, 2), weight=1, uniform="equal")
         
-        # Datos de ejemplo
+        # Tarjetas (los valores llegan con _show_metrics)
         card_data = [
             {
+                "key": "weighings",
                 "title": "Pesajes del Mes",
-                "value": f"{random.randint(50, 200)}",
                 "color": "#43B0F1"  # Azul
             },
             {
-                "title": "Material Reciclado",
-                "value": f"{random.randint(1000, 5000)} kg",
+                "key": "kg",
+                "title": "Material Reciclado (mes)",
                 "color": "#26C485"  # Verde
             },
             {
-                "title": "Ingresos Estimados",
-                "value": f"{random.randint(500, 2000)}€",
+                "key": "income",
+                "title": "Ingresos Estimados (mes)",
                 "color": "#E8A249"  # Ámbar
             }
         ]
+        self.card_values = {}
+        self.card_details = {}
         
         # Crear tarjetas
         for i, data in enumerate(card_data):
@@ -97,14 +167,24 @@ class DashboardView(ctk.CTkFrame):
             
             value = ctk.CTkLabel(
                 card, 
-                text=data["value"],
+                text="—",
                 font=ctk.CTkFont(size=24, weight="bold"),
                 text_color="white"
             )
-            value.pack(pady=(5, 15))
+            value.pack(pady=(5, 0))
+            self.card_values[data["key"]] = value
+            
+            detail = ctk.CTkLabel(
+                card,
+                text="",
+                font=ctk.CTkFont(size=11),
+                text_color="white"
+            )
+            detail.pack(pady=(0, 15))
+            self.card_details[data["key"]] = detail
     
     def _create_charts(self):
-        """Crea visualizaciones gráficas simuladas"""
+        """Crea el gráfico de kilos reciclados por material en el mes"""
         charts_frame = ctk.CTkFrame(self)
         charts_frame.grid(row=2, column=0, columnspan=2, sticky="nsew", padx=(20, 10), pady=10)
         
@@ -116,30 +196,71 @@ class DashboardView(ctk.CTkFrame):
         )
         chart_header.pack(pady=(15, 10))
         
-        # Simulación de gráfico con barras de colores
+        # Gráfico de barras: una fila fija por material (se reutilizan al actualizar)
         chart_content = ctk.CTkFrame(charts_frame, fg_color="transparent")
         chart_content.pack(fill="both", expand=True, padx=20, pady=10)
         
-        materials = ["Cartón", "Plástico", "Metal", "Vidrio", "Otros"]
-        colors = ["#E76F51", "#F4A261", "#E9C46A", "#2A9D8F", "#264653"]
+        self.chart_empty_label = ctk.CTkLabel(
+            chart_content,
+            text="Sin pesajes registrados este mes",
+            text_color="gray"
+        )
         
-        for i, (material, color) in enumerate(zip(materials, colors)):
+        self.chart_rows = []
+        for i, color in enumerate(self.CHART_COLORS[:self.CHART_MATERIALS + 1]):
             # Etiqueta de material
-            ctk.CTkLabel(chart_content, text=material, width=80).grid(
-                row=i, column=0, sticky="w", pady=5)
+            name_label = ctk.CTkLabel(chart_content, text="", width=120, anchor="w")
             
-            # Barra de valor
-            value = random.randint(10, 100)
-            bar_frame = ctk.CTkFrame(chart_content, height=20, fg_color=color, corner_radius=5)
-            bar_frame.grid(row=i, column=1, sticky="ew", pady=5)
+            # Barra de valor (ancho relativo dentro de su celda)
+            bar_cell = ctk.CTkFrame(chart_content, height=20, fg_color="transparent")
+            bar = ctk.CTkFrame(bar_cell, height=20, fg_color=color, corner_radius=5)
             
             # Valor numérico
-            ctk.CTkLabel(chart_content, text=f"{value}%").grid(
-                row=i, column=2, padx=10)
+            value_label = ctk.CTkLabel(chart_content, text="", width=150, anchor="e")
+            
+            self.chart_rows.append((i, name_label, bar_cell, bar, value_label))
             
         # Expandir las barras
         chart_content.columnconfigure(1, weight=1)
     
+    def _show_material_chart(self, materials):
+        """
+        Actualiza el gráfico con los kilos por material.
+        
+        Args:
+            materials (list): Totales por material, de mayor a menor
+        """
+        shown = materials[:self.CHART_MATERIALS]
+        others = materials[self.CHART_MATERIALS:]
+        if others:
+            shown = shown + [{
+                "name": "Otros",
+                "total_kg": sum(item["total_kg"] for item in others),
+            }]
+        
+        total_kg = sum(item["total_kg"] for item in shown)
+        if not shown or total_kg <= 0:
+            self.chart_empty_label.grid(row=0, column=0, columnspan=3, pady=20)
+        else:
+            self.chart_empty_label.grid_forget()
+        
+        largest = max((item["total_kg"] for item in shown), default=0)
+        for i, name_label, bar_cell, bar, value_label in self.chart_rows:
+            if i >= len(shown) or total_kg <= 0:
+                for widget in (name_label, bar_cell, value_label):
+                    widget.grid_forget()
+                continue
+            item = shown[i]
+            name_label.configure(text=item["name"])
+            name_label.grid(row=i + 1, column=0, sticky="w", pady=5)
+            bar_cell.grid(row=i + 1, column=1, sticky="ew", pady=5)
+            bar.place(x=0, rely=0.5, anchor="w",
+                      relwidth=max(0.02, item["total_kg"] / largest) if largest else 0.02)
+            value_label.configure(
+                text=f"{item['total_kg']:,.0f} kg ({item['total_kg'] / total_kg:.0%})"
+            )
+            value_label.grid(row=i + 1, column=2, padx=10)
+    
     def _create_recent_activities(self):
         """Crea panel de actividades recientes"""
         activity_frame = ctk.CTkFrame(self)
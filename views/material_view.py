@@ -5,7 +5,11 @@ import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
 from models.material import Material, MaterialType, PlasticSubtype
+from core.database.change_tracker import apply_row_changes, load_changed_rows
 from core.services.material_service import MaterialService
+from core.utils.text import build_search_key
+from views.components.incremental_filter import IncrementalFilter
+from views.components.virtual_list import VirtualList
 
 class MaterialView(ctk.CTkFrame):
     """Vista para la gestión de materiales."""
@@ -27,6 +31,7 @@ class MaterialView(ctk.CTkFrame):
             self.data_manager = main_window.data_manager
             # Inicializar servicios
             self.material_service = MaterialService(self.data_manager)
+            self.task_executor = main_window.task_executor
         except AttributeError:
             messagebox.showerror("Error", "No se pudo acceder al gestor de datos")
             return
@@ -35,12 +40,30 @@ class MaterialView(ctk.CTkFrame):
         self.materials = []
         self.current_material = None
         self.filtered_materials = []
+        self._pending_material_changes = None
         
         # Crear UI
         self._create_ui()
         
         # Cargar datos iniciales
         self._load_materials()
+        
+        # Refrescar solo las filas que cambien en otros puestos
+        self.change_tracker = getattr(main_window, "change_tracker", None)
+        self._subscriptions = [
+            ("materials", self._on_materials_changed),
+        ]
+        if self.change_tracker:
+            for table, callback in self._subscriptions:
+                self.change_tracker.subscribe(table, callback)
+    
+    def destroy(self):
+        """Cancela las suscripciones a cambios antes de destruir la vista."""
+        change_tracker = getattr(self, "change_tracker", None)
+        if change_tracker:
+            for table, callback in self._subscriptions:
+                change_tracker.unsubscribe(table, callback)
+        super().destroy()
     
     def _create_ui(self):
         """Crea la interfaz de usuario del módulo."""
@@ -73,7 +96,9 @@ class MaterialView(ctk.CTkFrame):
         
         # Barra de búsqueda
         self.search_var = tk.StringVar()
-        self.search_var.trace_add("write", lambda *args: self._filter_materials())
+        self.search_var.trace_add(
+            "write", lambda *args: self.material_filter.set_query(self.search_var.get())
+        )
         
         search_entry = ctk.CTkEntry(
             search_frame,
@@ -133,9 +158,21 @@ class MaterialView(ctk.CTkFrame):
                 font=ctk.CTkFont(weight="bold")
             ).pack()
         
-        # Contenedor para filas de materiales
-        self.material_rows_frame = ctk.CTkScrollableFrame(table_container, fg_color="transparent")
-        self.material_rows_frame.pack(fill="both", expand=True)
+        # Contenedor para filas de materiales (virtualizado: filas reutilizadas)
+        self.material_table = VirtualList(
+            table_container,
+            row_height=46,
+            create_row=self._create_material_row,
+            update_row=self._fill_material_row,
+            empty_text="No se encontraron materiales",
+            fg_color="transparent"
+        )
+        self.material_table.pack(fill="both", expand=True)
+        
+        # Filtro con retardo que acota el resultado anterior mientras se escribe
+        self.material_filter = IncrementalFilter(
+            self, self._material_search_key, self._show_filtered_materials
+        )
     
     def _set_filter(self, filter_type):
         """
@@ -145,142 +182,200 @@ class MaterialView(ctk.CTkFrame):
             filter_type (str): Tipo de filtro a aplicar
         """
         self.filter_var.set(filter_type)
-        self._filter_materials()
+        self.material_filter.set_predicate(
+            None if filter_type == "all" else (lambda material: material.material_type == filter_type)
+        )
     
     def _load_materials(self):
-        """Carga la lista de materiales desde la base de datos."""
-        # Cargar materiales
-        self.materials = self.material_service.get_all_materials()
-        self._filter_materials()
+        """Carga la lista de materiales desde la base de datos (en segundo plano)."""
+        self._pending_material_changes = None
+        self.material_table.set_loading(True)
+        self.task_executor.submit(
+            "materials.list", self.material_service.get_all_materials,
+            on_success=self._on_materials_loaded, owner=self
+        )
     
-    def _filter_materials(self):
-        """Filtra la lista de materiales según búsqueda y filtros."""
-        search_term = self.search_var.get().lower().strip()
-        filter_type = self.filter_var.get()
-        
-        if filter_type == "all":
-            # Filtrar solo por término de búsqueda
-            if not search_term:
-                self.filtered_materials = self.materials.copy()
-            else:
-                self.filtered_materials = [
-                    material for material in self.materials
-                    if (search_term in material.name.lower() or
-                        search_term in material.description.lower() or
-                        search_term in material.custom_subtype.lower())
-                ]
-        else:
-            # Filtrar por tipo y término de búsqueda
-            if not search_term:
-                self.filtered_materials = [
-                    material for material in self.materials
-                    if material.material_type == filter_type
-                ]
-            else:
-                self.filtered_materials = [
-                    material for material in self.materials
-                    if material.material_type == filter_type and
-                       (search_term in material.name.lower() or
-                        search_term in material.description.lower() or
-                        search_term in material.custom_subtype.lower())
-                ]
-        
-        self._update_material_table()
+    def _on_materials_loaded(self, materials):
+        """
+        Muestra los materiales recién cargados.
+        
+        Args:
+            materials (list): Materiales activos
+        """
+        self.materials = materials
+        self._filter_materials()
     
-    def _update_material_table(self):
-        """Actualiza la tabla de materiales en la UI."""
-        # Limpiar tabla actual
-        for widget in self.material_rows_frame.winfo_children():
-            widget.destroy()
-        
-        # Verificar si hay materiales para mostrar
-        if not self.filtered_materials:
-            no_data_label = ctk.CTkLabel(
-                self.material_rows_frame,
-                text="No se encontraron materiales",
-                font=ctk.CTkFont(size=14),
-                text_color="gray60"
-            )
-            no_data_label.pack(pady=30)
+    def _on_materials_changed(self, changes):
+        """
+        Actualiza la tabla con los materiales modificados en otros puestos.
+        
+        Args:
+            changes (dict): {id: operación}, o None para recargar todo
+        """
+        if not self.winfo_exists():
             return
         
-        # Crear filas para cada material
-        for i, material in enumerate(self.filtered_materials):
-            row_color = ("#F5F5F5", "#2D2D2D") if i % 2 == 0 else ("#FFFFFF", "#333333")
-            row_frame = ctk.CTkFrame(self.material_rows_frame, fg_color=row_color, corner_radius=0)
-            row_frame.pack(fill="x", pady=1)
-            
-            # Nombre
-            name_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-            name_frame.pack(side="left", fill="both", expand=True, padx=2, pady=8)
-            ctk.CTkLabel(name_frame, text=material.name).pack(anchor="w", padx=5)
-            
-            # Tipo
-            type_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-            type_frame.pack(side="left", fill="both", expand=True, padx=2, pady=8)
-            
-            type_text = MaterialType.get_display_name(material.material_type)
-            type_color = {
-                MaterialType.PLASTIC: "#4CAF50",
-                MaterialType.CUSTOM: "#FF9800"
-            }.get(material.material_type, "gray60")
-            
-            ctk.CTkLabel(
-                type_frame, 
-                text=type_text,
-                text_color=type_color,
-                font=ctk.CTkFont(size=12, weight="bold")
-            ).pack(anchor="w", padx=5)
-            
-            # Subtipo
-            subtype_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-            subtype_frame.pack(side="left", fill="both", expand=True, padx=2, pady=8)
-            
-            subtype_text = ""
-            if material.material_type == MaterialType.PLASTIC:
-                if material.plastic_subtype == PlasticSubtype.OTHER:
-                    subtype_text = material.custom_subtype
-                else:
-                    subtype_text = PlasticSubtype.get_display_name(material.plastic_subtype)
-            else:
-                subtype_text = material.custom_subtype if material.custom_subtype else "-"
-                
-            ctk.CTkLabel(subtype_frame, text=subtype_text).pack(anchor="w", padx=5)
-            
-            # Estado
-            state_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-            state_frame.pack(side="left", fill="both", expand=True, padx=2, pady=8)
+        # Una recarga completa en curso pudo leer el estado anterior: se repite
+        full_reload_pending = (self.task_executor.is_pending("materials.list")
+                               and self._pending_material_changes is None)
+        if changes is None or full_reload_pending:
+            self._load_materials()
+            return
+        
+        # La carga más reciente reemplaza a la anterior, así que incluye sus filas
+        pending = dict(self._pending_material_changes or {})
+        pending.update(changes)
+        self._pending_material_changes = pending
+        self.task_executor.submit(
+            "materials.list", load_changed_rows, pending, self._load_active_material,
+            on_success=self._on_material_rows_loaded, owner=self
+        )
+    
+    def _on_material_rows_loaded(self, rows):
+        """
+        Aplica a la tabla los materiales cambiados ya cargados.
+        
+        Args:
+            rows (dict): {id: material o None si ya no debe mostrarse}
+        """
+        self._pending_material_changes = None
+        self.materials = apply_row_changes(
+            self.materials, rows, rows.get,
+            sort_key=lambda material: material.name
+        )
+        self._filter_materials(keep_position=True)
+    
+    def _load_active_material(self, material_id):
+        """Obtiene un material si sigue activo (None si debe salir de la lista)."""
+        material = self.material_service.get_material_by_id(material_id)
+        return material if material and material.is_active else None
+    
+    def _filter_materials(self, keep_position=False):
+        """
+        Filtra la lista de materiales según búsqueda y filtros.
+        
+        Args:
+            keep_position (bool, optional): Conservar el desplazamiento de la tabla
+        """
+        # Solo se calculan claves de búsqueda para los materiales nuevos
+        self.material_filter.set_items(self.materials, keep_position=keep_position)
+    
+    def _show_filtered_materials(self, materials, keep_position):
+        """
+        Muestra el resultado del filtro en la tabla.
+        
+        Args:
+            materials (list): Materiales que cumplen los filtros
+            keep_position (bool): Conservar el desplazamiento de la tabla
+        """
+        self.filtered_materials = materials
+        self._update_material_table(keep_position)
+    
+    @staticmethod
+    def _material_search_key(material):
+        """Clave de búsqueda normalizada de un material (se calcula una vez)."""
+        return build_search_key(material.name, material.description, material.custom_subtype)
+    
+    def _update_material_table(self, keep_position=False):
+        """
+        Actualiza la tabla de materiales en la UI.
+        
+        Args:
+            keep_position (bool, optional): Conservar el desplazamiento actual
+        """
+        # Solo se crean widgets para las filas visibles
+        self.material_table.set_items(self.filtered_materials, keep_position=keep_position)
+    
+    def _create_material_row(self, parent):
+        """
+        Crea una fila vacía de la tabla de materiales (se reutiliza al desplazar).
+        
+        Args:
+            parent: Contenedor de la tabla
             
-            if material.material_type == MaterialType.PLASTIC and material.is_plastic_subtype:
-                state_text = "Limpio" if material.plastic_state == "clean" else "Sucio"
+        Returns:
+            CTkFrame: Fila con sus etiquetas y botones
+        """
+        row = ctk.CTkFrame(parent, corner_radius=0)
+        row.stripe = None
+        
+        # Nombre, tipo, subtipo y estado
+        labels = []
+        for _ in range(4):
+            cell_frame = ctk.CTkFrame(row, fg_color="transparent")
+            cell_frame.pack(side="left", fill="both", expand=True, padx=2, pady=8)
+            label = ctk.CTkLabel(cell_frame, text="")
+            label.pack(anchor="w", padx=5)
+            labels.append(label)
+        row.name_label, row.type_label, row.subtype_label, row.state_label = labels
+        row.type_label.configure(font=ctk.CTkFont(size=12, weight="bold"))
+        
+        # Acciones (los comandos usan el material mostrado en la fila)
+        actions_frame = ctk.CTkFrame(row, fg_color="transparent")
+        actions_frame.pack(side="left", fill="both", padx=2, pady=3)
+        
+        # Botón editar
+        edit_btn = ctk.CTkButton(
+            actions_frame,
+            text="✏️",
+            width=30,
+            command=lambda r=row: r.item and self._show_edit_dialog(r.item),
+            fg_color=("#6E9075", "#2D6A6A")
+        )
+        edit_btn.pack(side="left", padx=2)
+        
+        # Botón eliminar
+        delete_btn = ctk.CTkButton(
+            actions_frame,
+            text="🗑️",
+            width=30,
+            command=lambda r=row: r.item and self._confirm_delete(r.item),
+            fg_color=("#BC7777", "#AA5555")
+        )
+        delete_btn.pack(side="left", padx=2)
+        return row
+    
+    def _fill_material_row(self, row, material, index):
+        """
+        Muestra un material en una fila de la tabla.
+        
+        Args:
+            row: Fila creada por _create_material_row
+            material: Material a mostrar
+            index (int): Posición en la lista filtrada
+        """
+        stripe = index % 2
+        if row.stripe != stripe:
+            row.configure(fg_color=("#F5F5F5", "#2D2D2D") if stripe == 0 else ("#FFFFFF", "#333333"))
+            row.stripe = stripe
+        
+        row.name_label.configure(text=material.name)
+        
+        # Tipo
+        type_text = MaterialType.get_display_name(material.material_type)
+        type_color = {
+            MaterialType.PLASTIC: "#4CAF50",
+            MaterialType.CUSTOM: "#FF9800"
+        }.get(material.material_type, "gray60")
+        row.type_label.configure(text=type_text, text_color=type_color)
+        
+        # Subtipo
+        subtype_text = ""
+        if material.material_type == MaterialType.PLASTIC:
+            if material.plastic_subtype == PlasticSubtype.OTHER:
+                subtype_text = material.custom_subtype
             else:
-                state_text = "-"
-                
-            ctk.CTkLabel(state_frame, text=state_text).pack(anchor="w", padx=5)
-            
-            # Acciones
-            actions_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-            actions_frame.pack(side="left", fill="both", padx=2, pady=3)
-            
-            # Botón editar
-            edit_btn = ctk.CTkButton(
-                actions_frame,
-                text="✏️",
-                width=30,
-                command=lambda m=material: self._show_edit_dialog(m),
-                fg_color=("#6E9075", "#2D6A6A")
-            )
-            edit_btn.pack(side="left", padx=2)
-            
-            # Botón eliminar
-            delete_btn = ctk.CTkButton(
-                actions_frame,
-                text="🗑️",
-                width=30,
-                command=lambda m=material: self._confirm_delete(m),
-                fg_color=("#BC7777", "#AA5555")
-            )
-            delete_btn.pack(side="left", padx=2)
+                subtype_text = PlasticSubtype.get_display_name(material.plastic_subtype)
+        else:
+            subtype_text = material.custom_subtype if material.custom_subtype else "-"
+        row.subtype_label.configure(text=subtype_text)
+        
+        # Estado
+        if material.material_type == MaterialType.PLASTIC and material.is_plastic_subtype:
+            state_text = "Limpio" if material.plastic_state == "clean" else "Sucio"
+        else:
+            state_text = "-"
+        row.state_label.configure(text=state_text)
     
     def _show_edit_dialog(self, material=None):
         """
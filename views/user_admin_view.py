@@ -23,6 +23,7 @@ class UserAdminView(ctk.CTkFrame):
         main_window = self.winfo_toplevel()
         try:
             self.data_manager = main_window.data_manager
+            self.task_executor = main_window.task_executor
         except AttributeError:
             messagebox.showerror("Error", "No se pudo acceder al gestor de datos")
             return
@@ -105,18 +106,29 @@ class UserAdminView(ctk.CTkFrame):
         self.users_rows_frame.pack(fill="both", expand=True)
     
     def _load_users(self):
-        """Carga la lista de usuarios desde la base de datos."""
+        """Carga la lista de usuarios desde la base de datos (en segundo plano)."""
         query = """
         SELECT id, username, name, role, is_active 
         FROM users 
         ORDER BY username
         """
         
-        try:
-            self.users = self.data_manager.execute_query(query)
-            self._update_users_table()
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar usuarios: {e}")
+        self.task_executor.submit(
+            "users.list", self.data_manager.execute_query, query,
+            on_success=self._on_users_loaded,
+            on_error=lambda e: messagebox.showerror("Error", f"Error al cargar usuarios: {e}"),
+            owner=self
+        )
+    
+    def _on_users_loaded(self, users):
+        """
+        Muestra los usuarios recién cargados.
+        
+        Args:
+            users (list): Usuarios como diccionarios
+        """
+        self.users = users or []
+        self._update_users_table()
     
     def _filter_users(self):
         """Filtra la lista de usuarios según búsqueda."""
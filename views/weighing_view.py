@@ -0,0 +1,377 @@
+"""
+Vista para el registro de pesajes.
+
+El registro no espera a la base de datos: WeighingService encola el pesaje y
+lo confirma en el próximo lote. La lista muestra los últimos pesajes y se
+completa con los nuevos consultando solo los IDs posteriores al último
+mostrado: los registrados aquí al confirmarse su lote, y los de otros
+puestos cuando el ChangeTracker avisa de cambios en la tabla weighings.
+"""
+import tkinter as tk
+from tkinter import messagebox
+import customtkinter as ctk
+from core.services.weighing_service import RECENT_LIMIT
+from core.utils.text import build_search_key, normalize_text
+from models.weighing import PlasticState, Weighing
+from views.components.virtual_list import VirtualList
+
+class WeighingView(ctk.CTkFrame):
+    """Vista para el registro y consulta de pesajes."""
+
+    # Espera máxima a que se confirme un pesaje registrado aquí (segundos)
+    RECORD_CONFIRM_TIMEOUT = 5.0
+
+    # Opciones mostradas en el selector de cliente/trabajador mientras se escribe
+    PARTNER_SUGGESTIONS = 30
+
+    def __init__(self, parent):
+        """
+        Inicializa la vista de pesajes.
+
+        Args:
+            parent: Frame contenedor
+        """
+        super().__init__(parent)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # Obtener referencias a servicios desde ventana principal
+        main_window = self.winfo_toplevel()
+        try:
+            self.weighing_service = main_window.services["WeighingService"]
+            self.material_service = main_window.services["MaterialService"]
+            self.client_service = main_window.services["ClientService"]
+            self.worker_service = main_window.services.get("WorkerService")
+            self.task_executor = main_window.task_executor
+        except (AttributeError, KeyError):
+            messagebox.showerror("Error", "No se pudo acceder a los servicios necesarios")
+            return
+
+        # Datos de los selectores: nombre mostrado -> entidad
+        self.materials = {}
+        self.partners = {"client": {}, "worker": {}}
+        self.partner_keys = {"client": [], "worker": []}
+
+        # Pesajes mostrados (del más reciente al más antiguo)
+        self.weighings = []
+        self._last_id = 0
+
+        # Crear UI
+        self._create_ui()
+
+        # Cargar datos iniciales
+        self._load_choices()
+        self._load_weighings()
+
+        # Pesajes nuevos de otros puestos (los propios no se notifican)
+        self.change_tracker = getattr(main_window, "change_tracker", None)
+        if self.change_tracker:
+            self.change_tracker.subscribe("weighings", self._on_weighings_changed)
+
+    def destroy(self):
+        """Cancela la suscripción a cambios antes de destruir la vista."""
+        change_tracker = getattr(self, "change_tracker", None)
+        if change_tracker:
+            change_tracker.unsubscribe("weighings", self._on_weighings_changed)
+        super().destroy()
+
+    def _create_ui(self):
+        """Crea la interfaz de usuario del módulo."""
+        container = ctk.CTkFrame(self, fg_color="transparent")
+        container.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        container.grid_rowconfigure(3, weight=1)
+        container.grid_columnconfigure(0, weight=1)
+
+        # Título del módulo
+        header_frame = ctk.CTkFrame(container, fg_color="transparent")
+        header_frame.grid(row=0, column=0, sticky="ew", pady=(0, 15))
+
+        ctk.CTkLabel(
+            header_frame,
+            text="Registro de Pesajes",
+            font=ctk.CTkFont(size=22, weight="bold")
+        ).pack(side="left")
+
+        self.status_label = ctk.CTkLabel(header_frame, text="", text_color="gray")
+        self.status_label.pack(side="right", padx=10)
+
+        # Formulario de registro
+        self._create_form(container)
+
+        # Cabecera de la tabla
+        columns = [("Fecha", 150), ("Material", 180), ("Cliente / Trabajador", 220),
+                   ("Peso", 110), ("Condición", 90), ("Monto", 120)]
+        table_header = ctk.CTkFrame(container, fg_color=("#DDDDDD", "#2B2B2B"))
+        table_header.grid(row=2, column=0, sticky="ew")
+        for text, width in columns:
+            ctk.CTkLabel(
+                table_header,
+                text=text,
+                width=width,
+                anchor="w",
+                font=ctk.CTkFont(weight="bold")
+            ).pack(side="left", padx=5, pady=5)
+
+        # Lista de pesajes (virtualizada: filas reutilizadas)
+        self.weighing_list = VirtualList(
+            container,
+            row_height=36,
+            create_row=lambda parent: self._create_weighing_row(parent, columns),
+            update_row=self._fill_weighing_row,
+            empty_text="No hay pesajes registrados",
+            fg_color="transparent"
+        )
+        self.weighing_list.grid(row=3, column=0, sticky="nsew")
+
+    def _create_form(self, parent):
+        """Crea el formulario de registro de un pesaje."""
+        form = ctk.CTkFrame(parent)
+        form.grid(row=1, column=0, sticky="ew", pady=(0, 15))
+        for column in (1, 3):
+            form.grid_columnconfigure(column, weight=1)
+
+        # Material (la condición se propone según el material)
+        ctk.CTkLabel(form, text="Material:").grid(row=0, column=0, padx=10, pady=8, sticky="w")
+        self.material_var = tk.StringVar()
+        self.material_combo = ctk.CTkComboBox(
+            form,
+            values=[],
+            variable=self.material_var,
+            state="readonly",
+            command=self._on_material_selected
+        )
+        self.material_combo.grid(row=0, column=1, padx=10, pady=8, sticky="ew")
+
+        # Origen: cliente o trabajador
+        ctk.CTkLabel(form, text="Origen:").grid(row=0, column=2, padx=10, pady=8, sticky="w")
+        self.partner_type_var = tk.StringVar(value="Cliente")
+        ctk.CTkSegmentedButton(
+            form,
+            values=["Cliente", "Trabajador"],
+            variable=self.partner_type_var,
+            command=lambda value: self._update_partner_choices()
+        ).grid(row=0, column=3, padx=10, pady=8, sticky="w")
+
+        # Cliente o trabajador (las opciones se acotan mientras se escribe)
+        ctk.CTkLabel(form, text="Nombre:").grid(row=1, column=0, padx=10, pady=8, sticky="w")
+        self.partner_var = tk.StringVar()
+        self.partner_combo = ctk.CTkComboBox(form, values=[], variable=self.partner_var)
+        self.partner_combo.grid(row=1, column=1, padx=10, pady=8, sticky="ew")
+        self.partner_combo.bind("<KeyRelease>", lambda event: self._update_partner_choices())
+
+        # Condición del material
+        ctk.CTkLabel(form, text="Condición:").grid(row=1, column=2, padx=10, pady=8, sticky="w")
+        self.state_var = tk.StringVar(value=PlasticState.get_display_name(PlasticState.CLEAN))
+        ctk.CTkSegmentedButton(
+            form,
+            values=[PlasticState.get_display_name(state) for state in PlasticState.get_all_states()],
+            variable=self.state_var
+        ).grid(row=1, column=3, padx=10, pady=8, sticky="w")
+
+        # Peso y notas
+        ctk.CTkLabel(form, text="Peso (kg):").grid(row=2, column=0, padx=10, pady=8, sticky="w")
+        self.weight_var = tk.StringVar()
+        weight_entry = ctk.CTkEntry(form, textvariable=self.weight_var, placeholder_text="0,0")
+        weight_entry.grid(row=2, column=1, padx=10, pady=8, sticky="ew")
+        weight_entry.bind("<Return>", lambda event: self._record_weighing())
+
+        ctk.CTkLabel(form, text="Notas:").grid(row=2, column=2, padx=10, pady=8, sticky="w")
+        self.notes_var = tk.StringVar()
+        ctk.CTkEntry(form, textvariable=self.notes_var).grid(
+            row=2, column=3, padx=10, pady=8, sticky="ew")
+
+        ctk.CTkButton(
+            form,
+            text="Registrar Pesaje",
+            command=self._record_weighing,
+            fg_color="#2E8B57",
+            hover_color="#3CB371"
+        ).grid(row=3, column=3, padx=10, pady=(0, 10), sticky="e")
+
+    def _create_weighing_row(self, parent, columns):
+        """
+        Crea una fila vacía de la lista de pesajes (se reutiliza al desplazar).
+
+        Args:
+            parent: Contenedor de la lista
+            columns (list): (título, ancho) de cada columna
+
+        Returns:
+            CTkFrame: Fila con sus etiquetas
+        """
+        row = ctk.CTkFrame(parent, corner_radius=0)
+        row.stripe = None
+        row.cells = []
+        for _, width in columns:
+            label = ctk.CTkLabel(row, text="", width=width, anchor="w")
+            label.pack(side="left", padx=5)
+            row.cells.append(label)
+        return row
+
+    def _fill_weighing_row(self, row, weighing, index):
+        """
+        Muestra un pesaje en una fila de la lista.
+
+        Args:
+            row: Fila creada por _create_weighing_row
+            weighing (Weighing): Pesaje a mostrar
+            index (int): Posición en la lista
+        """
+        stripe = index % 2
+        if row.stripe != stripe:
+            row.configure(fg_color=("#F5F5F5", "#2D2D2D") if stripe == 0 else ("#FFFFFF", "#333333"))
+            row.stripe = stripe
+
+        values = (
+            weighing.weighed_at,
+            weighing.material_name or "",
+            weighing.partner_name,
+            f"{weighing.net_weight_kg:,.1f} kg",
+            PlasticState.get_display_name(weighing.plastic_state) if weighing.plastic_state else "",
+            f"${weighing.amount:,.0f}" if weighing.amount else "",
+        )
+        for label, value in zip(row.cells, values):
+            label.configure(text=value)
+
+    def _load_choices(self):
+        """Carga materiales, clientes y trabajadores para el formulario (en segundo plano)."""
+        self.task_executor.submit(
+            "weighings.materials", self.material_service.get_all_materials,
+            on_success=self._on_materials_loaded, owner=self
+        )
+        self.task_executor.submit(
+            "weighings.clients", self.client_service.get_all_clients,
+            on_success=lambda clients: self._on_partners_loaded("client", clients), owner=self
+        )
+        if self.worker_service:
+            self.task_executor.submit(
+                "weighings.workers", self.worker_service.get_all_workers,
+                on_success=lambda workers: self._on_partners_loaded("worker", workers), owner=self
+            )
+
+    def _on_materials_loaded(self, materials):
+        """Llena el selector de materiales."""
+        self.materials = {material.get_full_name(): material for material in materials}
+        names = list(self.materials)
+        self.material_combo.configure(values=names)
+        if names and self.material_var.get() not in self.materials:
+            self.material_var.set(names[0])
+            self._on_material_selected(names[0])
+
+    def _on_partners_loaded(self, partner_type, partners):
+        """Guarda clientes o trabajadores con su clave de búsqueda."""
+        by_name = {}
+        for partner in partners:
+            label = f"{partner.name} ({partner.rut})" if partner.rut else partner.name
+            by_name[label] = partner
+        self.partners[partner_type] = by_name
+        self.partner_keys[partner_type] = [
+            (build_search_key(partner.name, partner.rut), label)
+            for label, partner in by_name.items()
+        ]
+        self._update_partner_choices()
+
+    def _partner_type(self):
+        return "worker" if self.partner_type_var.get() == "Trabajador" else "client"
+
+    def _update_partner_choices(self):
+        """Acota las opciones del selector de cliente/trabajador al texto escrito."""
+        query = normalize_text(self.partner_var.get())
+        choices = []
+        for key, label in self.partner_keys[self._partner_type()]:
+            if query in key or label == self.partner_var.get():
+                choices.append(label)
+                if len(choices) >= self.PARTNER_SUGGESTIONS:
+                    break
+        self.partner_combo.configure(values=choices)
+
+    def _on_material_selected(self, name):
+        """Propone la condición registrada en el material."""
+        material = self.materials.get(name)
+        if material and material.plastic_state in PlasticState.get_all_states():
+            self.state_var.set(PlasticState.get_display_name(material.plastic_state))
+
+    def _record_weighing(self):
+        """Valida el formulario y registra el pesaje."""
+        material = self.materials.get(self.material_var.get())
+        partner_type = self._partner_type()
+        partner = self.partners[partner_type].get(self.partner_var.get())
+
+        try:
+            weight = float(self.weight_var.get().replace(",", "."))
+        except ValueError:
+            messagebox.showerror("Error", "El peso debe ser un número")
+            return
+
+        state = next(
+            (state for state in PlasticState.get_all_states()
+             if PlasticState.get_display_name(state) == self.state_var.get()),
+            ""
+        )
+        weighing = Weighing(
+            material_id=material.id if material else None,
+            client_id=partner.id if partner and partner_type == "client" else None,
+            worker_id=partner.id if partner and partner_type == "worker" else None,
+            net_weight_kg=weight,
+            plastic_state=state,
+            notes=self.notes_var.get().strip(),
+            material_name=material.name if material else "",
+            client_name=partner.name if partner and partner_type == "client" else "",
+            worker_name=partner.name if partner and partner_type == "worker" else "",
+        )
+
+        try:
+            self.weighing_service.record_weighing(weighing)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        # Limpiar para la siguiente lectura; el pesaje aparece al confirmarse
+        self.weight_var.set("")
+        self.notes_var.set("")
+        self._update_status()
+        self.task_executor.submit(
+            "weighings.recorded", self._load_confirmed_weighings, self._last_id,
+            on_success=self._on_new_weighings, owner=self
+        )
+
+    def _update_status(self):
+        """Muestra cuántos pesajes esperan confirmación."""
+        pending = self.weighing_service.writer.stats()["pending"]
+        self.status_label.configure(text=f"{pending} pendientes de guardar" if pending else "")
+
+    def _load_weighings(self):
+        """Carga los últimos pesajes (en segundo plano)."""
+        self.weighing_list.set_loading(True)
+        self.task_executor.submit(
+            "weighings.list", self.weighing_service.get_recent_weighings,
+            on_success=self._on_weighings_loaded, owner=self
+        )
+
+    def _on_weighings_loaded(self, weighings):
+        """Muestra los pesajes cargados."""
+        self.weighings = weighings
+        self._last_id = weighings[0].id if weighings else 0
+        self.weighing_list.set_items(self.weighings)
+
+    def _on_weighings_changed(self, changes):
+        """Consulta los pesajes posteriores al último mostrado (otro puesto registró pesajes)."""
+        self.task_executor.submit(
+            "weighings.new", self.weighing_service.get_weighings_since, self._last_id,
+            on_success=self._on_new_weighings, owner=self
+        )
+
+    def _load_confirmed_weighings(self, last_id):
+        """Espera a que se confirme el lote en curso y obtiene los pesajes nuevos (en segundo plano)."""
+        self.weighing_service.flush(self.RECORD_CONFIRM_TIMEOUT)
+        return self.weighing_service.get_weighings_since(last_id)
+
+    def _on_new_weighings(self, weighings):
+        """Agrega los pesajes nuevos al inicio de la lista."""
+        # Dos consultas en curso pueden devolver los mismos pesajes
+        weighings = [weighing for weighing in weighings if weighing.id > self._last_id]
+        if weighings:
+            self._last_id = weighings[0].id
+            self.weighings = (weighings + self.weighings)[:RECENT_LIMIT]
+            self.weighing_list.set_items(self.weighings, keep_position=True)
+        self._update_status()
@@ -4,6 +4,12 @@ Vista para la gestión de trabajadores en ISMAPP.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import customtkinter as ctk
+from core.database.change_tracker import apply_row_changes, load_changed_rows
+from core.utils.text import build_search_key
+from views.components.attachments_panel import AttachmentsPanel
+from views.components.incremental_filter import IncrementalFilter
+from views.components.virtual_list import VirtualList
+from models.attachment import AttachmentEntity
 from models.worker import Worker, BankAccount
 from datetime import datetime, date
 
@@ -25,6 +31,9 @@ class WorkerView(ctk.CTkFrame):
         main_window = self.winfo_toplevel()
         try:
             self.worker_service = main_window.services.get("WorkerService")
+            self.attachment_service = main_window.services.get("AttachmentService")
+            self.task_executor = main_window.task_executor
+            self.username = main_window.current_user.username if main_window.current_user else ""
         except AttributeError:
             messagebox.showerror("Error", "No se pudo acceder a los servicios necesarios")
             return
@@ -35,12 +44,30 @@ class WorkerView(ctk.CTkFrame):
         self.departments = ["Administración", "Operaciones", "Ventas", "Producción", "Logística", "Otro"]
         self.contract_types = ["Contrato Indefinido", "Contrato a Plazo Fijo", "Por Día", "Por Producción", "Honorarios", "Otro"]
         self.bank_accounts = []  # Lista para almacenar las cuentas bancarias del trabajador actual
+        self._pending_worker_changes = None
         
         # Crear UI
         self._create_ui()
         
         # Cargar datos iniciales
         self._load_workers()
+        
+        # Refrescar solo las filas que cambien en otros puestos
+        self.change_tracker = getattr(main_window, "change_tracker", None)
+        self._subscriptions = [
+            ("workers", self._on_workers_changed),
+        ]
+        if self.change_tracker:
+            for table, callback in self._subscriptions:
+                self.change_tracker.subscribe(table, callback)
+    
+    def destroy(self):
+        """Cancela las suscripciones a cambios antes de destruir la vista."""
+        change_tracker = getattr(self, "change_tracker", None)
+        if change_tracker:
+            for table, callback in self._subscriptions:
+                change_tracker.unsubscribe(table, callback)
+        super().destroy()
     
     def _create_ui(self):
         """Crea la interfaz de usuario."""
@@ -104,10 +131,10 @@ class WorkerView(ctk.CTkFrame):
             values=department_filters,
             variable=self.filter_var,
             state="readonly",
-            width=150
+            width=150,
+            command=self._apply_department_filter
         )
         dept_filter.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
-        dept_filter.bind("<<ComboboxSelected>>", self._apply_filter)
         
         # Campo de búsqueda
         search_frame = ctk.CTkFrame(filter_frame, fg_color="transparent")
@@ -131,9 +158,21 @@ class WorkerView(ctk.CTkFrame):
             command=self._apply_filter
         ).grid(row=0, column=1, padx=(5, 0))
         
-        # Lista de trabajadores con scroll
-        self.workers_frame = ctk.CTkScrollableFrame(self.left_panel)
-        self.workers_frame.grid(row=2, column=0, sticky="nsew", pady=(10, 0))
+        # Lista de trabajadores con scroll (virtualizada: filas reutilizadas)
+        self.workers_list = VirtualList(
+            self.left_panel,
+            row_height=60,
+            create_row=self._create_worker_row,
+            update_row=self._fill_worker_row,
+            on_select=self._select_worker,
+            empty_text="No se encontraron trabajadores"
+        )
+        self.workers_list.grid(row=2, column=0, sticky="nsew", pady=(10, 0))
+        
+        # Filtro con retardo que acota el resultado anterior mientras se escribe
+        self.worker_filter = IncrementalFilter(
+            self, self._worker_search_key, self._show_filtered_workers
+        )
     
     def _create_right_panel(self):
         """Configura el panel derecho con los detalles del trabajador."""
@@ -145,11 +184,17 @@ class WorkerView(ctk.CTkFrame):
         self.tabs.add("Información Personal")
         self.tabs.add("Datos Laborales")
         self.tabs.add("Cuentas Bancarias")
+        self.tabs.add("Adjuntos")
         
         # Configurar pestañas
         self._setup_personal_tab(self.tabs.tab("Información Personal"))
         self._setup_employment_tab(self.tabs.tab("Datos Laborales"))
         self._setup_banking_tab(self.tabs.tab("Cuentas Bancarias"))
+        self.attachments_panel = AttachmentsPanel(
+            self.tabs.tab("Adjuntos"), self.attachment_service, self.task_executor,
+            AttachmentEntity.WORKER, uploaded_by=self.username
+        )
+        self.attachments_panel.pack(fill="both", expand=True, padx=5, pady=5)
     
     def _setup_personal_tab(self, parent):
         """Configura la pestaña de información personal."""
@@ -364,99 +409,149 @@ class WorkerView(ctk.CTkFrame):
         ).pack(padx=10, pady=10)
     
     def _load_workers(self):
-        """Carga la lista de trabajadores desde la base de datos."""
-        self.workers = self.worker_service.get_all_workers()
+        """Carga la lista de trabajadores desde la base de datos (en segundo plano)."""
+        self._pending_worker_changes = None
+        self.workers_list.set_loading(True)
+        self.task_executor.submit(
+            "workers.list", self.worker_service.get_all_workers,
+            on_success=self._on_workers_loaded, owner=self
+        )
+    
+    def _on_workers_loaded(self, workers):
+        """
+        Muestra los trabajadores recién cargados.
+        
+        Args:
+            workers (list): Trabajadores activos
+        """
+        self.workers = workers
         self._update_workers_list()
     
-    def _update_workers_list(self):
-        """Actualiza la lista visual de trabajadores según filtros."""
-        # Limpiar lista actual
-        for widget in self.workers_frame.winfo_children():
-            widget.destroy()
-            
-        # Obtener filtros
-        search_term = self.search_var.get().lower()
-        filter_dept = self.filter_var.get()
-        if filter_dept == "Todos":
-            filter_dept = None
-            
-        # Filtrar trabajadores
-        filtered_workers = self.workers
+    def _on_workers_changed(self, changes):
+        """
+        Actualiza la lista con los trabajadores modificados en otros puestos.
         
-        # Aplicar filtro de departamento si está seleccionado
-        if filter_dept:
-            filtered_workers = [w for w in filtered_workers if w.department == filter_dept]
-            
-        # Aplicar filtro de búsqueda
-        if search_term:
-            filtered_workers = [
-                w for w in filtered_workers 
-                if search_term in w.name.lower() or 
-                   (w.rut and search_term in w.rut.lower()) or
-                   (w.position and search_term in w.position.lower())
-            ]
-        
-        # Mostrar mensaje si no hay trabajadores
-        if not filtered_workers:
-            no_results = ctk.CTkLabel(
-                self.workers_frame,
-                text="No se encontraron trabajadores",
-                font=ctk.CTkFont(size=14),
-                text_color="gray"
-            )
-            no_results.pack(pady=20)
+        Args:
+            changes (dict): {id: operación}, o None para recargar todo
+        """
+        if not self.winfo_exists():
             return
         
-        # Crear elementos visuales para cada trabajador
-        for i, worker in enumerate(filtered_workers):
-            # Crear frame para el trabajador
-            worker_frame = ctk.CTkFrame(self.workers_frame)
-            worker_frame.pack(fill="x", pady=2)
-            
-            # Al hacer clic, seleccionar el trabajador
-            worker_frame.bind("<Button-1>", lambda e, w=worker: self._select_worker(w))
-            
-            # Nombre del trabajador
-            name_label = ctk.CTkLabel(
-                worker_frame,
-                text=worker.name,
-                font=ctk.CTkFont(weight="bold")
-            )
-            name_label.bind("<Button-1>", lambda e, w=worker: self._select_worker(w))
-            name_label.pack(anchor="w", pady=(5, 0), padx=10)
-            
-            # Cargo y departamento
-            info_frame = ctk.CTkFrame(worker_frame, fg_color="transparent")
-            info_frame.pack(fill="x", padx=10, pady=(0, 5))
-            
-            position_text = worker.position if worker.position else ""
-            if worker.department:
-                if position_text:
-                    position_text += f" - {worker.department}"
-                else:
-                    position_text = worker.department
-                    
-            position_label = ctk.CTkLabel(
-                info_frame,
-                text=position_text,
-                font=ctk.CTkFont(size=12)
-            )
-            position_label.bind("<Button-1>", lambda e, w=worker: self._select_worker(w))
-            position_label.pack(side="left")
+        # Una recarga completa en curso pudo leer el estado anterior: se repite
+        full_reload_pending = (self.task_executor.is_pending("workers.list")
+                               and self._pending_worker_changes is None)
+        if changes is None or full_reload_pending:
+            self._load_workers()
+            return
+        
+        # La carga más reciente reemplaza a la anterior, así que incluye sus filas.
+        # get_worker_by_id devuelve None para trabajadores inactivos o borrados
+        pending = dict(self._pending_worker_changes or {})
+        pending.update(changes)
+        self._pending_worker_changes = pending
+        self.task_executor.submit(
+            "workers.list", load_changed_rows, pending, self.worker_service.get_worker_by_id,
+            on_success=self._on_worker_rows_loaded, owner=self
+        )
+    
+    def _on_worker_rows_loaded(self, rows):
+        """
+        Aplica a la lista los trabajadores cambiados ya cargados.
+        
+        Args:
+            rows (dict): {id: trabajador o None si ya no debe mostrarse}
+        """
+        self._pending_worker_changes = None
+        self.workers = apply_row_changes(self.workers, rows, rows.get)
+        self._update_workers_list(keep_position=True)
+    
+    def _update_workers_list(self, keep_position=False):
+        """
+        Actualiza la lista visual de trabajadores según filtros.
+        
+        Args:
+            keep_position (bool, optional): Conservar el desplazamiento actual
+        """
+        # Solo se calculan claves de búsqueda para los trabajadores nuevos
+        self.worker_filter.set_items(self.workers, keep_position=keep_position)
+    
+    def _show_filtered_workers(self, workers, keep_position):
+        """
+        Muestra el resultado del filtro (solo se crean widgets para las filas visibles).
+        
+        Args:
+            workers (list): Trabajadores que cumplen los filtros
+            keep_position (bool): Conservar el desplazamiento actual
+        """
+        self.workers_list.set_items(workers, keep_position=keep_position)
+    
+    @staticmethod
+    def _worker_search_key(worker):
+        """Clave de búsqueda normalizada de un trabajador (se calcula una vez)."""
+        return build_search_key(worker.name, worker.rut, worker.position)
+    
+    def _create_worker_row(self, parent):
+        """
+        Crea una fila vacía de la lista de trabajadores (se reutiliza al desplazar).
+        
+        Args:
+            parent: Contenedor de la lista
             
-            # RUT
-            rut_label = ctk.CTkLabel(
-                info_frame,
-                text=f"RUT: {worker.rut}" if worker.rut else "",
-                font=ctk.CTkFont(size=12),
-                text_color="gray50"
-            )
-            rut_label.bind("<Button-1>", lambda e, w=worker: self._select_worker(w))
-            rut_label.pack(side="right")
+        Returns:
+            CTkFrame: Fila con sus etiquetas
+        """
+        row = ctk.CTkFrame(parent)
+        
+        # Nombre del trabajador
+        row.name_label = ctk.CTkLabel(row, text="", font=ctk.CTkFont(weight="bold"))
+        row.name_label.pack(anchor="w", pady=(5, 0), padx=10)
+        
+        # Cargo, departamento y RUT
+        info_frame = ctk.CTkFrame(row, fg_color="transparent")
+        info_frame.pack(fill="x", padx=10, pady=(0, 5))
+        
+        row.position_label = ctk.CTkLabel(info_frame, text="", font=ctk.CTkFont(size=12))
+        row.position_label.pack(side="left")
+        
+        row.rut_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray50"
+        )
+        row.rut_label.pack(side="right")
+        return row
+    
+    def _fill_worker_row(self, row, worker, index):
+        """
+        Muestra un trabajador en una fila de la lista.
+        
+        Args:
+            row: Fila creada por _create_worker_row
+            worker: Trabajador a mostrar
+            index (int): Posición en la lista filtrada
+        """
+        position_text = worker.position if worker.position else ""
+        if worker.department:
+            if position_text:
+                position_text += f" - {worker.department}"
+            else:
+                position_text = worker.department
+        
+        row.name_label.configure(text=worker.name)
+        row.position_label.configure(text=position_text)
+        row.rut_label.configure(text=f"RUT: {worker.rut}" if worker.rut else "")
     
     def _apply_filter(self, *args):
-        """Aplica los filtros de búsqueda."""
-        self._update_workers_list()
+        """Aplica el término de búsqueda (tras una breve pausa al escribir)."""
+        self.worker_filter.set_query(self.search_var.get())
+    
+    def _apply_department_filter(self, *args):
+        """Aplica el filtro por departamento."""
+        department = self.filter_var.get()
+        self.worker_filter.set_predicate(
+            None if department == "Todos" else (lambda worker: worker.department == department)
+        )
     
     def _select_worker(self, worker):
         """
@@ -490,8 +585,9 @@ class WorkerView(ctk.CTkFrame):
         else:
             self.form_vars["salary"].set("")
         
-        # Cargar cuentas bancarias
+        # Cargar cuentas bancarias y adjuntos
         self._load_bank_accounts(worker)
+        self.attachments_panel.set_entity(worker.id)
         
         # Activar botones de guardar y eliminar
         self.save_btn.configure(state="normal")
@@ -510,8 +606,9 @@ class WorkerView(ctk.CTkFrame):
         for var in self.form_vars.values():
             var.set("")
         
-        # Limpiar cuentas bancarias
+        # Limpiar cuentas bancarias y adjuntos
         self._load_bank_accounts(None)
+        self.attachments_panel.set_entity(None)
         
         # Activar botón guardar y desactivar botón eliminar
         self.save_btn.configure(state="normal")
@@ -582,6 +679,8 @@ class WorkerView(ctk.CTkFrame):
             # Habilitar botones
             self.save_employment_btn.configure(state="normal")
             self.add_account_btn.configure(state="normal")
+            if self.attachments_panel.entity_id != worker.id:
+                self.attachments_panel.set_entity(worker.id)
         else:
             messagebox.showerror("Error", "Error al guardar el trabajador")
     
@@ -644,7 +743,13 @@ class WorkerView(ctk.CTkFrame):
         for widget in self.accounts_list_frame.winfo_children():
             widget.destroy()
         
+        # Obtener cuentas del trabajador
+        self.bank_accounts = []
+        
         if not worker:
+            # Descartar la carga de otro trabajador que siga en curso
+            self.task_executor.cancel("workers.bank_accounts")
+            
             # Mostrar mensaje de no cuentas
             self.no_accounts_label = ctk.CTkLabel(
                 self.accounts_list_frame,
@@ -655,17 +760,36 @@ class WorkerView(ctk.CTkFrame):
             self.no_accounts_label.pack(pady=30)
             return
         
-        # Obtener cuentas del trabajador
-        self.bank_accounts = []
+        ctk.CTkLabel(
+            self.accounts_list_frame,
+            text="Cargando...",
+            font=ctk.CTkFont(size=14),
+            text_color="gray"
+        ).pack(pady=30)
+        
+        # Cargar las cuentas desde la base de datos en segundo plano
+        self.task_executor.submit(
+            "workers.bank_accounts", self.worker_service.get_worker_bank_accounts, worker.id,
+            on_success=lambda accounts: self._show_bank_accounts(worker, accounts),
+            # Si falla la consulta, usar las cuentas del objeto worker si están disponibles
+            on_error=lambda error: self._show_bank_accounts(
+                worker, getattr(worker, "bank_accounts", None) or []
+            ),
+            owner=self
+        )
+    
+    def _show_bank_accounts(self, worker, accounts):
+        """
+        Muestra las cuentas bancarias cargadas del trabajador.
         
-        # Intentar cargar las cuentas desde la base de datos
-        try:
-            # Si tienes un método en el servicio para obtener cuentas
-            self.bank_accounts = self.worker_service.get_worker_bank_accounts(worker.id)
-        except Exception:
-            # Si el método no existe, usar las cuentas del objeto worker si están disponibles
-            if hasattr(worker, "bank_accounts"):
-                self.bank_accounts = worker.bank_accounts
+        Args:
+            worker: Objeto Worker al que pertenecen las cuentas
+            accounts (list): Cuentas bancarias (objetos BankAccount)
+        """
+        for widget in self.accounts_list_frame.winfo_children():
+            widget.destroy()
+        
+        self.bank_accounts = list(accounts)
         
         # Si no hay cuentas pero hay datos de cuenta "legado", crear una cuenta primaria
         if not self.bank_accounts and (worker.bank_name or worker.account_number):